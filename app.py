@@ -1,49 +1,35 @@
 import os
-import json
 import logging
 import tkinter as tk
 from tkinter import ttk, messagebox
-import threading
 import time
 
-# Probeer de andere componenten te importeren
-try:
-    from website_monitor import MrFixMonitor
-    from job_filter import get_job_filter
-    from calendar_integration import get_calendar_integration
-    from notification import send_notification
-except ImportError:
-    # Dummy imports voor testen
-    MrFixMonitor = None
-    get_job_filter = None
-    get_calendar_integration = None
-    send_notification = None
+from control_client import connect_to_daemon, ControlError, EVENT_CONNECTION
+from control_api import EVENT_METRICS, EVENT_PREFERENCES
+from job_view import JobListView
+from log_viewer import LogViewer, LogFilter, format_entry
+from logging_setup import setup_logging
+from monitoring_service import (get_monitoring_service, start_integrations,
+                                EVENT_STATE, EVENT_CHECK, EVENT_JOBS, EVENT_ERROR, EVENT_FAILED)
+from notification_metrics import get_notification_metrics
+from preferences import get_preferences, get_preferences_service, watch_preferences
+from ui_events import UIEventBus, LATEST, EXTEND
 
 # Configuratie
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, 'data')
 LOG_DIR = os.path.join(BASE_DIR, 'logs')
 LOG_PATH = os.path.join(LOG_DIR, 'app.log')
-PREFERENCES_FILE = os.path.join(DATA_DIR, 'user_preferences.json')
 
-# Zorg ervoor dat de data en logs directories bestaan
-os.makedirs(DATA_DIR, exist_ok=True)
-os.makedirs(LOG_DIR, exist_ok=True)
+# Milliseconden tussen het verversen van de kanaalstatistieken op het dashboard
+METRICS_REFRESH_INTERVAL = 5000
 
-# Logging configuratie
-logging.basicConfig(
-    filename=LOG_PATH,
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
-
-# Configureer ook logging naar console
-console = logging.StreamHandler()
-console.setLevel(logging.INFO)
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-console.setFormatter(formatter)
-logging.getLogger('').addHandler(console)
+# Logboek tab: aantal berichten bij openen of vernieuwen, maximaal aantal regels in beeld,
+# en milliseconden tussen controles op nieuwe berichten in de logbestanden
+LOG_TAIL_LINES = 100
+LOG_MAX_LINES = 2000
+LOG_POLL_INTERVAL = 1000
+LOG_LEVELS = ("ALLE", "DEBUG", "INFO", "WARNING", "ERROR")
 
 class MrFixApp:
     def __init__(self, root):
@@ -71,13 +57,33 @@ class MrFixApp:
         self.create_preferences_tab()
         self.create_logs_tab()
         
-        # Initialiseer de monitoring thread
-        self.monitoring_active = False
-        self.monitoring_thread = None
+        # Gebeurtenissen uit andere threads komen via de bus in de Tk thread, samengevoegd per frame
+        self.ui_events = UIEventBus(self.root, self.handle_ui_event, merge={
+            EVENT_CONNECTION: LATEST,
+            EVENT_METRICS: LATEST,
+            EVENT_STATE: LATEST,
+            EVENT_CHECK: LATEST,
+            EVENT_JOBS: EXTEND,
+            EVENT_PREFERENCES: EXTEND,
+        }).start()
         
         # Laad voorkeuren
         self.load_preferences()
         
+        # Draait de daemon, dan volgt en bestuurt de GUI die via de control API; anders draait
+        # de monitoring in een eigen thread in dit proces. Beide melden gebeurtenissen aan de GUI.
+        self.monitoring = connect_to_daemon()
+        self.remote = self.monitoring is not None
+        if not self.remote:
+            self.monitoring = get_monitoring_service()
+        self.monitoring.subscribe(self.ui_events.post)
+        
+        if not self.remote:
+            # Laat de monitoring ook via Telegram commando's besturen, met bezorgstatistieken
+            # op het dashboard en via http://127.0.0.1:9464/metrics
+            start_integrations(self.monitoring)
+            self.refresh_channel_metrics()
+        
         logging.info("MrFix App geïnitialiseerd")
 
     def create_dashboard_tab(self):
@@ -115,43 +121,29 @@ class MrFixApp:
         self.last_check_label = ttk.Label(stats_frame, text="-")
         self.last_check_label.grid(row=2, column=1, sticky=tk.W, padx=5, pady=5)
         
-        # Recente opdrachten sectie
-        recent_frame = ttk.LabelFrame(frame, text="Recente Opdrachten")
-        recent_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # Treeview voor recente opdrachten
-        columns = ("titel", "locatie", "datum", "status")
-        self.recent_jobs_tree = ttk.Treeview(recent_frame, columns=columns, show="headings")
-        
-        # Definieer kolomkoppen
-        self.recent_jobs_tree.heading("titel", text="Titel")
-        self.recent_jobs_tree.heading("locatie", text="Locatie")
-        self.recent_jobs_tree.heading("datum", text="Datum")
-        self.recent_jobs_tree.heading("status", text="Status")
-        
-        # Definieer kolombreedte
-        self.recent_jobs_tree.column("titel", width=300)
-        self.recent_jobs_tree.column("locatie", width=150)
-        self.recent_jobs_tree.column("datum", width=150)
-        self.recent_jobs_tree.column("status", width=100)
-        
-        # Voeg scrollbar toe
-        scrollbar = ttk.Scrollbar(recent_frame, orient=tk.VERTICAL, command=self.recent_jobs_tree.yview)
-        self.recent_jobs_tree.configure(yscroll=scrollbar.set)
-        
-        # Plaats de treeview en scrollbar
-        self.recent_jobs_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        # Voeg wat voorbeeldgegevens toe
-        for i in range(5):
-            self.recent_jobs_tree.insert("", tk.END, values=(f"Voorbeeld opdracht {i+1}", "Amsterdam", "2025-03-25", "Verwerkt"))
+        # Notificatiekanalen sectie
+        channels_frame = ttk.LabelFrame(frame, text="Notificatiekanalen")
+        channels_frame.pack(fill=tk.X, padx=5, pady=5)
+        
+        columns = ("kanaal", "verzonden", "geslaagd", "latentie", "status", "fout")
+        self.channels_tree = ttk.Treeview(channels_frame, columns=columns, show="headings", height=4)
+        for column, heading, width in (("kanaal", "Kanaal", 110), ("verzonden", "Verzonden", 80),
+                                       ("geslaagd", "Geslaagd", 70), ("latentie", "p95 latentie", 90),
+                                       ("status", "Status", 80), ("fout", "Laatste fout", 370)):
+            self.channels_tree.heading(column, text=heading)
+            self.channels_tree.column(column, width=width)
+        self.channels_tree.pack(fill=tk.X)
+        
+        # Opdrachten sectie: alle verwerkte opdrachten uit de database, pagina voor pagina
+        jobs_frame = ttk.LabelFrame(frame, text="Opdrachten")
+        jobs_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        self.jobs_view = JobListView(jobs_frame, on_change=self.update_accepted_count)
 
     def create_preferences_tab(self):
         """Maak de voorkeuren tab."""
         # Maak een instantie van de GUI klasse voor voorkeuren
         from gui import MrFixPreferencesGUI
-        self.preferences_gui = MrFixPreferencesGUI(self.preferences_frame)
+        self.preferences_gui = MrFixPreferencesGUI(self.preferences_frame, save=self.save_preferences)
 
     def create_logs_tab(self):
         """Maak de logboek tab."""
@@ -181,166 +173,174 @@ class MrFixApp:
         clear_button = ttk.Button(button_frame, text="Wissen", command=self.clear_logs)
         clear_button.pack(side=tk.LEFT, padx=5)
         
-        # Laad initiële logs
+        # Filters (op niveau en job id), voor alle logbestanden samen
+        ttk.Label(button_frame, text="Niveau:").pack(side=tk.LEFT, padx=(20, 5))
+        self.log_level_var = tk.StringVar(value=LOG_LEVELS[0])
+        level_box = ttk.Combobox(button_frame, textvariable=self.log_level_var, values=LOG_LEVELS, state="readonly", width=10)
+        level_box.bind("<<ComboboxSelected>>", lambda event: self.refresh_logs())
+        level_box.pack(side=tk.LEFT)
+        ttk.Label(button_frame, text="Job id:").pack(side=tk.LEFT, padx=(20, 5))
+        self.log_job_id_var = tk.StringVar()
+        job_id_entry = ttk.Entry(button_frame, textvariable=self.log_job_id_var, width=20)
+        job_id_entry.bind("<Return>", lambda event: self.refresh_logs())
+        job_id_entry.pack(side=tk.LEFT)
+        
+        # Laad initiële logs en volg daarna nieuwe berichten
         self.refresh_logs()
+        self.root.after(LOG_POLL_INTERVAL, self.poll_logs)
 
     def load_preferences(self):
-        """Laad gebruikersvoorkeuren uit het configuratiebestand."""
-        try:
-            if os.path.exists(PREFERENCES_FILE):
-                with open(PREFERENCES_FILE, 'r') as f:
-                    self.preferences = json.load(f)
-                    logging.info(f"Voorkeuren geladen uit {PREFERENCES_FILE}")
-            else:
-                logging.warning(f"Voorkeuren bestand niet gevonden: {PREFERENCES_FILE}")
-                self.preferences = {}
-        except Exception as e:
-            logging.error(f"Fout bij laden van voorkeuren: {e}")
-            self.preferences = {}
+        """Gebruik de gedeelde voorkeuren en volg wijzigingen (na opslaan in de voorkeuren tab of in het bestand)."""
+        self.preferences = get_preferences()
+        get_preferences_service().subscribe(self.on_preferences_changed)
+        watch_preferences()
 
-    def save_preferences(self):
-        """Sla gebruikersvoorkeuren op in het configuratiebestand."""
-        try:
-            with open(PREFERENCES_FILE, 'w') as f:
-                json.dump(self.preferences, f, indent=4)
-            logging.info(f"Voorkeuren opgeslagen in {PREFERENCES_FILE}")
-        except Exception as e:
-            logging.error(f"Fout bij opslaan van voorkeuren: {e}")
-            messagebox.showerror("Fout", f"Fout bij opslaan van voorkeuren: {e}")
+    def save_preferences(self, values):
+        """Sla voorkeuren op; met een daemon in de daemon, die ze ook naar het bestand schrijft."""
+        if self.remote:
+            self.monitoring.client.push_preferences(values)
+        else:
+            get_preferences_service().save(values)
+
+    def on_preferences_changed(self, preferences, changed):
+        """Neem nieuwe voorkeuren over; kan vanuit elke thread worden aangeroepen."""
+        self.preferences = preferences
+        self.ui_events.post(EVENT_PREFERENCES, list(changed))
+
+    @property
+    def monitoring_active(self):
+        return self.monitoring.active
+
+    def handle_ui_event(self, event, value):
+        """Verwerk een (samengevoegde) gebeurtenis van de monitoring of de voorkeuren in de GUI thread."""
+        if event == EVENT_CONNECTION:
+            self.show_daemon_status(value)
+        elif event == EVENT_METRICS:
+            self.show_channel_metrics(value)
+        elif event == EVENT_STATE:
+            self.show_monitoring_state(value)
+        elif event == EVENT_CHECK:
+            self.update_last_check_label(value)
+        elif event == EVENT_JOBS:
+            self.update_jobs_count(len(value))
+            self.update_log(f"{len(value)} nieuwe opdrachten gevonden")
+        elif event == EVENT_PREFERENCES:
+            self.update_log(f"Voorkeuren bijgewerkt: {', '.join(sorted(set(value)))}")
+        elif event == EVENT_ERROR:
+            self.update_log(f"Fout: {value}")
+        elif event == EVENT_FAILED:
+            messagebox.showerror("Fout", f"Onverwachte fout: {value}")
 
     def start_monitoring(self):
         """Start de monitoring thread."""
-        if self.monitoring_active:
-            return
-        
-        self.monitoring_active = True
-        self.monitoring_thread = threading.Thread(target=self.monitoring_loop)
-        self.monitoring_thread.daemon = True
-        self.monitoring_thread.start()
-        
-        self.status_label.config(text="Actief", foreground="green")
-        self.start_button.config(state=tk.DISABLED)
-        self.stop_button.config(state=tk.NORMAL)
-        
-        logging.info("Monitoring gestart")
-        self.update_log("Monitoring gestart")
+        try:
+            self.monitoring.start()
+        except ControlError as e:
+            messagebox.showerror("Fout", f"Kon monitoring niet starten: {e}")
 
     def stop_monitoring(self):
         """Stop de monitoring thread."""
-        if not self.monitoring_active:
+        try:
+            self.monitoring.stop()
+        except ControlError as e:
+            messagebox.showerror("Fout", f"Kon monitoring niet stoppen: {e}")
+
+    def show_daemon_status(self, status):
+        """Toon de status van de daemon na (opnieuw) verbinden, of dat de verbinding weg is."""
+        if status is None:
+            self.status_label.config(text="Geen verbinding met daemon", foreground="orange")
+            self.start_button.config(state=tk.DISABLED)
+            self.stop_button.config(state=tk.DISABLED)
+            self.update_log("Verbinding met de daemon verbroken, opnieuw verbinden...")
             return
-        
-        self.monitoring_active = False
-        if self.monitoring_thread:
-            self.monitoring_thread.join(timeout=1.0)
-        
-        self.status_label.config(text="Gestopt", foreground="red")
-        self.start_button.config(state=tk.NORMAL)
-        self.stop_button.config(state=tk.DISABLED)
-        
-        logging.info("Monitoring gestopt")
-        self.update_log("Monitoring gestopt")
+        self.monitored_jobs_label.config(text=str(status["jobs_found"]))
+        if status["last_check"]:
+            self.last_check_label.config(text=status["last_check"])
+        self.show_monitoring_state(status["active"])
 
-    def monitoring_loop(self):
-        """De hoofdlus voor monitoring."""
-        try:
-            # Initialiseer de monitor
-            if MrFixMonitor:
-                monitor = MrFixMonitor()
-            else:
-                # Dummy monitor voor testen
-                class DummyMonitor:
-                    def monitor_website(self):
-                        time.sleep(5)  # Simuleer verwerking
-                        return []
-                    def cleanup(self):
-                        pass
-                monitor = DummyMonitor()
-            
-            while self.monitoring_active:
-                try:
-                    # Update de UI
-                    self.root.after(0, self.update_last_check_label)
-                    
-                    # Monitor de website
-                    new_jobs = monitor.monitor_website()
-                    
-                    # Update de UI met nieuwe opdrachten
-                    if new_jobs:
-                        self.root.after(0, lambda: self.update_jobs_count(len(new_jobs)))
-                        self.root.after(0, lambda: self.update_log(f"{len(new_jobs)} nieuwe opdrachten gevonden"))
-                        
-                        # Voeg nieuwe opdrachten toe aan de treeview
-                        for job in new_jobs:
-                            self.root.after(0, lambda j=job: self.add_job_to_treeview(j))
-                    
-                    # Wacht voor de volgende controle
-                    # In een echte implementatie zou dit de monitoring_interval uit de voorkeuren gebruiken
-                    interval = 300  # 5 minuten in seconden
-                    if hasattr(monitor, 'preferences') and 'monitoring_interval' in monitor.preferences:
-                        interval = monitor.preferences['monitoring_interval']
-                    
-                    # Wacht in kleine stappen zodat we snel kunnen stoppen als dat nodig is
-                    for _ in range(interval):
-                        if not self.monitoring_active:
-                            break
-                        time.sleep(1)
-                        
-                except Exception as e:
-                    logging.error(f"Fout in monitoring loop: {e}")
-                    self.root.after(0, lambda: self.update_log(f"Fout: {e}"))
-                    time.sleep(10)  # Wacht even voordat we het opnieuw proberen
-            
-            # Ruim resources op
-            monitor.cleanup()
-            
-        except Exception as e:
-            logging.error(f"Onverwachte fout in monitoring thread: {e}")
-            self.root.after(0, lambda: messagebox.showerror("Fout", f"Onverwachte fout: {e}"))
-            self.root.after(0, self.stop_monitoring)
+    def show_monitoring_state(self, active):
+        """Toon of de monitoring actief is (ook na /pauze of /hervat via Telegram)."""
+        if active:
+            self.status_label.config(text="Actief", foreground="green")
+            self.start_button.config(state=tk.DISABLED)
+            self.stop_button.config(state=tk.NORMAL)
+            self.update_log("Monitoring gestart")
+        else:
+            self.status_label.config(text="Gestopt", foreground="red")
+            self.start_button.config(state=tk.NORMAL)
+            self.stop_button.config(state=tk.DISABLED)
+            self.update_log("Monitoring gestopt")
 
-    def update_last_check_label(self):
+    def update_last_check_label(self, checked_at=None):
         """Update het label met de tijd van de laatste controle."""
-        now = time.strftime("%Y-%m-%d %H:%M:%S")
-        self.last_check_label.config(text=now)
+        self.last_check_label.config(text=time.strftime("%Y-%m-%d %H:%M:%S", checked_at or time.localtime()))
 
     def update_jobs_count(self, new_jobs_count):
         """Update de tellers voor gemonitorde en geaccepteerde opdrachten."""
         current_count = int(self.monitored_jobs_label.cget("text"))
         self.monitored_jobs_label.config(text=str(current_count + new_jobs_count))
 
-    def add_job_to_treeview(self, job):
-        """Voeg een opdracht toe aan de treeview."""
-        self.recent_jobs_tree.insert("", 0, values=(
-            job['title'],
-            job['location'],
-            job['date_posted'],
-            "Verwerkt"
-        ))
-        
-        # Beperk het aantal items in de treeview
-        items = self.recent_jobs_tree.get_children()
-        if len(items) > 20:
-            self.recent_jobs_tree.delete(items[-1])
+    def update_accepted_count(self, store):
+        """Update de teller voor geaccepteerde opdrachten na nieuwe opdrachten in de database."""
+        self.accepted_jobs_label.config(text=str(store.count(accepted_only=True)))
+
+    def refresh_channel_metrics(self):
+        """Ververs de statistieken per notificatiekanaal en plan de volgende verversing."""
+        self.show_channel_metrics(get_notification_metrics().snapshot())
+        self.root.after(METRICS_REFRESH_INTERVAL, self.refresh_channel_metrics)
+
+    def show_channel_metrics(self, snapshot):
+        """Toon de statistieken per notificatiekanaal (lokaal of uit de event stream van de daemon)."""
+        states = {"closed": "OK", "open": "Overgeslagen", "half_open": "Proberen"}
+        self.channels_tree.delete(*self.channels_tree.get_children())
+        for channel, metrics in snapshot.items():
+            success_rate = metrics["success_rate"]
+            p95 = metrics["latency_p95"]
+            self.channels_tree.insert("", tk.END, values=(
+                channel,
+                metrics["sent"] + metrics["failed"],
+                "-" if success_rate is None else f"{success_rate * 100:.0f}%",
+                "-" if p95 is None else f"<= {p95:g} s",
+                states.get(metrics["state"], metrics["state"]),
+                metrics["last_error"] or ""
+            ))
+
+    def log_filter(self):
+        level = self.log_level_var.get()
+        return LogFilter(level=None if level == LOG_LEVELS[0] else level, job_id=self.log_job_id_var.get().strip())
 
     def refresh_logs(self):
-        """Vernieuw de logboek weergave."""
+        """Vernieuw de logboek weergave met de laatste berichten uit alle logbestanden."""
         try:
             self.log_text.delete(1.0, tk.END)
             
-            if os.path.exists(LOG_PATH):
-                with open(LOG_PATH, 'r') as f:
-                    # Lees de laatste 100 regels
-                    lines = f.readlines()[-100:]
-                    for line in lines:
-                        self.log_text.insert(tk.END, line)
-                
-                # Scroll naar het einde
-                self.log_text.see(tk.END)
+            # Alleen het einde van elk bestand wordt gelezen, ook bij logbestanden van gigabytes
+            self.log_viewer = LogViewer()
+            self.show_log_entries(self.log_viewer.tail(LOG_TAIL_LINES, self.log_filter()))
         except Exception as e:
-            logging.error(f"Fout bij vernieuwen van logboek: {e}")
+            logging.error("Fout bij vernieuwen van logboek: %s", e)
             messagebox.showerror("Fout", f"Fout bij vernieuwen van logboek: {e}")
 
+    def poll_logs(self):
+        """Voeg berichten toe die sinds de vorige keer aan de logbestanden zijn toegevoegd."""
+        try:
+            self.show_log_entries(self.log_viewer.poll(self.log_filter()))
+        except Exception as e:
+            logging.error("Fout bij volgen van logboek: %s", e)
+        self.root.after(LOG_POLL_INTERVAL, self.poll_logs)
+
+    def show_log_entries(self, entries):
+        if not entries:
+            return
+        # Blijf alleen onderaan als de gebruiker niet omhoog gescrold heeft
+        at_end = self.log_text.yview()[1] >= 1.0
+        self.log_text.insert(tk.END, "".join(f"[{entry.source}] {format_entry(entry)}\n" for entry in entries))
+        lines = int(self.log_text.index("end-1c").split(".")[0])
+        if lines > LOG_MAX_LINES:
+            self.log_text.delete(1.0, f"{lines - LOG_MAX_LINES}.0")
+        if at_end:
+            self.log_text.see(tk.END)
+
     def clear_logs(self):
         """Wis de logboek weergave."""
         self.log_text.delete(1.0, tk.END)
@@ -353,15 +353,20 @@ class MrFixApp:
 
     def on_closing(self):
         """Handler voor het sluiten van de applicatie."""
-        if self.monitoring_active:
-            if messagebox.askyesno("Afsluiten", "Monitoring is actief. Weet u zeker dat u wilt afsluiten?"):
-                self.stop_monitoring()
-                self.root.destroy()
-        else:
-            self.root.destroy()
+        if self.remote:
+            # De monitoring draait door in de daemon
+            self.monitoring.close()
+        elif self.monitoring_active:
+            if not messagebox.askyesno("Afsluiten", "Monitoring is actief. Weet u zeker dat u wilt afsluiten?"):
+                return
+            self.stop_monitoring()
+        self.ui_events.stop()
+        self.root.destroy()
 
 def main():
     """Start de applicatie."""
+    setup_logging(LOG_PATH)
+    os.makedirs(DATA_DIR, exist_ok=True)
     root = tk.Tk()
     app = MrFixApp(root)
     root.mainloop()
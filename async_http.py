@@ -0,0 +1,203 @@
+import ssl
+import json
+import asyncio
+import logging
+from urllib.parse import urlsplit, urlencode
+
+# Standaardinstellingen
+MAX_IDLE_PER_HOST = 4  # Aantal open (keep-alive) verbindingen dat per host bewaard blijft
+REQUEST_TIMEOUT = 30  # Seconden
+USER_AGENT = "MrFix-Monitor/1.0"
+
+
+class HTTPError(Exception):
+    """Fout in de HTTP verbinding of een onleesbaar antwoord."""
+
+
+class HTTPResponse:
+    def __init__(self, status, reason, headers, body):
+        """Een volledig ingelezen HTTP antwoord."""
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+    def text(self):
+        return self.body.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.body or b'null')
+
+
+class _Connection:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    def is_reusable(self):
+        return not self.writer.is_closing() and not self.reader.at_eof()
+
+    def close(self):
+        self.writer.close()
+
+
+class AsyncHTTPClient:
+    def __init__(self, max_idle_per_host=MAX_IDLE_PER_HOST, timeout=REQUEST_TIMEOUT, ssl_context=None):
+        """Initialiseer een kleine HTTP/1.1 client met keep-alive verbindingen per host.
+
+        Er zijn geen threads nodig: alles draait op de event loop waarop de client gebruikt wordt.
+        """
+        self.max_idle_per_host = max_idle_per_host
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self._idle = {}
+        self.connections_opened = 0
+
+    def _ssl(self):
+        if self.ssl_context is None:
+            self.ssl_context = ssl.create_default_context()
+        return self.ssl_context
+
+    async def _acquire(self, key):
+        idle = self._idle.get(key) or []
+        while idle:
+            connection = idle.pop()
+            if connection.is_reusable():
+                return connection, True
+            connection.close()
+
+        scheme, host, port = key
+        reader, writer = await asyncio.open_connection(
+            host, port, ssl=self._ssl() if scheme == 'https' else None)
+        self.connections_opened += 1
+        return _Connection(reader, writer), False
+
+    def _release(self, key, connection):
+        idle = self._idle.setdefault(key, [])
+        if connection.is_reusable() and len(idle) < self.max_idle_per_host:
+            idle.append(connection)
+        else:
+            connection.close()
+
+    async def request(self, method, url, json_body=None, data=None, headers=None, timeout=None):
+        """Voer een HTTP verzoek uit en geef een HTTPResponse terug."""
+        parts = urlsplit(url)
+        scheme = parts.scheme or 'http'
+        port = parts.port or (443 if scheme == 'https' else 80)
+        key = (scheme, parts.hostname, port)
+        target = parts.path or '/'
+        if parts.query:
+            target += '?' + parts.query
+
+        if json_body is not None:
+            data = json.dumps(json_body).encode('utf-8')
+            headers = {"Content-Type": "application/json", **(headers or {})}
+        elif isinstance(data, dict):
+            data = urlencode(data).encode('utf-8')
+            headers = {"Content-Type": "application/x-www-form-urlencoded", **(headers or {})}
+        elif isinstance(data, str):
+            data = data.encode('utf-8')
+
+        host_header = parts.hostname if parts.port is None else f"{parts.hostname}:{parts.port}"
+        lines = [f"{method} {target} HTTP/1.1", f"Host: {host_header}", f"User-Agent: {USER_AGENT}",
+                 "Connection: keep-alive", f"Content-Length: {len(data or b'')}"]
+        lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+        payload = ("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + (data or b'')
+
+        timeout = self.timeout if timeout is None else timeout
+        connection, reused = await self._acquire(key)
+        try:
+            response = await asyncio.wait_for(self._exchange(connection, method, payload), timeout)
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            connection.close()
+            if not reused:
+                raise HTTPError(f"Verbinding met {parts.hostname} verbroken: {e}") from e
+            # De server heeft een bewaarde verbinding gesloten; probeer het eenmaal op een nieuwe
+            logging.info("Bewaarde verbinding met %s was gesloten, opnieuw verbinden", parts.hostname)
+            connection, _ = await self._acquire(key)
+            try:
+                response = await asyncio.wait_for(self._exchange(connection, method, payload), timeout)
+            except BaseException:
+                connection.close()
+                raise
+        except BaseException:
+            connection.close()
+            raise
+
+        if response.headers.get('connection', '').lower() == 'close':
+            connection.close()
+        else:
+            self._release(key, connection)
+        return response
+
+    async def _exchange(self, connection, method, payload):
+        connection.writer.write(payload)
+        await connection.writer.drain()
+
+        reader = connection.reader
+        status_line = await reader.readuntil(b"\r\n")
+        try:
+            _, status, reason = (status_line.decode('latin-1').rstrip("\r\n").split(' ', 2) + [''])[:3]
+            status = int(status)
+        except ValueError:
+            raise HTTPError(f"Ongeldige statusregel: {status_line!r}")
+
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            body = b''
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = await self._read_chunked(reader)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            # Zonder lengte loopt het antwoord tot de server de verbinding sluit
+            body = await reader.read()
+            headers['connection'] = 'close'
+        return HTTPResponse(status, reason, headers, body)
+
+    async def _read_chunked(self, reader):
+        chunks = []
+        while True:
+            size_line = await reader.readuntil(b"\r\n")
+            size = int(size_line.split(b';')[0].strip(), 16)
+            if size == 0:
+                # Sla eventuele trailers over
+                while await reader.readuntil(b"\r\n") != b"\r\n":
+                    pass
+                return b''.join(chunks)
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    async def close(self):
+        """Sluit alle bewaarde verbindingen."""
+        for connections in self._idle.values():
+            for connection in connections:
+                connection.close()
+        self._idle.clear()
+
+# Singleton instantie
+_http_client = None
+
+def get_http_client():
+    """Verkrijg de gedeelde AsyncHTTPClient (voor gebruik op de event loop van de async runtime)."""
+    global _http_client
+    if _http_client is None:
+        _http_client = AsyncHTTPClient()
+    return _http_client
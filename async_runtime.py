@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import threading
+
+
+class AsyncRuntime:
+    def __init__(self):
+        """Initialiseer de gedeelde asyncio runtime (één event loop in één achtergrondthread)."""
+        self.loop = None
+        self.thread = None
+        self._started = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start de event loop als die nog niet draait."""
+        with self._lock:
+            if self.thread is not None and self.thread.is_alive():
+                return self.loop
+            self._started.clear()
+            self.thread = threading.Thread(target=self._run, name="async-runtime", daemon=True)
+            self.thread.start()
+        self._started.wait()
+        return self.loop
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._started.set()
+        logging.info("Async runtime gestart")
+        try:
+            self.loop.run_forever()
+        finally:
+            # Laat lopende taken netjes afbreken voordat de loop sluit
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.close()
+            logging.info("Async runtime gestopt")
+
+    def submit(self, coro):
+        """Plan een coroutine in op de runtime; geeft een concurrent.futures.Future terug."""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout=None):
+        """Voer een coroutine uit op de runtime en wacht (vanuit een gewone thread) op het resultaat."""
+        return self.submit(coro).result(timeout)
+
+    def call_soon(self, callback, *args):
+        """Roep een functie aan op de thread van de event loop."""
+        self.start()
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def stop(self, timeout=5):
+        """Stop de event loop en wacht tot de thread klaar is."""
+        with self._lock:
+            if self.loop is None or self.thread is None:
+                return
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join(timeout)
+            self.thread = None
+            self.loop = None
+
+# Singleton instantie
+_async_runtime = None
+_runtime_lock = threading.Lock()
+
+def get_async_runtime():
+    """Verkrijg een singleton instantie van de AsyncRuntime (gestart)."""
+    global _async_runtime
+    with _runtime_lock:
+        if _async_runtime is None:
+            _async_runtime = AsyncRuntime()
+    _async_runtime.start()
+    return _async_runtime
+
+def stop_async_runtime(timeout=5):
+    """Stop de gedeelde runtime als die gestart is (bij afsluiten)."""
+    with _runtime_lock:
+        runtime = _async_runtime
+    if runtime is not None:
+        runtime.stop(timeout)
+
+def submit(coro):
+    """Plan een coroutine in op de gedeelde runtime."""
+    return get_async_runtime().submit(coro)
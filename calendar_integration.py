@@ -1,76 +1,44 @@
 import os
-import json
 import logging
 import pickle
 from datetime import datetime, timedelta
-from google.auth.transport.requests import Request
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import build
+
+from logging_setup import setup_logging
+from preferences import get_preferences
 
 # Configuratie
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, 'data')
 LOG_DIR = os.path.join(BASE_DIR, 'logs')
 LOG_PATH = os.path.join(LOG_DIR, 'calendar.log')
-PREFERENCES_FILE = os.path.join(DATA_DIR, 'user_preferences.json')
 CREDENTIALS_FILE = os.path.join(DATA_DIR, 'google_credentials.json')
 TOKEN_FILE = os.path.join(DATA_DIR, 'google_token.pickle')
 
 # Google Calendar API scopes
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
-# Zorg ervoor dat de data en logs directories bestaan
-os.makedirs(DATA_DIR, exist_ok=True)
-os.makedirs(LOG_DIR, exist_ok=True)
-
-# Logging configuratie
-logging.basicConfig(
-    filename=LOG_PATH,
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
-
-# Configureer ook logging naar console
-console = logging.StreamHandler()
-console.setLevel(logging.INFO)
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-console.setFormatter(formatter)
-logging.getLogger('').addHandler(console)
-
 class GoogleCalendarIntegration:
     def __init__(self):
         """Initialiseer de Google Calendar integratie."""
-        self.load_preferences()
         self.service = self.get_calendar_service()
         logging.info("Google Calendar integratie geïnitialiseerd")
 
-    def load_preferences(self):
-        """Laad gebruikersvoorkeuren uit het configuratiebestand."""
-        # Standaard voorkeuren
-        self.preferences = {
-            "travel_time_between_jobs": 60,  # minuten
-            "calendar_id": "primary"  # Gebruik de primaire agenda
-        }
-        
-        try:
-            if os.path.exists(PREFERENCES_FILE):
-                with open(PREFERENCES_FILE, 'r') as f:
-                    user_prefs = json.load(f)
-                    # Update de voorkeuren die relevant zijn voor de agenda
-                    if "travel_time_between_jobs" in user_prefs:
-                        self.preferences["travel_time_between_jobs"] = user_prefs["travel_time_between_jobs"]
-                    if "calendar_id" in user_prefs:
-                        self.preferences["calendar_id"] = user_prefs["calendar_id"]
-                    
-                    logging.info(f"Gebruikersvoorkeuren geladen uit {PREFERENCES_FILE}")
-            else:
-                logging.warning(f"Voorkeuren bestand niet gevonden: {PREFERENCES_FILE}, standaardwaarden worden gebruikt")
-        except Exception as e:
-            logging.error(f"Fout bij laden van voorkeuren: {e}")
+    @property
+    def preferences(self):
+        """De gedeelde voorkeuren snapshot (agenda ID en reistijd tussen opdrachten)."""
+        return get_preferences()
 
     def get_calendar_service(self):
         """Authenticeer en krijg toegang tot de Google Calendar API."""
+        # De Google SDK's zijn traag om te laden; importeer ze pas als de agenda nodig is
+        try:
+            from google.auth.transport.requests import Request
+            from google_auth_oauthlib.flow import InstalledAppFlow
+            from googleapiclient.discovery import build
+        except ImportError as e:
+            logging.error("Google API bibliotheken niet geïnstalleerd: %s", e)
+            return None
+
         creds = None
         
         # Controleer of er een token bestand is met opgeslagen credentials
@@ -84,12 +52,12 @@ class GoogleCalendarIntegration:
                 try:
                     creds.refresh(Request())
                 except Exception as e:
-                    logging.error(f"Fout bij vernieuwen van token: {e}")
+                    logging.error("Fout bij vernieuwen van token: %s", e)
                     creds = None
             
             if not creds:
                 if not os.path.exists(CREDENTIALS_FILE):
-                    logging.error(f"Google credentials bestand niet gevonden: {CREDENTIALS_FILE}")
+                    logging.error("Google credentials bestand niet gevonden: %s", CREDENTIALS_FILE)
                     logging.error("Volg de installatie-instructies om de Google Calendar API te configureren")
                     return None
                 
@@ -97,10 +65,11 @@ class GoogleCalendarIntegration:
                     flow = InstalledAppFlow.from_client_secrets_file(CREDENTIALS_FILE, SCOPES)
                     creds = flow.run_local_server(port=0)
                 except Exception as e:
-                    logging.error(f"Fout bij authenticatie: {e}")
+                    logging.error("Fout bij authenticatie: %s", e)
                     return None
                 
                 # Sla de credentials op voor de volgende keer
+                os.makedirs(DATA_DIR, exist_ok=True)
                 with open(TOKEN_FILE, 'wb') as token:
                     pickle.dump(creds, token)
         
@@ -109,7 +78,7 @@ class GoogleCalendarIntegration:
             logging.info("Google Calendar service succesvol opgezet")
             return service
         except Exception as e:
-            logging.error(f"Fout bij opzetten van Google Calendar service: {e}")
+            logging.error("Fout bij opzetten van Google Calendar service: %s", e)
             return None
 
     def check_calendar_availability(self, start_time, duration_minutes):
@@ -128,7 +97,7 @@ class GoogleCalendarIntegration:
             
             # Zoek naar evenementen in dit tijdvak
             events_result = self.service.events().list(
-                calendarId=self.preferences["calendar_id"],
+                calendarId=self.preferences.calendar_id,
                 timeMin=start_iso,
                 timeMax=end_iso,
                 singleEvents=True,
@@ -139,18 +108,18 @@ class GoogleCalendarIntegration:
             
             if not events:
                 # Geen evenementen gevonden, tijd is beschikbaar
-                logging.info(f"Tijd beschikbaar: {start_time.isoformat()} - {end_time.isoformat()}")
+                logging.info("Tijd beschikbaar: %s - %s", start_time.isoformat(), end_time.isoformat())
                 return {"available": True, "suggested_time": start_time}
             else:
                 # Evenementen gevonden, tijd is niet beschikbaar
-                logging.info(f"Tijd niet beschikbaar: {start_time.isoformat()} - {end_time.isoformat()}")
+                logging.info("Tijd niet beschikbaar: %s - %s", start_time.isoformat(), end_time.isoformat())
                 
                 # Zoek naar de volgende beschikbare tijd
                 suggested_time = self.find_next_available_time(end_time, duration_minutes)
                 return {"available": False, "suggested_time": suggested_time}
                 
         except Exception as e:
-            logging.error(f"Fout bij controleren van beschikbaarheid: {e}")
+            logging.error("Fout bij controleren van beschikbaarheid: %s", e)
             return {"available": False, "suggested_time": None}
 
     def find_next_available_time(self, start_from, duration_minutes):
@@ -169,7 +138,7 @@ class GoogleCalendarIntegration:
             
             # Haal alle evenementen op voor de komende 7 dagen
             events_result = self.service.events().list(
-                calendarId=self.preferences["calendar_id"],
+                calendarId=self.preferences.calendar_id,
                 timeMin=start_iso,
                 timeMax=end_iso,
                 singleEvents=True,
@@ -211,7 +180,7 @@ class GoogleCalendarIntegration:
             return current_time
             
         except Exception as e:
-            logging.error(f"Fout bij zoeken naar volgende beschikbare tijd: {e}")
+            logging.error("Fout bij zoeken naar volgende beschikbare tijd: %s", e)
             return None
 
     def add_event_to_calendar(self, event_details):
@@ -243,17 +212,23 @@ class GoogleCalendarIntegration:
                 },
             }
             
+            # Bewaar de geplande duur zodat het duurmodel die later kan vergelijken met de werkelijke duur
+            if event_details.get('scheduled_minutes'):
+                event['extendedProperties'] = {
+                    'private': {'mrfix_scheduled_minutes': str(event_details['scheduled_minutes'])}
+                }
+            
             # Voeg het evenement toe aan de agenda
             event = self.service.events().insert(
-                calendarId=self.preferences["calendar_id"],
+                calendarId=self.preferences.calendar_id,
                 body=event
             ).execute()
             
-            logging.info(f"Evenement toegevoegd: {event.get('htmlLink')}")
+            logging.info("Evenement toegevoegd: %s", event.get('htmlLink'))
             return True
             
         except Exception as e:
-            logging.error(f"Fout bij toevoegen van evenement: {e}")
+            logging.error("Fout bij toevoegen van evenement: %s", e)
             return False
 
     def get_busy_times_for_day(self, date):
@@ -273,7 +248,7 @@ class GoogleCalendarIntegration:
             
             # Haal alle evenementen op voor deze dag
             events_result = self.service.events().list(
-                calendarId=self.preferences["calendar_id"],
+                calendarId=self.preferences.calendar_id,
                 timeMin=start_iso,
                 timeMax=end_iso,
                 singleEvents=True,
@@ -299,7 +274,55 @@ class GoogleCalendarIntegration:
             return busy_times
             
         except Exception as e:
-            logging.error(f"Fout bij ophalen van bezette tijden: {e}")
+            logging.error("Fout bij ophalen van bezette tijden: %s", e)
+            return []
+
+    def get_job_events(self, days_back=180):
+        """Haal de MrFix afspraken van de afgelopen periode op, met geplande en werkelijke tijden."""
+        if not self.service:
+            logging.error("Google Calendar service niet beschikbaar")
+            return []
+        
+        try:
+            now = datetime.utcnow()
+            job_events = []
+            page_token = None
+            
+            while True:
+                events_result = self.service.events().list(
+                    calendarId=self.preferences.calendar_id,
+                    timeMin=(now - timedelta(days=days_back)).isoformat() + 'Z',
+                    timeMax=now.isoformat() + 'Z',
+                    q='MrFix:',
+                    singleEvents=True,
+                    orderBy='startTime',
+                    pageToken=page_token
+                ).execute()
+                
+                for event in events_result.get('items', []):
+                    start = event['start'].get('dateTime')
+                    end = event['end'].get('dateTime')
+                    if not start or not end or not event.get('summary', '').startswith('MrFix:'):
+                        continue
+                    
+                    scheduled = event.get('extendedProperties', {}).get('private', {}).get('mrfix_scheduled_minutes')
+                    job_events.append({
+                        'summary': event.get('summary', ''),
+                        'description': event.get('description', ''),
+                        'start': datetime.fromisoformat(start.replace('Z', '+00:00')),
+                        'end': datetime.fromisoformat(end.replace('Z', '+00:00')),
+                        'scheduled_minutes': int(scheduled) if scheduled else None
+                    })
+                
+                page_token = events_result.get('nextPageToken')
+                if not page_token:
+                    break
+            
+            logging.info("%s MrFix afspraken opgehaald uit de agenda", len(job_events))
+            return job_events
+            
+        except Exception as e:
+            logging.error("Fout bij ophalen van MrFix afspraken: %s", e)
             return []
 
 # Singleton instantie
@@ -327,8 +350,15 @@ def get_busy_times_for_day(date):
     calendar = get_calendar_integration()
     return calendar.get_busy_times_for_day(date)
 
+def get_job_events(days_back=180):
+    """Haal de MrFix afspraken van de afgelopen periode op."""
+    calendar = get_calendar_integration()
+    return calendar.get_job_events(days_back)
+
 # Voor testen
 if __name__ == "__main__":
+    setup_logging(LOG_PATH)
+
     # Test de Google Calendar integratie
     calendar = get_calendar_integration()
     
@@ -0,0 +1,268 @@
+import json
+import time
+import queue
+import logging
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from monitoring_service import EVENT_CHECK, EVENT_JOBS, EVENT_ERROR, EVENT_FAILED
+from notification_metrics import get_notification_metrics
+from preferences import get_preferences, get_preferences_service
+
+# Control API (alleen bereikbaar vanaf deze computer)
+CONTROL_HOST = "127.0.0.1"
+CONTROL_PORT = 9465
+ALLOWED_HOSTS = {"127.0.0.1", "localhost"}  # Host headers die we accepteren (tegen DNS rebinding)
+
+# Aantal recente opdrachten dat de daemon onthoudt voor /jobs
+RECENT_JOBS = 50
+
+# Gebeurtenissen die per client in de wachtrij mogen staan; een client die achterloopt wordt afgesloten
+CLIENT_BUFFER = 200
+
+# Seconden tussen metrics gebeurtenissen in de event stream (houdt de verbinding ook open)
+METRICS_PUSH_INTERVAL = 5
+
+# Extra gebeurtenissen in de event stream, naast die van de MonitoringService
+EVENT_STATUS = "status"  # Direct na het verbinden: de volledige status
+EVENT_METRICS = "metrics"  # Bezorgstatistieken per notificatiekanaal
+EVENT_PREFERENCES = "preferences"  # De voorkeuren zijn gewijzigd
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def event_data(event, value):
+    """Zet de waarde van een monitoring gebeurtenis om naar JSON."""
+    if event == EVENT_CHECK:
+        return time.strftime(TIME_FORMAT, value)
+    if event == EVENT_JOBS:
+        return [job.to_dict() for job in value]
+    if event in (EVENT_ERROR, EVENT_FAILED):
+        return str(value)
+    return value
+
+
+class ControlState:
+    def __init__(self, service):
+        """Houd tellers en recente opdrachten bij en verdeel gebeurtenissen over de verbonden clients."""
+        self.service = service
+        self.started_at = time.time()
+        self.checks = 0
+        self.jobs_found = 0
+        self.errors = 0
+        self.last_error = None
+        self.recent_jobs = deque(maxlen=RECENT_JOBS)
+        self.clients = set()
+        self.lock = threading.Lock()
+
+        service.subscribe(self.on_monitoring_event)
+        get_preferences_service().subscribe(self.on_preferences_changed)
+
+    def on_monitoring_event(self, event, value):
+        data = event_data(event, value)
+        with self.lock:
+            if event == EVENT_CHECK:
+                self.checks += 1
+            elif event == EVENT_JOBS:
+                self.jobs_found += len(data)
+                self.recent_jobs.extendleft(reversed(data))  # Nieuwste ronde vooraan, in de volgorde van de ronde
+            elif event in (EVENT_ERROR, EVENT_FAILED):
+                self.errors += 1
+                self.last_error = data
+        self.broadcast(event, data)
+
+    def on_preferences_changed(self, preferences, changed):
+        self.broadcast(EVENT_PREFERENCES, sorted(changed))
+
+    def status(self):
+        with self.lock:
+            return {
+                "active": self.service.active,
+                "last_check": time.strftime(TIME_FORMAT, self.service.last_check) if self.service.last_check else None,
+                "started_at": self.started_at,
+                "checks": self.checks,
+                "jobs_found": self.jobs_found,
+                "errors": self.errors,
+                "last_error": self.last_error,
+                "clients": len(self.clients),
+            }
+
+    def jobs(self, limit=RECENT_JOBS):
+        with self.lock:
+            return list(self.recent_jobs)[:limit]
+
+    def connect(self):
+        """Meld een client aan voor de event stream; geeft zijn wachtrij terug."""
+        client = queue.Queue(CLIENT_BUFFER)
+        with self.lock:
+            self.clients.add(client)
+        return client
+
+    def disconnect(self, client):
+        with self.lock:
+            self.clients.discard(client)
+
+    def connected(self, client):
+        with self.lock:
+            return client in self.clients
+
+    def broadcast(self, event, data):
+        with self.lock:
+            clients = list(self.clients)
+        for client in clients:
+            try:
+                client.put_nowait((event, data))
+            except queue.Full:
+                logging.warning("Control API client loopt achter en wordt afgesloten")
+                self.disconnect(client)
+
+    def close(self):
+        """Meld af bij de monitoring en beëindig alle event streams."""
+        self.service.unsubscribe(self.on_monitoring_event)
+        get_preferences_service().unsubscribe(self.on_preferences_changed)
+        with self.lock:
+            clients, self.clients = list(self.clients), set()
+        for client in clients:
+            try:
+                client.put_nowait(None)
+            except queue.Full:
+                pass
+
+
+class ControlRequestHandler(BaseHTTPRequestHandler):
+    """JSON API voor de GUI (of curl) om de daemon te volgen en te besturen.
+
+    GET  /status, /jobs?limit=20, /preferences, /events (server-sent events)
+    POST /pause, /resume, /check, /preferences (alleen met Content-Type: application/json)
+    """
+
+    def do_GET(self):
+        if not self.check_host():
+            return
+        url = urlsplit(self.path)
+        state = self.server.state
+        if url.path == "/status":
+            self.send_json(200, state.status())
+        elif url.path == "/jobs":
+            try:
+                limit = int(parse_qs(url.query).get("limit", [RECENT_JOBS])[0])
+            except ValueError:
+                self.send_json(400, {"error": "limit moet een getal zijn"})
+                return
+            self.send_json(200, state.jobs(limit))
+        elif url.path == "/preferences":
+            self.send_json(200, get_preferences().to_dict())
+        elif url.path == "/events":
+            self.stream_events()
+        else:
+            self.send_json(404, {"error": f"Onbekend pad: {url.path}"})
+
+    def do_POST(self):
+        if not self.check_host():
+            return
+        # Een JSON content type kan een webpagina niet zonder CORS preflight versturen
+        if self.headers.get_content_type() != "application/json":
+            self.send_json(415, {"error": "Content-Type moet application/json zijn"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self.send_json(400, {"error": "Ongeldige JSON"})
+            return
+
+        service = self.server.state.service
+        path = urlsplit(self.path).path
+        if path == "/pause":
+            service.stop()
+            self.send_json(200, {"active": service.active})
+        elif path == "/resume":
+            service.start()
+            self.send_json(200, {"active": service.active})
+        elif path == "/check":
+            if service.request_check():
+                self.send_json(202, {"active": True})
+            else:
+                self.send_json(409, {"error": "Monitoring staat uit"})
+        elif path == "/preferences":
+            if not isinstance(body, dict):
+                self.send_json(400, {"error": "Verwacht een JSON object met voorkeuren"})
+                return
+            self.send_json(200, get_preferences_service().save(body).to_dict())
+        else:
+            self.send_json(404, {"error": f"Onbekend pad: {path}"})
+
+    do_PUT = do_POST
+
+    def check_host(self):
+        host = (self.headers.get("Host") or "").rsplit(":", 1)[0]
+        if host not in ALLOWED_HOSTS:
+            self.send_json(403, {"error": "Alleen bereikbaar via localhost"})
+            return False
+        return True
+
+    def send_json(self, status, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_event(self, event, data):
+        self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode())
+        self.wfile.flush()
+
+    def stream_events(self):
+        """Server-sent events: eerst de status, daarna elke gebeurtenis zodra die plaatsvindt."""
+        state = self.server.state
+        client = state.connect()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        try:
+            self.send_event(EVENT_STATUS, state.status())
+            self.send_event(EVENT_METRICS, get_notification_metrics().snapshot())
+            while state.connected(client):
+                try:
+                    item = client.get(timeout=METRICS_PUSH_INTERVAL)
+                except queue.Empty:
+                    self.send_event(EVENT_METRICS, get_notification_metrics().snapshot())
+                    continue
+                if item is None:
+                    break
+                self.send_event(*item)
+        except OSError:
+            pass  # De client heeft de verbinding verbroken
+        finally:
+            state.disconnect(client)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_control_api(service, host=CONTROL_HOST, port=CONTROL_PORT):
+    """Start de control API in een achtergrondthread; geeft de server terug."""
+    server = ThreadingHTTPServer((host, port), ControlRequestHandler)
+    server.daemon_threads = True
+    server.state = ControlState(service)
+    threading.Thread(target=server.serve_forever, name="control-api", daemon=True).start()
+    logging.info("Control API beschikbaar op http://%s:%s/status", host, server.server_address[1])
+    return server
+
+def stop_control_api(server):
+    """Stop de control API en sluit de event streams."""
+    server.state.close()
+    server.shutdown()
+    server.server_close()
+
+def start_control_api(service, port=CONTROL_PORT):
+    """Start de control API; None als de poort niet beschikbaar is."""
+    try:
+        return serve_control_api(service, port=port)
+    except OSError as e:
+        logging.error("Kon control API niet starten op poort %s: %s", port, e)
+        return None
@@ -0,0 +1,178 @@
+import json
+import time
+import logging
+import threading
+import http.client
+
+from job import Job
+from control_api import (CONTROL_HOST, CONTROL_PORT, METRICS_PUSH_INTERVAL, TIME_FORMAT,
+                         EVENT_STATUS, EVENT_METRICS, EVENT_PREFERENCES)
+from monitoring_service import MonitoringService, EVENT_STATE, EVENT_CHECK, EVENT_JOBS, EVENT_ERROR, EVENT_FAILED
+
+# Seconden wachten op een antwoord van de daemon
+REQUEST_TIMEOUT = 5
+
+# Seconden tussen pogingen om opnieuw te verbinden met de event stream
+RECONNECT_DELAY = 2
+
+# Gebeurtenis van de RemoteMonitoringService: verbonden (waarde is de status) of niet (None)
+EVENT_CONNECTION = "connection"
+
+
+class ControlError(Exception):
+    """De daemon is niet bereikbaar of weigert het verzoek."""
+
+
+class ControlClient:
+    def __init__(self, host=CONTROL_HOST, port=CONTROL_PORT, timeout=REQUEST_TIMEOUT):
+        """Client voor de control API van de daemon."""
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+
+    def request(self, method, path, data=None):
+        conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+        try:
+            headers = {}
+            body = None
+            if method != "GET":
+                body = json.dumps(data or {}).encode()
+                headers["Content-Type"] = "application/json"
+            conn.request(method, path, body, headers)
+            response = conn.getresponse()
+            result = json.loads(response.read() or b"null")
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            raise ControlError(f"Daemon niet bereikbaar op {self.host}:{self.port}: {e}") from e
+        finally:
+            conn.close()
+        if response.status >= 400:
+            raise ControlError(result.get("error") if isinstance(result, dict) else f"HTTP {response.status}")
+        return result
+
+    def status(self):
+        return self.request("GET", "/status")
+
+    def recent_jobs(self, limit=20):
+        return [Job.from_dict(job) for job in self.request("GET", f"/jobs?limit={limit}")]
+
+    def pause(self):
+        return self.request("POST", "/pause")
+
+    def resume(self):
+        return self.request("POST", "/resume")
+
+    def check(self):
+        return self.request("POST", "/check")
+
+    def preferences(self):
+        return self.request("GET", "/preferences")
+
+    def push_preferences(self, values):
+        """Sla (een deel van de) voorkeuren op in de daemon; geeft alle voorkeuren terug."""
+        return self.request("POST", "/preferences", values)
+
+    def events(self, connection=None):
+        """Volg de event stream; levert (gebeurtenis, data) tot de verbinding wegvalt."""
+        conn = connection or http.client.HTTPConnection(self.host, self.port, timeout=METRICS_PUSH_INTERVAL * 3)
+        try:
+            conn.request("GET", "/events")
+            response = conn.getresponse()
+            if response.status != 200:
+                raise ControlError(f"Event stream geweigerd: HTTP {response.status}")
+            event, data = None, []
+            for line in response:
+                line = line.decode().rstrip("\r\n")
+                if not line:
+                    if event and data:
+                        yield event, json.loads("\n".join(data))
+                    event, data = None, []
+                elif line.startswith("event:"):
+                    event = line[len("event:"):].strip()
+                elif line.startswith("data:"):
+                    data.append(line[len("data:"):].strip())
+        except (OSError, http.client.HTTPException, ValueError) as e:
+            raise ControlError(f"Verbinding met de daemon verbroken: {e}") from e
+        finally:
+            conn.close()
+
+
+class RemoteMonitoringService(MonitoringService):
+    def __init__(self, client):
+        """Bestuur en volg de monitoring in de daemon, met dezelfde interface als de MonitoringService.
+
+        De gebeurtenissen komen uit de event stream van de daemon; sluiten of herstarten van de
+        GUI heeft dus geen invloed op de monitoring.
+        """
+        super().__init__(monitor_factory=None)
+        self.client = client
+        self.connected = False
+        self.closed = threading.Event()
+        self.connection = None
+        self.follower = None
+
+    def start(self):
+        return self.client.resume().get("active", False)
+
+    def stop(self, timeout=None):
+        return not self.client.pause().get("active", True)
+
+    def request_check(self):
+        try:
+            self.client.check()
+        except ControlError:
+            return False
+        return True
+
+    def connect(self):
+        """Volg de event stream in een achtergrondthread en verbind opnieuw als die wegvalt."""
+        if self.follower is None:
+            self.follower = threading.Thread(target=self.follow, name="control-events", daemon=True)
+            self.follower.start()
+        return self
+
+    def close(self):
+        self.closed.set()
+        if self.connection is not None and self.connection.sock is not None:
+            self.connection.sock.close()
+
+    def follow(self):
+        while not self.closed.is_set():
+            self.connection = http.client.HTTPConnection(self.client.host, self.client.port,
+                                                         timeout=METRICS_PUSH_INTERVAL * 3)
+            try:
+                for event, data in self.client.events(self.connection):
+                    self.handle_event(event, data)
+            except ControlError as e:
+                if not self.closed.is_set():
+                    logging.warning(str(e))
+            if self.connected:
+                self.connected = False
+                self.publish(EVENT_CONNECTION, None)
+            self.closed.wait(RECONNECT_DELAY)
+
+    def handle_event(self, event, data):
+        if event == EVENT_STATUS:
+            self.connected = True
+            self.active = data["active"]
+            self.publish(EVENT_CONNECTION, data)
+        elif event == EVENT_STATE:
+            self.active = data
+            self.publish(EVENT_STATE, data)
+        elif event == EVENT_CHECK:
+            self.last_check = time.strptime(data, TIME_FORMAT)
+            self.publish(EVENT_CHECK, self.last_check)
+        elif event == EVENT_JOBS:
+            self.publish(EVENT_JOBS, [Job.from_dict(job) for job in data])
+        elif event in (EVENT_ERROR, EVENT_FAILED, EVENT_METRICS, EVENT_PREFERENCES):
+            self.publish(event, data)
+
+
+def connect_to_daemon(client=None):
+    """Een RemoteMonitoringService als de daemon draait, anders None."""
+    client = client or ControlClient()
+    try:
+        client.status()
+    except ControlError:
+        return None
+    logging.info("Verbonden met de daemon op %s:%s", client.host, client.port)
+    return RemoteMonitoringService(client).connect()
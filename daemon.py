@@ -0,0 +1,219 @@
+import os
+import queue
+import signal
+import logging
+import threading
+
+from async_runtime import stop_async_runtime
+from control_api import start_control_api, stop_control_api
+from logging_setup import setup_logging
+from monitoring_service import get_monitoring_service, start_integrations, EVENT_CHECK, EVENT_JOBS
+from notification_outbox import get_notification_outbox, stop_notification_outbox
+from permission_manager import get_permission_manager
+from preferences import get_preferences_service, watch_preferences
+
+# Configuratie
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+LOG_DIR = os.path.join(BASE_DIR, 'logs')
+LOG_PATH = os.path.join(LOG_DIR, 'daemon.log')
+PID_FILE = os.path.join(DATA_DIR, 'mrfix.pid')
+
+# Seconden die elk onderdeel krijgt om netjes te stoppen
+SHUTDOWN_TIMEOUT = 10
+
+
+class AlreadyRunningError(Exception):
+    """Er draait al een daemon (volgens het pidfile)."""
+
+
+def process_alive(pid):
+    """Of er een proces met dit pid bestaat."""
+    if os.name != 'posix':
+        return True  # Op Windows beëindigt os.kill het proces; neem aan dat het nog draait
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Bestaat, maar van een andere gebruiker
+    return True
+
+
+class PidFile:
+    def __init__(self, path=PID_FILE):
+        """Een pidfile dat voorkomt dat de daemon twee keer draait."""
+        self.path = path
+
+    def read_pid(self):
+        try:
+            with open(self.path, 'r') as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def acquire(self):
+        """Maak het pidfile aan; een pidfile van een gestopt proces wordt vervangen."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                pid = self.read_pid()
+                if pid is not None and process_alive(pid):
+                    raise AlreadyRunningError(f"MrFix daemon draait al (pid {pid}, {self.path})")
+                logging.warning("Verouderd pidfile %s (pid %s) verwijderd", self.path, pid)
+                try:
+                    os.remove(self.path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, 'w') as f:
+                f.write(f"{os.getpid()}\n")
+            return
+
+    def release(self):
+        """Verwijder het pidfile, als het nog van dit proces is."""
+        if self.read_pid() == os.getpid():
+            os.remove(self.path)
+
+
+def filter_jobs(jobs):
+    """Filter, plan en meld nieuwe opdrachten; de agenda en notificaties worden pas hier geladen."""
+    from job_filter import filter_and_process_jobs
+    filter_and_process_jobs(jobs)
+
+
+class Daemon:
+    def __init__(self, pid_path=PID_FILE, service=None, job_handler=filter_jobs, shutdown_timeout=SHUTDOWN_TIMEOUT):
+        """De monitoring, filter, agenda en notificaties zonder GUI, voor op een server."""
+        self.pidfile = PidFile(pid_path)
+        self.service = service or get_monitoring_service()
+        self.job_handler = job_handler
+        self.shutdown_timeout = shutdown_timeout
+        self.stopping = threading.Event()
+        self.jobs = queue.Queue()
+        self.pipeline = None
+        self.permissions = None
+        self.receiver = None
+        self.metrics_server = None
+        self.control_server = None
+        self.previous_handlers = {}
+
+    def handle_signal(self, signum, frame):
+        name = signal.Signals(signum).name
+        if signum == getattr(signal, 'SIGHUP', None):
+            logging.info("%s ontvangen, voorkeuren worden herladen", name)
+            get_preferences_service().reload()
+            return
+        logging.info("%s ontvangen, daemon stopt", name)
+        self.stopping.set()
+
+    def install_signal_handlers(self):
+        """SIGTERM en SIGINT stoppen de daemon netjes; SIGHUP herlaadt de voorkeuren."""
+        signals = [signal.SIGTERM, signal.SIGINT]
+        if hasattr(signal, 'SIGHUP'):
+            signals.append(signal.SIGHUP)
+        for signum in signals:
+            self.previous_handlers[signum] = signal.signal(signum, self.handle_signal)
+
+    def restore_signal_handlers(self):
+        for signum, handler in self.previous_handlers.items():
+            signal.signal(signum, handler)
+        self.previous_handlers = {}
+
+    def on_monitoring_event(self, event, value):
+        # Het filteren (met agenda en notificaties) gebeurt in een eigen thread, zodat een trage
+        # agenda de volgende controle niet ophoudt en de database altijd in dezelfde thread blijft
+        if event == EVENT_JOBS:
+            self.jobs.put(value)
+        elif event == EVENT_CHECK and self.permissions is not None:
+            self.permissions.expire_requests()  # Een verlopen verzoek kan automatisch goedgekeurd worden
+
+    def on_permission_decided(self, request_id, approved):
+        # Een goedgekeurde geparkeerde opdracht wordt direct ingepland, niet pas bij de volgende nieuwe
+        # opdrachten (dan kan het tijdslot al verlopen zijn); de filter haalt hem zelf op
+        if approved:
+            self.jobs.put([])
+
+    def run_pipeline(self):
+        while True:
+            jobs = self.jobs.get()
+            if jobs is None:
+                return
+            try:
+                self.job_handler(jobs)
+            except Exception as e:
+                logging.error("Fout bij verwerken van %s nieuwe opdrachten: %s", len(jobs), e)
+
+    def start(self):
+        """Start alle onderdelen."""
+        logging.info("MrFix daemon gestart (pid %s)", os.getpid())
+        watch_preferences()
+        get_notification_outbox()  # Bezorgt ook berichten die nog van voor een herstart openstaan
+        self.pipeline = threading.Thread(target=self.run_pipeline, name="job-pipeline", daemon=True)
+        self.pipeline.start()
+        self.permissions = get_permission_manager()
+        self.permissions.subscribe(self.on_permission_decided)
+        self.receiver, self.metrics_server = start_integrations(self.service)
+        self.service.subscribe(self.on_monitoring_event)
+        self.control_server = start_control_api(self.service)  # Voor de GUI, zie control_client.py
+        self.service.start()
+
+    def shutdown(self):
+        """Stop de onderdelen in omgekeerde volgorde; opdrachten en berichten in behandeling worden afgemaakt."""
+        steps = [
+            ("control API", lambda: self.control_server and stop_control_api(self.control_server)),
+            ("monitoring", lambda: self.service.stop(self.shutdown_timeout)),
+            ("opdrachten", self.stop_pipeline),
+            ("Telegram ontvanger", lambda: self.receiver and self.receiver.stop()),
+            ("metrics endpoint", lambda: self.metrics_server and self.metrics_server.shutdown()),
+            ("notificaties", lambda: stop_notification_outbox(self.shutdown_timeout)),
+            ("async runtime", lambda: stop_async_runtime(self.shutdown_timeout)),
+            ("voorkeuren", lambda: get_preferences_service().stop_watching()),
+        ]
+        for name, step in steps:
+            try:
+                step()
+            except Exception as e:
+                logging.error("Fout bij stoppen van %s: %s", name, e)
+        self.service.unsubscribe(self.on_monitoring_event)
+        if self.permissions is not None:
+            self.permissions.unsubscribe(self.on_permission_decided)
+        self.pidfile.release()
+        logging.info("MrFix daemon gestopt")
+
+    def stop_pipeline(self):
+        if self.pipeline is not None:
+            self.jobs.put(None)
+            self.pipeline.join(self.shutdown_timeout)
+            self.pipeline = None
+
+    def run(self):
+        """Draai tot SIGTERM of SIGINT (Ctrl+C); AlreadyRunningError als er al een daemon draait."""
+        self.install_signal_handlers()
+        try:
+            self.pidfile.acquire()
+            try:
+                self.start()
+                while not self.stopping.wait(1):
+                    pass
+            finally:
+                self.shutdown()
+        finally:
+            self.restore_signal_handlers()
+
+def run_daemon(pid_path=PID_FILE, log_path=LOG_PATH, json_logs=True):
+    """Start de daemon met logging naar log_path; geeft de exitcode terug."""
+    setup_logging(log_path, json_format=json_logs)
+    os.makedirs(DATA_DIR, exist_ok=True)
+    try:
+        Daemon(pid_path).run()
+    except AlreadyRunningError as e:
+        logging.error(str(e))
+        return 1
+    return 0
+
+# Voor testen
+if __name__ == "__main__":
+    raise SystemExit(run_daemon())
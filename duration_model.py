@@ -0,0 +1,184 @@
+import os
+import re
+import json
+import math
+import logging
+from datetime import datetime
+
+from job_classifier import classify_job
+from persistence import atomic_write_json
+
+# Configuratie
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+DURATION_MODEL_FILE = os.path.join(DATA_DIR, 'duration_model.json')
+
+# Standaard duur als er (nog) geen historie is
+DEFAULT_DURATION = 120  # minuten
+
+# Trainingsinstellingen
+MIN_SAMPLES = 3  # Minimum aantal afspraken voordat een categorie een eigen duur krijgt
+PERCENTILE = 0.8  # We reserveren de duur waarbinnen 80% van de opdrachten klaar was
+ROUND_TO = 15  # Afronden naar boven op kwartieren
+MIN_DURATION = 30  # Nooit minder dan een half uur reserveren
+
+# Trefwoorden met een eigen duur-categorie, van specifiek naar algemeen
+DURATION_KEYWORDS = [
+    "pax",
+    "keuken",
+    "kast",
+    "bed",
+    "groepenkast",
+    "stopcontact",
+    "lamp",
+    "router",
+    "wifi",
+]
+
+_KEYWORD_PATTERNS = [(keyword, re.compile(r'\b' + re.escape(keyword) + r'\w*')) for keyword in DURATION_KEYWORDS]
+
+
+def job_feature_keys(job):
+    """Bepaal de opzoeksleutels voor een opdracht, van meest naar minst specifiek."""
+    text = f"{job.get('title', '')} {job.get('description', '')}".lower()
+
+    keys = [f"kw:{keyword}" for keyword, pattern in _KEYWORD_PATTERNS if pattern.search(text)]
+
+    for job_type in ("ikea", "electrical", "internet"):
+        if job.get(f"is_{job_type}"):
+            keys.append(f"type:{job_type}")
+
+    keys.append("default")
+    return keys
+
+
+def event_to_job_features(event):
+    """Zet een agenda-afspraak om naar de opdrachtkenmerken die het model gebruikt."""
+    summary = event.get('summary', '')
+    if summary.startswith('MrFix: '):
+        summary = summary[len('MrFix: '):]
+
+    description = event.get('description', '')
+
+    job = {'title': summary, 'description': description}
+    job.update(classify_job(summary, description))
+    return job
+
+
+class DurationModel:
+    def __init__(self, durations=None, default=DEFAULT_DURATION, samples=None):
+        """Initialiseer het duurmodel met een opzoektabel (sleutel -> minuten)."""
+        self.durations = durations or {}
+        self.default = default
+        self.samples = samples or {}
+
+    def estimate(self, job):
+        """Schat de duur van een opdracht in minuten."""
+        for key in job_feature_keys(job):
+            if key in self.durations:
+                return self.durations[key]
+        return self.default
+
+    @classmethod
+    def train(cls, samples, default=DEFAULT_DURATION):
+        """Train een opzoektabel uit (opdracht, geplande minuten, werkelijke minuten) samples."""
+        groups = {}
+        for job, scheduled_minutes, actual_minutes in samples:
+            if actual_minutes <= 0:
+                continue
+            for key in job_feature_keys(job):
+                groups.setdefault(key, []).append(actual_minutes)
+
+        durations = {}
+        counts = {}
+        for key, values in groups.items():
+            counts[key] = len(values)
+            if len(values) < MIN_SAMPLES:
+                continue
+            durations[key] = cls._reservation_minutes(values)
+
+        # De algemene categorie wordt de nieuwe standaard als er genoeg historie is
+        if "default" in durations:
+            default = durations.pop("default")
+
+        overruns = [actual - scheduled for _, scheduled, actual in samples if scheduled]
+        if overruns:
+            logging.info("Gemiddelde afwijking t.o.v. geplande duur: %.0f minuten", sum(overruns) / len(overruns))
+
+        logging.info("Duurmodel getraind op %s afspraken, %s categorieën", len(samples), len(durations))
+        return cls(durations, default, counts)
+
+    @staticmethod
+    def _reservation_minutes(values):
+        """Bereken de te reserveren duur voor een groep werkelijke duren."""
+        values = sorted(values)
+        index = min(len(values) - 1, math.ceil(PERCENTILE * len(values)) - 1)
+        minutes = math.ceil(values[index] / ROUND_TO) * ROUND_TO
+        return max(MIN_DURATION, minutes)
+
+    @classmethod
+    def load(cls, path=None):
+        """Laad de opzoektabel uit het modelbestand, of gebruik de standaardduur."""
+        path = path or DURATION_MODEL_FILE
+        try:
+            if os.path.exists(path):
+                with open(path, 'r') as f:
+                    data = json.load(f)
+                logging.info("Duurmodel geladen uit %s", path)
+                return cls(data.get('durations', {}), data.get('default', DEFAULT_DURATION), data.get('samples', {}))
+        except Exception as e:
+            logging.error("Fout bij laden van duurmodel: %s", e)
+        return cls()
+
+    def save(self, path=None):
+        """Sla de opzoektabel op in het modelbestand."""
+        path = path or DURATION_MODEL_FILE
+        data = {
+            'version': 1,
+            'trained_at': datetime.now().isoformat(timespec='seconds'),
+            'default': self.default,
+            'durations': self.durations,
+            'samples': self.samples,
+        }
+        atomic_write_json(path, data, indent=4, sort_keys=True)
+        logging.info("Duurmodel opgeslagen in %s", path)
+
+
+def samples_from_calendar_events(events):
+    """Zet agenda-afspraken om naar trainingssamples."""
+    samples = []
+    for event in events:
+        actual_minutes = (event['end'] - event['start']).total_seconds() / 60
+        scheduled_minutes = event.get('scheduled_minutes') or DEFAULT_DURATION
+        samples.append((event_to_job_features(event), scheduled_minutes, actual_minutes))
+    return samples
+
+
+# Singleton instantie
+_duration_model = None
+
+def get_duration_model():
+    """Verkrijg een singleton instantie van het DurationModel."""
+    global _duration_model
+    if _duration_model is None:
+        _duration_model = DurationModel.load()
+    return _duration_model
+
+def train_from_calendar(days_back=180):
+    """Train het duurmodel op de MrFix afspraken uit de agenda en sla het op."""
+    from calendar_integration import get_job_events
+
+    events = get_job_events(days_back)
+    model = DurationModel.train(samples_from_calendar_events(events))
+    model.save()
+    return model
+
+# Voor trainen
+if __name__ == "__main__":
+    import sys
+
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 180
+    model = train_from_calendar(days)
+    print(f"Standaardduur: {model.default} minuten")
+    for key, minutes in sorted(model.durations.items()):
+        print(f"  {key}: {minutes} minuten ({model.samples.get(key, 0)} afspraken)")
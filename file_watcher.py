@@ -0,0 +1,199 @@
+import os
+import sys
+import time
+import ctypes
+import ctypes.util
+import select
+import struct
+import logging
+import threading
+
+# Standaardinstellingen
+DEBOUNCE_DELAY = 0.5  # Seconden zonder nieuwe wijziging voordat de callback wordt aangeroepen
+POLL_INTERVAL = 1.0  # Seconden tussen controles als inotify niet beschikbaar is
+
+# inotify (Linux), zie inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len; daarna de bestandsnaam
+
+
+def load_inotify():
+    """De libc met inotify, of None als dat niet beschikbaar is (macOS, Windows, oude kernels)."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1, libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class InotifyBackend:
+    name = "inotify"
+
+    def __init__(self, libc, directory):
+        """Volg een directory via inotify; wakeup_fd onderbreekt het wachten bij stoppen."""
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 mislukt")
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch mislukt voor {directory}")
+        self.wakeup_read, self.wakeup_write = os.pipe()
+
+    def wait(self, timeout):
+        """Wacht op wijzigingen; geeft de namen van de gewijzigde bestanden terug."""
+        readable, _, _ = select.select([self.fd, self.wakeup_read], [], [], timeout)
+        if self.fd not in readable:
+            return set()
+
+        names = set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return names
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name:
+                names.add(os.fsdecode(name))
+        return names
+
+    def wakeup(self):
+        os.write(self.wakeup_write, b'\0')
+
+    def close(self):
+        for fd in (self.fd, self.wakeup_read, self.wakeup_write):
+            os.close(fd)
+
+
+class PollingBackend:
+    name = "polling"
+
+    def __init__(self, directory, filenames, poll_interval, stopped):
+        """Vergelijk periodiek de bestandsstatus (mtime, grootte, inode) van de gevolgde bestanden."""
+        self.directory = directory
+        self.filenames = filenames
+        self.poll_interval = poll_interval
+        self.stopped = stopped
+        self.state = self.snapshot()
+
+    def snapshot(self):
+        names = self.filenames if self.filenames is not None else os.listdir(self.directory)
+        state = {}
+        for name in names:
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+                state[name] = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+            except OSError:
+                state[name] = None
+        return state
+
+    def wait(self, timeout):
+        if self.stopped.wait(min(timeout, self.poll_interval)):
+            return set()
+        state = self.snapshot()
+        changed = {name for name in set(state) | set(self.state) if state.get(name) != self.state.get(name)}
+        self.state = state
+        return changed
+
+    def wakeup(self):
+        pass  # stopped.wait() wordt al onderbroken door stopped.set()
+
+    def close(self):
+        pass
+
+
+class FileWatcher:
+    def __init__(self, directory, callback, filenames=None, debounce=DEBOUNCE_DELAY, poll_interval=POLL_INTERVAL,
+                 use_inotify=True):
+        """Roep callback(namen) aan als bestanden in een directory veranderen.
+
+        Snel achter elkaar volgende wijzigingen (bijvoorbeeld een tijdelijk bestand gevolgd door
+        een rename) worden samengevoegd tot één aanroep. De callback draait in de thread van de
+        watcher, nooit in die van de aanroeper.
+        """
+        self.directory = directory
+        self.callback = callback
+        self.filenames = set(filenames) if filenames is not None else None
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify
+        self.stopped = threading.Event()
+        self.backend = None
+        self.thread = None
+
+    def create_backend(self):
+        libc = load_inotify() if self.use_inotify else None
+        if libc is not None:
+            try:
+                return InotifyBackend(libc, self.directory)
+            except OSError as e:
+                logging.warning("inotify niet beschikbaar (%s), bestanden worden periodiek gecontroleerd", e)
+        return PollingBackend(self.directory, self.filenames, self.poll_interval, self.stopped)
+
+    def start(self):
+        """Start de watcher in een achtergrondthread."""
+        if self.thread is not None:
+            return self
+        self.backend = self.create_backend()
+        self.thread = threading.Thread(target=self.run, name="file-watcher", daemon=True)
+        self.thread.start()
+        logging.info("Wijzigingen in %s worden gevolgd (%s)", self.directory, self.backend.name)
+        return self
+
+    def stop(self, timeout=5):
+        """Stop de watcher en wacht tot de thread klaar is."""
+        self.stopped.set()
+        if self.thread is not None:
+            self.backend.wakeup()
+            self.thread.join(timeout)
+            self.backend.close()
+            self.thread = None
+
+    def run(self):
+        pending = set()
+        deadline = None
+        while not self.stopped.is_set():
+            timeout = self.poll_interval if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                names = self.backend.wait(timeout)
+            except OSError as e:
+                logging.error("Fout bij volgen van %s: %s", self.directory, e)
+                self.stopped.wait(self.poll_interval)
+                continue
+
+            if self.filenames is not None:
+                names &= self.filenames
+            if names:
+                # Wacht tot er even niets meer verandert
+                pending |= names
+                deadline = time.monotonic() + self.debounce
+            elif deadline is not None and time.monotonic() >= deadline:
+                changed, pending, deadline = pending, set(), None
+                try:
+                    self.callback(changed)
+                except Exception as e:
+                    logging.error("Fout bij verwerken van gewijzigde bestanden %s: %s", sorted(changed), e)
+
+# Voor testen
+if __name__ == "__main__":
+    directory = sys.argv[1] if len(sys.argv) > 1 else "."
+    watcher = FileWatcher(directory, lambda names: print(f"Gewijzigd: {', '.join(sorted(names))}")).start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        watcher.stop()
@@ -0,0 +1,450 @@
+import os
+import re
+import math
+import sqlite3
+import logging
+import difflib
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import datetime
+
+# Configuratie
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+DB_PATH = os.path.join(DATA_DIR, 'mrfix.db')
+
+# Versie van de ingebouwde tabel en het herleiden; bij wijzigingen worden oude cache-regels genegeerd
+GEODATA_VERSION = 2
+
+# Centrum van Amsterdam (Dam)
+AMSTERDAM_COORDS = (52.3731, 4.8926)
+
+# Afstand voor locaties die we niet kunnen herleiden: altijd toestemming vragen
+UNKNOWN_DISTANCE = 999.0
+
+LRU_SIZE = 1024
+FUZZY_CUTOFF = 0.85
+
+# Plaatsen en Amsterdamse stadsdelen met (benaderde) coördinaten
+PLACES = {
+    "amsterdam": (52.3731, 4.8926),
+    "amsterdam centrum": (52.3731, 4.8926),
+    "amsterdam noord": (52.3910, 4.9200),
+    "amsterdam oost": (52.3600, 4.9400),
+    "amsterdam west": (52.3730, 4.8550),
+    "amsterdam nieuw west": (52.3600, 4.8050),
+    "amsterdam zuid": (52.3450, 4.8700),
+    "amsterdam zuidoost": (52.3080, 4.9720),
+    "bijlmer": (52.3080, 4.9720),
+    "westpoort": (52.4000, 4.8300),
+    "amstelveen": (52.3114, 4.8701),
+    "diemen": (52.3397, 4.9627),
+    "duivendrecht": (52.3247, 4.9436),
+    "ouderkerk aan de amstel": (52.2950, 4.9140),
+    "badhoevedorp": (52.3386, 4.7844),
+    "zwanenburg": (52.3790, 4.7440),
+    "halfweg": (52.3840, 4.7510),
+    "landsmeer": (52.4307, 4.9153),
+    "oostzaan": (52.4403, 4.8758),
+    "zaandam": (52.4420, 4.8292),
+    "zaanstad": (52.4420, 4.8292),
+    "wormerveer": (52.4910, 4.7880),
+    "krommenie": (52.4990, 4.7630),
+    "purmerend": (52.5050, 4.9597),
+    "edam": (52.5130, 5.0480),
+    "volendam": (52.4950, 5.0710),
+    "monnickendam": (52.4590, 5.0360),
+    "weesp": (52.3076, 5.0418),
+    "muiden": (52.3294, 5.0694),
+    "abcoude": (52.2726, 4.9700),
+    "uithoorn": (52.2378, 4.8256),
+    "aalsmeer": (52.2632, 4.7625),
+    "hoofddorp": (52.3030, 4.6891),
+    "haarlemmermeer": (52.3030, 4.6891),
+    "nieuw vennep": (52.2640, 4.6330),
+    "haarlem": (52.3874, 4.6462),
+    "heemstede": (52.3580, 4.6188),
+    "zandvoort": (52.3713, 4.5333),
+    "ijmuiden": (52.4586, 4.6193),
+    "velsen": (52.4586, 4.6193),
+    "beverwijk": (52.4833, 4.6566),
+    "heemskerk": (52.5110, 4.6700),
+    "alkmaar": (52.6324, 4.7534),
+    "hoorn": (52.6424, 5.0602),
+    "almere": (52.3508, 5.2647),
+    "lelystad": (52.5185, 5.4714),
+    "naarden": (52.2958, 5.1625),
+    "bussum": (52.2733, 5.1611),
+    "huizen": (52.2992, 5.2417),
+    "hilversum": (52.2292, 5.1669),
+    "amersfoort": (52.1561, 5.3878),
+    "utrecht": (52.0907, 5.1214),
+    "nieuwegein": (52.0292, 5.0806),
+    "zeist": (52.0907, 5.2333),
+    "leiden": (52.1601, 4.4970),
+    "den haag": (52.0705, 4.3007),
+    "delft": (52.0116, 4.3571),
+    "zoetermeer": (52.0575, 4.4931),
+    "gouda": (52.0115, 4.7105),
+    "rotterdam": (51.9244, 4.4777),
+    "dordrecht": (51.8133, 4.6901),
+    "breda": (51.5719, 4.7683),
+    "tilburg": (51.5555, 5.0913),
+    "s hertogenbosch": (51.6978, 5.3037),
+    "eindhoven": (51.4416, 5.4697),
+    "nijmegen": (51.8126, 5.8372),
+    "arnhem": (51.9851, 5.8987),
+    "apeldoorn": (52.2112, 5.9699),
+    "zwolle": (52.5168, 6.0830),
+    "enschede": (52.2215, 6.8937),
+    "groningen": (53.2194, 6.5665),
+    "leeuwarden": (53.2012, 5.7999),
+    "maastricht": (50.8514, 5.6910),
+}
+
+# Alternatieve schrijfwijzen
+ALIASES = {
+    "adam": "amsterdam",
+    "a dam": "amsterdam",
+    "mokum": "amsterdam",
+    "amsterdam zuid oost": "amsterdam zuidoost",
+    "nieuw west": "amsterdam nieuw west",
+    "den bosch": "s hertogenbosch",
+    "hertogenbosch": "s hertogenbosch",
+    "s gravenhage": "den haag",
+    "the hague": "den haag",
+}
+
+# Plaatsen die als Amsterdam gelden
+AMSTERDAM_PLACES = {
+    "amsterdam", "amsterdam centrum", "amsterdam noord", "amsterdam oost", "amsterdam west",
+    "amsterdam nieuw west", "amsterdam zuid", "amsterdam zuidoost", "bijlmer", "westpoort",
+}
+
+# Postcodegebieden (eerste drie cijfers) in en rond Amsterdam
+POSTCODE_AREAS_PC3 = {
+    "101": ("amsterdam centrum", 52.3740, 4.8970),
+    "102": ("amsterdam noord", 52.3950, 4.9200),
+    "103": ("amsterdam noord", 52.4000, 4.9400),
+    "104": ("westpoort", 52.3850, 4.8100),
+    "105": ("amsterdam west", 52.3730, 4.8600),
+    "106": ("amsterdam nieuw west", 52.3600, 4.8000),
+    "107": ("amsterdam zuid", 52.3470, 4.8750),
+    "108": ("amsterdam zuid", 52.3300, 4.8700),
+    "109": ("amsterdam oost", 52.3550, 4.9400),
+    "110": ("amsterdam zuidoost", 52.3100, 4.9700),
+    "111": ("diemen", 52.3350, 4.9600),
+    "112": ("landsmeer", 52.4307, 4.9153),
+    "113": ("volendam", 52.5000, 5.0600),
+    "114": ("monnickendam", 52.4590, 5.0360),
+    "115": ("landsmeer", 52.4400, 4.9700),
+    "116": ("zwanenburg", 52.3800, 4.7400),
+    "117": ("badhoevedorp", 52.3400, 4.7800),
+    "118": ("amstelveen", 52.3000, 4.8600),
+    "119": ("ouderkerk aan de amstel", 52.2950, 4.9100),
+}
+
+# Postcodegebieden (eerste twee cijfers) voor de rest van Nederland, benaderd met de hoofdplaats
+POSTCODE_AREAS_PC2 = {
+    "10": ("amsterdam", 52.3731, 4.8926),
+    "11": ("amstelveen", 52.3114, 4.8701),
+    "12": ("hilversum", 52.2292, 5.1669),
+    "13": ("almere", 52.3508, 5.2647),
+    "14": ("purmerend", 52.5050, 4.9597),
+    "15": ("zaandam", 52.4420, 4.8292),
+    "16": ("hoorn", 52.6424, 5.0602),
+    "17": ("schagen", 52.7870, 4.7990),
+    "18": ("alkmaar", 52.6324, 4.7534),
+    "19": ("beverwijk", 52.4833, 4.6566),
+    "20": ("haarlem", 52.3874, 4.6462),
+    "21": ("hoofddorp", 52.3030, 4.6891),
+    "22": ("katwijk", 52.2030, 4.4180),
+    "23": ("leiden", 52.1601, 4.4970),
+    "24": ("alphen aan den rijn", 52.1290, 4.6580),
+    "25": ("den haag", 52.0705, 4.3007),
+    "26": ("delft", 52.0116, 4.3571),
+    "27": ("zoetermeer", 52.0575, 4.4931),
+    "28": ("gouda", 52.0115, 4.7105),
+    "29": ("krimpen aan den ijssel", 51.9170, 4.5940),
+    "30": ("rotterdam", 51.9244, 4.4777),
+    "31": ("schiedam", 51.9190, 4.3990),
+    "32": ("spijkenisse", 51.8450, 4.3290),
+    "33": ("dordrecht", 51.8133, 4.6901),
+    "34": ("nieuwegein", 52.0292, 5.0806),
+    "35": ("utrecht", 52.0907, 5.1214),
+    "36": ("maarssen", 52.1360, 5.0400),
+    "37": ("zeist", 52.0907, 5.2333),
+    "38": ("amersfoort", 52.1561, 5.3878),
+    "39": ("veenendaal", 52.0280, 5.5580),
+    "40": ("tiel", 51.8870, 5.4290),
+    "41": ("culemborg", 51.9550, 5.2270),
+    "42": ("gorinchem", 51.8310, 4.9740),
+    "43": ("zierikzee", 51.6500, 3.9190),
+    "44": ("goes", 51.5040, 3.8880),
+    "45": ("terneuzen", 51.3360, 3.8280),
+    "46": ("bergen op zoom", 51.4950, 4.2910),
+    "47": ("roosendaal", 51.5310, 4.4650),
+    "48": ("breda", 51.5719, 4.7683),
+    "49": ("oosterhout", 51.6450, 4.8600),
+    "50": ("tilburg", 51.5555, 5.0913),
+    "51": ("waalwijk", 51.6830, 5.0700),
+    "52": ("s hertogenbosch", 51.6978, 5.3037),
+    "53": ("zaltbommel", 51.8100, 5.2450),
+    "54": ("uden", 51.6600, 5.6190),
+    "55": ("veldhoven", 51.4180, 5.4040),
+    "56": ("eindhoven", 51.4416, 5.4697),
+    "57": ("helmond", 51.4790, 5.6570),
+    "58": ("venray", 51.5260, 5.9750),
+    "59": ("venlo", 51.3700, 6.1720),
+    "60": ("weert", 51.2510, 5.7060),
+    "61": ("sittard", 51.0000, 5.8690),
+    "62": ("maastricht", 50.8514, 5.6910),
+    "63": ("valkenburg", 50.8650, 5.8320),
+    "64": ("heerlen", 50.8880, 5.9790),
+    "65": ("nijmegen", 51.8126, 5.8372),
+    "66": ("wijchen", 51.8090, 5.7250),
+    "67": ("ede", 52.0400, 5.6650),
+    "68": ("arnhem", 51.9851, 5.8987),
+    "69": ("zevenaar", 51.9300, 6.0700),
+    "70": ("doetinchem", 51.9650, 6.2890),
+    "71": ("winterswijk", 51.9720, 6.7200),
+    "72": ("zutphen", 52.1380, 6.2010),
+    "73": ("apeldoorn", 52.2112, 5.9699),
+    "74": ("deventer", 52.2550, 6.1630),
+    "75": ("enschede", 52.2215, 6.8937),
+    "76": ("almelo", 52.3570, 6.6620),
+    "77": ("hardenberg", 52.5750, 6.6190),
+    "78": ("emmen", 52.7790, 6.9060),
+    "79": ("hoogeveen", 52.7220, 6.4760),
+    "80": ("zwolle", 52.5168, 6.0830),
+    "81": ("raalte", 52.3870, 6.2750),
+    "82": ("lelystad", 52.5185, 5.4714),
+    "83": ("emmeloord", 52.7100, 5.7500),
+    "84": ("heerenveen", 52.9600, 5.9200),
+    "85": ("joure", 52.9650, 5.7950),
+    "86": ("sneek", 53.0320, 5.6590),
+    "87": ("bolsward", 53.0650, 5.5300),
+    "88": ("franeker", 53.1870, 5.5410),
+    "89": ("leeuwarden", 53.2012, 5.7999),
+    "90": ("grou", 53.0950, 5.8360),
+    "91": ("dokkum", 53.3270, 5.9990),
+    "92": ("drachten", 53.1120, 6.0990),
+    "93": ("roden", 53.1380, 6.4210),
+    "94": ("assen", 52.9930, 6.5640),
+    "95": ("stadskanaal", 52.9890, 6.9500),
+    "96": ("hoogezand", 53.1610, 6.7610),
+    "97": ("groningen", 53.2194, 6.5665),
+    "98": ("groningen", 53.2500, 6.5500),
+    "99": ("delfzijl", 53.3300, 6.9180),
+}
+
+# Een volledige postcode (1012 AB); vier losse cijfers zijn vaak een huisnummer
+_POSTCODE_PATTERN = re.compile(r'\b([1-9]\d{3})\s?[a-z]{2}\b')
+_POSTCODE_DIGITS_PATTERN = re.compile(r'\b([1-9]\d{3})\b')
+
+
+def haversine(coord1, coord2):
+    """Bereken de afstand in kilometers tussen twee (lat, lon) coördinaten."""
+    lat1, lon1 = map(math.radians, coord1)
+    lat2, lon2 = map(math.radians, coord2)
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = math.sin(dlat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+
+def normalize_location(location):
+    """Normaliseer een locatie (kleine letters, geen accenten of leestekens)."""
+    text = unicodedata.normalize('NFKD', str(location)).encode('ascii', 'ignore').decode('ascii')
+    text = text.lower().replace("'", "")
+    text = re.sub(r'[^a-z0-9]+', ' ', text)
+    return ' '.join(text.split())
+
+
+class GeoResolver:
+    def __init__(self, db_path=None, lru_size=LRU_SIZE):
+        """Initialiseer de locatie-resolver met een LRU en een persistente SQLite cache."""
+        self.db_path = db_path or DB_PATH
+        self.lru_size = lru_size
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self._place_names = sorted(set(PLACES) | set(ALIASES), key=len, reverse=True)
+        self.setup_database()
+
+    def setup_database(self):
+        """Initialiseer de cache tabel voor herleide locaties."""
+        try:
+            self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS geocode_cache (
+                    query TEXT PRIMARY KEY,
+                    place TEXT,
+                    lat REAL,
+                    lon REAL,
+                    version INTEGER,
+                    resolved_at TEXT
+                )
+            ''')
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logging.error("Database fout bij opzetten van geocode cache: %s", e)
+            self.conn = None
+
+    def resolve(self, location):
+        """Herleid een locatie naar (plaats, lat, lon), of None als dat niet lukt."""
+        if not location:
+            return None
+
+        query = normalize_location(location)
+        with self._lock:
+            if query in self._lru:
+                self._lru.move_to_end(query)
+                return self._lru[query]
+
+            result = self._load_cached(query)
+            if result is None:
+                result = self._resolve_uncached(query)
+                self._store_cached(query, result)
+
+            self._lru[query] = result
+            if len(self._lru) > self.lru_size:
+                self._lru.popitem(last=False)
+            return result
+
+    def _resolve_uncached(self, query):
+        """Herleid een genormaliseerde locatie via postcode, plaatsnaam of fuzzy matching."""
+        # Postcode (1012 AB)
+        match = _POSTCODE_PATTERN.search(query)
+        if match:
+            area = self._lookup_postcode(match.group(1))
+            if area:
+                return area
+
+        # Exacte plaatsnaam
+        place = self._lookup_place(query)
+        if place:
+            return place
+
+        # Plaatsnaam als onderdeel van een adres ("Keizersgracht 1 Amsterdam")
+        padded = f" {query} "
+        for name in self._place_names:
+            if f" {name} " in padded:
+                return self._lookup_place(name)
+
+        # Alleen de cijfers van een postcode (1012), als er geen plaatsnaam in staat
+        match = _POSTCODE_DIGITS_PATTERN.search(query)
+        if match:
+            area = self._lookup_postcode(match.group(1))
+            if area:
+                return area
+
+        # Fuzzy matching voor tikfouten ("Amsterdm")
+        candidates = difflib.get_close_matches(query, self._place_names, n=1, cutoff=FUZZY_CUTOFF)
+        if not candidates:
+            for token in reversed(query.split()):
+                candidates = difflib.get_close_matches(token, self._place_names, n=1, cutoff=FUZZY_CUTOFF)
+                if candidates:
+                    break
+        if candidates:
+            return self._lookup_place(candidates[0])
+
+        logging.warning("Kon locatie niet herleiden: %s", query)
+        return None
+
+    def _lookup_postcode(self, postcode):
+        """Zoek het gebied van de cijfers van een postcode op in de ingebouwde tabel."""
+        return POSTCODE_AREAS_PC3.get(postcode[:3]) or POSTCODE_AREAS_PC2.get(postcode[:2])
+
+    def _lookup_place(self, name):
+        """Zoek een plaatsnaam (of alias) op in de ingebouwde tabel."""
+        name = ALIASES.get(name, name)
+        if name in PLACES:
+            lat, lon = PLACES[name]
+            return (name, lat, lon)
+        return None
+
+    def _load_cached(self, query):
+        """Haal een eerder herleide locatie uit de SQLite cache."""
+        if not self.conn:
+            return None
+        try:
+            row = self.conn.execute(
+                'SELECT place, lat, lon FROM geocode_cache WHERE query = ? AND version = ?',
+                (query, GEODATA_VERSION)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logging.error("Database fout bij lezen van geocode cache: %s", e)
+            return None
+        if row and row[0] is not None:
+            return (row[0], row[1], row[2])
+        return None
+
+    def _store_cached(self, query, result):
+        """Sla een herleide locatie op in de SQLite cache."""
+        if not self.conn or result is None:
+            return
+        try:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO geocode_cache (query, place, lat, lon, version, resolved_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (query, result[0], result[1], result[2], GEODATA_VERSION, datetime.now().isoformat())
+            )
+            self.conn.commit()
+        except sqlite3.Error as e:
+            logging.error("Database fout bij schrijven van geocode cache: %s", e)
+
+    def distance_to_amsterdam(self, location):
+        """Bereken de afstand (km) van een locatie tot het centrum van Amsterdam."""
+        result = self.resolve(location)
+        if result is None:
+            return None
+        return round(haversine(AMSTERDAM_COORDS, (result[1], result[2])), 1)
+
+    def is_amsterdam(self, location):
+        """Controleer of een locatie in Amsterdam ligt."""
+        result = self.resolve(location)
+        return result is not None and result[0] in AMSTERDAM_PLACES
+
+    def cleanup(self):
+        """Ruim resources op."""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+# Singleton instantie
+_geo_resolver = None
+
+def get_geo_resolver():
+    """Verkrijg een singleton instantie van de GeoResolver."""
+    global _geo_resolver
+    if _geo_resolver is None:
+        _geo_resolver = GeoResolver()
+    return _geo_resolver
+
+def resolve_location(location):
+    """Herleid een locatie naar (plaats, lat, lon)."""
+    return get_geo_resolver().resolve(location)
+
+def distance_to_amsterdam(location):
+    """Bereken de afstand (km) van een locatie tot het centrum van Amsterdam."""
+    return get_geo_resolver().distance_to_amsterdam(location)
+
+def is_amsterdam(location):
+    """Controleer of een locatie in Amsterdam ligt."""
+    return get_geo_resolver().is_amsterdam(location)
+
+def enrich_job_location(job):
+    """Vul distance_to_amsterdam en is_amsterdam aan voor een opdracht waar die ontbreken."""
+    if 'distance_to_amsterdam' not in job or job['distance_to_amsterdam'] is None:
+        distance = distance_to_amsterdam(job.get('location'))
+        job['distance_to_amsterdam'] = UNKNOWN_DISTANCE if distance is None else distance
+    if 'is_amsterdam' not in job or job['is_amsterdam'] is None:
+        job['is_amsterdam'] = is_amsterdam(job.get('location'))
+    return job
+
+# Voor testen
+if __name__ == "__main__":
+    import sys
+
+    for location in sys.argv[1:] or ["Amsterdam", "1012 AB Amsterdam", "Utrecht", "Amsterdm", "Den Bosch"]:
+        print(f"{location}: {resolve_location(location)} - {distance_to_amsterdam(location)} km, Amsterdam: {is_amsterdam(location)}")
@@ -1,87 +1,28 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 import logging
-import os
-import json
+
+from preferences import get_preferences, get_preferences_service, WEEKDAYS, WEEKDAY_LABELS
 
 class MrFixPreferencesGUI:
-    def __init__(self, parent):
+    def __init__(self, parent, save=None):
         self.parent = parent
+        self.save = save or get_preferences_service().save  # De app geeft de daemon door als die draait
         
-        # Configuratie bestandspad
-        self.config_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
-        self.config_file = os.path.join(self.config_dir, 'user_preferences.json')
-        
-        # Zorg ervoor dat de data directory bestaat
-        os.makedirs(self.config_dir, exist_ok=True)
-        
-        # Laad bestaande voorkeuren of gebruik standaardwaarden
+        # Een aanpasbare kopie van de gedeelde voorkeuren; opslaan vervangt de gedeelde snapshot
         self.preferences = self.load_preferences()
         
         # Maak de GUI
         self.create_gui()
     
     def load_preferences(self):
-        """Laad voorkeuren uit het configuratiebestand of gebruik standaardwaarden."""
-        default_preferences = {
-            # Opdracht type voorkeuren
-            "prefer_ikea": True,
-            "prefer_electrical": True,
-            "prefer_internet": True,
-            "min_hourly_rate": 79,  # Minimum uurloon in euro
-            "prefer_urgent": True,
-            
-            # Planning voorkeuren
-            "max_jobs_weekday": {
-                "0": 3,  # Zondag: max 3
-                "1": 5,  # Maandag: meer opdrachten
-                "2": 2,  # Dinsdag: max 2
-                "3": 5,  # Woensdag: meer opdrachten
-                "4": 2,  # Donderdag: max 2
-                "5": 2,  # Vrijdag: max 2
-                "6": 3,  # Zaterdag: max 3
-            },
-            
-            # Locatie voorkeuren
-            "prefer_amsterdam": True,
-            "max_distance_without_permission": 20,  # km
-            "travel_time_between_jobs": 60,  # minuten
-            
-            # Notificatie voorkeuren
-            "notification_method": "telegram",  # 'telegram' of 'pushbullet'
-            "telegram": {
-                "bot_token": "",
-                "chat_id": ""
-            },
-            "pushbullet": {
-                "api_key": ""
-            }
-        }
-        
-        try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    preferences = json.load(f)
-                    # Zorg ervoor dat alle standaardwaarden aanwezig zijn
-                    for key, value in default_preferences.items():
-                        if key not in preferences:
-                            preferences[key] = value
-                        elif key == "max_jobs_weekday" and isinstance(value, dict):
-                            for day, max_jobs in value.items():
-                                if day not in preferences[key]:
-                                    preferences[key][day] = max_jobs
-                return preferences
-            else:
-                return default_preferences
-        except Exception as e:
-            messagebox.showerror("Fout", f"Fout bij laden van voorkeuren: {e}")
-            return default_preferences
+        """Laad de voorkeuren (met standaardwaarden voor ontbrekende instellingen)."""
+        return get_preferences().to_dict()
     
     def save_preferences(self):
         """Sla voorkeuren op in het configuratiebestand."""
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.preferences, f, indent=4)
+            self.save(self.preferences)
             messagebox.showinfo("Succes", "Voorkeuren succesvol opgeslagen!")
         except Exception as e:
             messagebox.showerror("Fout", f"Fout bij opslaan van voorkeuren: {e}")
@@ -169,16 +110,15 @@ class MrFixPreferencesGUI:
             row=0, column=0, columnspan=2, sticky=tk.W, pady=(0, 10))
         
         # Dagen van de week
-        days = ["Zondag", "Maandag", "Dinsdag", "Woensdag", "Donderdag", "Vrijdag", "Zaterdag"]
         self.max_jobs_vars = {}
         
-        for i, day in enumerate(days):
-            ttk.Label(frame, text=day).grid(row=i+1, column=0, sticky=tk.W, pady=5)
+        for i, (day, label) in enumerate(zip(WEEKDAYS, WEEKDAY_LABELS)):
+            ttk.Label(frame, text=label).grid(row=i+1, column=0, sticky=tk.W, pady=5)
             
-            self.max_jobs_vars[str(i)] = tk.StringVar(value=str(self.preferences["max_jobs_weekday"][str(i)]))
-            spinbox = ttk.Spinbox(frame, from_=0, to=10, textvariable=self.max_jobs_vars[str(i)], width=5)
+            self.max_jobs_vars[day] = tk.StringVar(value=str(self.preferences["max_jobs_weekday"][day]))
+            spinbox = ttk.Spinbox(frame, from_=0, to=10, textvariable=self.max_jobs_vars[day], width=5)
             spinbox.grid(row=i+1, column=1, sticky=tk.W, pady=5)
-            spinbox.bind("<FocusOut>", lambda e, day=str(i): self.update_max_jobs(day))
+            spinbox.bind("<FocusOut>", lambda e, day=day: self.update_max_jobs(day))
         
         # Reistijd tussen opdrachten
         ttk.Label(frame, text="Reistijd tussen opdrachten (minuten):").grid(
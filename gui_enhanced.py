@@ -1,27 +1,17 @@
 import os
-import json
 import logging
 import tkinter as tk
 from tkinter import ttk, messagebox, StringVar, IntVar, BooleanVar, Frame, LabelFrame
 
+from logging_setup import setup_logging
+from preferences import get_preferences, get_preferences_service, WEEKDAYS, WEEKDAY_LABELS
+
 # Configuratie
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, 'data')
 LOG_DIR = os.path.join(BASE_DIR, 'logs')
 LOG_PATH = os.path.join(LOG_DIR, 'gui.log')
-PREFERENCES_FILE = os.path.join(DATA_DIR, 'user_preferences.json')
-
-# Zorg ervoor dat de data directory bestaat
-os.makedirs(DATA_DIR, exist_ok=True)
-os.makedirs(LOG_DIR, exist_ok=True)
 
-# Logging configuratie
-logging.basicConfig(
-    filename=LOG_PATH,
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
 
 class MrFixPreferencesGUI:
     def __init__(self, root):
@@ -37,83 +27,8 @@ class MrFixPreferencesGUI:
         logging.info("Voorkeuren GUI geïnitialiseerd")
 
     def load_preferences(self):
-        """Laad gebruikersvoorkeuren uit het configuratiebestand."""
-        # Standaard voorkeuren
-        self.preferences = {
-            # Opdrachttypes voorkeuren
-            "prefer_ikea": True,
-            "prefer_electrical": True,
-            "prefer_internet": True,
-            "prefer_urgent": True,
-            
-            # Uurloon instellingen
-            "min_hourly_rate": 79,
-            
-            # Planningsvoorkeuren per dag
-            "max_jobs_monday": 5,
-            "max_jobs_tuesday": 2,
-            "max_jobs_wednesday": 5,
-            "max_jobs_thursday": 2,
-            "max_jobs_friday": 2,
-            "max_jobs_saturday": 3,
-            "max_jobs_sunday": 3,
-            
-            # Locatievoorkeuren
-            "prefer_amsterdam": True,
-            "max_distance_without_permission": 20,
-            "travel_time_between_jobs": 60,
-            
-            # Monitoring instellingen
-            "monitoring_interval": 300,  # 5 minuten in seconden
-            "auto_accept": True,
-            
-            # Notificatie-instellingen
-            "notification_method": "telegram",  # 'telegram', 'pushbullet', 'email', 'pushover', 'safari_web_push'
-            "telegram": {
-                "bot_token": "",
-                "chat_id": ""
-            },
-            "pushbullet": {
-                "api_key": ""
-            },
-            "email": {
-                "smtp_server": "smtp.gmail.com",
-                "smtp_port": 587,
-                "username": "",
-                "password": "",  # App-specifiek wachtwoord voor Gmail
-                "recipient": ""
-            },
-            "pushover": {
-                "api_token": "",
-                "user_key": ""
-            },
-            "safari_web_push": {
-                "vapid_private_key": "",
-                "vapid_public_key": "",
-                "subscription_info": {}
-            },
-            "notify_new_jobs": True,
-            "notify_accepted_jobs": True,
-            
-            # Google Agenda instellingen
-            "calendar_id": "primary",
-            "auto_schedule": True
-        }
-        
-        try:
-            if os.path.exists(PREFERENCES_FILE):
-                with open(PREFERENCES_FILE, 'r') as f:
-                    loaded_prefs = json.load(f)
-                    # Update alleen de voorkeuren die in het bestand staan
-                    for key, value in loaded_prefs.items():
-                        if key in self.preferences:
-                            self.preferences[key] = value
-                    
-                    logging.info(f"Voorkeuren geladen uit {PREFERENCES_FILE}")
-            else:
-                logging.warning(f"Voorkeuren bestand niet gevonden: {PREFERENCES_FILE}, standaardwaarden worden gebruikt")
-        except Exception as e:
-            logging.error(f"Fout bij laden van voorkeuren: {e}")
+        """Laad een aanpasbare kopie van de gedeelde gebruikersvoorkeuren."""
+        self.preferences = get_preferences().to_dict()
 
     def save_preferences(self):
         """Sla gebruikersvoorkeuren op in het configuratiebestand."""
@@ -121,13 +36,10 @@ class MrFixPreferencesGUI:
             # Update de voorkeuren met de huidige waarden uit de GUI
             self.update_preferences_from_gui()
             
-            with open(PREFERENCES_FILE, 'w') as f:
-                json.dump(self.preferences, f, indent=4)
-            
-            logging.info(f"Voorkeuren opgeslagen in {PREFERENCES_FILE}")
+            get_preferences_service().save(self.preferences)
             messagebox.showinfo("Voorkeuren opgeslagen", "Uw voorkeuren zijn succesvol opgeslagen.")
         except Exception as e:
-            logging.error(f"Fout bij opslaan van voorkeuren: {e}")
+            logging.error("Fout bij opslaan van voorkeuren: %s", e)
             messagebox.showerror("Fout", f"Fout bij opslaan van voorkeuren: {e}")
 
     def update_preferences_from_gui(self):
@@ -142,13 +54,7 @@ class MrFixPreferencesGUI:
         self.preferences["min_hourly_rate"] = self.min_hourly_rate_var.get()
         
         # Planningsvoorkeuren per dag
-        self.preferences["max_jobs_monday"] = self.max_jobs_monday_var.get()
-        self.preferences["max_jobs_tuesday"] = self.max_jobs_tuesday_var.get()
-        self.preferences["max_jobs_wednesday"] = self.max_jobs_wednesday_var.get()
-        self.preferences["max_jobs_thursday"] = self.max_jobs_thursday_var.get()
-        self.preferences["max_jobs_friday"] = self.max_jobs_friday_var.get()
-        self.preferences["max_jobs_saturday"] = self.max_jobs_saturday_var.get()
-        self.preferences["max_jobs_sunday"] = self.max_jobs_sunday_var.get()
+        self.preferences["max_jobs_weekday"] = {day: var.get() for day, var in self.max_jobs_vars.items()}
         
         # Locatievoorkeuren
         self.preferences["prefer_amsterdam"] = self.prefer_amsterdam_var.get()
@@ -287,36 +193,12 @@ class MrFixPreferencesGUI:
         planning_frame = ttk.LabelFrame(parent, text="Maximum aantal opdrachten per dag")
         planning_frame.pack(fill=tk.X, padx=5, pady=5)
         
-        # Maak variabelen voor de spinboxes
-        self.max_jobs_monday_var = IntVar(value=self.preferences["max_jobs_monday"])
-        self.max_jobs_tuesday_var = IntVar(value=self.preferences["max_jobs_tuesday"])
-        self.max_jobs_wednesday_var = IntVar(value=self.preferences["max_jobs_wednesday"])
-        self.max_jobs_thursday_var = IntVar(value=self.preferences["max_jobs_thursday"])
-        self.max_jobs_friday_var = IntVar(value=self.preferences["max_jobs_friday"])
-        self.max_jobs_saturday_var = IntVar(value=self.preferences["max_jobs_saturday"])
-        self.max_jobs_sunday_var = IntVar(value=self.preferences["max_jobs_sunday"])
-        
-        # Maak de labels en spinboxes
-        ttk.Label(planning_frame, text="Maandag:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
-        ttk.Spinbox(planning_frame, from_=0, to=10, textvariable=self.max_jobs_monday_var, width=5).grid(row=0, column=1, sticky=tk.W, padx=5, pady=5)
-        
-        ttk.Label(planning_frame, text="Dinsdag:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=5)
-        ttk.Spinbox(planning_frame, from_=0, to=10, textvariable=self.max_jobs_tuesday_var, width=5).grid(row=1, column=1, sticky=tk.W, padx=5, pady=5)
-        
-        ttk.Label(planning_frame, text="Woensdag:").grid(row=2, column=0, sticky=tk.W, padx=5, pady=5)
-        ttk.Spinbox(planning_frame, from_=0, to=10, textvariable=self.max_jobs_wednesday_var, width=5).grid(row=2, column=1, sticky=tk.W, padx=5, pady=5)
-        
-        ttk.Label(planning_frame, text="Donderdag:").grid(row=3, column=0, sticky=tk.W, padx=5, pady=5)
-        ttk.Spinbox(planning_frame, from_=0, to=10, textvariable=self.max_jobs_thursday_var, width=5).grid(row=3, column=1, sticky=tk.W, padx=5, pady=5)
-        
-        ttk.Label(planning_frame, text="Vrijdag:").grid(row=4, column=0, sticky=tk.W, padx=5, pady=5)
-        ttk.Spinbox(planning_frame, from_=0, to=10, textvariable=self.max_jobs_friday_var, width=5).grid(row=4, column=1, sticky=tk.W, padx=5, pady=5)
-        
-        ttk.Label(planning_frame, text="Zaterdag:").grid(row=5, column=0, sticky=tk.W, padx=5, pady=5)
-        ttk.Spinbox(planning_frame, from_=0, to=10, textvariable=self.max_jobs_saturday_var, width=5).grid(row=5, column=1, sticky=tk.W, padx=5, pady=5)
-        
-        ttk.Label(planning_frame, text="Zondag:").grid(row=6, column=0, sticky=tk.W, padx=5, pady=5)
-        ttk.Spinbox(planning_frame, from_=0, to=10, textvariable=self.max_jobs_sunday_var, width=5).grid(row=6, column=1, sticky=tk.W, padx=5, pady=5)
+        # Maak de labels en spinboxes, van maandag tot en met zondag
+        self.max_jobs_vars = {}
+        for row, (day, label) in enumerate(zip(WEEKDAYS, WEEKDAY_LABELS)):
+            self.max_jobs_vars[day] = IntVar(value=self.preferences["max_jobs_weekday"][day])
+            ttk.Label(planning_frame, text=f"{label}:").grid(row=row, column=0, sticky=tk.W, padx=5, pady=5)
+            ttk.Spinbox(planning_frame, from_=0, to=10, textvariable=self.max_jobs_vars[day], width=5).grid(row=row, column=1, sticky=tk.W, padx=5, pady=5)
 
     def create_location_tab(self, parent):
         """Maak de tab voor locatievoorkeuren."""
@@ -506,12 +388,10 @@ class MrFixPreferencesGUI:
         """Reset alle voorkeuren naar standaardwaarden."""
         if messagebox.askyesno("Reset voorkeuren", "Weet u zeker dat u alle voorkeuren wilt resetten naar standaardwaarden?"):
             # Verwijder het voorkeuren bestand
-            if os.path.exists(PREFERENCES_FILE):
-                try:
-                    os.remove(PREFERENCES_FILE)
-                    logging.info(f"Voorkeuren bestand verwijderd: {PREFERENCES_FILE}")
-                except Exception as e:
-                    logging.error(f"Fout bij verwijderen van voorkeuren bestand: {e}")
+            try:
+                get_preferences_service().reset()
+            except Exception as e:
+                logging.error("Fout bij verwijderen van voorkeuren bestand: %s", e)
             
             # Herlaad de standaard voorkeuren
             self.load_preferences()
@@ -524,6 +404,7 @@ class MrFixPreferencesGUI:
 
 # Voor testen
 if __name__ == "__main__":
+    setup_logging(LOG_PATH, console=False)
     root = tk.Tk()
     root.title("MrFix Voorkeuren")
     root.geometry("800x600")
@@ -0,0 +1,209 @@
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+
+# Typevlaggen, samengevoegd in één int bitveld
+FLAG_IKEA = 1
+FLAG_ELECTRICAL = 2
+FLAG_INTERNET = 4
+FLAG_URGENT = 8
+FLAG_AMSTERDAM = 16
+
+FLAGS = {
+    'is_ikea': FLAG_IKEA,
+    'is_electrical': FLAG_ELECTRICAL,
+    'is_internet': FLAG_INTERNET,
+    'is_urgent': FLAG_URGENT,
+    'is_amsterdam': FLAG_AMSTERDAM,
+}
+
+# Ondersteunde tijdslotformaten, in volgorde van waarschijnlijkheid
+TIMESLOT_FORMATS = [
+    '%Y-%m-%d %H:%M',  # 2025-03-25 18:00
+    '%Y-%m-%d %H:%M:%S',  # 2025-03-25 18:00:00
+    '%d-%m-%Y %H:%M',  # 25-03-2025 18:00
+    '%d/%m/%Y %H:%M',  # 25/03/2025 18:00
+    '%d %b %Y %H:%M',  # 25 Mar 2025 18:00
+]
+TIMESLOT_FORMAT = TIMESLOT_FORMATS[0]
+
+# Kolomvolgorde van de processed_jobs tabel
+PROCESSED_JOBS_COLUMNS = (
+    'id', 'title', 'description', 'location', 'date_posted', 'accept_link',
+    'is_ikea', 'is_electrical', 'is_internet', 'hourly_rate', 'is_urgent',
+    'is_amsterdam', 'distance_to_amsterdam', 'available_timeslots', 'processed_at',
+)
+
+
+def parse_timeslot(timeslot):
+    """Converteer een tijdslot string naar een datetime object, of None als het formaat onbekend is."""
+    if not isinstance(timeslot, str):
+        logging.warning("Kon tijdslot niet parsen: %r", timeslot)
+        return None
+    for fmt in TIMESLOT_FORMATS:
+        try:
+            return datetime.strptime(timeslot, fmt)
+        except ValueError:
+            continue
+
+    logging.warning("Kon tijdslot niet parsen: %s", timeslot)
+    return None
+
+
+def timeslot_to_epoch(timeslot):
+    """Converteer een tijdslot (string, datetime of epoch) naar epoch seconden in lokale tijd."""
+    if isinstance(timeslot, int):
+        return timeslot
+    if isinstance(timeslot, datetime):
+        return int(timeslot.timestamp())
+
+    slot_datetime = parse_timeslot(timeslot)
+    return int(slot_datetime.timestamp()) if slot_datetime else None
+
+
+@dataclass
+class Job:
+    """Eén opdracht van MrFix, met voorgeparste tijdslots en typevlaggen in een bitveld."""
+    __slots__ = (
+        'id', 'title', 'description', 'location', 'date_posted', 'accept_link',
+        'flags', 'hourly_rate', 'distance_to_amsterdam', 'timeslots',
+    )
+
+    id: str
+    title: str
+    description: str
+    location: str
+    date_posted: str
+    accept_link: str
+    flags: int
+    hourly_rate: float
+    distance_to_amsterdam: float
+    timeslots: tuple  # Epoch seconden, oplopend gesorteerd
+
+    @classmethod
+    def from_dict(cls, data):
+        """Maak een Job aan uit een opdracht-dict zoals de monitor die oplevert."""
+        flags = 0
+        for key, flag in FLAGS.items():
+            if data.get(key):
+                flags |= flag
+
+        timeslots = []
+        for timeslot in data.get('available_timeslots') or ():
+            epoch = timeslot_to_epoch(timeslot)
+            if epoch is not None:
+                timeslots.append(epoch)
+
+        distance = data.get('distance_to_amsterdam')
+        return cls(
+            id=data.get('id', ''),
+            title=data.get('title', ''),
+            description=data.get('description', ''),
+            location=data.get('location', ''),
+            date_posted=data.get('date_posted', ''),
+            accept_link=data.get('accept_link', ''),
+            flags=flags,
+            hourly_rate=data.get('hourly_rate') or 0,
+            distance_to_amsterdam=0.0 if distance is None else distance,
+            timeslots=tuple(sorted(timeslots)),
+        )
+
+    @classmethod
+    def coerce(cls, job):
+        """Geef een Job terug, ongeacht of de invoer al een Job of nog een dict is."""
+        return job if isinstance(job, cls) else cls.from_dict(job)
+
+    @classmethod
+    def from_row(cls, row):
+        """Maak een Job aan uit een rij van de processed_jobs tabel."""
+        (job_id, title, description, location, date_posted, accept_link,
+         is_ikea, is_electrical, is_internet, hourly_rate, is_urgent,
+         is_amsterdam, distance, timeslots_json) = row[:14]
+
+        flags = 0
+        for value, flag in ((is_ikea, FLAG_IKEA), (is_electrical, FLAG_ELECTRICAL), (is_internet, FLAG_INTERNET),
+                            (is_urgent, FLAG_URGENT), (is_amsterdam, FLAG_AMSTERDAM)):
+            if value:
+                flags |= flag
+
+        timeslots = (timeslot_to_epoch(timeslot) for timeslot in json.loads(timeslots_json or '[]'))
+        return cls(
+            job_id, title or '', description or '', location or '', date_posted or '', accept_link or '',
+            flags, hourly_rate or 0, distance or 0.0,
+            tuple(sorted(epoch for epoch in timeslots if epoch is not None)),
+        )
+
+    def to_row(self, processed_at=None):
+        """Zet de Job om naar een rij voor de processed_jobs tabel (zie PROCESSED_JOBS_COLUMNS)."""
+        flags = self.flags
+        return (
+            self.id, self.title, self.description, self.location, self.date_posted, self.accept_link,
+            int(bool(flags & FLAG_IKEA)), int(bool(flags & FLAG_ELECTRICAL)), int(bool(flags & FLAG_INTERNET)),
+            self.hourly_rate, int(bool(flags & FLAG_URGENT)), int(bool(flags & FLAG_AMSTERDAM)),
+            self.distance_to_amsterdam, json.dumps(self.available_timeslots),
+            processed_at or datetime.now().isoformat(),
+        )
+
+    def to_dict(self):
+        """Zet de Job terug om naar het oude dict-formaat."""
+        data = {
+            'id': self.id,
+            'title': self.title,
+            'description': self.description,
+            'location': self.location,
+            'date_posted': self.date_posted,
+            'accept_link': self.accept_link,
+        }
+        for key, flag in FLAGS.items():
+            data[key] = bool(self.flags & flag)
+        data['hourly_rate'] = self.hourly_rate
+        data['distance_to_amsterdam'] = self.distance_to_amsterdam
+        data['available_timeslots'] = self.available_timeslots
+        return data
+
+    # Typevlaggen
+    @property
+    def is_ikea(self):
+        return bool(self.flags & FLAG_IKEA)
+
+    @property
+    def is_electrical(self):
+        return bool(self.flags & FLAG_ELECTRICAL)
+
+    @property
+    def is_internet(self):
+        return bool(self.flags & FLAG_INTERNET)
+
+    @property
+    def is_urgent(self):
+        return bool(self.flags & FLAG_URGENT)
+
+    @property
+    def is_amsterdam(self):
+        return bool(self.flags & FLAG_AMSTERDAM)
+
+    @property
+    def available_timeslots(self):
+        """De tijdslots als strings, voor weergave en opslag."""
+        return [datetime.fromtimestamp(epoch).strftime(TIMESLOT_FORMAT) for epoch in self.timeslots]
+
+    def slot_datetimes(self):
+        """De tijdslots als datetime objecten, chronologisch."""
+        return [datetime.fromtimestamp(epoch) for epoch in self.timeslots]
+
+    # Dict-compatibiliteit voor code die nog job['title'] of job.get('title') gebruikt
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return hasattr(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def items(self):
+        return self.to_dict().items()
@@ -0,0 +1,189 @@
+import os
+import re
+import json
+import time
+import logging
+import sqlite3
+
+# Configuratie
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+DB_PATH = os.path.join(DATA_DIR, 'mrfix.db')
+JOB_KEYWORDS_FILE = os.path.join(DATA_DIR, 'job_keywords.json')
+
+# Opdrachttypes en de vlag die ze in een opdracht zetten
+JOB_TYPES = ["ikea", "electrical", "internet", "urgent"]
+
+# Bedragen: "€85", "€ 85,-", "85 euro", eventueel gevolgd door "per uur", "/uur", "p/u"
+AMOUNT_PATTERN = r'\d+(?:[.,]\d{1,2})?'
+HOURLY_SUFFIX_PATTERN = r'\s*(?:per\s+uur|/\s*uur|p/u|per\s+hour|/\s*h(?:our)?)\b'
+WORD_PATTERN = r'[^\W\d_]+'
+
+# Eén tokenizer-regex voor de hele tekst: een woord, of een bedrag met eventueel een uur-aanduiding
+TOKEN_PATTERN = re.compile(
+    f'({WORD_PATTERN})'
+    f'|(?:€\\s*({AMOUNT_PATTERN})(?:,-)?|({AMOUNT_PATTERN})\\s*euro?\\b)({HOURLY_SUFFIX_PATTERN})?'
+)
+
+
+def load_keywords(path=None):
+    """Laad de Nederlandse/Engelse synoniemenlijst per opdrachttype."""
+    path = path or JOB_KEYWORDS_FILE
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            keywords = json.load(f)
+        logging.info("Trefwoorden voor opdrachttypes geladen uit %s", path)
+        return keywords
+    except Exception as e:
+        logging.error("Fout bij laden van trefwoorden: %s", e)
+        return {}
+
+
+def build_keyword_index(keywords):
+    """Bouw de opzoektabellen: losse woorden -> types en eerste woord -> woordreeksen."""
+    words = {}
+    phrases = {}
+    for job_type in JOB_TYPES:
+        for synonym in keywords.get(job_type, []):
+            tokens = tuple(re.findall(WORD_PATTERN, synonym.lower()))
+            if len(tokens) == 1:
+                words.setdefault(tokens[0], set()).add(job_type)
+            elif tokens:
+                phrases.setdefault(tokens[0], set()).add((tokens, job_type))
+    return words, phrases
+
+
+def parse_amount(value):
+    """Zet een bedrag ("85", "85,50") om naar een int of float."""
+    amount = float(value.replace(',', '.'))
+    return int(amount) if amount.is_integer() else amount
+
+
+class JobClassifier:
+    def __init__(self, keywords=None):
+        """Initialiseer de classifier met een voorgecompileerde tokenizer en trefwoordindex."""
+        self.keywords = keywords if keywords is not None else load_keywords()
+        self.word_index, self.phrase_index = build_keyword_index(self.keywords)
+
+    def classify(self, title, description):
+        """Bepaal in één doorloop alle typevlaggen en het uurloon van een opdracht."""
+        result = {f"is_{job_type}": False for job_type in JOB_TYPES}
+        hourly_rates = []
+        amounts = []
+        words = []
+
+        # Eén doorloop over de tekst: bedragen direct verwerken, woorden verzamelen
+        for word, amount_before, amount_after, hourly in TOKEN_PATTERN.findall(f"{title}\n{description}".lower()):
+            if word:
+                words.append(word)
+            elif hourly:
+                hourly_rates.append(parse_amount(amount_before or amount_after))
+            else:
+                amounts.append(parse_amount(amount_before or amount_after))
+
+        # Losse trefwoorden via een set-doorsnede, woordreeksen via hun eerste woord
+        unique_words = set(words)
+        for word in self.word_index.keys() & unique_words:
+            for job_type in self.word_index[word]:
+                result[f"is_{job_type}"] = True
+
+        for first_word in self.phrase_index.keys() & unique_words:
+            for phrase, job_type in self.phrase_index[first_word]:
+                length = len(phrase)
+                if any(tuple(words[i:i + length]) == phrase for i, word in enumerate(words) if word == first_word):
+                    result[f"is_{job_type}"] = True
+
+        # Een bedrag met "per uur" heeft voorrang; anders nemen we het eerste bedrag
+        if hourly_rates:
+            result['hourly_rate'] = max(hourly_rates)
+        elif amounts:
+            result['hourly_rate'] = amounts[0]
+        else:
+            result['hourly_rate'] = 0
+        return result
+
+    def apply(self, job):
+        """Vul de typevlaggen en het uurloon aan voor een opdracht waar die ontbreken."""
+        keys = [f"is_{job_type}" for job_type in JOB_TYPES] + ['hourly_rate']
+        if all(key in job for key in keys):
+            return job
+
+        classification = self.classify(job.get('title', ''), job.get('description', ''))
+        for key in keys:
+            job.setdefault(key, classification[key])
+        return job
+
+# Singleton instantie
+_job_classifier = None
+
+def get_job_classifier():
+    """Verkrijg een singleton instantie van de JobClassifier."""
+    global _job_classifier
+    if _job_classifier is None:
+        _job_classifier = JobClassifier()
+    return _job_classifier
+
+def classify_job(title, description):
+    """Bepaal de typevlaggen en het uurloon van een opdracht."""
+    return get_job_classifier().classify(title, description)
+
+def apply_classification(job):
+    """Vul ontbrekende typevlaggen en uurloon aan in een opdracht."""
+    return get_job_classifier().apply(job)
+
+
+def naive_classify(keywords, title, description):
+    """De oude aanpak: losse substring-controles per trefwoord (alleen voor de benchmark)."""
+    text = f"{title}\n{description}".lower()
+    result = {f"is_{job_type}": any(keyword in text for keyword in keywords.get(job_type, [])) for job_type in JOB_TYPES}
+    match = re.search(r'€\s*(\d+)', text)
+    result['hourly_rate'] = int(match.group(1)) if match else 0
+    return result
+
+
+def load_corpus(db_path=None):
+    """Laad de titels en beschrijvingen van verwerkte opdrachten uit de database."""
+    try:
+        conn = sqlite3.connect(db_path or DB_PATH)
+        try:
+            return conn.execute('SELECT title, description FROM processed_jobs').fetchall()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        logging.error("Database fout bij laden van benchmark corpus: %s", e)
+        return []
+
+
+def benchmark(corpus, repeat=5):
+    """Vergelijk de tokenizer met woordindex met losse substring-controles."""
+    classifier = get_job_classifier()
+
+    timings = {}
+    for name, func in (
+        ("losse substring-controles", lambda t, d: naive_classify(classifier.keywords, t, d)),
+        ("tokenizer met woordindex", classifier.classify),
+    ):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for title, description in corpus:
+                func(title or '', description or '')
+        elapsed = time.perf_counter() - start
+        timings[name] = elapsed / (repeat * len(corpus)) * 1e6
+    return timings
+
+# Benchmark over de opgeslagen opdrachten
+if __name__ == "__main__":
+    import sys
+
+    corpus = load_corpus(sys.argv[1] if len(sys.argv) > 1 else None)
+    if not corpus:
+        print("Geen opgeslagen opdrachten gevonden in processed_jobs, voorbeeldcorpus wordt gebruikt")
+        corpus = [
+            ("IKEA kast monteren", "Montage van een IKEA PAX kast, 2 uur werk, €85 per uur"),
+            ("Elektra aanleggen", "Elektra werkzaamheden voor nieuwe keuken, €90 per uur"),
+            ("Wifi probleem", "Router en repeater instellen, spoed, 65 euro per uur"),
+            ("Schilderij ophangen", "Drie schilderijen ophangen in de woonkamer"),
+        ] * 250
+
+    for name, microseconds in benchmark(corpus).items():
+        print(f"{name}: {microseconds:.1f} µs per opdracht ({len(corpus)} opdrachten)")
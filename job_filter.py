@@ -1,13 +1,25 @@
 import os
-import json
 import logging
 import sqlite3
+import threading
 from datetime import datetime, timedelta
 
+from duration_model import get_duration_model
+from geodata import enrich_job_location
+from job import Job, PROCESSED_JOBS_COLUMNS, parse_timeslot
+from job_classifier import apply_classification
+from job_store import ensure_schema
+from logging_setup import setup_logging, job_context
+from notification_templates import template_message
+from preferences import get_preferences
+from travel_time import get_travel_time_model
+
 # Probeer de andere componenten te importeren
 try:
     from calendar_integration import check_calendar_availability, add_event_to_calendar
-    from notification import send_notification, request_permission
+    from permission_manager import request_permission, decided_jobs, mark_handled
+    # Notificaties gaan via de outbox, zodat een trage provider het accepteren niet ophoudt
+    from notification_outbox import enqueue_notification as send_notification
 except ImportError:
     # Mock functies voor testen
     def check_calendar_availability(start_time, duration_minutes):
@@ -16,11 +28,17 @@ except ImportError:
     def add_event_to_calendar(event_details):
         return True
     
-    def send_notification(title, body):
+    def send_notification(title, body, urgent=False, template=None):
         return True
     
     def request_permission(message, job):
         return True
+    
+    def decided_jobs():
+        return []
+    
+    def mark_handled(job_id):
+        pass
 
 # Configuratie
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -28,184 +46,169 @@ DATA_DIR = os.path.join(BASE_DIR, 'data')
 DB_PATH = os.path.join(DATA_DIR, 'mrfix.db')
 LOG_DIR = os.path.join(BASE_DIR, 'logs')
 LOG_PATH = os.path.join(LOG_DIR, 'filter.log')
-PREFERENCES_FILE = os.path.join(DATA_DIR, 'user_preferences.json')
-
-# Zorg ervoor dat de data en logs directories bestaan
-os.makedirs(DATA_DIR, exist_ok=True)
-os.makedirs(LOG_DIR, exist_ok=True)
-
-# Logging configuratie
-logging.basicConfig(
-    filename=LOG_PATH,
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
-
-# Configureer ook logging naar console
-console = logging.StreamHandler()
-console.setLevel(logging.INFO)
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-console.setFormatter(formatter)
-logging.getLogger('').addHandler(console)
 
 class JobFilter:
     def __init__(self):
         """Initialiseer de opdracht filter."""
-        self.load_preferences()
+        self.duration_model = get_duration_model()
+        self.travel_time_model = get_travel_time_model()
+        self.current_pass = threading.local()
         self.setup_database()
         logging.info("JobFilter geïnitialiseerd")
 
-    def load_preferences(self):
-        """Laad gebruikersvoorkeuren uit het configuratiebestand."""
-        # Standaard voorkeuren
-        self.preferences = {
-            "prefer_ikea": True,
-            "prefer_electrical": True,
-            "prefer_internet": True,
-            "min_hourly_rate": 79,
-            "prefer_urgent": True,
-            "max_jobs_weekday": {
-                "0": 3,  # Zondag
-                "1": 5,  # Maandag
-                "2": 2,  # Dinsdag
-                "3": 5,  # Woensdag
-                "4": 2,  # Donderdag
-                "5": 2,  # Vrijdag
-                "6": 3,  # Zaterdag
-            },
-            "prefer_amsterdam": True,
-            "max_distance_without_permission": 20,
-            "travel_time_between_jobs": 60
-        }
-        
-        try:
-            if os.path.exists(PREFERENCES_FILE):
-                with open(PREFERENCES_FILE, 'r') as f:
-                    user_prefs = json.load(f)
-                    # Update de voorkeuren die relevant zijn voor filtering
-                    for key in self.preferences:
-                        if key in user_prefs:
-                            self.preferences[key] = user_prefs[key]
-                    
-                    logging.info(f"Gebruikersvoorkeuren geladen uit {PREFERENCES_FILE}")
-            else:
-                logging.warning(f"Voorkeuren bestand niet gevonden: {PREFERENCES_FILE}, standaardwaarden worden gebruikt")
-        except Exception as e:
-            logging.error(f"Fout bij laden van voorkeuren: {e}")
+    @property
+    def preferences(self):
+        """De voorkeuren van de lopende filterronde, en anders de gedeelde voorkeuren snapshot."""
+        preferences = getattr(self.current_pass, 'preferences', None)
+        return preferences if preferences is not None else get_preferences()
 
     def setup_database(self):
         """Initialiseer de SQLite database connectie."""
         try:
+            os.makedirs(DATA_DIR, exist_ok=True)
             self.conn = sqlite3.connect(DB_PATH)
             self.cursor = self.conn.cursor()
+            ensure_schema(self.conn)
             logging.info("Database connectie opgezet")
         except sqlite3.Error as e:
-            logging.error(f"Database fout: {e}")
+            logging.error("Database fout: %s", e)
             raise
 
     def filter_and_process_jobs(self, new_jobs):
+        """Filter en verwerk nieuwe opdrachten met één vaste voorkeuren snapshot.
+
+        Worden de voorkeuren tijdens de ronde herladen, dan gelden de nieuwe pas vanaf de volgende
+        ronde; zo worden regels en planning van twee versies nooit door elkaar gebruikt.
+        """
+        self.current_pass.preferences = get_preferences()
+        try:
+            return self.process_jobs(new_jobs)
+        finally:
+            self.current_pass.preferences = None
+
+    def process_jobs(self, new_jobs):
         """Filter en verwerk nieuwe opdrachten."""
-        logging.info(f"Start filtering van {len(new_jobs)} nieuwe opdrachten")
+        logging.info("Start filtering van %s nieuwe opdrachten", len(new_jobs))
+        
+        # Vul ontbrekende typevlaggen, uurloon en afstanden aan (geen netwerk nodig)
+        # en zet de opdrachten om naar compacte Job records
+        jobs = []
+        
+        # Geparkeerde opdrachten waarvoor intussen toestemming is gegeven doen weer mee; ze worden pas
+        # als afgehandeld gemarkeerd als ze verwerkt zijn, zodat een mislukte ronde ze niet kwijtraakt
+        parked = set()
+        for job in decided_jobs():
+            logging.info("Toestemming ontvangen voor geparkeerde opdracht \"%s\"", job.title)
+            jobs.append(job)
+            parked.add(job.id)
+        
+        for job in new_jobs:
+            if not isinstance(job, Job):
+                # Een opdracht met onverwachte gegevens wordt overgeslagen, niet de hele ronde
+                try:
+                    apply_classification(job)
+                    enrich_job_location(job)
+                    job = Job.from_dict(job)
+                except Exception as e:
+                    logging.error("Fout bij inlezen van opdracht %s: %s", job.get('id'), e)
+                    continue
+            jobs.append(job)
         
         # Sorteer opdrachten op prioriteit
-        sorted_jobs = self.sort_jobs_by_priority(new_jobs)
+        sorted_jobs = self.sort_jobs_by_priority(jobs)
         
         for job in sorted_jobs:
-            try:
-                # Controleer of de opdracht voldoet aan de basisvoorwaarden
-                if not self.meets_basic_criteria(job):
-                    logging.info(f"Opdracht \"{job['title']}\" voldoet niet aan basisvoorwaarden, overgeslagen")
-                    continue
+            # Alle logberichten over deze opdracht (ook van agenda en notificaties) krijgen het job id
+            with job_context(job.id):
+                try:
+                    self.save_processed_job(job)
                 
-                # Controleer of we toestemming nodig hebben voor deze opdracht (buiten Amsterdam)
-                if job['distance_to_amsterdam'] > self.preferences['max_distance_without_permission']:
-                    logging.info(f"Opdracht \"{job['title']}\" is {job['distance_to_amsterdam']}km van Amsterdam, toestemming vragen")
-                    
-                    # Vraag toestemming aan de gebruiker
-                    permission_message = f"Opdracht buiten Amsterdam ({job['distance_to_amsterdam']}km): {job['title']} in {job['location']}. Accepteren?"
-                    permission_granted = request_permission(permission_message, job)
-                    
-                    if not permission_granted:
-                        logging.info(f"Toestemming geweigerd voor opdracht \"{job['title']}\", overgeslagen")
+                    # Controleer of de opdracht voldoet aan de basisvoorwaarden
+                    if not self.meets_basic_criteria(job):
+                        logging.info("Opdracht \"%s\" voldoet niet aan basisvoorwaarden, overgeslagen", job.title)
                         continue
                 
-                # Controleer of er beschikbare tijdslots zijn
-                if not job.get('available_timeslots'):
-                    logging.info(f"Geen beschikbare tijdslots voor opdracht \"{job['title']}\", overgeslagen")
-                    continue
-                
-                # Selecteer het beste tijdslot
-                selected_timeslot = self.select_best_timeslot(job)
+                    # Controleer of we toestemming nodig hebben voor deze opdracht (buiten Amsterdam)
+                    if job.distance_to_amsterdam > self.preferences.max_distance_without_permission:
+                        logging.info("Opdracht \"%s\" is %skm van Amsterdam, toestemming vragen", job.title, job.distance_to_amsterdam)
+                    
+                        # Vraag toestemming aan de gebruiker; we wachten niet op het antwoord
+                        permission_message = f"Opdracht buiten Amsterdam ({job.distance_to_amsterdam}km): {job.title} in {job.location}. Accepteren?"
+                        permission_granted = request_permission(permission_message, job)
+                    
+                        if permission_granted is None:
+                            logging.info("Opdracht \"%s\" geparkeerd tot er een beslissing is, volgende opdracht", job.title)
+                            continue
+                    
+                        if not permission_granted:
+                            logging.info("Toestemming geweigerd voor opdracht \"%s\", overgeslagen", job.title)
+                            continue
                 
-                if not selected_timeslot:
-                    logging.info(f"Geen geschikt tijdslot gevonden voor opdracht \"{job['title']}\", overgeslagen")
-                    continue
+                    # Controleer of er beschikbare tijdslots zijn
+                    if not job.timeslots:
+                        logging.info("Geen beschikbare tijdslots voor opdracht \"%s\", overgeslagen", job.title)
+                        continue
                 
-                # Converteer het tijdslot naar een datetime object
-                job_date = self.parse_timeslot(selected_timeslot)
-                if not job_date:
-                    logging.error(f"Kon tijdslot niet parsen voor opdracht \"{job['title']}\": {selected_timeslot}")
-                    continue
+                    # Selecteer het beste tijdslot
+                    job_date = self.select_best_slot(job)
                 
-                job_duration = self.estimate_job_duration(job)
+                    if not job_date:
+                        logging.info("Geen geschikt tijdslot gevonden voor opdracht \"%s\", overgeslagen", job.title)
+                        continue
                 
-                logging.info(f"Controleren van beschikbaarheid voor opdracht \"{job['title']}\" op {job_date.isoformat()}")
+                    job_duration = self.estimate_job_duration(job)
                 
-                # Controleer beschikbaarheid in Google Agenda
-                availability = check_calendar_availability(
-                    job_date,
-                    job_duration + self.preferences['travel_time_between_jobs']
-                )
+                    logging.info("Controleren van beschikbaarheid voor opdracht \"%s\" op %s", job.title, job_date.isoformat())
                 
-                if not availability['available']:
-                    logging.info(f"Geen beschikbaarheid voor opdracht \"{job['title']}\", overgeslagen")
-                    continue
+                    # Controleer beschikbaarheid in Google Agenda, inclusief reistijd van en naar de andere opdrachten
+                    window_start, window_minutes = self.reservation_window(job, job_date, job_duration)
+                    availability = check_calendar_availability(window_start, window_minutes)
                 
-                # Controleer of we het maximum aantal opdrachten voor deze dag niet overschrijden
-                day_of_week = job_date.weekday()
-                jobs_on_same_day = self.count_jobs_on_date(job_date)
+                    if not availability['available']:
+                        logging.info("Geen beschikbaarheid voor opdracht \"%s\", overgeslagen", job.title)
+                        continue
                 
-                max_jobs_key = str(day_of_week)
-                if max_jobs_key in self.preferences['max_jobs_weekday']:
-                    max_jobs = self.preferences['max_jobs_weekday'][max_jobs_key]
-                else:
-                    max_jobs = 2  # Standaard maximum
+                    # Controleer of we het maximum aantal opdrachten voor deze dag niet overschrijden
+                    jobs_on_same_day = self.count_jobs_on_date(job_date)
                 
-                if jobs_on_same_day >= max_jobs:
-                    logging.info(f"Maximum aantal opdrachten bereikt voor {job_date.strftime('%Y-%m-%d')}, overgeslagen")
-                    continue
+                    if jobs_on_same_day >= self.preferences.max_jobs_on(job_date):
+                        logging.info("Maximum aantal opdrachten bereikt voor %s, overgeslagen", job_date.strftime('%Y-%m-%d'))
+                        continue
                 
-                # Alles is in orde, accepteer de opdracht
-                logging.info(f"Accepteren van opdracht \"{job['title']}\" voor tijdslot {selected_timeslot}")
+                    # Alles is in orde, accepteer de opdracht
+                    logging.info("Accepteren van opdracht \"%s\" voor tijdslot %s", job.title, job_date.strftime('%Y-%m-%d %H:%M'))
                 
-                accepted = self.accept_job(job, selected_timeslot)
+                    accepted = self.accept_job(job, job_date)
                 
-                if accepted:
-                    # Voeg de opdracht toe aan Google Agenda
-                    event_details = {
-                        'summary': f"MrFix: {job['title']}",
-                        'location': job['location'],
-                        'description': job['description'],
-                        'start_time': job_date,
-                        'end_time': job_date + timedelta(minutes=job_duration)
-                    }
+                    if accepted:
+                        # Voeg de opdracht toe aan Google Agenda
+                        event_details = {
+                            'summary': f"MrFix: {job.title}",
+                            'location': job.location,
+                            'description': job.description,
+                            'start_time': job_date,
+                            'end_time': job_date + timedelta(minutes=job_duration),
+                            'scheduled_minutes': job_duration
+                        }
                     
-                    calendar_success = add_event_to_calendar(event_details)
+                        calendar_success = add_event_to_calendar(event_details)
                     
-                    if calendar_success:
-                        # Markeer de opdracht als geaccepteerd
-                        self.mark_job_as_accepted(job, job_date)
+                        if calendar_success:
+                            # Markeer de opdracht als geaccepteerd
+                            self.mark_job_as_accepted(job, job_date)
                         
-                        # Stuur een notificatie naar de gebruiker
-                        notification_title = f"Opdracht geaccepteerd: {job['title']}"
-                        notification_body = f"Deze opdracht is ingepland op {job_date.strftime('%Y-%m-%d %H:%M')} in {job['location']}"
-                        send_notification(notification_title, notification_body)
-                    else:
-                        logging.error(f"Fout bij toevoegen van opdracht aan agenda: {job['title']}")
+                            # Stuur een notificatie naar de gebruiker
+                            send_notification(**template_message(
+                                "job_accepted", title=job.title, slot=job_date.strftime('%Y-%m-%d %H:%M'), location=job.location
+                            ), urgent=True)
+                        else:
+                            logging.error("Fout bij toevoegen van opdracht aan agenda: %s", job.title)
                 
-            except Exception as e:
-                logging.error(f"Fout bij verwerken van opdracht \"{job['title']}\": {e}")
+                except Exception as e:
+                    logging.error("Fout bij verwerken van opdracht \"%s\": %s", job.title, e)
+                finally:
+                    if job.id in parked:
+                        mark_handled(job.id)
 
     def sort_jobs_by_priority(self, jobs):
         """Sorteer opdrachten op prioriteit."""
@@ -213,126 +216,133 @@ class JobFilter:
 
     def calculate_priority_score(self, job):
         """Bereken een prioriteitsscore voor een opdracht."""
+        job = Job.coerce(job)
         score = 0
         
         # Voorkeur voor type opdracht
-        if job['is_ikea'] and self.preferences['prefer_ikea']:
+        if job.is_ikea and self.preferences.prefer_ikea:
             score += 10
-        if job['is_electrical'] and self.preferences['prefer_electrical']:
+        if job.is_electrical and self.preferences.prefer_electrical:
             score += 10
-        if job['is_internet'] and self.preferences['prefer_internet']:
+        if job.is_internet and self.preferences.prefer_internet:
             score += 10
         
         # Voorkeur voor uurloon
-        if job['hourly_rate'] >= self.preferences['min_hourly_rate']:
-            score += 5 + (job['hourly_rate'] - self.preferences['min_hourly_rate']) / 10
+        if job.hourly_rate >= self.preferences.min_hourly_rate:
+            score += 5 + (job.hourly_rate - self.preferences.min_hourly_rate) / 10
         
         # Voorkeur voor urgente opdrachten
-        if job['is_urgent'] and self.preferences['prefer_urgent']:
+        if job.is_urgent and self.preferences.prefer_urgent:
             score += 15
         
         # Voorkeur voor Amsterdam
-        if job['is_amsterdam'] and self.preferences['prefer_amsterdam']:
+        if job.is_amsterdam and self.preferences.prefer_amsterdam:
             score += 20
         else:
             # Lagere score voor opdrachten verder van Amsterdam
-            score -= job['distance_to_amsterdam'] / 2
+            score -= job.distance_to_amsterdam / 2
         
         return score
 
     def meets_basic_criteria(self, job):
         """Controleer of een opdracht voldoet aan de basisvoorwaarden."""
+        job = Job.coerce(job)
+        
         # Controleer of het een voorkeursopdracht is OF het uurloon hoog genoeg is OF het urgent is
         is_preferred_type = (
-            (job['is_ikea'] and self.preferences['prefer_ikea']) or
-            (job['is_electrical'] and self.preferences['prefer_electrical']) or
-            (job['is_internet'] and self.preferences['prefer_internet'])
+            (job.is_ikea and self.preferences.prefer_ikea) or
+            (job.is_electrical and self.preferences.prefer_electrical) or
+            (job.is_internet and self.preferences.prefer_internet)
         )
         
-        has_good_rate = job['hourly_rate'] >= self.preferences['min_hourly_rate']
-        is_urgent_job = job['is_urgent'] and self.preferences['prefer_urgent']
+        has_good_rate = job.hourly_rate >= self.preferences.min_hourly_rate
+        is_urgent_job = job.is_urgent and self.preferences.prefer_urgent
         
         return is_preferred_type or has_good_rate or is_urgent_job
 
     def select_best_timeslot(self, job):
-        """Selecteer het beste tijdslot voor een opdracht."""
-        if not job.get('available_timeslots'):
-            return None
-        
-        # Sorteer tijdslots chronologisch
-        sorted_timeslots = sorted(job['available_timeslots'])
-        
-        # Controleer elk tijdslot op beschikbaarheid in de agenda
-        for timeslot in sorted_timeslots:
+        """Selecteer het beste tijdslot voor een opdracht, als string."""
+        slot_datetime = self.select_best_slot(Job.coerce(job))
+        return slot_datetime.strftime('%Y-%m-%d %H:%M') if slot_datetime else None
+
+    def select_best_slot(self, job):
+        """Selecteer het eerste geschikte tijdslot voor een opdracht als datetime object."""
+        # De tijdslots van een Job zijn al geparsed en chronologisch gesorteerd
+        for slot_datetime in job.slot_datetimes():
             try:
-                # Converteer het tijdslot naar een datetime object
-                slot_datetime = self.parse_timeslot(timeslot)
-                if not slot_datetime:
-                    continue
-                
                 # Controleer of dit tijdslot in de toekomst ligt
                 if slot_datetime <= datetime.now():
                     continue
                 
                 # Controleer of we het maximum aantal opdrachten voor deze dag niet overschrijden
-                day_of_week = slot_datetime.weekday()
                 jobs_on_same_day = self.count_jobs_on_date(slot_datetime)
                 
-                max_jobs_key = str(day_of_week)
-                if max_jobs_key in self.preferences['max_jobs_weekday']:
-                    max_jobs = self.preferences['max_jobs_weekday'][max_jobs_key]
-                else:
-                    max_jobs = 2  # Standaard maximum
-                
-                if jobs_on_same_day >= max_jobs:
+                if jobs_on_same_day >= self.preferences.max_jobs_on(slot_datetime):
                     continue
                 
                 # Controleer beschikbaarheid in Google Agenda
                 job_duration = self.estimate_job_duration(job)
-                availability = check_calendar_availability(
-                    slot_datetime,
-                    job_duration + self.preferences['travel_time_between_jobs']
-                )
+                window_start, window_minutes = self.reservation_window(job, slot_datetime, job_duration)
+                availability = check_calendar_availability(window_start, window_minutes)
                 
                 if availability['available']:
-                    return timeslot
+                    return slot_datetime
                 
             except Exception as e:
-                logging.error(f"Fout bij controleren van tijdslot {timeslot}: {e}")
+                logging.error("Fout bij controleren van tijdslot %s: %s", slot_datetime, e)
         
         return None
 
     def parse_timeslot(self, timeslot):
         """Converteer een tijdslot string naar een datetime object."""
-        try:
-            # Probeer verschillende formaten
-            formats = [
-                '%Y-%m-%d %H:%M',  # 2025-03-25 18:00
-                '%Y-%m-%d %H:%M:%S',  # 2025-03-25 18:00:00
-                '%d-%m-%Y %H:%M',  # 25-03-2025 18:00
-                '%d/%m/%Y %H:%M',  # 25/03/2025 18:00
-                '%d %b %Y %H:%M',  # 25 Mar 2025 18:00
-            ]
-            
-            for fmt in formats:
-                try:
-                    return datetime.strptime(timeslot, fmt)
-                except ValueError:
-                    continue
-            
-            # Als geen van de formaten werkt, log een waarschuwing
-            logging.warning(f"Kon tijdslot niet parsen: {timeslot}")
-            return None
-            
-        except Exception as e:
-            logging.error(f"Fout bij parsen van tijdslot: {e}")
-            return None
+        return parse_timeslot(timeslot)
 
     def estimate_job_duration(self, job):
-        """Schat de duur van een opdracht (voor nu gebruiken we een eenvoudige benadering)."""
-        # Voor nu gebruiken we een standaard duur van 2 uur (120 minuten)
-        # In een echte implementatie zou dit gebaseerd zijn op het type opdracht
-        return 120
+        """Schat de duur van een opdracht op basis van de historie van vergelijkbare opdrachten."""
+        # Het duurmodel is een opzoektabel per opdrachttype/trefwoord, getraind op de agenda
+        # (zie duration_model.py); zonder historie valt het terug op 120 minuten
+        return self.duration_model.estimate(job)
+
+    def reservation_window(self, job, start_time, job_duration):
+        """Bepaal het te reserveren tijdvak: reistijd vanaf de vorige opdracht, de opdracht en reistijd naar de volgende."""
+        previous_location = None
+        next_location = None
+        
+        for scheduled_date, location in self.get_jobs_on_date(start_time):
+            if scheduled_date <= start_time:
+                previous_location = location
+            elif next_location is None:
+                next_location = location
+        
+        # Zonder vorige of volgende opdracht op dezelfde dag reserveren we de reistijd van en naar huis
+        travel_before = self.travel_time(previous_location or self.preferences.home_location, job.location)
+        travel_after = self.travel_time(job.location, next_location or self.preferences.home_location)
+        
+        window_start = start_time - timedelta(minutes=travel_before)
+        return window_start, travel_before + job_duration + travel_after
+
+    def travel_time(self, origin, destination):
+        """Geef de reistijd in minuten tussen twee locaties uit de voorberekende reistijdmatrix."""
+        minutes = self.travel_time_model.travel_minutes(origin, destination)
+        if minutes is None:
+            return self.preferences.travel_time_between_jobs
+        return minutes
+
+    def get_jobs_on_date(self, date):
+        """Haal het tijdstip en de locatie op van de geaccepteerde opdrachten op een bepaalde datum."""
+        date_str = date.strftime('%Y-%m-%d')
+        
+        try:
+            self.cursor.execute('''
+                SELECT scheduled_date, location FROM accepted_jobs 
+                WHERE DATE(scheduled_date) = DATE(?)
+                ORDER BY scheduled_date
+            ''', (date_str,))
+            
+            return [(datetime.fromisoformat(scheduled_date), location) for scheduled_date, location in self.cursor.fetchall()]
+        except (sqlite3.Error, ValueError) as e:
+            logging.error("Database fout bij ophalen van opdrachten: %s", e)
+            return []
 
     def count_jobs_on_date(self, date):
         """Tel het aantal opdrachten op een bepaalde datum."""
@@ -347,19 +357,19 @@ class JobFilter:
             count = self.cursor.fetchone()[0]
             return count
         except sqlite3.Error as e:
-            logging.error(f"Database fout bij tellen van opdrachten: {e}")
+            logging.error("Database fout bij tellen van opdrachten: %s", e)
             return 0
 
     def accept_job(self, job, selected_timeslot):
         """Accepteer een opdracht via de acceptatielink."""
-        if not job['accept_link']:
-            logging.error(f"Geen acceptatielink gevonden voor opdracht \"{job['title']}\"")
+        if not job.accept_link:
+            logging.error("Geen acceptatielink gevonden voor opdracht \"%s\"", job.title)
             return False
         
         try:
             # In een echte implementatie zouden we hier Selenium gebruiken om de acceptatielink te volgen
             # en het geselecteerde tijdslot te kiezen
-            logging.info(f"Accepteren van opdracht \"{job['title']}\" via link: {job['accept_link']} voor tijdslot: {selected_timeslot}")
+            logging.info("Accepteren van opdracht \"%s\" via link: %s voor tijdslot: %s", job.title, job.accept_link, selected_timeslot)
             
             # Hier zou de logica komen om de acceptatie te bevestigen
             # Dit is afhankelijk van hoe de MrFix acceptatiepagina werkt
@@ -367,7 +377,21 @@ class JobFilter:
             return True
             
         except Exception as e:
-            logging.error(f"Fout bij accepteren van opdracht \"{job['title']}\": {e}")
+            logging.error("Fout bij accepteren van opdracht \"%s\": %s", job.title, e)
+            return False
+
+    def save_processed_job(self, job):
+        """Sla een opdracht op in de tabel met verwerkte opdrachten, met de score om op te sorteren."""
+        try:
+            self.cursor.execute(f'''
+                INSERT OR REPLACE INTO processed_jobs ({', '.join(PROCESSED_JOBS_COLUMNS)}, score)
+                VALUES ({', '.join('?' * len(PROCESSED_JOBS_COLUMNS))}, ?)
+            ''', job.to_row() + (self.calculate_priority_score(job),))
+            self.conn.commit()
+            return True
+        except sqlite3.Error as e:
+            logging.error("Database fout bij opslaan van verwerkte opdracht: %s", e)
+            self.conn.rollback()
             return False
 
     def mark_job_as_accepted(self, job, scheduled_date):
@@ -379,14 +403,14 @@ class JobFilter:
                     scheduled_date, accepted_at
                 ) VALUES (?, ?, ?, ?, ?, ?, ?)
             ''', (
-                job['id'], job['title'], job['description'], job['location'],
-                job['date_posted'], scheduled_date.isoformat(), datetime.now().isoformat()
+                job.id, job.title, job.description, job.location,
+                job.date_posted, scheduled_date.isoformat(), datetime.now().isoformat()
             ))
             self.conn.commit()
-            logging.info(f"Opdracht gemarkeerd als geaccepteerd: {job['title']}")
+            logging.info("Opdracht gemarkeerd als geaccepteerd: %s", job.title)
             return True
         except sqlite3.Error as e:
-            logging.error(f"Database fout bij markeren van opdracht als geaccepteerd: {e}")
+            logging.error("Database fout bij markeren van opdracht als geaccepteerd: %s", e)
             self.conn.rollback()
             return False
 
@@ -412,11 +436,13 @@ def filter_and_process_jobs(new_jobs):
     try:
         return job_filter.filter_and_process_jobs(new_jobs)
     except Exception as e:
-        logging.error(f"Fout bij filteren en verwerken van opdrachten: {e}")
+        logging.error("Fout bij filteren en verwerken van opdrachten: %s", e)
         return False
 
 # Voor testen
 if __name__ == "__main__":
+    setup_logging(LOG_PATH)
+
     # Test data
     test_jobs = [
         {
@@ -0,0 +1,122 @@
+import os
+import sqlite3
+
+from job import PROCESSED_JOBS_COLUMNS
+
+# Configuratie
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+DB_PATH = os.path.join(DATA_DIR, 'mrfix.db')
+
+# Aantal opdrachten per pagina
+PAGE_SIZE = 100
+
+# Sorteringen: (kolom, richting, waarde voor lege velden). Elke kolom heeft een index (kolom, id),
+# zodat elke pagina direct in de index begint, hoe ver er ook gebladerd is.
+SORTS = {
+    "date": ("processed_at", "DESC", ""),  # Nieuwste eerst
+    "score": ("score", "DESC", 0),  # Hoogste prioriteitsscore eerst
+    "distance": ("distance_to_amsterdam", "ASC", 0),  # Dichtstbij eerst
+}
+SORT_LABELS = {"date": "Nieuwste", "score": "Score", "distance": "Afstand"}
+
+STATUS_ACCEPTED = "Geaccepteerd"
+STATUS_PROCESSED = "Verwerkt"
+
+
+def ensure_schema(conn):
+    """Maak de opdrachttabellen aan als ze ontbreken en voeg de score kolom en sorteerindexen toe."""
+    conn.execute(f"CREATE TABLE IF NOT EXISTS processed_jobs ({', '.join(PROCESSED_JOBS_COLUMNS)}, score REAL)")
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS accepted_jobs (
+            id TEXT PRIMARY KEY,
+            title TEXT,
+            description TEXT,
+            location TEXT,
+            date_posted TEXT,
+            scheduled_date TEXT,
+            accepted_at TEXT,
+            FOREIGN KEY (id) REFERENCES processed_jobs (id)
+        )
+    ''')
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(processed_jobs)")}
+    if "score" not in columns:
+        conn.execute("ALTER TABLE processed_jobs ADD COLUMN score REAL")
+    for name, (column, direction, empty) in SORTS.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS processed_jobs_{name} ON processed_jobs ({column}, id)")
+        # Een cursor met NULL kan niet vergeleken worden; vul lege velden (van oudere opdrachten) aan.
+        # Via de index kost dit niets als er geen lege velden zijn.
+        conn.execute(f"UPDATE processed_jobs SET {column} = ? WHERE {column} IS NULL", (empty,))
+    conn.commit()
+
+
+def like_pattern(text):
+    """Een LIKE patroon dat text letterlijk zoekt (ook % en _)."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class JobStore:
+    def __init__(self, db_path=DB_PATH):
+        """Pagina's met verwerkte en geaccepteerde opdrachten uit de database, voor de GUI.
+
+        Er wordt gebladerd met keyset paginering: elke pagina begint na de sorteersleutel van de
+        laatste rij van de vorige, in plaats van met OFFSET. Een pagina kost daardoor even weinig
+        bij de eerste honderd als bij de laatste van honderdduizenden opdrachten.
+        """
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        ensure_schema(self.conn)
+        self.data_version = None
+
+    def where(self, search, accepted_only):
+        """De FROM en WHERE delen voor een zoekopdracht, met parameters."""
+        sql = f"FROM processed_jobs p {'JOIN' if accepted_only else 'LEFT JOIN'} accepted_jobs a ON a.id = p.id"
+        conditions, params = [], []
+        if search:
+            conditions.append("(p.title LIKE ? ESCAPE '\\' OR p.location LIKE ? ESCAPE '\\')")
+            params += [like_pattern(search)] * 2
+        return sql, conditions, params
+
+    def page(self, sort="date", search="", accepted_only=False, after=None, limit=PAGE_SIZE):
+        """Een pagina opdrachten; geeft (rijen, cursor) terug.
+
+        Elke rij is (id, titel, locatie, datum, score, afstand, status). Geef de cursor als after
+        mee voor de volgende pagina; de cursor is None als er geen opdrachten meer zijn.
+        """
+        column, direction, _ = SORTS[sort]
+        key = f"p.{column}"
+        sql, conditions, params = self.where(search, accepted_only)
+        if after is not None:
+            conditions.append(f"({key}, p.id) {'<' if direction == 'DESC' else '>'} (?, ?)")
+            params += list(after)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        rows = self.conn.execute(f'''
+            SELECT p.id, p.title, p.location, p.date_posted, p.score, p.distance_to_amsterdam,
+                   a.id IS NOT NULL, {key}
+            {sql}
+            ORDER BY {key} {direction}, p.id {direction}
+            LIMIT ?
+        ''', params + [limit]).fetchall()
+
+        jobs = [(job_id, title, location, date_posted, score, distance, STATUS_ACCEPTED if accepted else STATUS_PROCESSED)
+                for job_id, title, location, date_posted, score, distance, accepted, _ in rows]
+        cursor = (rows[-1][7], rows[-1][0]) if len(rows) == limit else None
+        return jobs, cursor
+
+    def count(self, search="", accepted_only=False):
+        """Het aantal opdrachten dat aan de zoekopdracht voldoet."""
+        sql, conditions, params = self.where(search, accepted_only)
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        return self.conn.execute(f"SELECT COUNT(*) {sql}", params).fetchone()[0]
+
+    def changed(self):
+        """Of een andere verbinding (de filter of de daemon) sinds de vorige aanroep iets heeft opgeslagen."""
+        version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        changed, self.data_version = version != self.data_version, version
+        return changed
+
+    def close(self):
+        self.conn.close()
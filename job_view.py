@@ -0,0 +1,179 @@
+import tkinter as tk
+from tkinter import ttk
+from collections import deque
+
+from job_store import JobStore, PAGE_SIZE, SORT_LABELS
+
+# Maximaal aantal pagina's tegelijk in de treeview; verder scrollen laadt de volgende pagina
+# en haalt de bovenste weg (en andersom), zodat Tk nooit meer dan een paar honderd rijen heeft
+MAX_PAGES = 4
+
+# Milliseconden tussen controles op nieuwe opdrachten in de database
+POLL_INTERVAL = 1000
+
+# Milliseconden na de laatste toetsaanslag voordat er gezocht wordt
+SEARCH_DELAY = 300
+
+# Hoe dicht (als fractie van de scrollbalk) bij de rand de volgende pagina geladen wordt
+LOAD_MARGIN = 0.1
+
+COLUMNS = (
+    # (kolom, kop, breedte, sortering)
+    ("titel", "Titel", 280, None),
+    ("locatie", "Locatie", 130, None),
+    ("datum", "Datum", 130, "date"),
+    ("score", "Score", 60, "score"),
+    ("afstand", "Afstand", 70, "distance"),
+    ("status", "Status", 100, None),
+)
+
+
+def format_row(row):
+    job_id, title, location, date_posted, score, distance, status = row
+    return (title, location, date_posted or "", f"{score or 0:.0f}", f"{distance or 0:.0f} km", status)
+
+
+class JobListView:
+    def __init__(self, parent, store=None, on_change=None, page_size=PAGE_SIZE, max_pages=MAX_PAGES):
+        """Alle verwerkte opdrachten uit de database in een treeview, pagina voor pagina geladen.
+
+        Sorteren kan door op de kolomkoppen Datum, Score en Afstand te klikken. on_change(store)
+        wordt aangeroepen als er nieuwe opdrachten in de database staan.
+        """
+        self.store = store or JobStore()
+        self.on_change = on_change
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.sort = "date"
+        self.pages = deque()  # (cursor waarna de pagina begint, treeview items) per geladen pagina
+        self.dropped = []  # Cursors van pagina's die boven het venster zijn weggehaald
+        self.next_cursor = None
+        self.loading = False
+        self.search_after = None
+
+        self.frame = ttk.Frame(parent)
+        self.frame.pack(fill=tk.BOTH, expand=True)
+
+        # Zoeken en filteren
+        search_frame = ttk.Frame(self.frame)
+        search_frame.pack(fill=tk.X, pady=(0, 5))
+        ttk.Label(search_frame, text="Zoeken:").pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", lambda *args: self.schedule_search())
+        ttk.Entry(search_frame, textvariable=self.search_var, width=30).pack(side=tk.LEFT, padx=5)
+        self.accepted_only_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(search_frame, text="Alleen geaccepteerd", variable=self.accepted_only_var,
+                        command=self.reload).pack(side=tk.LEFT, padx=5)
+        self.count_label = ttk.Label(search_frame, text="")
+        self.count_label.pack(side=tk.RIGHT)
+
+        # Treeview met scrollbar
+        self.tree = ttk.Treeview(self.frame, columns=[column for column, *rest in COLUMNS], show="headings")
+        for column, heading, width, sort in COLUMNS:
+            if sort:
+                self.tree.heading(column, text=heading, command=lambda s=sort: self.set_sort(s))
+            else:
+                self.tree.heading(column, text=heading)
+            self.tree.column(column, width=width)
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.on_scroll)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.poll()
+
+    def query(self):
+        return {"sort": self.sort, "search": self.search_var.get().strip(),
+                "accepted_only": self.accepted_only_var.get(), "limit": self.page_size}
+
+    def set_sort(self, sort):
+        self.sort = sort
+        self.reload()
+
+    def schedule_search(self):
+        if self.search_after is not None:
+            self.tree.after_cancel(self.search_after)
+        self.search_after = self.tree.after(SEARCH_DELAY, self.reload)
+
+    def reload(self):
+        """Begin opnieuw bovenaan, met de huidige sortering en zoekopdracht."""
+        self.search_after = None
+        self.tree.delete(*self.tree.get_children())
+        self.pages.clear()
+        self.dropped = []
+        self.next_cursor = None
+        self.load_page(None)
+        query = self.query()
+        count = self.store.count(query["search"], query["accepted_only"])
+        for column, heading, width, sort in COLUMNS:
+            if sort:
+                self.tree.heading(column, text=heading + (" ▾" if sort == self.sort else ""))
+        self.count_label.config(text=f"{count} opdrachten, gesorteerd op {SORT_LABELS[self.sort].lower()}")
+
+    def load_page(self, after, top=False):
+        """Laad de pagina na cursor after onder (of boven) in het venster; geeft de items terug."""
+        rows, cursor = self.store.page(after=after, **self.query())
+        if top:
+            items = [self.tree.insert("", index, values=format_row(row)) for index, row in enumerate(rows)]
+            self.pages.appendleft((after, items))
+        else:
+            items = [self.tree.insert("", tk.END, values=format_row(row)) for row in rows]
+            self.pages.append((after, items))
+            self.next_cursor = cursor
+        return items
+
+    def keep_position(self, change):
+        """Voer change uit zonder dat de zichtbare rijen verspringen."""
+        anchor = self.tree.identify_row(5)
+        change()
+        children = self.tree.get_children()
+        if anchor and self.tree.exists(anchor) and children:
+            self.tree.yview_moveto(self.tree.index(anchor) / len(children))
+
+    def load_next(self):
+        def change():
+            self.load_page(self.next_cursor)
+            if len(self.pages) > self.max_pages:
+                after, items = self.pages.popleft()
+                self.tree.delete(*items)
+                self.dropped.append(after)
+        self.keep_position(change)
+
+    def load_previous(self):
+        def change():
+            self.load_page(self.dropped.pop(), top=True)
+            if len(self.pages) > self.max_pages:
+                after, items = self.pages.pop()
+                self.tree.delete(*items)
+                self.next_cursor = after
+        self.keep_position(change)
+
+    def on_scroll(self, first, last):
+        """Werk de scrollbar bij en laad een pagina als de rand van het venster in zicht komt."""
+        self.scrollbar.set(first, last)
+        if self.loading:
+            return
+        if float(last) > 1 - LOAD_MARGIN and self.next_cursor is not None:
+            action = self.load_next
+        elif float(first) < LOAD_MARGIN and self.dropped:
+            action = self.load_previous
+        else:
+            return
+        # Niet vanuit de scroll callback zelf de treeview wijzigen
+        self.loading = True
+        self.tree.after_idle(lambda: self.finish_loading(action))
+
+    def finish_loading(self, action):
+        try:
+            action()
+        finally:
+            self.loading = False
+
+    def poll(self):
+        """Toon nieuwe opdrachten (van de filter of de daemon) als het venster bovenaan staat."""
+        if self.store.changed():
+            if not self.dropped and self.tree.yview()[0] == 0:
+                self.reload()
+            if self.on_change:
+                self.on_change(self.store)
+        self.tree.after(POLL_INTERVAL, self.poll)
@@ -0,0 +1,209 @@
+import os
+import re
+import json
+import glob
+import time
+import heapq
+import logging
+from datetime import datetime
+from collections import namedtuple
+
+# Configuratie
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LOG_DIR = os.path.join(BASE_DIR, 'logs')
+
+# Lezen gebeurt in blokken; bij het zoeken naar de laatste regels van achteren naar voren
+BLOCK_SIZE = 64 * 1024
+
+# Maximaal aantal bytes per bestand dat doorzocht wordt voor de laatste regels met een filter,
+# zodat een zeldzaam job id in een logbestand van gigabytes de GUI niet ophoudt
+MAX_SCAN_BYTES = 16 * 1024 * 1024
+
+# Een tekstregel van logging_setup: "2025-03-25 18:00:00[,123] - INFO - bericht"
+TEXT_LINE = re.compile(r'(\d{4})-(\d\d)-(\d\d) (\d\d):(\d\d):(\d\d)(?:,(\d{3}))? - ([A-Z]+) - (.*)', re.S)
+
+# Eén logbericht; text zijn de oorspronkelijke regels (met eventuele traceback), source het logbestand
+LogEntry = namedtuple('LogEntry', 'time level message job_id source text')
+
+
+def parse_line(line, source):
+    """Een LogEntry voor een tekst- of JSON logregel, of None voor een vervolgregel (zoals een traceback)."""
+    if line.startswith('{'):
+        try:
+            data = json.loads(line)
+            created = datetime.fromisoformat(data['time']).timestamp()
+        except (ValueError, KeyError, TypeError):
+            return None
+        message = data.get('message', '')
+        if data.get('exception'):
+            message = f"{message}\n{data['exception']}"
+        return LogEntry(created, data.get('level', 'INFO'), message, data.get('job_id'), source, line)
+    match = TEXT_LINE.match(line)
+    if not match:
+        return None
+    year, month, day, hour, minute, second, millis, level, message = match.groups()
+    created = datetime(int(year), int(month), int(day), int(hour), int(minute), int(second)).timestamp()
+    return LogEntry(created + int(millis or 0) / 1000, level, message, None, source, line)
+
+
+def format_entry(entry):
+    """Het bericht zoals in een tekst log, ook als het uit een JSON log komt (met het job id erbij)."""
+    if not entry.text.startswith('{'):
+        return entry.text
+    text = f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry.time))} - {entry.level} - {entry.message}"
+    return f"{text} [job {entry.job_id}]" if entry.job_id else text
+
+
+def continue_entry(entry, line, source):
+    """Voeg een vervolgregel toe aan entry; zonder entry wordt het een los bericht."""
+    if entry is None:
+        return LogEntry(0, 'INFO', line, None, source, line)
+    return entry._replace(message=f"{entry.message}\n{line}", text=f"{entry.text}\n{line}")
+
+
+def reverse_lines(f, end, max_bytes=None):
+    """Lees de regels van een binair bestand van achteren naar voren, vanaf positie end."""
+    position = end
+    remainder = b''
+    scanned = 0
+    while position > 0 and (max_bytes is None or scanned < max_bytes):
+        size = min(BLOCK_SIZE, position)
+        position -= size
+        scanned += size
+        f.seek(position)
+        lines = (f.read(size) + remainder).split(b'\n')
+        remainder = lines.pop(0)  # Waarschijnlijk een halve regel; hoort bij het volgende blok
+        for line in reversed(lines):
+            yield line
+    if position == 0 and remainder:
+        yield remainder
+
+
+def level_number(name):
+    """Het nummer van een logniveau ("WARNING" -> 30); onbekende niveaus tellen als INFO."""
+    number = logging.getLevelName(name)
+    return number if isinstance(number, int) else logging.INFO
+
+
+class LogFilter:
+    def __init__(self, level=None, job_id=None):
+        """Filter op minimaal niveau (bijvoorbeeld "WARNING") en/of een job id."""
+        self.level = level_number(level) if level else None
+        self.job_id = job_id or None
+
+    def __call__(self, entry):
+        if self.level is not None and level_number(entry.level) < self.level:
+            return False
+        if self.job_id is not None and entry.job_id != self.job_id and self.job_id not in entry.message:
+            return False
+        return True
+
+
+def tail(path, count, matches=None, max_bytes=MAX_SCAN_BYTES):
+    """De laatste count berichten van een logbestand (oudste eerst) en de positie van het einde.
+
+    Alleen het einde van het bestand wordt gelezen; met een filter (matches) hooguit max_bytes.
+    """
+    source = os.path.splitext(os.path.basename(path))[0]
+    entries = []
+    with open(path, 'rb') as f:
+        end = f.seek(0, os.SEEK_END)
+        continuation = []  # Van achteren gelezen vervolgregels, horen bij de eerstvolgende kopregel
+        for raw in reverse_lines(f, end, max_bytes if matches else None):
+            line = raw.decode('utf-8', errors='replace').rstrip('\r')
+            if not line:
+                continue
+            entry = parse_line(line, source)
+            if entry is None:
+                continuation.append(line)
+                continue
+            for extra in reversed(continuation):
+                entry = continue_entry(entry, extra, source)
+            continuation = []
+            if matches is None or matches(entry):
+                entries.append(entry)
+                if len(entries) >= count:
+                    break
+    entries.reverse()
+    return entries, end
+
+
+class LogFollower:
+    def __init__(self, path, offset=None):
+        """Volg een logbestand: read() geeft alleen de berichten die sinds de vorige aanroep zijn toegevoegd."""
+        self.path = path
+        self.source = os.path.splitext(os.path.basename(path))[0]
+        self.offset = offset
+        self.inode = None if offset is None else os.stat(path).st_ino
+        self.partial = b''  # Een regel die nog niet af is
+        self.last = None
+
+    def read(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return []
+        if self.offset is None:
+            self.offset = stat.st_size  # Begin aan het einde; de staart komt uit tail()
+        elif stat.st_ino != self.inode or stat.st_size < self.offset:
+            # Geroteerd of leeggemaakt: lees het nieuwe bestand vanaf het begin
+            self.offset, self.partial = 0, b''
+        self.inode = stat.st_ino
+        if stat.st_size == self.offset:
+            return []
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            data = self.partial + f.read(stat.st_size - self.offset)
+            self.offset = f.tell()
+        *lines, self.partial = data.split(b'\n')
+
+        entries = []
+        for raw in lines:
+            line = raw.decode('utf-8', errors='replace').rstrip('\r')
+            if not line:
+                continue
+            entry = parse_line(line, self.source)
+            if entry is not None:
+                entries.append(entry)
+            elif entries:
+                entries[-1] = continue_entry(entries[-1], line, self.source)
+            else:
+                # Vervolg van een bericht uit een vorige read(); toon het met dezelfde tijd
+                entries.append(continue_entry(None, line, self.source)._replace(
+                    time=self.last.time if self.last else 0, level=self.last.level if self.last else 'INFO'))
+        if entries:
+            self.last = entries[-1]
+        return entries
+
+
+class LogViewer:
+    def __init__(self, paths=None):
+        """Toon en volg meerdere logbestanden tegelijk, samengevoegd op tijd.
+
+        Standaard alle .log bestanden in de logs map (app, daemon, filter, notificaties, ...).
+        """
+        self.paths = paths if paths is not None else sorted(glob.glob(os.path.join(LOG_DIR, '*.log')))
+        self.followers = {}
+
+    def tail(self, count, matches=None):
+        """De laatste count berichten van alle bestanden samen; volgen begint vanaf hier."""
+        tails = []
+        for path in self.paths:
+            try:
+                entries, end = tail(path, count, matches)
+            except OSError as e:
+                logging.warning("Kon logbestand %s niet lezen: %s", path, e)
+                continue
+            self.followers[path] = LogFollower(path, end)
+            tails.append(entries)
+        return list(heapq.merge(*tails, key=lambda entry: entry.time))[-count:]
+
+    def poll(self, matches=None):
+        """Nieuwe berichten sinds de vorige tail() of poll(), samengevoegd op tijd."""
+        new = []
+        for path in self.paths:
+            follower = self.followers.setdefault(path, LogFollower(path))
+            entries = follower.read()
+            new.append([entry for entry in entries if matches is None or matches(entry)])
+        return list(heapq.merge(*new, key=lambda entry: entry.time))
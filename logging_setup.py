@@ -0,0 +1,135 @@
+import os
+import json
+import queue
+import atexit
+import logging
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+# Formaat van de logregels
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Logbestanden worden geroteerd (app.log -> app.log.1 -> ...) zodra ze deze grootte bereiken
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+# Argumenttypes die niet meer veranderen en dus pas in de schrijfthread geformatteerd hoeven te worden
+IMMUTABLE_ARGS = (str, int, float, bool, type(None))
+
+_configured = False
+_listener = None
+_queue_handler = None
+
+# De opdracht die in deze thread (of taak) verwerkt wordt, zie job_context()
+_job_id = contextvars.ContextVar('job_id', default=None)
+
+
+@contextmanager
+def job_context(job_id):
+    """Voorzie alle logberichten binnen dit blok van job_id, ook die van de agenda en notificaties."""
+    token = _job_id.set(job_id)
+    try:
+        yield
+    finally:
+        _job_id.reset(token)
+
+
+class JobIdFilter(logging.Filter):
+    """Zet het job id van de lopende opdracht op elk bericht (tenzij er al een via extra= is meegegeven)."""
+
+    def filter(self, record):
+        if getattr(record, 'job_id', None) is None:
+            record.job_id = _job_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Eén JSON object per regel, zodat logregels op een server doorzocht en verwerkt kunnen worden."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        job_id = getattr(record, 'job_id', None)
+        if job_id is not None:
+            entry["job_id"] = job_id
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text  # Al omgezet door de DeferredQueueHandler
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Zet berichten in een wachtrij; formatteren en schrijven gebeurt in de schrijfthread.
+
+    De standaard QueueHandler formatteert het bericht al in de aanroepende thread. Hier gebeurt dat
+    alleen als een argument nog kan veranderen voordat de schrijfthread eraan toekomt.
+    """
+
+    def prepare(self, record):
+        if record.args and not (isinstance(record.args, tuple) and all(isinstance(arg, IMMUTABLE_ARGS) for arg in record.args)):
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None  # Tracebacks en frames niet vasthouden in de wachtrij
+        return record
+
+
+def setup_logging(log_path, console=True, level=logging.INFO, json_format=True):
+    """Configureer logging naar een bestand (en de console).
+
+    Wordt aangeroepen door het programma dat gestart wordt, niet bij het importeren van een module;
+    alleen de eerste aanroep telt. Het bestand bevat JSON regels (of tekst met json_format=False) en
+    wordt geroteerd bij LOG_MAX_BYTES. Schrijven gebeurt in een achtergrondthread, zodat een trage
+    schijf het filteren en accepteren van opdrachten nooit ophoudt.
+    """
+    global _configured, _listener, _queue_handler
+    if _configured:
+        return
+    _configured = True
+
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    handler = RotatingFileHandler(log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8')
+    handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(LOG_FORMAT, DATE_FORMAT))
+    handlers = [handler]
+
+    # Configureer ook logging naar console
+    if console:
+        handler = logging.StreamHandler()
+        handler.setLevel(level)
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        handlers.append(handler)
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = DeferredQueueHandler(log_queue)
+    _queue_handler.addFilter(JobIdFilter())
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger('')
+    root.setLevel(level)
+    root.addHandler(_queue_handler)
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Schrijf alle berichten in de wachtrij weg; daarna wordt weer direct geschreven."""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    root = logging.getLogger('')
+    for handler in _listener.handlers:
+        handler.addFilter(JobIdFilter())
+        root.addHandler(handler)
+    root.removeHandler(_queue_handler)
+    _listener.stop()  # Na het omzetten, zodat er geen bericht in de wachtrij achterblijft
+    _listener = _queue_handler = None
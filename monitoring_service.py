@@ -0,0 +1,201 @@
+import time
+import logging
+import threading
+
+from job import Job
+from preferences import get_preferences
+
+# Seconden wachten na een fout in de monitoring loop
+ERROR_RETRY_DELAY = 10
+
+# Gebeurtenissen voor abonnees (de GUI, of het logboek in headless modus)
+EVENT_STATE = "state"  # Monitoring gestart (True) of gestopt (False)
+EVENT_CHECK = "check"  # Een controle van de website begint; waarde is het tijdstip
+EVENT_JOBS = "jobs"  # Nieuwe opdrachten gevonden; waarde is een lijst van Job records
+EVENT_ERROR = "error"  # Fout tijdens een controle; de monitoring gaat door
+EVENT_FAILED = "failed"  # Onverwachte fout; de monitoring is gestopt
+
+
+class DummyMonitor:
+    """Monitor voor testen als de echte website monitor niet beschikbaar is."""
+
+    def monitor_website(self):
+        time.sleep(5)  # Simuleer verwerking
+        return []
+
+    def cleanup(self):
+        pass
+
+def create_monitor():
+    """Maak de website monitor; selenium en requests worden pas hier geladen."""
+    try:
+        from website_monitor import MrFixMonitor
+    except ImportError as e:
+        logging.warning("Website monitor niet beschikbaar (%s), dummy monitor wordt gebruikt", e)
+        return DummyMonitor()
+    return MrFixMonitor()
+
+
+class MonitoringService:
+    def __init__(self, monitor_factory=create_monitor):
+        """De monitoring loop, los van de GUI, zodat die ook zonder tkinter (headless) kan draaien."""
+        self.monitor_factory = monitor_factory
+        self.active = False
+        self.thread = None
+        self.check_now = threading.Event()
+        self.last_check = None
+        self.subscribers = []
+
+    def subscribe(self, callback):
+        """Roep callback(gebeurtenis, waarde) aan bij elke gebeurtenis; vanuit de monitoring thread."""
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def publish(self, event, value=None):
+        for callback in list(self.subscribers):
+            try:
+                callback(event, value)
+            except Exception as e:
+                logging.error("Fout bij verwerken van monitoring gebeurtenis %s: %s", event, e)
+
+    def start(self):
+        """Start de monitoring thread; False als die al draait."""
+        if self.active:
+            return False
+
+        self.active = True
+        self.check_now.clear()
+        logging.info("Monitoring gestart")
+        self.publish(EVENT_STATE, True)
+
+        self.thread = threading.Thread(target=self.run, name="monitoring", daemon=True)
+        self.thread.start()
+        return True
+
+    def stop(self, timeout=1.0):
+        """Stop de monitoring thread; False als die niet draaide."""
+        if not self.active:
+            return False
+
+        self.active = False
+        self.check_now.set()
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout=timeout)
+
+        logging.info("Monitoring gestopt")
+        self.publish(EVENT_STATE, False)
+        return True
+
+    def request_check(self):
+        """Controleer de website direct in plaats van na het interval."""
+        if not self.active:
+            return False
+        self.check_now.set()
+        return True
+
+    def status(self):
+        last_check = time.strftime("%Y-%m-%d %H:%M:%S", self.last_check) if self.last_check else "nog niet"
+        return f"Monitoring: {'actief' if self.active else 'gestopt'}, laatste controle {last_check}"
+
+    def run(self):
+        """De hoofdlus voor monitoring."""
+        try:
+            monitor = self.monitor_factory()
+
+            while self.active:
+                try:
+                    self.last_check = time.localtime()
+                    self.publish(EVENT_CHECK, self.last_check)
+
+                    # Monitor de website
+                    new_jobs = [Job.coerce(job) for job in monitor.monitor_website() or []]
+                    if new_jobs:
+                        logging.info("%s nieuwe opdrachten gevonden", len(new_jobs))
+                        self.publish(EVENT_JOBS, new_jobs)
+
+                    # Wacht voor de volgende controle; een gewijzigd interval geldt vanaf de volgende ronde
+                    interval = get_preferences().monitoring_interval
+
+                    # Wacht in kleine stappen zodat we snel kunnen stoppen (of via Telegram direct controleren)
+                    for _ in range(interval):
+                        if not self.active or self.check_now.wait(1):
+                            break
+                    self.check_now.clear()
+
+                except Exception as e:
+                    logging.error("Fout in monitoring loop: %s", e)
+                    self.publish(EVENT_ERROR, e)
+                    time.sleep(ERROR_RETRY_DELAY)  # Wacht even voordat we het opnieuw proberen
+
+            # Ruim resources op
+            monitor.cleanup()
+
+        except Exception as e:
+            logging.error("Onverwachte fout in monitoring thread: %s", e)
+            self.publish(EVENT_FAILED, e)
+            self.stop()
+
+    def register_telegram_commands(self, receiver):
+        """Laat de monitoring via Telegram commando's besturen."""
+        def pause(args):
+            self.stop()
+            return "Monitoring gepauzeerd"
+
+        def resume(args):
+            self.start()
+            return "Monitoring hervat"
+
+        def force_check(args):
+            if not self.request_check():
+                return "Monitoring staat uit; stuur /hervat om te starten"
+            return "Website wordt nu gecontroleerd"
+
+        receiver.register_command(pause, "/pauze", "/pause")
+        receiver.register_command(resume, "/hervat", "/resume")
+        receiver.register_command(force_check, "/controleer", "/poll")
+        receiver.status_callbacks.append(self.status)
+
+
+def start_integrations(service):
+    """Start de Telegram ontvanger en het metrics endpoint; beide worden pas hier geladen.
+
+    Geeft de ontvanger en de metrics server terug (elk None als die niet gestart is).
+    """
+    try:
+        from telegram_receiver import start_telegram_receiver
+        receiver = start_telegram_receiver()
+    except ImportError as e:
+        logging.warning("Telegram ontvanger niet beschikbaar: %s", e)
+        receiver = None
+    if receiver is not None:
+        service.register_telegram_commands(receiver)
+
+    try:
+        from notification_metrics import start_metrics_server
+        metrics_server = start_metrics_server()
+    except ImportError as e:
+        logging.warning("Metrics endpoint niet beschikbaar: %s", e)
+        metrics_server = None
+    return receiver, metrics_server
+
+# Singleton instantie
+_monitoring_service = None
+
+def get_monitoring_service():
+    """Verkrijg een singleton instantie van de MonitoringService."""
+    global _monitoring_service
+    if _monitoring_service is None:
+        _monitoring_service = MonitoringService()
+    return _monitoring_service
+
+# Voor testen
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    service = MonitoringService(monitor_factory=DummyMonitor)
+    service.subscribe(lambda event, value: print(f"{event}: {value}"))
+    service.start()
+    time.sleep(12)
+    service.stop()
@@ -0,0 +1,31 @@
+import argparse
+
+
+def main(argv=None):
+    """Start de applicatie: de GUI (standaard) of de daemon voor op een server."""
+    parser = argparse.ArgumentParser(prog="mrfix", description="MrFix opdracht automatisering")
+    parser.add_argument("--headless", action="store_true",
+                        help="hetzelfde als 'mrfix daemon' (tkinter wordt niet geladen)")
+    commands = parser.add_subparsers(dest="command", metavar="commando")
+    commands.add_parser("gui", help="start de applicatie met GUI (standaard)")
+    daemon = commands.add_parser("daemon", help="monitoring, filter, agenda en notificaties zonder GUI")
+    daemon.add_argument("--pidfile", help="pidfile (standaard data/mrfix.pid)")
+    daemon.add_argument("--log-file", help="logbestand (standaard logs/daemon.log)")
+    daemon.add_argument("--log-format", choices=["json", "text"], default="json",
+                        help="formaat van het logbestand (standaard json)")
+    args = parser.parse_args(argv)
+
+    # Importeer pas hier, zodat de daemon nooit tkinter laadt
+    if args.command == "daemon" or (args.command is None and args.headless):
+        import daemon as mrfix_daemon
+        return mrfix_daemon.run_daemon(
+            pid_path=getattr(args, "pidfile", None) or mrfix_daemon.PID_FILE,
+            log_path=getattr(args, "log_file", None) or mrfix_daemon.LOG_PATH,
+            json_logs=getattr(args, "log_format", "json") == "json")
+
+    from app import main as run_gui
+    run_gui()
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
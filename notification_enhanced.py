@@ -1,43 +1,46 @@
 import os
 import json
 import logging
-import requests
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+
+from async_runtime import get_async_runtime
+from notifiers import Notification, PROVIDERS, create_notifier
+from notification_templates import render
+from rate_limit import get_rate_limiter
+from notification_metrics import get_notification_metrics
+from logging_setup import setup_logging
+from preferences import get_preferences, get_preferences_service
 
 # Configuratie
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, 'data')
 LOG_DIR = os.path.join(BASE_DIR, 'logs')
 LOG_PATH = os.path.join(LOG_DIR, 'notification.log')
-PREFERENCES_FILE = os.path.join(DATA_DIR, 'user_preferences.json')
 NOTIFICATION_CONFIG_FILE = os.path.join(DATA_DIR, 'notification_config.json')
 
-# Zorg ervoor dat de data en logs directories bestaan
-os.makedirs(DATA_DIR, exist_ok=True)
-os.makedirs(LOG_DIR, exist_ok=True)
-
-# Logging configuratie
-logging.basicConfig(
-    filename=LOG_PATH,
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S'
-)
-
-# Configureer ook logging naar console
-console = logging.StreamHandler()
-console.setLevel(logging.INFO)
-formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-console.setFormatter(formatter)
-logging.getLogger('').addHandler(console)
+# Kanalen die we kunnen bedienen, in volgorde van voorkeur
+CHANNELS = ["telegram", "pushbullet", "email", "pushover", "safari_web_push"]
+
+# Instellingen die uit de voorkeuren komen als er geen apart notificatie configuratiebestand is
+PREFERENCE_KEYS = ["notification_method", "notification_methods", *CHANNELS]
+
+# Bezorgbeleid bij meerdere kanalen
+POLICY_FIRST_SUCCESS = "first_success"  # Geslaagd zodra één kanaal het bericht heeft afgeleverd
+POLICY_ALL_SUCCESS = "all_success"  # Alleen geslaagd als alle kanalen het bericht hebben afgeleverd
+
+# Maximale wachttijd (seconden) op de kanalen bij het verzenden naar meerdere kanalen
+FANOUT_TIMEOUT = 30
 
 class NotificationSystem:
     def __init__(self):
         """Initialiseer het notificatiesysteem."""
         self.load_config()
+        self.executor = None
+        self.last_report = None
+        self.notifiers = {}
+        self.rate_limiter = get_rate_limiter()
+        self.metrics = get_notification_metrics()
         logging.info("Notificatiesysteem geïnitialiseerd")
 
     def load_config(self):
@@ -45,6 +48,13 @@ class NotificationSystem:
         # Standaard configuratie
         self.config = {
             "notification_method": "telegram",  # 'telegram', 'pushbullet', 'email', 'pushover', 'safari_web_push'
+            "notification_methods": {},  # Meerdere kanalen tegelijk, bijv. {"telegram": true, "email": true}
+            "delivery_policy": {  # Bezorgbeleid per berichttype bij meerdere kanalen
+                "default": POLICY_FIRST_SUCCESS,
+                "job_accepted": POLICY_ALL_SUCCESS,
+                "permission": POLICY_ALL_SUCCESS
+            },
+            "digest_window": 60,  # Seconden waarin informatieve berichten tot één samenvatting worden samengevoegd
             "telegram": {
                 "bot_token": "",
                 "chat_id": ""
@@ -80,214 +90,171 @@ class NotificationSystem:
                     for key, value in notification_config.items():
                         self.config[key] = value
                     
-                    logging.info(f"Notificatie configuratie geladen uit {NOTIFICATION_CONFIG_FILE}")
-            # Als dat niet bestaat, probeer de algemene voorkeuren
-            elif os.path.exists(PREFERENCES_FILE):
-                with open(PREFERENCES_FILE, 'r') as f:
-                    user_prefs = json.load(f)
-                    # Update alleen de notificatie-gerelateerde voorkeuren
-                    if "notification_method" in user_prefs:
-                        self.config["notification_method"] = user_prefs["notification_method"]
-                    if "telegram" in user_prefs:
-                        self.config["telegram"] = user_prefs["telegram"]
-                    if "pushbullet" in user_prefs:
-                        self.config["pushbullet"] = user_prefs["pushbullet"]
-                    if "email" in user_prefs:
-                        self.config["email"] = user_prefs["email"]
-                    if "pushover" in user_prefs:
-                        self.config["pushover"] = user_prefs["pushover"]
-                    if "safari_web_push" in user_prefs:
-                        self.config["safari_web_push"] = user_prefs["safari_web_push"]
-                    
-                    logging.info(f"Notificatie configuratie geladen uit {PREFERENCES_FILE}")
+                    logging.info("Notificatie configuratie geladen uit %s", NOTIFICATION_CONFIG_FILE)
+            # Als dat niet bestaat, gebruik de notificatie-instellingen uit de gedeelde voorkeuren
             else:
-                logging.warning(f"Geen configuratiebestanden gevonden, standaardwaarden worden gebruikt")
-                logging.warning("Notificaties zullen niet werken zonder geldige configuratie")
+                preferences = get_preferences()
+                for key in PREFERENCE_KEYS:
+                    self.config[key] = getattr(preferences, key)
+                
+                logging.info("Notificatie configuratie overgenomen uit de voorkeuren")
         except Exception as e:
-            logging.error(f"Fout bij laden van notificatie configuratie: {e}")
+            logging.error("Fout bij laden van notificatie configuratie: %s", e)
 
-    def send_notification(self, title, body):
-        """Stuur een notificatie naar de gebruiker."""
-        method = self.config["notification_method"]
-        
-        if method == "telegram":
-            return self.send_telegram_notification(title, body)
-        elif method == "pushbullet":
-            return self.send_pushbullet_notification(title, body)
-        elif method == "email":
-            return self.send_email_notification(title, body)
-        elif method == "pushover":
-            return self.send_pushover_notification(title, body)
-        elif method == "safari_web_push":
-            return self.send_safari_web_push_notification(title, body)
-        else:
-            logging.error(f"Onbekende notificatiemethode: {method}")
-            return False
+    def on_preferences_changed(self, preferences, changed):
+        """Neem gewijzigde kanaalinstellingen over als de configuratie uit de voorkeuren komt."""
+        if not os.path.exists(NOTIFICATION_CONFIG_FILE) and changed.intersection(PREFERENCE_KEYS):
+            self.load_config()
 
-    def send_telegram_notification(self, title, body):
-        """Stuur een notificatie via Telegram."""
-        bot_token = self.config["telegram"]["bot_token"]
-        chat_id = self.config["telegram"]["chat_id"]
+    def enabled_channels(self):
+        """Bepaal de kanalen waarlangs een notificatie verstuurd wordt."""
+        methods = self.config.get("notification_methods") or {}
+        channels = [channel for channel in CHANNELS if methods.get(channel)]
+        # Zonder (bruikbare) lijst van kanalen gebruiken we de enkele notificatiemethode
+        return channels or [self.config["notification_method"]]
+
+    def configured(self, channel):
+        """Of een kanaal bekend is en een volledige configuratie heeft."""
+        return channel in PROVIDERS and self.get_notifier(channel).missing_config() is None
+
+    def route(self, channels):
+        """Vervang kanalen die herhaaldelijk falen (open circuit breaker) door het volgende bruikbare kanaal.
+
+        Zijn er geen vervangers, dan blijven de oorspronkelijke kanalen staan; die weigeren dan direct
+        zonder de provider aan te roepen.
+        """
+        routed = [channel for channel in channels if self.metrics.available(channel)]
+        for channel in CHANNELS:
+            if len(routed) == len(channels):
+                break
+            if channel not in channels and self.metrics.available(channel) and self.configured(channel):
+                logging.info("Notificatiekanaal %s wordt gebruikt in plaats van een falend kanaal", channel)
+                routed.append(channel)
+        return routed or channels
+
+    def delivery_policy(self, message_type=None):
+        """Het bezorgbeleid voor een berichttype."""
+        policies = self.config.get("delivery_policy") or {}
+        return policies.get(message_type) or policies.get("default") or POLICY_FIRST_SUCCESS
+
+    def send_notification(self, title, body, message_type=None):
+        """Stuur een notificatie naar de gebruiker, via alle ingeschakelde kanalen."""
+        channels = self.route(self.enabled_channels())
+        if len(channels) > 1:
+            return self.send_to_channels(title, body, channels, self.delivery_policy(message_type))["success"]
+        
+        method = channels[0]
         
-        if not bot_token or not chat_id:
-            logging.error("Telegram bot token of chat ID ontbreekt")
+        if method not in PROVIDERS:
+            logging.error("Onbekende notificatiemethode: %s", method)
             return False
+        if self.channel_sender(method)(title, body):
+            return True
         
+        # Is de circuit breaker van het kanaal door deze poging opengegaan, probeer dan direct het volgende kanaal
+        fallback = self.route([method])[0]
+        return fallback != method and self.channel_sender(fallback)(title, body)
+
+    def channel_sender(self, channel):
+        """De verzendfunctie (titel, inhoud) -> bool van een kanaal."""
+        send = getattr(self, f"send_{channel}_notification", None)
+        return send or (lambda title, body: self.deliver(channel, title, body))
+
+    def send_via_channel(self, channel, title, body):
+        """Stuur een notificatie via één kanaal en meet hoe lang dat duurt."""
+        start = time.perf_counter()
+        error = None
         try:
-            message = f"*{title}*\n\n{body}"
-            url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-            data = {
-                "chat_id": chat_id,
-                "text": message,
-                "parse_mode": "Markdown"
-            }
-            
-            response = requests.post(url, data=data)
-            
-            if response.status_code == 200:
-                logging.info(f"Telegram notificatie verzonden: {title}")
-                return True
-            else:
-                logging.error(f"Fout bij verzenden van Telegram notificatie: {response.text}")
-                return False
-                
+            success = bool(self.channel_sender(channel)(title, body))
         except Exception as e:
-            logging.error(f"Fout bij verzenden van Telegram notificatie: {e}")
-            return False
+            success = False
+            error = str(e)
+        latency = time.perf_counter() - start
+        
+        if not success and error is None:
+            error = "Bezorging mislukt"
+        return {"success": success, "latency": latency, "error": error}
 
-    def send_pushbullet_notification(self, title, body):
-        """Stuur een notificatie via Pushbullet."""
-        api_key = self.config["pushbullet"]["api_key"]
+    def send_to_channels(self, title, body, channels, policy=POLICY_FIRST_SUCCESS):
+        """Stuur een notificatie gelijktijdig via meerdere kanalen.
         
-        if not api_key:
-            logging.error("Pushbullet API key ontbreekt")
-            return False
+        Geeft een rapport terug met per kanaal het resultaat en de latentie. Bij first_success
+        keert deze functie terug zodra één kanaal geslaagd is; de overige kanalen worden op de
+        achtergrond afgemaakt en later in hetzelfde rapport bijgewerkt.
+        """
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=len(CHANNELS), thread_name_prefix="notification")
+        
+        report = {"success": False, "policy": policy, "channels": {}}
+        futures = {self.executor.submit(self.send_via_channel, channel, title, body): channel for channel in channels}
+        
+        def record(future, channel):
+            report["channels"][channel] = future.result()
         
         try:
-            url = "https://api.pushbullet.com/v2/pushes"
-            headers = {
-                "Access-Token": api_key,
-                "Content-Type": "application/json"
-            }
-            data = {
-                "type": "note",
-                "title": title,
-                "body": body
-            }
-            
-            response = requests.post(url, headers=headers, json=data)
-            
-            if response.status_code == 200:
-                logging.info(f"Pushbullet notificatie verzonden: {title}")
-                return True
+            for future in as_completed(futures, timeout=FANOUT_TIMEOUT):
+                channel = futures[future]
+                record(future, channel)
+                if policy == POLICY_FIRST_SUCCESS and report["channels"][channel]["success"]:
+                    report["success"] = True
+                    break
             else:
-                logging.error(f"Fout bij verzenden van Pushbullet notificatie: {response.text}")
-                return False
-                
-        except Exception as e:
-            logging.error(f"Fout bij verzenden van Pushbullet notificatie: {e}")
-            return False
+                report["success"] = all(result["success"] for result in report["channels"].values())
+        except FuturesTimeoutError:
+            logging.error("Niet alle notificatiekanalen reageerden binnen %s seconden", FANOUT_TIMEOUT)
+        
+        # Kanalen die nog bezig zijn werken het rapport bij zodra ze klaar zijn (vanuit hun eigen thread),
+        # dus loggen gebeurt met een kopie van wat er nu binnen is
+        finished = dict(report["channels"])
+        for future, channel in futures.items():
+            if channel not in finished:
+                future.add_done_callback(lambda f, c=channel: record(f, c))
+        
+        results = ", ".join(f"{channel}: {'ok' if result['success'] else 'mislukt'} ({result['latency'] * 1000:.0f} ms)"
+                            for channel, result in finished.items())
+        logging.info("Notificatie \"%s\" verzonden via %s kanalen (%s): %s", title, len(channels), policy, results)
+        
+        self.last_report = report
+        return report
+
+    def get_notifier(self, channel):
+        """De notifier van een kanaal; die wordt opnieuw gemaakt als de configuratie van het kanaal vervangen is."""
+        settings = self.config.get(channel) or {}
+        notifier = self.notifiers.get(channel)
+        if notifier is None or notifier.config is not settings:
+            if notifier is not None:
+                notifier.close()
+            notifier = self.notifiers[channel] = create_notifier(channel, settings, rate_limiter=self.rate_limiter,
+                                                                          metrics=self.metrics)
+        return notifier
+
+    def deliver(self, channel, title, body, rate_limit=True, template=None):
+        """Bezorg een bericht via de notifier van een kanaal, op de gedeelde async runtime.
+
+        Met een template verwijzing ({"name", "values"}) rendert het kanaal het bericht in zijn eigen opmaak.
+        """
+        notifier = self.get_notifier(channel)
+        return get_async_runtime().run(notifier.send([Notification(title, body, template=template)], rate_limit))[0]
+
+    def send_telegram_notification(self, title, body):
+        """Stuur een notificatie via Telegram."""
+        return self.deliver("telegram", title, body)
+
+    def send_pushbullet_notification(self, title, body):
+        """Stuur een notificatie via Pushbullet."""
+        return self.deliver("pushbullet", title, body)
 
     def send_email_notification(self, title, body):
         """Stuur een notificatie via e-mail (Gmail)."""
-        smtp_server = self.config["email"]["smtp_server"]
-        smtp_port = self.config["email"]["smtp_port"]
-        username = self.config["email"]["username"]
-        password = self.config["email"]["password"]
-        recipient = self.config["email"]["recipient"]
-        
-        if not username or not password or not recipient:
-            logging.error("E-mail configuratie ontbreekt")
-            return False
-        
-        try:
-            # Maak het bericht
-            msg = MIMEMultipart()
-            msg['From'] = username
-            msg['To'] = recipient
-            msg['Subject'] = title
-            
-            # Voeg de tekst toe
-            msg.attach(MIMEText(body, 'plain'))
-            
-            # Maak verbinding met de SMTP server
-            server = smtplib.SMTP(smtp_server, smtp_port)
-            server.starttls()
-            server.login(username, password)
-            
-            # Verstuur het bericht
-            server.send_message(msg)
-            server.quit()
-            
-            logging.info(f"E-mail notificatie verzonden: {title}")
-            return True
-            
-        except Exception as e:
-            logging.error(f"Fout bij verzenden van e-mail notificatie: {e}")
-            return False
+        return self.deliver("email", title, body)
 
     def send_pushover_notification(self, title, body):
         """Stuur een notificatie via Pushover (native iOS notificaties)."""
-        api_token = self.config["pushover"]["api_token"]
-        user_key = self.config["pushover"]["user_key"]
-        
-        if not api_token or not user_key:
-            logging.error("Pushover API token of user key ontbreekt")
-            return False
-        
-        try:
-            url = "https://api.pushover.net/1/messages.json"
-            data = {
-                "token": api_token,
-                "user": user_key,
-                "title": title,
-                "message": body,
-                "sound": "pushover"  # Standaard geluid
-            }
-            
-            response = requests.post(url, data=data)
-            
-            if response.status_code == 200:
-                logging.info(f"Pushover notificatie verzonden: {title}")
-                return True
-            else:
-                logging.error(f"Fout bij verzenden van Pushover notificatie: {response.text}")
-                return False
-                
-        except Exception as e:
-            logging.error(f"Fout bij verzenden van Pushover notificatie: {e}")
-            return False
+        return self.deliver("pushover", title, body)
 
     def send_safari_web_push_notification(self, title, body):
         """Stuur een Safari Web Push notificatie."""
-        # Voor Safari Web Push is een webserver nodig die VAPID ondersteunt
-        # Dit is een complexere implementatie die normaal gesproken via een webserver loopt
-        # Voor deze implementatie gebruiken we een vereenvoudigde versie die alleen lokaal werkt
-        
-        vapid_private_key = self.config["safari_web_push"]["vapid_private_key"]
-        subscription_info = self.config["safari_web_push"]["subscription_info"]
-        
-        if not vapid_private_key or not subscription_info:
-            logging.error("Safari Web Push configuratie ontbreekt")
-            return False
-        
-        try:
-            # In een echte implementatie zou hier de pywebpush bibliotheek worden gebruikt
-            # om een push notificatie te sturen naar de browser
-            # Voor nu loggen we alleen dat dit zou gebeuren
-            
-            logging.info(f"Safari Web Push notificatie zou worden verzonden: {title}")
-            logging.info("Safari Web Push vereist een actieve webserver en client-side JavaScript")
-            logging.info("Zie de documentatie voor instructies over het opzetten van Safari Web Push")
-            
-            # In een echte implementatie zou hier code staan om de notificatie te versturen
-            # via de Web Push API
-            
-            return True
-            
-        except Exception as e:
-            logging.error(f"Fout bij verzenden van Safari Web Push notificatie: {e}")
-            return False
+        return self.deliver("safari_web_push", title, body)
 
     def request_permission(self, message, job):
         """Vraag toestemming aan de gebruiker voor een actie."""
@@ -295,12 +262,13 @@ class NotificationSystem:
         # en wachten op een antwoord van de gebruiker
         
         # Voor nu simuleren we dit door een notificatie te sturen en altijd True terug te geven
-        title = "Toestemming gevraagd"
-        body = f"{message}\n\nDetails:\n- Titel: {job['title']}\n- Locatie: {job['location']}\n- Afstand: {job['distance_to_amsterdam']}km\n\nDeze toestemming wordt automatisch goedgekeurd na {self.config['permission_timeout'] / 60} minuten."
+        title, body = render("permission", message=message, title=job['title'], location=job['location'],
+                             distance=job['distance_to_amsterdam'], timeout=self.config['permission_timeout'] / 60,
+                             default="goedgekeurd")
         
-        self.send_notification(title, body)
+        self.send_notification(title, body, message_type="permission")
         
-        logging.info(f"Toestemming gevraagd voor opdracht: {job['title']}")
+        logging.info("Toestemming gevraagd voor opdracht: %s", job['title'])
         
         # In een echte implementatie zou hier een wachtlus komen die wacht op een antwoord
         # Voor nu geven we altijd True terug
@@ -314,12 +282,13 @@ def get_notification_system():
     global _notification_system
     if _notification_system is None:
         _notification_system = NotificationSystem()
+        get_preferences_service().subscribe(_notification_system.on_preferences_changed)
     return _notification_system
 
-def send_notification(title, body):
+def send_notification(title, body, message_type=None):
     """Stuur een notificatie naar de gebruiker."""
     notification_system = get_notification_system()
-    return notification_system.send_notification(title, body)
+    return notification_system.send_notification(title, body, message_type)
 
 def request_permission(message, job):
     """Vraag toestemming aan de gebruiker voor een actie."""
@@ -328,6 +297,8 @@ def request_permission(message, job):
 
 # Voor testen
 if __name__ == "__main__":
+    setup_logging(LOG_PATH)
+
     # Test het notificatiesysteem
     notification_system = get_notification_system()
     
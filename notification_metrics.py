@@ -0,0 +1,282 @@
+import json
+import time
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Grenzen (seconden) van de latentie histogram, zoals Prometheus ze gebruikt
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Circuit breaker: na zoveel mislukte bezorgingen op rij wordt een kanaal niet meer aangeroepen
+FAILURE_THRESHOLD = 5
+RESET_TIMEOUT = 300  # Seconden tot er weer één proefbericht via het kanaal mag
+
+# Toestanden van een circuit breaker
+STATE_CLOSED = "closed"  # Normaal; berichten gaan via het kanaal
+STATE_OPEN = "open"  # Het kanaal faalt; berichten gaan via een ander kanaal
+STATE_HALF_OPEN = "half_open"  # Het eerstvolgende bericht test of het kanaal weer werkt
+
+# Metrics endpoint (alleen bereikbaar vanaf deze computer)
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9464
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT, clock=time.monotonic):
+        """Houd bij of een kanaal aangeroepen mag worden."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return STATE_CLOSED
+        if self.clock() - self.opened_at < self.reset_timeout:
+            return STATE_OPEN
+        return STATE_HALF_OPEN
+
+    def available(self):
+        """Of het kanaal gebruikt kan worden (dicht, of klaar voor een proefbericht)."""
+        return self.state != STATE_OPEN
+
+    def allow(self):
+        """Of er nu een bericht via het kanaal mag; in half open toestand maar één tegelijk."""
+        state = self.state
+        if state == STATE_CLOSED:
+            return True
+        if state == STATE_HALF_OPEN and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record(self, success):
+        """Verwerk het resultaat van een bezorging; geeft True terug als de breaker daardoor opengaat."""
+        self.probing = False
+        if success:
+            self.failures = 0
+            self.opened_at = None
+            return False
+        self.failures += 1
+        was_closed = self.opened_at is None
+        if self.failures >= self.failure_threshold or not was_closed:
+            self.opened_at = self.clock()
+            return was_closed
+        return False
+
+
+class ProviderMetrics:
+    def __init__(self, breaker):
+        """Bezorgstatistieken van één kanaal."""
+        self.breaker = breaker
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # De laatste is +Inf
+        self.latency_sum = 0.0
+        self.sent = 0
+        self.failed = 0
+        self.rejected = 0  # Niet aangeroepen omdat de circuit breaker open stond
+        self.last_error = None
+        self.last_error_at = None
+
+    def observe(self, latency):
+        for index, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                break
+        else:
+            index = len(LATENCY_BUCKETS)
+        self.buckets[index] += 1
+        self.latency_sum += latency
+
+    def quantile(self, q):
+        """Schat een kwantiel van de latentie: de bovengrens van de bucket waarin het valt."""
+        total = sum(self.buckets)
+        if not total:
+            return None
+        rank = q * total
+        count = 0
+        for index, bucket in enumerate(self.buckets):
+            count += bucket
+            if count >= rank:
+                return LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else float('inf')
+        return float('inf')
+
+    def snapshot(self):
+        attempts = self.sent + self.failed
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "success_rate": self.sent / attempts if attempts else None,
+            "latency_buckets": dict(zip([*map(str, LATENCY_BUCKETS), "+Inf"], self.buckets)),
+            "latency_sum": self.latency_sum,
+            "latency_p50": self.quantile(0.5),
+            "latency_p95": self.quantile(0.95),
+            "last_error": self.last_error,
+            "last_error_at": self.last_error_at,
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+        }
+
+
+class NotificationMetrics:
+    def __init__(self, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT, clock=time.monotonic):
+        """Bezorgstatistieken en circuit breakers van alle notificatiekanalen."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.providers = {}
+        self.lock = threading.Lock()
+
+    def _provider(self, name):
+        provider = self.providers.get(name)
+        if provider is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout, self.clock)
+            provider = self.providers[name] = ProviderMetrics(breaker)
+        return provider
+
+    def available(self, name):
+        """Of een kanaal gebruikt kan worden; een kanaal met een open breaker wordt overgeslagen."""
+        with self.lock:
+            return self._provider(name).breaker.available()
+
+    def allow(self, name):
+        """Vraag toestemming voor één bezorging; telt een weigering mee in de statistieken."""
+        with self.lock:
+            provider = self._provider(name)
+            if provider.breaker.allow():
+                return True
+            provider.rejected += 1
+            return False
+
+    def record(self, name, success, latency, error=None):
+        """Leg het resultaat en de duur (seconden) van een bezorging vast."""
+        with self.lock:
+            provider = self._provider(name)
+            provider.observe(latency)
+            if success:
+                provider.sent += 1
+            else:
+                provider.failed += 1
+                provider.last_error = error or "Bezorging mislukt"
+                provider.last_error_at = time.time()
+            opened = provider.breaker.record(success)
+            failures = provider.breaker.failures
+        if opened:
+            logging.warning("Notificatiekanaal %s faalde %s keer op rij en wordt %.0f seconden overgeslagen: %s",
+                            name, failures, self.reset_timeout, error)
+
+    def snapshot(self):
+        """De statistieken van alle kanalen als dict (voor de GUI en het metrics endpoint)."""
+        with self.lock:
+            return {name: provider.snapshot() for name, provider in sorted(self.providers.items())}
+
+    def reset(self):
+        with self.lock:
+            self.providers.clear()
+
+
+def format_metrics(snapshot):
+    """Een korte tekst per kanaal, voor Telegram en het logboek."""
+    if not snapshot:
+        return "Nog geen notificaties verzonden."
+    lines = []
+    for name, metrics in snapshot.items():
+        rate = "-" if metrics["success_rate"] is None else f"{metrics['success_rate'] * 100:.0f}%"
+        p95 = "-" if metrics["latency_p95"] is None else f"{metrics['latency_p95']:g}s"
+        line = f"{name}: {metrics['sent']} verzonden, {metrics['failed']} mislukt ({rate} geslaagd, p95 <= {p95}), {metrics['state']}"
+        if metrics["last_error"]:
+            line += f"\n  laatste fout: {metrics['last_error']}"
+        lines.append(line)
+    return "\n".join(lines)
+
+def prometheus_text(snapshot):
+    """De statistieken in het Prometheus tekstformaat."""
+    lines = [
+        "# HELP mrfix_notification_latency_seconds Duur van een bezorging per kanaal.",
+        "# TYPE mrfix_notification_latency_seconds histogram",
+    ]
+    for name, metrics in snapshot.items():
+        cumulative = 0
+        for bound, count in metrics["latency_buckets"].items():
+            cumulative += count
+            lines.append(f'mrfix_notification_latency_seconds_bucket{{provider="{name}",le="{bound}"}} {cumulative}')
+        lines.append(f'mrfix_notification_latency_seconds_sum{{provider="{name}"}} {metrics["latency_sum"]}')
+        lines.append(f'mrfix_notification_latency_seconds_count{{provider="{name}"}} {cumulative}')
+
+    lines += ["# HELP mrfix_notifications_total Bezorgingen per kanaal en resultaat.",
+              "# TYPE mrfix_notifications_total counter"]
+    for name, metrics in snapshot.items():
+        for result in ("sent", "failed", "rejected"):
+            lines.append(f'mrfix_notifications_total{{provider="{name}",result="{result}"}} {metrics[result]}')
+
+    lines += ["# HELP mrfix_notification_circuit_open 1 als het kanaal wordt overgeslagen.",
+              "# TYPE mrfix_notification_circuit_open gauge"]
+    for name, metrics in snapshot.items():
+        lines.append(f'mrfix_notification_circuit_open{{provider="{name}"}} {int(metrics["state"] == STATE_OPEN)}')
+    return "\n".join(lines) + "\n"
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """GET /metrics (Prometheus) en GET /metrics.json."""
+
+    def do_GET(self):
+        snapshot = self.server.metrics.snapshot()
+        if self.path == "/metrics":
+            body, content_type = prometheus_text(snapshot).encode(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.json":
+            body, content_type = json.dumps(snapshot).encode(), "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(metrics, host=METRICS_HOST, port=METRICS_PORT):
+    """Start het metrics endpoint in een achtergrondthread; geeft de server terug."""
+    server = ThreadingHTTPServer((host, port), MetricsRequestHandler)
+    server.daemon_threads = True
+    server.metrics = metrics
+    threading.Thread(target=server.serve_forever, name="metrics-endpoint", daemon=True).start()
+    logging.info("Metrics endpoint beschikbaar op http://%s:%s/metrics", host, server.server_address[1])
+    return server
+
+# Singleton instanties
+_notification_metrics = None
+_metrics_server = None
+_lock = threading.RLock()  # start_metrics_server roept get_notification_metrics aan
+
+def get_notification_metrics():
+    """Verkrijg een singleton instantie van de NotificationMetrics."""
+    global _notification_metrics
+    with _lock:
+        if _notification_metrics is None:
+            _notification_metrics = NotificationMetrics()
+        return _notification_metrics
+
+def start_metrics_server(port=METRICS_PORT):
+    """Start het metrics endpoint (eenmalig); None als de poort niet beschikbaar is."""
+    global _metrics_server
+    with _lock:
+        if _metrics_server is None:
+            try:
+                _metrics_server = serve_metrics(get_notification_metrics(), port=port)
+            except OSError as e:
+                logging.error("Kon metrics endpoint niet starten op poort %s: %s", port, e)
+        return _metrics_server
+
+# Voor testen
+if __name__ == "__main__":
+    metrics = get_notification_metrics()
+    metrics.record("telegram", True, 0.3)
+    metrics.record("telegram", False, 10.2, "HTTP 401: Unauthorized")
+    print(format_metrics(metrics.snapshot()))
+    print(prometheus_text(metrics.snapshot()))
@@ -0,0 +1,415 @@
+import os
+import json
+import time
+import uuid
+import logging
+import sqlite3
+import threading
+
+from rate_limit import get_rate_limiter
+
+# Configuratie
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+OUTBOX_DB_PATH = os.path.join(DATA_DIR, 'notification_outbox.db')
+
+# Bezorginstellingen
+WORKER_COUNT = 4  # Aantal bezorgthreads; per kanaal is er altijd maar één tegelijk actief
+MAX_ATTEMPTS = 8  # Daarna wordt een bericht als mislukt gemarkeerd
+RETRY_BASE_DELAY = 5  # Seconden tot de eerste herhaalpoging, daarna telkens verdubbeld
+RETRY_MAX_DELAY = 900  # Nooit langer dan een kwartier wachten tussen pogingen
+IDLE_POLL_INTERVAL = 5  # Seconden dat een worker maximaal slaapt zonder nieuw bericht
+SENT_RETENTION_DAYS = 7  # Verzonden berichten worden daarna opgeruimd
+
+# Samenvoegen van informatieve berichten
+DIGEST_WINDOW = 60  # Seconden dat een niet-urgent bericht wacht op andere berichten voor hetzelfde kanaal
+DIGEST_MAX_MESSAGES = 20  # Maximum aantal berichten in één samenvatting
+
+# Status van een bericht in de outbox
+STATUS_PENDING = 'pending'
+STATUS_SENT = 'sent'
+STATUS_FAILED = 'failed'
+STATUS_SUPERSEDED = 'superseded'  # Niet meer nodig: al via een ander kanaal bezorgd (first_success)
+
+
+def retry_delay(attempts, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY):
+    """Bereken de wachttijd in seconden na een gegeven aantal mislukte pogingen."""
+    return min(base_delay * (2 ** max(attempts - 1, 0)), max_delay)
+
+
+def deliver_notification(channel, title, body, template=None):
+    """Bezorg een bericht via het notificatiesysteem op het opgegeven kanaal."""
+    from notification_enhanced import get_notification_system
+
+    # De outbox heeft het token uit de rate limiter al genomen bij het oppakken van het bericht
+    return get_notification_system().deliver(channel, title, body, rate_limit=False, template=template)
+
+
+def channel_destination(channel):
+    """De bestemming (chat, API key, ontvanger) van een kanaal, voor de rate limit per bestemming."""
+    from notification_enhanced import get_notification_system
+
+    settings = get_notification_system().config.get(channel) or {}
+    for key in ("chat_id", "api_key", "user_key", "recipient"):
+        if settings.get(key):
+            return str(settings[key])
+    return ""
+
+
+def compose_digest(messages):
+    """Voeg (titel, inhoud) paren samen tot één samenvattingsbericht."""
+    if len(messages) == 1:
+        return messages[0]
+
+    title = f"{len(messages)} nieuwe meldingen"
+    body = "\n\n".join(f"• {message_title}\n{message_body}" if message_body else f"• {message_title}"
+                        for message_title, message_body in messages)
+    return title, body
+
+
+def delivery_policy(message_type=None):
+    """Het bezorgbeleid (first_success of all_success) voor een berichttype uit de notificatie configuratie."""
+    from notification_enhanced import get_notification_system
+
+    return get_notification_system().delivery_policy(message_type)
+
+
+def default_channels():
+    """De ingeschakelde kanalen uit de notificatie configuratie, zonder kanalen die herhaaldelijk falen."""
+    from notification_enhanced import get_notification_system
+
+    notification_system = get_notification_system()
+    return notification_system.route(notification_system.enabled_channels())
+
+
+class NotificationOutbox:
+    def __init__(self, db_path=None, deliver=None, workers=WORKER_COUNT, max_attempts=MAX_ATTEMPTS,
+                 base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY, digest_window=DIGEST_WINDOW,
+                 rate_limiter=None, destination=None):
+        """Initialiseer de outbox met een SQLite wachtrij en (nog niet gestarte) bezorgthreads."""
+        self.db_path = db_path or OUTBOX_DB_PATH
+        self.deliver = deliver or deliver_notification
+        self.digest_window = digest_window
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.destination = destination or channel_destination
+        self.worker_count = workers
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._local = threading.local()
+        self._condition = threading.Condition()
+        self._busy_channels = set()
+        self._stop_event = threading.Event()
+        self._workers = []
+
+        self.setup_database()
+        logging.info("Notificatie outbox geïnitialiseerd (%s)", self.db_path)
+
+    def _connection(self):
+        """Geef de SQLite connectie van de huidige thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def setup_database(self):
+        """Maak de outbox tabel aan als die nog niet bestaat."""
+        conn = self._connection()
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel TEXT NOT NULL,
+                title TEXT,
+                body TEXT,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                sent_at REAL,
+                urgent INTEGER NOT NULL DEFAULT 0,
+                template TEXT,
+                delivery_group TEXT
+            )
+        ''')
+        # Oudere outboxen hebben nog geen urgent, template en/of delivery_group kolom
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(outbox)')]
+        if 'urgent' not in columns:
+            conn.execute('ALTER TABLE outbox ADD COLUMN urgent INTEGER NOT NULL DEFAULT 0')
+        if 'template' not in columns:
+            conn.execute('ALTER TABLE outbox ADD COLUMN template TEXT')
+        if 'delivery_group' not in columns:
+            conn.execute('ALTER TABLE outbox ADD COLUMN delivery_group TEXT')
+        conn.execute('CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (status, channel, id)')
+        conn.commit()
+
+    def enqueue(self, title, body, channel=None, urgent=False, template=None, group=None):
+        """Zet een bericht in de outbox; de bezorging gebeurt op de achtergrond.
+
+        Urgente berichten gaan direct weg. Informatieve berichten wachten het samenvattingsvenster
+        af en worden met de andere berichten voor hetzelfde kanaal tot één bericht samengevoegd.
+        Een template verwijzing ({"name", "values"}) wordt bewaard, zodat het kanaal het bericht
+        in zijn eigen opmaak kan renderen; titel en inhoud zijn de platte tekst versie.
+        Berichten met dezelfde group zijn kopieën voor verschillende kanalen: zodra één ervan
+        bezorgd is, worden de andere niet meer (opnieuw) geprobeerd.
+        """
+        channel = channel or default_channels()[0]
+        now = time.time()
+        due = now if urgent else now + self.digest_window
+
+        conn = self._connection()
+        cursor = conn.execute('''
+            INSERT INTO outbox (channel, title, body, status, attempts, next_attempt_at, created_at, urgent, template, delivery_group)
+            VALUES (?, ?, ?, ?, 0, ?, ?, ?, ?, ?)
+        ''', (channel, title, body, STATUS_PENDING, due, now, int(bool(urgent)), json.dumps(template) if template else None, group))
+        conn.commit()
+
+        with self._condition:
+            self._condition.notify()
+        return cursor.lastrowid
+
+    def pending_count(self, channel=None):
+        """Tel de berichten die nog bezorgd moeten worden."""
+        query = 'SELECT COUNT(*) FROM outbox WHERE status = ?'
+        params = [STATUS_PENDING]
+        if channel:
+            query += ' AND channel = ?'
+            params.append(channel)
+        return self._connection().execute(query, params).fetchone()[0]
+
+    def get_message(self, message_id):
+        """Haal een bericht op als dict, of None als het niet bestaat."""
+        conn = self._connection()
+        conn.row_factory = sqlite3.Row
+        try:
+            row = conn.execute('SELECT * FROM outbox WHERE id = ?', (message_id,)).fetchone()
+        finally:
+            conn.row_factory = None
+        return dict(row) if row else None
+
+    def _claim_next(self, claim=True):
+        """Kies de volgende groep berichten voor een kanaal dat niet al door een andere worker wordt bediend.
+
+        Per kanaal zijn er twee rijen: urgente berichten en informatieve berichten. Alleen het eerste
+        bericht van een rij komt in aanmerking, zodat de volgorde binnen een rij behouden blijft, ook
+        als een bericht op een herhaalpoging wacht. Informatieve berichten worden samen met de
+        berichten die erachter staan als één samenvatting verstuurd. Een kanaal waarvan de
+        rate limit bereikt is wordt overgeslagen tot er weer ruimte is.
+        Geeft (groep, wachttijd) terug; groep is None als er nu niets te doen is.
+        """
+        now = time.time()
+        conn = self._connection()
+        heads = conn.execute('''
+            SELECT id, channel, title, body, attempts, next_attempt_at, urgent, template FROM outbox
+            WHERE id IN (SELECT MIN(id) FROM outbox WHERE status = ? GROUP BY channel, urgent)
+            ORDER BY urgent DESC, next_attempt_at
+        ''', (STATUS_PENDING,)).fetchall()
+
+        wait = IDLE_POLL_INTERVAL
+        for message in heads:
+            message_id, channel, next_attempt_at, urgent = message[0], message[1], message[5], message[6]
+            if channel in self._busy_channels:
+                continue
+            if next_attempt_at > now:
+                wait = min(wait, next_attempt_at - now)
+                continue
+
+            destination = self.destination(channel)
+            limit_wait = self.rate_limiter.consume(channel, destination) if claim else self.rate_limiter.wait_time(channel, destination)
+            if limit_wait:
+                wait = min(wait, limit_wait)
+                continue
+
+            group = [message]
+            if not urgent:
+                group += conn.execute('''
+                    SELECT id, channel, title, body, attempts, next_attempt_at, urgent, template FROM outbox
+                    WHERE status = ? AND channel = ? AND urgent = 0 AND id > ?
+                    ORDER BY id LIMIT ?
+                ''', (STATUS_PENDING, channel, message_id, DIGEST_MAX_MESSAGES - 1)).fetchall()
+            if claim:
+                self._busy_channels.add(channel)
+            return group, 0
+        return None, wait
+
+    def process_next(self):
+        """Bezorg één bericht (of samenvatting) als er een klaarstaat. Geeft True terug als er iets is geprobeerd."""
+        with self._condition:
+            group, _ = self._claim_next()
+        if group is None:
+            return False
+
+        self._attempt(group)
+        return True
+
+    def _attempt(self, group):
+        """Doe één bezorgpoging voor een geclaimde groep berichten en leg de uitkomst vast."""
+        channel = group[0][1]
+        try:
+            self._record_attempt(group)
+        finally:
+            with self._condition:
+                self._busy_channels.discard(channel)
+                self._condition.notify_all()
+
+    def _record_attempt(self, group):
+        ids = [message[0] for message in group]
+        channel, attempts = group[0][1], group[0][4]
+        title, body = compose_digest([(message[2], message[3]) for message in group])
+        # Een samenvatting gaat als platte tekst; een los bericht behoudt zijn template
+        template = json.loads(group[0][7]) if len(group) == 1 and group[0][7] else None
+
+        error = None
+        try:
+            delivered = self.deliver(channel, title, body, template=template)
+            if not delivered:
+                error = "Bezorging mislukt"
+        except Exception as e:
+            error = str(e)
+
+        conn = self._connection()
+        placeholders = ', '.join('?' * len(ids))
+        attempts += 1
+        if error is None:
+            conn.execute(f'UPDATE outbox SET status = ?, attempts = ?, sent_at = ?, last_error = NULL WHERE id IN ({placeholders})',
+                         (STATUS_SENT, attempts, time.time(), *ids))
+            if len(ids) > 1:
+                logging.info("%s notificaties samengevoegd verzonden via %s", len(ids), channel)
+            conn.execute(f'''
+                UPDATE outbox SET status = ? WHERE status = ? AND delivery_group IN (
+                    SELECT delivery_group FROM outbox WHERE id IN ({placeholders}) AND delivery_group IS NOT NULL)
+            ''', (STATUS_SUPERSEDED, STATUS_PENDING, *ids))
+        elif attempts >= self.max_attempts:
+            conn.execute(f'UPDATE outbox SET status = ?, attempts = ?, last_error = ? WHERE status = ? AND id IN ({placeholders})',
+                         (STATUS_FAILED, attempts, error, STATUS_PENDING, *ids))
+            logging.error("Notificatie %s via %s definitief mislukt na %s pogingen: %s", ids[0], channel, attempts, error)
+        else:
+            delay = retry_delay(attempts, self.base_delay, self.max_delay)
+            conn.execute(f'UPDATE outbox SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id IN ({placeholders})',
+                         (attempts, time.time() + delay, error, *ids))
+            logging.warning("Notificatie %s via %s mislukt (%s), nieuwe poging over %.0f seconden", ids[0], channel, error, delay)
+        conn.commit()
+
+    def _worker_loop(self):
+        """Hoofdlus van een bezorgthread."""
+        while not self._stop_event.is_set():
+            try:
+                with self._condition:
+                    # Binnen de lock controleren, zodat een stop-signaal niet verloren gaat
+                    if self._stop_event.is_set():
+                        break
+                    group, wait = self._claim_next()
+                    if group is None:
+                        self._condition.wait(wait)
+                        continue
+
+                self._attempt(group)
+            except Exception as e:
+                logging.error("Fout in notificatie worker: %s", e)
+                self._stop_event.wait(1)
+
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+
+    def start(self):
+        """Start de bezorgthreads. Berichten die nog in de outbox stonden worden alsnog bezorgd."""
+        if self._workers:
+            return
+        self._stop_event.clear()
+        self.purge_sent()
+        for i in range(self.worker_count):
+            worker = threading.Thread(target=self._worker_loop, name=f"notification-outbox-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+        pending = self.pending_count()
+        if pending:
+            logging.info("Notificatie outbox gestart met %s openstaande berichten", pending)
+
+    def stop(self, timeout=5):
+        """Stop de bezorgthreads; openstaande berichten blijven in de outbox staan."""
+        self._stop_event.set()
+        with self._condition:
+            self._condition.notify_all()
+        for worker in self._workers:
+            worker.join(timeout)
+        self._workers = []
+
+    def flush(self, timeout=10):
+        """Wacht tot alle direct bezorgbare berichten zijn verwerkt (handig bij afsluiten en in tests)."""
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            with self._condition:
+                group, _ = self._claim_next(claim=False)
+                if group is None and not self._busy_channels:
+                    return True
+                self._condition.wait(0.05)
+        return False
+
+    def purge_sent(self, retention_days=SENT_RETENTION_DAYS):
+        """Ruim verzonden berichten op die ouder zijn dan de bewaartermijn."""
+        conn = self._connection()
+        conn.execute('DELETE FROM outbox WHERE status = ? AND sent_at < ?',
+                     (STATUS_SENT, time.time() - retention_days * 86400))
+        conn.commit()
+
+# Singleton instantie
+_notification_outbox = None
+_outbox_lock = threading.Lock()
+
+def get_notification_outbox():
+    """Verkrijg een singleton instantie van de NotificationOutbox, met gestarte bezorgthreads."""
+    global _notification_outbox
+    with _outbox_lock:
+        if _notification_outbox is None:
+            from notification_enhanced import get_notification_system
+
+            digest_window = get_notification_system().config.get("digest_window", DIGEST_WINDOW)
+            _notification_outbox = NotificationOutbox(digest_window=digest_window)
+            _notification_outbox.start()
+    return _notification_outbox
+
+def stop_notification_outbox(timeout=10):
+    """Bezorg wat direct bezorgd kan worden en stop de bezorgthreads (bij afsluiten)."""
+    with _outbox_lock:
+        outbox = _notification_outbox
+    if outbox is not None:
+        outbox.flush(timeout)
+        outbox.stop()
+
+def enqueue_notification(title, body, channel=None, urgent=False, template=None, message_type=None):
+    """Zet een notificatie in de outbox, één bericht per ingeschakeld kanaal.
+
+    Geeft True terug zodra de berichten veilig zijn opgeslagen; de kanalen worden daarna
+    onafhankelijk van elkaar (en dus gelijktijdig) bezorgd. Niet-urgente berichten worden
+    per kanaal samengevoegd tot een samenvatting. Het bezorgbeleid van het berichttype (standaard
+    de naam van het template) bepaalt of alle kanalen het bericht moeten krijgen (all_success),
+    of dat de andere kanalen na de eerste bezorging vervallen (first_success).
+    """
+    try:
+        from notification_enhanced import POLICY_FIRST_SUCCESS
+
+        outbox = get_notification_outbox()
+        channels = [channel] if channel else default_channels()
+        group = None
+        if len(channels) > 1 and delivery_policy(message_type or (template or {}).get("name")) == POLICY_FIRST_SUCCESS:
+            group = uuid.uuid4().hex[:12]
+        for name in channels:
+            outbox.enqueue(title, body, name, urgent, template, group)
+        return True
+    except Exception as e:
+        logging.error("Fout bij toevoegen van notificatie aan de outbox: %s", e)
+        return False
+
+# Voor testen
+if __name__ == "__main__":
+    outbox = get_notification_outbox()
+    enqueue_notification("Test Notificatie", "Dit is een test notificatie via de outbox.", urgent=True)
+    outbox.flush()
+    outbox.stop()
+    print(f"Openstaande berichten: {outbox.pending_count()}")
@@ -0,0 +1,175 @@
+import logging
+from string import Formatter
+from functools import lru_cache
+from collections import namedtuple
+
+# Opmaak per kanaal
+FORMAT_PLAIN = "plain"
+FORMAT_MARKDOWN = "markdown"  # Telegram MarkdownV2
+FORMAT_HTML = "html"
+
+CHANNEL_FORMATS = {
+    "telegram": FORMAT_MARKDOWN,
+    "pushbullet": FORMAT_PLAIN,
+    "email": FORMAT_HTML,  # Met een platte tekst versie ernaast
+    "pushover": FORMAT_HTML,
+    "safari_web_push": FORMAT_PLAIN,
+}
+
+# Aantal gerenderde berichten dat bewaard blijft (per template, opmaak en waarden)
+RENDER_CACHE_SIZE = 512
+
+# De berichten als (titel, inhoud). {veld} wordt ingevuld en ge-escaped voor de opmaak van het kanaal;
+# tekst tussen *sterretjes* wordt vet (in platte tekst vallen de sterretjes weg)
+TEMPLATES = {
+    "message": ("{title}", "{body}"),
+    "job_accepted": (
+        "Opdracht geaccepteerd: {title}",
+        "Deze opdracht is ingepland op *{slot}* in {location}"
+    ),
+    "permission": (
+        "Toestemming gevraagd",
+        "{message}\n\n*Details:*\n- Titel: {title}\n- Locatie: {location}\n- Afstand: {distance}km\n\n"
+        "Zonder antwoord wordt deze opdracht na {timeout:.0f} minuten automatisch {default}."
+    ),
+    "website_change": (
+        "Website Verandering",
+        "Er is een verandering gedetecteerd op {url}"
+    ),
+    "job_details": (
+        "{title}",
+        "{message}\n\n*Opdracht details:*\n{details}"
+    ),
+}
+
+# Tekens met een betekenis in Telegram MarkdownV2 respectievelijk HTML
+_MARKDOWN_ESCAPES = str.maketrans({char: f"\\{char}" for char in "\\_*[]()~`>#+-=|{}.!"})
+_HTML_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+_BOLD = {
+    FORMAT_PLAIN: ("", ""),
+    FORMAT_MARKDOWN: ("*", "*"),
+    FORMAT_HTML: ("<b>", "</b>"),
+}
+
+Rendered = namedtuple("Rendered", ["title", "body"])
+
+
+def escape(text, fmt):
+    """Escape tekst zodat die letterlijk verschijnt in de opmaak van een kanaal."""
+    text = str(text)
+    if fmt == FORMAT_MARKDOWN:
+        return text.translate(_MARKDOWN_ESCAPES)
+    if fmt == FORMAT_HTML:
+        return text.translate(_HTML_ESCAPES)
+    return text
+
+
+def bold(text, fmt):
+    """Maak (al ge-escapete) tekst vet in de opmaak van een kanaal."""
+    start, end = _BOLD[fmt]
+    return f"{start}{text}{end}"
+
+
+class Template:
+    def __init__(self, source, fmt):
+        """Compileer een template eenmalig voor één opmaak.
+
+        De vaste tekst wordt direct ge-escaped en van opmaak voorzien; bij het renderen hoeven
+        alleen de velden nog ingevuld en ge-escaped te worden.
+        """
+        self.source = source
+        self.fmt = fmt
+        self.parts = []
+
+        is_bold = False
+        for literal, field, spec, conversion in Formatter().parse(source):
+            pieces = literal.split('*')
+            text = escape(pieces[0], fmt)
+            for piece in pieces[1:]:
+                text += _BOLD[fmt][1 if is_bold else 0] + escape(piece, fmt)
+                is_bold = not is_bold
+            if text:
+                self.parts.append(text)
+            if field is not None:
+                self.parts.append((field, spec or "", conversion))
+        if is_bold:
+            raise ValueError(f"Template heeft een niet afgesloten *: {source!r}")
+
+    def render(self, values):
+        """Vul de velden in; ontbrekende velden worden leeg gelaten."""
+        output = []
+        for part in self.parts:
+            if isinstance(part, str):
+                output.append(part)
+                continue
+            field, spec, conversion = part
+            value = values.get(field, "")
+            if conversion == 'r':
+                value = repr(value)
+            elif conversion == 's':
+                value = str(value)
+            try:
+                value = format(value, spec)
+            except (TypeError, ValueError):
+                value = str(value)
+            output.append(escape(value, self.fmt))
+        return "".join(output)
+
+
+def compile_templates(templates):
+    """Compileer alle templates voor alle opmaken."""
+    return {
+        (name, fmt): (Template(title, fmt), Template(body, fmt))
+        for name, (title, body) in templates.items()
+        for fmt in _BOLD
+    }
+
+_compiled = compile_templates(TEMPLATES)
+
+
+@lru_cache(maxsize=RENDER_CACHE_SIZE)
+def _render_cached(name, fmt, items):
+    return _render(name, fmt, dict(items))
+
+def _render(name, fmt, values):
+    try:
+        title_template, body_template = _compiled[(name, fmt)]
+    except KeyError:
+        raise ValueError(f"Onbekend notificatie template of opmaak: {name} ({fmt})")
+    return Rendered(title_template.render(values), body_template.render(values))
+
+def render(name, fmt=FORMAT_PLAIN, **values):
+    """Render een template als (titel, inhoud) voor een opmaak.
+
+    Het resultaat wordt per template, opmaak en waarden bewaard, zodat hetzelfde bericht over
+    een opdracht niet per kanaal of herhaalpoging opnieuw gerenderd wordt.
+    """
+    try:
+        return _render_cached(name, fmt, tuple(sorted(values.items())))
+    except TypeError:
+        # Niet-hashbare waarden (lijsten, dicts): renderen zonder cache
+        return _render(name, fmt, values)
+
+def compose_text(rendered, fmt):
+    """Eén tekst met vette titel en inhoud, voor kanalen zonder apart titelveld (Telegram)."""
+    if not rendered.title:
+        return rendered.body
+    return f"{bold(rendered.title, fmt)}\n\n{rendered.body}"
+
+def template_message(name, **values):
+    """De argumenten voor send_notification/enqueue_notification van een template bericht.
+
+    Titel en inhoud zijn de platte tekst versie (voor de outbox, samenvattingen en logs); elk
+    kanaal rendert het template zelf opnieuw in zijn eigen opmaak.
+    """
+    title, body = render(name, FORMAT_PLAIN, **values)
+    return {"title": title, "body": body, "template": {"name": name, "values": values}}
+
+def render_notification(template, fmt):
+    """Render een template verwijzing ({"name", "values"}) uit de outbox."""
+    try:
+        return render(template["name"], fmt, **(template.get("values") or {}))
+    except Exception as e:
+        logging.error("Fout bij renderen van notificatie template %s: %s", template.get('name'), e)
+        return None
@@ -0,0 +1,47 @@
+"""Register van notificatiekanalen.
+
+Elk kanaal staat hier als "module:Klasse" en wordt pas geïmporteerd als het echt gebruikt wordt,
+zodat kanalen die niet zijn ingeschakeld (en hun afhankelijkheden) nooit geladen worden.
+"""
+import importlib
+import threading
+
+from notifiers.base import Notification, Notifier
+
+PROVIDERS = {
+    "telegram": "notifiers.telegram:TelegramNotifier",
+    "pushbullet": "notifiers.pushbullet:PushbulletNotifier",
+    "email": "notifiers.mail:EmailNotifier",
+    "pushover": "notifiers.pushover:PushoverNotifier",
+    "safari_web_push": "notifiers.web_push:WebPushNotifier",
+}
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def register_provider(name, path):
+    """Registreer (of vervang) een kanaal als "module:Klasse"."""
+    with _lock:
+        PROVIDERS[name] = path
+        _loaded.pop(name, None)
+
+
+def load_provider(name):
+    """Importeer de notifier klasse van een kanaal (eenmalig)."""
+    with _lock:
+        provider = _loaded.get(name)
+        if provider is None:
+            if name not in PROVIDERS:
+                raise ValueError(f"Onbekende notificatiemethode: {name}")
+            module_name, class_name = PROVIDERS[name].split(':')
+            provider = _loaded[name] = getattr(importlib.import_module(module_name), class_name)
+        return provider
+
+
+def create_notifier(name, config=None, **kwargs):
+    """Maak een notifier voor een kanaal met zijn sectie uit de notificatie configuratie."""
+    return load_provider(name)(config, **kwargs)
+
+
+__all__ = ["Notification", "Notifier", "PROVIDERS", "register_provider", "load_provider", "create_notifier"]
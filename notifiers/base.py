@@ -0,0 +1,118 @@
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+
+from rate_limit import get_rate_limiter
+from notification_metrics import get_notification_metrics
+from notification_templates import render, render_notification
+
+
+@dataclass(frozen=True)
+class Notification:
+    """Eén bericht voor een notifier; met een template verwijzing rendert elk kanaal het in zijn eigen opmaak."""
+    title: str
+    body: str = ""
+    urgent: bool = False
+    template: dict = None
+
+    def render(self, fmt):
+        """Titel en inhoud in de opmaak van een kanaal, met de velden ge-escaped."""
+        rendered = render_notification(self.template, fmt) if self.template else None
+        return rendered or render("message", fmt, title=self.title, body=self.body)
+
+
+class Notifier:
+    """Basisklasse voor alle notificatiekanalen.
+
+    Een notifier krijgt zijn eigen sectie uit de notificatie configuratie en bezorgt berichten via
+    send(batch) op de event loop van de async runtime. HTTP verzoeken gaan over de gedeelde
+    keep-alive verbindingen en elk bericht neemt een token uit de gedeelde rate limiter.
+    Elke bezorging wordt gemeten; staat de circuit breaker van het kanaal open, dan wordt het
+    kanaal niet aangeroepen.
+    """
+
+    name = None  # Sleutel van het kanaal in de configuratie en de rate limiter
+    label = None  # Naam in logberichten
+
+    def __init__(self, config=None, client=None, rate_limiter=None, metrics=None):
+        self.config = config if config is not None else {}
+        self._client = client
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.metrics = metrics or get_notification_metrics()
+        self.error = None  # Reden van de laatste mislukte bezorging, voor de statistieken
+
+    @property
+    def client(self):
+        if self._client is None:
+            from async_http import get_http_client
+            self._client = get_http_client()
+        return self._client
+
+    def missing_config(self):
+        """Een foutmelding als de configuratie onvolledig is, anders None."""
+        return None
+
+    def destination(self):
+        """De bestemming (chat, API key, ontvanger) voor de rate limit per bestemming."""
+        return ""
+
+    async def send(self, batch, rate_limit=True):
+        """Bezorg een reeks berichten in volgorde; geeft per bericht True of False terug."""
+        problem = self.missing_config()
+        if problem:
+            logging.error(problem)
+            return [False] * len(batch)
+
+        results = []
+        for notification in batch:
+            result = await self.attempt(lambda: self.deliver(notification), rate_limit)
+            results.append(bool(result))
+        return results
+
+    async def attempt(self, operation, rate_limit=True):
+        """Voer één bezorging (een coroutine functie) uit met circuit breaker, rate limit en meting.
+
+        Geeft het resultaat van operation terug, of None als het kanaal overgeslagen werd of de bezorging mislukte.
+        """
+        if not self.metrics.allow(self.name):
+            logging.warning("%s notificatie overgeslagen: het kanaal faalt herhaaldelijk", self.label)
+            return None
+        if rate_limit:
+            await self.wait_for_token()
+
+        self.error = None
+        start = time.perf_counter()
+        try:
+            result = await operation()
+        except Exception as e:
+            logging.error("Fout bij verzenden van %s notificatie: %s", self.label, e)
+            self.error = str(e) or type(e).__name__
+            result = None
+        self.metrics.record(self.name, bool(result), time.perf_counter() - start, self.error)
+        return result
+
+    async def wait_for_token(self):
+        """Wacht (zonder de event loop te blokkeren) tot de rate limit een bericht toestaat."""
+        while True:
+            wait = self.rate_limiter.consume(self.name, self.destination())
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+    def close(self):
+        """Ruim verbindingen op die alleen deze notifier gebruikt."""
+
+    async def deliver(self, notification):
+        """Bezorg één bericht; geeft True terug bij succes."""
+        raise NotImplementedError
+
+    async def post(self, notification, url, **kwargs):
+        """Verstuur een POST verzoek en log het resultaat zoals alle kanalen dat doen."""
+        response = await self.client.post(url, **kwargs)
+        if response.status == 200:
+            logging.info("%s notificatie verzonden: %s", self.label, notification.title)
+            return True
+        logging.error("Fout bij verzenden van %s notificatie: %s", self.label, response.text())
+        self.error = f"HTTP {response.status}: {response.text()[:200]}"
+        return False
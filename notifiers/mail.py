@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import smtplib
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+
+from smtp_transport import SMTPTransport
+from notifiers.base import Notifier
+from notification_templates import FORMAT_HTML, FORMAT_PLAIN
+
+
+class EmailNotifier(Notifier):
+    """E-mail (Gmail) over een blijvende, ingelogde SMTP verbinding."""
+
+    name = "email"
+    label = "E-mail"
+
+    def __init__(self, config=None, client=None, rate_limiter=None, metrics=None):
+        super().__init__(config, client, rate_limiter, metrics)
+        self.transport = None
+
+    def missing_config(self):
+        if not self.config.get("username") or not self.config.get("password") or not self.config.get("recipient"):
+            return "E-mail configuratie ontbreekt"
+        return None
+
+    def destination(self):
+        return str(self.config.get("recipient", ""))
+
+    def get_transport(self):
+        """De SMTP verbinding; die wordt opnieuw opgebouwd als server, poort of gebruiker veranderen."""
+        smtp_server = self.config.get("smtp_server", "smtp.gmail.com")
+        smtp_port = self.config.get("smtp_port", 587)
+        username = self.config["username"]
+
+        transport = self.transport
+        if transport is None or (transport.server, transport.port, transport.username) != (smtp_server, smtp_port, username):
+            if transport is not None:
+                transport.close()
+            self.transport = SMTPTransport(
+                smtp_server, smtp_port, username, self.config["password"],
+                connect=lambda: smtplib.SMTP(smtp_server, smtp_port)
+            )
+        return self.transport
+
+    def close(self):
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+
+    async def deliver(self, notification):
+        plain = notification.render(FORMAT_PLAIN)
+
+        # Maak het bericht
+        msg = MIMEMultipart('alternative')
+        msg['From'] = self.config["username"]
+        msg['To'] = self.config["recipient"]
+        msg['Subject'] = plain.title
+
+        # Voeg de tekst toe, met een HTML versie voor mailprogramma's die dat tonen
+        html_body = notification.render(FORMAT_HTML).body.replace("\n", "<br>\n")
+        msg.attach(MIMEText(plain.body, 'plain'))
+        msg.attach(MIMEText(html_body, 'html'))
+
+        # smtplib blokkeert; verstuur daarom buiten de event loop via de blijvende SMTP verbinding
+        transport = self.get_transport()
+        if not await asyncio.get_running_loop().run_in_executor(None, transport.send, msg):
+            self.error = "SMTP verzending mislukt"
+            return False
+
+        logging.info("E-mail notificatie verzonden: %s", notification.title)
+        return True
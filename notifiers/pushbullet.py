@@ -0,0 +1,25 @@
+from notifiers.base import Notifier
+from notification_templates import FORMAT_PLAIN
+
+API_URL = "https://api.pushbullet.com/v2/pushes"
+
+
+class PushbulletNotifier(Notifier):
+    name = "pushbullet"
+    label = "Pushbullet"
+
+    def missing_config(self):
+        if not self.config.get("api_key"):
+            return "Pushbullet API key ontbreekt"
+        return None
+
+    def destination(self):
+        return str(self.config.get("api_key", ""))
+
+    async def deliver(self, notification):
+        title, body = notification.render(FORMAT_PLAIN)
+        return await self.post(notification, API_URL, headers={"Access-Token": self.config["api_key"]}, json_body={
+            "type": "note",
+            "title": title,
+            "body": body
+        })
@@ -0,0 +1,30 @@
+from notifiers.base import Notifier
+from notification_templates import FORMAT_HTML, FORMAT_PLAIN
+
+API_URL = "https://api.pushover.net/1/messages.json"
+
+
+class PushoverNotifier(Notifier):
+    """Native iOS notificaties via Pushover."""
+
+    name = "pushover"
+    label = "Pushover"
+
+    def missing_config(self):
+        if not self.config.get("api_token") or not self.config.get("user_key"):
+            return "Pushover API token of user key ontbreekt"
+        return None
+
+    def destination(self):
+        return str(self.config.get("user_key", ""))
+
+    async def deliver(self, notification):
+        # De titel is altijd platte tekst; de inhoud mag (eenvoudige) HTML bevatten
+        return await self.post(notification, API_URL, data={
+            "token": self.config["api_token"],
+            "user": self.config["user_key"],
+            "title": notification.render(FORMAT_PLAIN).title,
+            "message": notification.render(FORMAT_HTML).body,
+            "html": 1,
+            "sound": "pushover"  # Standaard geluid
+        })
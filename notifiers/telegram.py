@@ -0,0 +1,67 @@
+import logging
+
+from notifiers.base import Notifier
+from notification_templates import FORMAT_HTML, FORMAT_MARKDOWN, FORMAT_PLAIN, compose_text
+
+API_BASE = "https://api.telegram.org"
+PARSE_MODES = {FORMAT_MARKDOWN: "MarkdownV2", FORMAT_HTML: "HTML"}
+
+
+class TelegramNotifier(Notifier):
+    name = "telegram"
+    label = "Telegram"
+
+    def missing_config(self):
+        if not self.config.get("bot_token") or not self.config.get("chat_id"):
+            return "Telegram bot token of chat ID ontbreekt"
+        return None
+
+    def destination(self):
+        return str(self.config.get("chat_id", ""))
+
+    def format(self):
+        return FORMAT_HTML if self.config.get("parse_mode") == "HTML" else FORMAT_MARKDOWN
+
+    def url(self, method):
+        return f"{self.config.get('api_base', API_BASE).rstrip('/')}/bot{self.config['bot_token']}/{method}"
+
+    async def call(self, method, params, timeout=10):
+        """Roep een Bot API methode aan en geef het resultaat terug; RuntimeError als Telegram weigert."""
+        response = await self.client.post(self.url(method), json_body=params, timeout=timeout)
+        data = response.json() or {}
+        if not data.get('ok'):
+            raise RuntimeError(f"Telegram {method} mislukt: {data.get('description', response.status)}")
+        return data.get('result')
+
+    async def api(self, method, params, rate_limit=True):
+        """Een Bot API aanroep (zoals een bericht met knoppen) met dezelfde rate limit, metrics en
+        circuit breaker als gewone notificaties. Geeft het resultaat terug, of None als het mislukte."""
+        problem = self.missing_config()
+        if problem:
+            logging.error(problem)
+            return None
+        return await self.attempt(lambda: self.call(method, params), rate_limit)
+
+    async def deliver(self, notification):
+        fmt = self.format()
+        url = self.url("sendMessage")
+        params = {
+            "chat_id": self.config["chat_id"],
+            "text": compose_text(notification.render(fmt), fmt),
+            "parse_mode": PARSE_MODES[fmt]
+        }
+
+        response = await self.client.post(url, json_body=params)
+        if response.status == 400 and "parse" in response.text():
+            # Zou met de escaping niet moeten gebeuren; stuur dan platte tekst in plaats van telkens opnieuw te falen
+            logging.warning("Telegram kon de opmaak niet verwerken, platte tekst verzonden: %s", response.text())
+            params["text"] = compose_text(notification.render(FORMAT_PLAIN), FORMAT_PLAIN)
+            del params["parse_mode"]
+            response = await self.client.post(url, json_body=params)
+
+        if response.status == 200:
+            logging.info("Telegram notificatie verzonden: %s", notification.title)
+            return True
+        logging.error("Fout bij verzenden van Telegram notificatie: %s", response.text())
+        self.error = f"HTTP {response.status}: {response.text()[:200]}"
+        return False
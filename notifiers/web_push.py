@@ -0,0 +1,205 @@
+import os
+import json
+import time
+import hmac
+import base64
+import hashlib
+import logging
+import threading
+from urllib.parse import urlsplit
+
+from notifiers.base import Notifier
+from notification_templates import FORMAT_PLAIN
+from persistence import atomic_write_json
+
+# cryptography is alleen nodig voor Web Push (ECDH, AES-GCM en ES256 handtekeningen)
+try:
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:
+    ec = None
+
+# Configuratie
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+EXPIRED_SUBSCRIPTIONS_FILE = os.path.join(DATA_DIR, 'web_push_expired.json')
+
+# Standaardinstellingen
+VAPID_TOKEN_LIFETIME = 12 * 3600  # Seconden; push services accepteren maximaal 24 uur
+VAPID_REFRESH_MARGIN = 3600  # Een token wordt vernieuwd als het binnen dit aantal seconden verloopt
+VAPID_SUBJECT = "mailto:mrfix@localhost"
+PUSH_TTL = 24 * 3600  # Seconden dat de push service een bericht bewaart voor een offline apparaat
+RECORD_SIZE = 4096  # Eén aes128gcm record; groter mag een Web Push bericht niet zijn
+MAX_PAYLOAD = RECORD_SIZE - 17 - 86  # Minus padding, GCM tag en de header van het bericht
+
+
+def b64url_decode(data):
+    """Decodeer base64url zonder padding, zoals in abonnementen en VAPID keys."""
+    data = data.strip()
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+def b64url_encode(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+def hkdf(salt, ikm, info, length):
+    """HKDF-SHA256 (RFC 5869) voor uitvoer tot 32 bytes, zoals Web Push die nodig heeft."""
+    prk = hmac.new(salt, ikm, hashlib.sha256).digest()
+    return hmac.new(prk, info + b'\x01', hashlib.sha256).digest()[:length]
+
+def public_key_bytes(key):
+    """De publieke sleutel als ongecomprimeerd P-256 punt (65 bytes)."""
+    return key.public_key().public_bytes(serialization.Encoding.X962, serialization.PublicFormat.UncompressedPoint)
+
+def load_vapid_key(value):
+    """Laad de VAPID private key: base64url van de ruwe 32 bytes, of PEM."""
+    if value.strip().startswith('-----BEGIN'):
+        return serialization.load_pem_private_key(value.encode(), password=None)
+    return ec.derive_private_key(int.from_bytes(b64url_decode(value), 'big'), ec.SECP256R1())
+
+def encrypt_payload(payload, p256dh, auth, salt=None, server_key=None):
+    """Versleutel een bericht voor een abonnement volgens RFC 8291 (Content-Encoding: aes128gcm)."""
+    ua_public = b64url_decode(p256dh)
+    auth_secret = b64url_decode(auth)
+    server_key = server_key or ec.generate_private_key(ec.SECP256R1())
+    server_public = public_key_bytes(server_key)
+    salt = salt or os.urandom(16)
+
+    shared_secret = server_key.exchange(ec.ECDH(), ec.EllipticCurvePublicKey.from_encoded_point(ec.SECP256R1(), ua_public))
+    ikm = hkdf(auth_secret, shared_secret, b"WebPush: info\x00" + ua_public + server_public, 32)
+    content_key = hkdf(salt, ikm, b"Content-Encoding: aes128gcm\x00", 16)
+    nonce = hkdf(salt, ikm, b"Content-Encoding: nonce\x00", 12)
+
+    # Eén record; 0x02 markeert het laatste record
+    ciphertext = AESGCM(content_key).encrypt(nonce, payload + b'\x02', None)
+    header = salt + RECORD_SIZE.to_bytes(4, 'big') + bytes([len(server_public)]) + server_public
+    return header + ciphertext
+
+def origin_of(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class VapidSigner:
+    def __init__(self, private_key, subject=VAPID_SUBJECT, lifetime=VAPID_TOKEN_LIFETIME,
+                 refresh_margin=VAPID_REFRESH_MARGIN, clock=time.time):
+        """Maak VAPID tokens (RFC 8292) en bewaar ze per push service tot ze bijna verlopen."""
+        self.private_key = private_key
+        self.subject = subject
+        self.lifetime = lifetime
+        self.refresh_margin = refresh_margin
+        self.clock = clock
+        self.public_key = b64url_encode(public_key_bytes(private_key))
+        self.tokens = {}
+        self.lock = threading.Lock()
+
+    def sign(self, audience, expires):
+        header = b64url_encode(json.dumps({"typ": "JWT", "alg": "ES256"}, separators=(',', ':')).encode())
+        claims = b64url_encode(json.dumps({"aud": audience, "exp": int(expires), "sub": self.subject},
+                                          separators=(',', ':')).encode())
+        signing_input = f"{header}.{claims}".encode('ascii')
+        r, s = decode_dss_signature(self.private_key.sign(signing_input, ec.ECDSA(hashes.SHA256())))
+        return f"{header}.{claims}.{b64url_encode(r.to_bytes(32, 'big') + s.to_bytes(32, 'big'))}"
+
+    def authorization(self, audience):
+        """De Authorization header voor een push service; het token wordt hergebruikt zolang het geldig is."""
+        now = self.clock()
+        with self.lock:
+            token, expires = self.tokens.get(audience, (None, 0))
+            if token is None or expires - now < self.refresh_margin:
+                expires = now + self.lifetime
+                token = self.sign(audience, expires)
+                self.tokens[audience] = (token, expires)
+        return f"vapid t={token}, k={self.public_key}"
+
+
+class WebPushNotifier(Notifier):
+    """Web Push (onder andere Safari op macOS en iOS) met versleutelde berichten en VAPID.
+
+    De verbindingen met elke push service (origin) worden door de gedeelde HTTP client bewaard.
+    Abonnementen die de push service als verlopen meldt (404/410) worden onthouden en overgeslagen.
+    """
+
+    name = "safari_web_push"
+    label = "Safari Web Push"
+
+    def __init__(self, config=None, client=None, rate_limiter=None, metrics=None, clock=time.time, expired_file=None):
+        super().__init__(config, client, rate_limiter, metrics)
+        self.clock = clock
+        self.expired_file = expired_file or EXPIRED_SUBSCRIPTIONS_FILE
+        self.expired = self.load_expired()
+        self.signer = None
+
+    def load_expired(self):
+        try:
+            with open(self.expired_file, 'r') as f:
+                return set(json.load(f))
+        except (OSError, ValueError):
+            return set()
+
+    def save_expired(self):
+        atomic_write_json(self.expired_file, sorted(self.expired))
+
+    def subscriptions(self):
+        """De actieve abonnementen; subscription_info mag één abonnement of een lijst zijn."""
+        info = self.config.get("subscription_info") or []
+        if isinstance(info, dict):
+            info = [info]
+        return [subscription for subscription in info
+                if subscription.get("endpoint") and subscription["endpoint"] not in self.expired]
+
+    def missing_config(self):
+        if ec is None:
+            return "Safari Web Push vereist de cryptography module (pip install cryptography)"
+        if not self.config.get("vapid_private_key") or not self.subscriptions():
+            return "Safari Web Push configuratie ontbreekt"
+        return None
+
+    def get_signer(self):
+        if self.signer is None:
+            self.signer = VapidSigner(load_vapid_key(self.config["vapid_private_key"]),
+                                      subject=self.config.get("vapid_subject", VAPID_SUBJECT), clock=self.clock)
+        return self.signer
+
+    async def deliver(self, notification):
+        title, body = notification.render(FORMAT_PLAIN)
+        payload = json.dumps({"title": title, "body": body}).encode('utf-8')
+        while len(payload) > MAX_PAYLOAD and body:
+            # Het moet in één record passen; de inhoud wordt ingekort tot het past
+            body = body[:max(len(body) - (len(payload) - MAX_PAYLOAD) - 1, 0)]
+            payload = json.dumps({"title": title, "body": body + "…"}).encode('utf-8')
+
+        delivered = False
+        for subscription in self.subscriptions():
+            if await self.push(subscription, payload, notification.urgent):
+                delivered = True
+        return delivered
+
+    async def push(self, subscription, payload, urgent=False):
+        """Stuur een versleuteld bericht naar één abonnement."""
+        endpoint = subscription["endpoint"]
+        keys = subscription.get("keys") or {}
+        body = encrypt_payload(payload, keys["p256dh"], keys["auth"])
+
+        response = await self.client.post(endpoint, data=body, headers={
+            "Authorization": self.get_signer().authorization(origin_of(endpoint)),
+            "Content-Encoding": "aes128gcm",
+            "Content-Type": "application/octet-stream",
+            "TTL": str(self.config.get("ttl", PUSH_TTL)),
+            "Urgency": "high" if urgent else "normal",
+        })
+
+        if response.ok:
+            logging.info("Safari Web Push notificatie verzonden naar %s", origin_of(endpoint))
+            return True
+        if response.status in (404, 410):
+            # Het abonnement bestaat niet meer (browser afgemeld of verlopen); niet opnieuw proberen
+            logging.warning("Web Push abonnement verlopen (%s), wordt overgeslagen: %s", response.status, endpoint)
+            self.expired.add(endpoint)
+            self.save_expired()
+            self.error = f"Abonnement verlopen ({response.status})"
+            return False
+        logging.error("Fout bij verzenden van Safari Web Push notificatie (%s): %s", response.status, response.text())
+        self.error = f"HTTP {response.status}: {response.text()[:200]}"
+        return False
@@ -0,0 +1,345 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+import sqlite3
+from contextlib import closing
+
+from job import Job
+from notification_templates import FORMAT_MARKDOWN, render
+
+# Configuratie
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+DB_PATH = os.path.join(DATA_DIR, 'mrfix.db')
+
+# Standaardinstellingen
+PERMISSION_TIMEOUT = 600  # Seconden; daarna beslissen we zelf
+AUTO_APPROVE_ON_TIMEOUT = True  # Zonder antwoord wordt de opdracht (zoals aangekondigd) goedgekeurd
+CALLBACK_PREFIX = "perm"
+
+# Status van een toestemmingsverzoek
+STATUS_PENDING = 'pending'
+STATUS_APPROVED = 'approved'
+STATUS_DENIED = 'denied'
+
+
+def configured_telegram():
+    """De Telegram notifier uit de huidige notificatie configuratie, of None als er geen bot is ingesteld."""
+    from notification_enhanced import get_notification_system
+
+    notifier = get_notification_system().get_notifier("telegram")
+    return notifier if notifier.missing_config() is None else None
+
+
+def permission_keyboard(request_id):
+    """De inline knoppen onder een toestemmingsverzoek."""
+    return {
+        "inline_keyboard": [[
+            {"text": "✅ Accepteren", "callback_data": f"{CALLBACK_PREFIX}:{request_id}:yes"},
+            {"text": "❌ Weigeren", "callback_data": f"{CALLBACK_PREFIX}:{request_id}:no"},
+        ]]
+    }
+
+
+class PermissionManager:
+    def __init__(self, db_path=None, telegram=None, timeout=PERMISSION_TIMEOUT,
+                 auto_approve=AUTO_APPROVE_ON_TIMEOUT, fallback_notify=None, runtime=None):
+        """Initialiseer de toestemmingsafhandeling.
+
+        telegram is een functie die de huidige Telegram notifier geeft (of None) en wordt bij elk verzoek
+        opnieuw aangeroepen, zodat een gewijzigde bot configuratie direct geldt. Zonder notifier gaat het
+        verzoek als gewone notificatie via fallback_notify en beslist de timeout. De Telegram aanroepen
+        draaien op de gedeelde async runtime (of runtime), dus de filter wacht er niet op.
+        """
+        self.db_path = db_path or DB_PATH
+        self.telegram = telegram
+        self.runtime = runtime
+        self.timeout = timeout
+        self.auto_approve = auto_approve
+        self.fallback_notify = fallback_notify
+        self.subscribers = []
+
+        self.setup_database()
+        logging.info("PermissionManager geïnitialiseerd")
+
+    def subscribe(self, callback):
+        """Roep callback(verzoek id, goedgekeurd) aan bij elke beslissing; verlopen verzoeken geven verzoek id None."""
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def publish(self, request_id, approved):
+        for callback in list(self.subscribers):
+            try:
+                callback(request_id, approved)
+            except Exception as e:
+                logging.error("Fout bij verwerken van beslissing over toestemmingsverzoek %s: %s", request_id, e)
+
+    def telegram_notifier(self):
+        return self.telegram() if self.telegram else None
+
+    def submit(self, coro):
+        """Start een coroutine op de async runtime zonder op het resultaat te wachten."""
+        if self.runtime is None:
+            from async_runtime import get_async_runtime
+            self.runtime = get_async_runtime()
+        return self.runtime.submit(coro)
+
+    def _connect(self):
+        # Eén korte connectie per bewerking, zodat de Telegram ontvanger en de filter elkaar niet hinderen
+        return closing(sqlite3.connect(self.db_path, timeout=10))
+
+    def setup_database(self):
+        """Maak de tabel met toestemmingsverzoeken aan als die nog niet bestaat."""
+        with self._connect() as conn:
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS permission_requests (
+                    id TEXT PRIMARY KEY,
+                    job_id TEXT NOT NULL,
+                    job TEXT NOT NULL,
+                    message TEXT,
+                    status TEXT NOT NULL,
+                    decided_by TEXT,
+                    handled INTEGER NOT NULL DEFAULT 0,
+                    telegram_message_id INTEGER,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    decided_at REAL
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS permission_requests_job ON permission_requests (job_id)')
+            conn.commit()
+
+    def request(self, message, job):
+        """Vraag toestemming voor een opdracht zonder te wachten op het antwoord.
+
+        Geeft True (goedgekeurd), False (geweigerd) of None (nog geen beslissing, opdracht geparkeerd) terug.
+        Een tweede aanroep voor dezelfde opdracht stuurt geen nieuw verzoek maar geeft de huidige stand.
+        """
+        job = Job.coerce(job)
+        self.expire_requests()
+
+        with self._connect() as conn:
+            row = conn.execute('''
+                SELECT status FROM permission_requests WHERE job_id = ? ORDER BY created_at DESC LIMIT 1
+            ''', (job.id,)).fetchone()
+        if row is not None:
+            return {STATUS_APPROVED: True, STATUS_DENIED: False}.get(row[0])
+
+        request_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute('''
+                INSERT INTO permission_requests (id, job_id, job, message, status, created_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (request_id, job.id, json.dumps(job.to_dict()), message, STATUS_PENDING, now, now + self.timeout))
+            conn.commit()
+
+        self.send_request(request_id, message, job)
+        logging.info("Toestemming gevraagd voor opdracht: %s (verzoek %s)", job.title, request_id)
+        return None
+
+    def send_request(self, request_id, message, job):
+        """Stuur het toestemmingsverzoek met knoppen naar Telegram (of als gewone notificatie)."""
+        values = dict(message=message, title=job.title, location=job.location, distance=job.distance_to_amsterdam,
+                      timeout=self.timeout / 60, default="goedgekeurd" if self.auto_approve else "geweigerd")
+
+        notifier = self.telegram_notifier()
+        if notifier is not None:
+            self.submit(self.send_telegram_request(notifier, request_id, values))
+            self.start_polling()
+            return True
+        return self.send_fallback(values)
+
+    def send_fallback(self, values):
+        if self.fallback_notify:
+            return self.fallback_notify(*render("permission", **values))
+        return False
+
+    async def send_telegram_request(self, notifier, request_id, values):
+        """Verstuur het verzoek via de notifier (rate limit, metrics en circuit breaker inbegrepen)."""
+        result = await notifier.api("sendMessage", {
+            "chat_id": notifier.config["chat_id"],
+            "text": render("permission", FORMAT_MARKDOWN, **values).body,
+            "parse_mode": "MarkdownV2",
+            "reply_markup": permission_keyboard(request_id),
+        })
+
+        # De database en de fallback blokkeren; die horen niet op de event loop
+        loop = asyncio.get_running_loop()
+        if result is None:
+            logging.error("Toestemmingsverzoek %s niet via Telegram verstuurd: %s", request_id, notifier.error)
+            return await loop.run_in_executor(None, self.send_fallback, values)
+        await loop.run_in_executor(None, self.save_message_id, request_id, result.get('message_id'))
+        return True
+
+    def save_message_id(self, request_id, telegram_message_id):
+        with self._connect() as conn:
+            conn.execute('UPDATE permission_requests SET telegram_message_id = ? WHERE id = ?',
+                         (telegram_message_id, request_id))
+            conn.commit()
+
+    def decide(self, request_id, approved, decided_by="gebruiker"):
+        """Leg een beslissing vast. Geeft False terug als het verzoek al beslist (of onbekend) was."""
+        status = STATUS_APPROVED if approved else STATUS_DENIED
+        with self._connect() as conn:
+            cursor = conn.execute('''
+                UPDATE permission_requests SET status = ?, decided_by = ?, decided_at = ?
+                WHERE id = ? AND status = ?
+            ''', (status, decided_by, time.time(), request_id, STATUS_PENDING))
+            conn.commit()
+            changed = cursor.rowcount > 0
+
+        if changed:
+            logging.info("Toestemmingsverzoek %s %s door %s", request_id, 'goedgekeurd' if approved else 'geweigerd', decided_by)
+            self.publish(request_id, approved)
+        return changed
+
+    def expire_requests(self):
+        """Beslis verlopen verzoeken volgens de standaardbeslissing; geeft het aantal verlopen verzoeken terug."""
+        status = STATUS_APPROVED if self.auto_approve else STATUS_DENIED
+        now = time.time()
+        with self._connect() as conn:
+            cursor = conn.execute('''
+                UPDATE permission_requests SET status = ?, decided_by = 'timeout', decided_at = ?
+                WHERE status = ? AND expires_at <= ?
+            ''', (status, now, STATUS_PENDING, now))
+            conn.commit()
+            expired = cursor.rowcount
+
+        if expired:
+            logging.info("%s toestemmingsverzoeken verlopen en automatisch %s", expired, status)
+            self.publish(None, self.auto_approve)
+        return expired
+
+    def decided_jobs(self):
+        """Geef de geparkeerde opdrachten waarvoor inmiddels toestemming is gegeven.
+
+        Een opdracht blijft terugkomen tot mark_handled() is aangeroepen, zodat een goedkeuring niet
+        verloren gaat als de filterronde halverwege mislukt. Geweigerde verzoeken zijn direct afgehandeld.
+        """
+        self.expire_requests()
+        with self._connect() as conn:
+            conn.execute('UPDATE permission_requests SET handled = 1 WHERE status = ? AND handled = 0', (STATUS_DENIED,))
+            conn.commit()
+            rows = conn.execute('''
+                SELECT job FROM permission_requests
+                WHERE status = ? AND handled = 0
+                ORDER BY decided_at
+            ''', (STATUS_APPROVED,)).fetchall()
+
+        return [Job.from_dict(json.loads(row[0])) for row in rows]
+
+    def mark_handled(self, job_id):
+        """Leg vast dat de goedgekeurde opdracht verwerkt is; decided_jobs() geeft hem daarna niet meer."""
+        with self._connect() as conn:
+            conn.execute('UPDATE permission_requests SET handled = 1 WHERE job_id = ? AND status = ? AND handled = 0',
+                         (job_id, STATUS_APPROVED))
+            conn.commit()
+
+    def pending_count(self):
+        """Tel de verzoeken waarop nog een antwoord verwacht wordt."""
+        with self._connect() as conn:
+            return conn.execute('SELECT COUNT(*) FROM permission_requests WHERE status = ?', (STATUS_PENDING,)).fetchone()[0]
+
+    def parse_callback(self, data):
+        """Lees (verzoek id, goedgekeurd) uit de callback_data van een knop; None als het geen toestemmingsknop is."""
+        parts = (data or '').split(':')
+        if len(parts) != 3 or parts[0] != CALLBACK_PREFIX:
+            return None
+        _, request_id, answer = parts
+        return request_id, answer == 'yes'
+
+    def request_for_message(self, telegram_message_id=None):
+        """Het openstaande verzoek bij een Telegram bericht, of het meest recente openstaande verzoek."""
+        with self._connect() as conn:
+            if telegram_message_id is not None:
+                row = conn.execute('''
+                    SELECT id FROM permission_requests WHERE telegram_message_id = ? AND status = ?
+                ''', (telegram_message_id, STATUS_PENDING)).fetchone()
+            else:
+                row = conn.execute('''
+                    SELECT id FROM permission_requests WHERE status = ? ORDER BY created_at DESC LIMIT 1
+                ''', (STATUS_PENDING,)).fetchone()
+        return row[0] if row else None
+
+    def callback_answers(self, callback, changed, approved):
+        """De Telegram aanroepen (methode, parameters) die een druk op een knop bevestigen."""
+        reply = ("Opdracht geaccepteerd" if approved else "Opdracht geweigerd") if changed else "Hierover is al beslist"
+        calls = [("answerCallbackQuery", {"callback_query_id": callback.get('id'), "text": reply})]
+        message = callback.get('message') or {}
+        chat_id = message.get('chat', {}).get('id')
+        if changed and message.get('message_id') and chat_id is not None:
+            calls.append(("editMessageReplyMarkup", {
+                "chat_id": chat_id,
+                "message_id": message['message_id'],
+                "reply_markup": {"inline_keyboard": [[{"text": f"✔ {reply}", "callback_data": "noop"}]]},
+            }))
+        return calls
+
+    def handle_update(self, update):
+        """Verwerk een Telegram update synchroon (bijvoorbeeld van een lokale webhook)."""
+        callback = update.get('callback_query')
+        if not callback:
+            return False
+
+        parsed = self.parse_callback(callback.get('data'))
+        if parsed is None:
+            return False
+
+        request_id, approved = parsed
+        changed = self.decide(request_id, approved)
+
+        notifier = self.telegram_notifier()
+        if notifier is not None:
+            self.submit(self.answer_callback(notifier, self.callback_answers(callback, changed, approved)))
+        return changed
+
+    async def answer_callback(self, notifier, calls):
+        # Bevestigingen zijn geen nieuwe berichten; ze hoeven niet op de rate limit te wachten
+        for method, params in calls:
+            await notifier.api(method, params, rate_limit=False)
+
+    def start_polling(self):
+        """Zorg dat de Telegram ontvanger draait, zodat antwoorden op de knoppen binnenkomen."""
+        if self.telegram_notifier() is None:
+            return
+        from telegram_receiver import start_telegram_receiver
+        start_telegram_receiver()
+
+# Singleton instantie
+_permission_manager = None
+
+def get_permission_manager():
+    """Verkrijg een singleton instantie van de PermissionManager, met Telegram uit de notificatie configuratie."""
+    global _permission_manager
+    if _permission_manager is None:
+        from notification_enhanced import get_notification_system
+        from notification_outbox import enqueue_notification
+
+        config = get_notification_system().config
+        _permission_manager = PermissionManager(
+            telegram=configured_telegram,
+            timeout=config.get("permission_timeout", PERMISSION_TIMEOUT),
+            fallback_notify=lambda title, body: enqueue_notification(title, body, urgent=True, message_type="permission")
+        )
+        if _permission_manager.pending_count():
+            _permission_manager.start_polling()
+    return _permission_manager
+
+def request_permission(message, job):
+    """Vraag toestemming voor een opdracht: True, False of None (wacht op antwoord, opdracht geparkeerd)."""
+    return get_permission_manager().request(message, job)
+
+def decided_jobs():
+    """Geef de geparkeerde opdrachten terug waarvoor inmiddels toestemming is gegeven."""
+    return get_permission_manager().decided_jobs()
+
+def mark_handled(job_id):
+    """Leg vast dat een goedgekeurde geparkeerde opdracht verwerkt is."""
+    get_permission_manager().mark_handled(job_id)
@@ -0,0 +1,97 @@
+import os
+import json
+import logging
+import tempfile
+import threading
+
+# Achtervoegsel van de vorige versie van een bestand
+BACKUP_SUFFIX = ".bak"
+
+_locks = {}
+_locks_lock = threading.Lock()
+
+def path_lock(path):
+    """Eén lock per bestand, zodat bijvoorbeeld de GUI en de monitor thread niet door elkaar schrijven."""
+    path = os.path.abspath(path)
+    with _locks_lock:
+        lock = _locks.get(path)
+        if lock is None:
+            lock = _locks[path] = threading.Lock()
+        return lock
+
+def read_bytes(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+def fsync_directory(directory):
+    """Leg de rename vast op schijf; niet mogelijk (en niet nodig) op Windows."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def atomic_write_bytes(path, data):
+    """Schrijf naar een tijdelijk bestand naast het doel, fsync, en vervang het doel in één keer.
+
+    Na een crash staat er dus altijd óf de oude óf de nieuwe inhoud, nooit een half bestand.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    fsync_directory(directory)
+
+def atomic_write_json(path, data, indent=None, sort_keys=False, backup=False):
+    """Sla data op als JSON zonder het bestand bij een crash te beschadigen.
+
+    Is de inhoud gelijk aan wat er al staat, dan wordt er niets geschreven. Met backup=True
+    blijft de vorige versie bewaard als <bestand>.bak. Geeft True terug als er geschreven is.
+    """
+    content = json.dumps(data, indent=indent, sort_keys=sort_keys).encode('utf-8')
+    with path_lock(path):
+        current = read_bytes(path)
+        if current == content:
+            return False
+        if backup and current is not None:
+            atomic_write_bytes(path + BACKUP_SUFFIX, current)
+        atomic_write_bytes(path, content)
+        return True
+
+def load_json(path, use_backup=False):
+    """Lees een JSON bestand; met use_backup=True wordt bij een beschadigd bestand de .bak gelezen."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except ValueError as e:
+        backup_path = path + BACKUP_SUFFIX
+        if not use_backup or not os.path.exists(backup_path):
+            raise
+        logging.warning("%s is beschadigd (%s), vorige versie uit %s wordt gebruikt", path, e, backup_path)
+        with open(backup_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+# Voor testen
+if __name__ == "__main__":
+    path = os.path.join(tempfile.gettempdir(), "mrfix_persistence_test.json")
+    print(atomic_write_json(path, {"offset": 1}, backup=True))
+    print(atomic_write_json(path, {"offset": 1}, backup=True))
+    print(load_json(path, use_backup=True))
@@ -0,0 +1,431 @@
+"""Eén gedeelde, gevalideerde kopie van de gebruikersvoorkeuren.
+
+Het voorkeuren bestand wordt één keer gelezen en omgezet naar een onveranderlijke Preferences
+snapshot die alle onderdelen (filter, agenda, notificaties, GUI) delen. Bij opslaan of herladen
+wordt de snapshot in één keer vervangen en krijgen abonnees een wijzigingsbericht. Met watch()
+wordt het bestand gevolgd en na een wijziging van buitenaf automatisch herladen.
+
+In de loop der tijd zijn er verschillende schema's in omloop geweest; die worden hier allemaal
+gelezen en als één schema weer opgeslagen:
+- max_jobs_weekday met "0" t/m "6", waarbij "0" zondag is (oude GUI en JobFilter)
+- max_jobs_monday t/m max_jobs_sunday (verbeterde GUI)
+- schedule.max_jobs_per_day (ook "0" = zondag), schedule.available_from, location.*
+- check_interval in minuten in plaats van monitoring_interval in seconden
+"""
+import os
+import logging
+import threading
+from dataclasses import dataclass, field, fields, replace
+
+from file_watcher import FileWatcher, DEBOUNCE_DELAY
+from persistence import atomic_write_json, load_json
+
+# Configuratie
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+PREFERENCES_FILE = os.path.join(DATA_DIR, 'user_preferences.json')
+
+# Versie van het schema waarin de voorkeuren worden opgeslagen
+SCHEMA_VERSION = 2
+
+# Dagen in de volgorde van date.weekday() (maandag = 0)
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+WEEKDAY_LABELS = ("Maandag", "Dinsdag", "Woensdag", "Donderdag", "Vrijdag", "Zaterdag", "Zondag")
+
+# Standaard instellingen per notificatiekanaal
+CHANNEL_DEFAULTS = {
+    "telegram": {"bot_token": "", "chat_id": ""},
+    "pushbullet": {"api_key": ""},
+    "email": {"smtp_server": "smtp.gmail.com", "smtp_port": 587, "username": "", "password": "", "recipient": ""},
+    "pushover": {"api_token": "", "user_key": ""},
+    "safari_web_push": {"vapid_private_key": "", "vapid_public_key": "", "subscription_info": {}},
+}
+
+
+class FrozenDict(dict):
+    """Een dict die niet meer gewijzigd kan worden (blijft een dict voor json en isinstance)."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Voorkeuren zijn onveranderlijk; gebruik get_preferences_service().save()")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _readonly
+
+    def __hash__(self):
+        return hash(tuple(sorted(self.items(), key=lambda item: item[0])))
+
+
+def freeze(value):
+    """Maak een (geneste) JSON waarde onveranderlijk."""
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+def thaw(value):
+    """Een gewone, aanpasbare kopie van een bevroren waarde (voor de GUI en het opslaan)."""
+    if isinstance(value, dict):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+@dataclass(frozen=True)
+class Preferences:
+    # Opdrachttypes
+    prefer_ikea: bool = True
+    prefer_electrical: bool = True
+    prefer_internet: bool = True
+    prefer_urgent: bool = True
+    min_hourly_rate: float = 79
+
+    # Planning; max_jobs_per_day is maandag t/m zondag, zodat max_jobs_per_day[datum.weekday()] klopt
+    max_jobs_per_day: tuple = (5, 2, 5, 2, 2, 3, 3)
+    available_from: str = None
+
+    # Locatie
+    prefer_amsterdam: bool = True
+    max_distance_without_permission: float = 20  # km
+    travel_time_between_jobs: int = 60  # minuten; terugvaloptie als de reistijd niet bekend is
+    home_location: str = "Amsterdam"
+
+    # Monitoring
+    monitoring_interval: int = 300  # seconden
+    auto_accept: bool = True
+
+    # Notificaties
+    notification_method: str = "telegram"
+    notification_methods: FrozenDict = field(default_factory=FrozenDict)
+    telegram: FrozenDict = field(default_factory=lambda: freeze(CHANNEL_DEFAULTS["telegram"]))
+    pushbullet: FrozenDict = field(default_factory=lambda: freeze(CHANNEL_DEFAULTS["pushbullet"]))
+    email: FrozenDict = field(default_factory=lambda: freeze(CHANNEL_DEFAULTS["email"]))
+    pushover: FrozenDict = field(default_factory=lambda: freeze(CHANNEL_DEFAULTS["pushover"]))
+    safari_web_push: FrozenDict = field(default_factory=lambda: freeze(CHANNEL_DEFAULTS["safari_web_push"]))
+    notify_new_jobs: bool = True
+    notify_accepted_jobs: bool = True
+
+    # Google Agenda
+    calendar_id: str = "primary"
+    auto_schedule: bool = True
+
+    # Onbekende sleutels uit het bestand; die blijven bij opslaan behouden
+    extra: FrozenDict = field(default_factory=FrozenDict)
+
+    def max_jobs_on(self, day):
+        """Het maximum aantal opdrachten op een datum."""
+        return self.max_jobs_per_day[day.weekday()]
+
+    def to_dict(self):
+        """De voorkeuren in het schema van het voorkeuren bestand (een aanpasbare kopie)."""
+        data = {"schema_version": SCHEMA_VERSION}
+        for item in fields(self):
+            if item.name == "extra":
+                continue
+            value = getattr(self, item.name)
+            if item.name == "max_jobs_per_day":
+                data["max_jobs_weekday"] = dict(zip(WEEKDAYS, value))
+            else:
+                data[item.name] = thaw(value)
+        data.update(thaw(self.extra))
+        return data
+
+
+def _bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return bool(value)
+    if isinstance(value, str) and value.strip().lower() in ("true", "ja", "1", "false", "nee", "0"):
+        return value.strip().lower() in ("true", "ja", "1")
+    return None
+
+def _number(value):
+    if isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    if number < 0:
+        return None
+    return int(number) if number.is_integer() else number
+
+def _integer(value):
+    number = _number(value)
+    return None if number is None else int(number)
+
+def _string(value):
+    return str(value) if isinstance(value, (str, int, float)) and not isinstance(value, bool) else None
+
+def _mapping(value):
+    return freeze(value) if isinstance(value, dict) else None
+
+# Hoe elk veld uit het bestand wordt gecontroleerd en omgezet; None betekent ongeldig (dan geldt de standaardwaarde)
+_CONVERTERS = {
+    "prefer_ikea": _bool,
+    "prefer_electrical": _bool,
+    "prefer_internet": _bool,
+    "prefer_urgent": _bool,
+    "min_hourly_rate": _number,
+    "available_from": _string,
+    "prefer_amsterdam": _bool,
+    "max_distance_without_permission": _number,
+    "travel_time_between_jobs": _integer,
+    "home_location": _string,
+    "monitoring_interval": _integer,
+    "auto_accept": _bool,
+    "notification_method": _string,
+    "notification_methods": _mapping,
+    "notify_new_jobs": _bool,
+    "notify_accepted_jobs": _bool,
+    "calendar_id": _string,
+    "auto_schedule": _bool,
+}
+
+# Sleutels van oudere schema's die bij het omzetten worden verwerkt
+_LEGACY_KEYS = {"schema_version", "max_jobs_weekday", "check_interval", "schedule", "location",
+                *(f"max_jobs_{day}" for day in WEEKDAYS)}
+
+
+def _max_jobs(data, defaults):
+    """Lees het maximum aantal opdrachten per dag uit alle bekende schema's (maandag = index 0)."""
+    max_jobs = list(defaults)
+
+    def apply(day_index, value, source):
+        number = _integer(value)
+        if number is None:
+            logging.warning("Ongeldig maximum aantal opdrachten in %s: %r, standaardwaarde wordt gebruikt", source, value)
+            return
+        max_jobs[day_index] = number
+
+    def apply_mapping(mapping, source):
+        if not isinstance(mapping, dict):
+            return
+        for key, value in mapping.items():
+            key = str(key).lower()
+            if key in WEEKDAYS:
+                apply(WEEKDAYS.index(key), value, source)
+            elif key.isdigit() and int(key) < 7:
+                # In de oude schema's is "0" zondag; date.weekday() telt vanaf maandag
+                apply((int(key) - 1) % 7, value, source)
+
+    schedule = data.get("schedule")
+    if isinstance(schedule, dict):
+        apply_mapping(schedule.get("max_jobs_per_day"), "schedule.max_jobs_per_day")
+    apply_mapping(data.get("max_jobs_weekday"), "max_jobs_weekday")
+    for index, day in enumerate(WEEKDAYS):
+        if f"max_jobs_{day}" in data:
+            apply(index, data[f"max_jobs_{day}"], f"max_jobs_{day}")
+    return tuple(max_jobs)
+
+
+def normalize(data):
+    """Zet de inhoud van een voorkeuren bestand (elk bekend schema) om naar een Preferences snapshot."""
+    if not isinstance(data, dict):
+        logging.error("Voorkeuren bestand bevat geen object, standaardwaarden worden gebruikt")
+        data = {}
+    data = dict(data)
+    defaults = Preferences()
+    values = {}
+
+    # Oudere schema's omzetten naar de huidige sleutels (de huidige sleutels gaan voor)
+    location = data.get("location")
+    if isinstance(location, dict):
+        data.setdefault("prefer_amsterdam", location.get("prefer_amsterdam", defaults.prefer_amsterdam))
+        data.setdefault("max_distance_without_permission", location.get("max_distance", defaults.max_distance_without_permission))
+    schedule = data.get("schedule")
+    if isinstance(schedule, dict) and "available_from" in schedule:
+        data.setdefault("available_from", schedule["available_from"])
+    if "check_interval" in data and "monitoring_interval" not in data:
+        minutes = _number(data["check_interval"])
+        if minutes is not None:
+            data["monitoring_interval"] = minutes * 60
+    if isinstance(data.get("auto_accept"), dict):
+        # Per opdrachttype; automatisch accepteren staat aan als het voor een type aan staat
+        data["auto_accept"] = any(data["auto_accept"].values())
+    if isinstance(data.get("email"), str):
+        # In het oudste schema was "email" het adres van de gebruiker
+        data["email"] = {"recipient": data["email"]}
+
+    values["max_jobs_per_day"] = _max_jobs(data, defaults.max_jobs_per_day)
+
+    for name, convert in _CONVERTERS.items():
+        if data.get(name) is None:
+            continue
+        value = convert(data[name])
+        if value is None:
+            logging.warning("Ongeldige waarde voor voorkeur %s: %r, standaardwaarde wordt gebruikt", name, data[name])
+            continue
+        values[name] = value
+
+    if values.get("monitoring_interval") == 0:
+        logging.warning("Controle-interval van 0 seconden is ongeldig, standaardwaarde wordt gebruikt")
+        del values["monitoring_interval"]
+
+    for channel, channel_defaults in CHANNEL_DEFAULTS.items():
+        section = data.get(channel)
+        if section is None:
+            continue
+        if not isinstance(section, dict):
+            logging.warning("Ongeldige instellingen voor %s, standaardwaarden worden gebruikt", channel)
+            continue
+        values[channel] = freeze({**channel_defaults, **section})
+
+    known = set(_CONVERTERS) | set(CHANNEL_DEFAULTS) | _LEGACY_KEYS
+    values["extra"] = freeze({key: value for key, value in data.items() if key not in known})
+    return replace(defaults, **values)
+
+def changed_fields(old, new):
+    """De namen van de velden die verschillen tussen twee snapshots."""
+    return {item.name for item in fields(Preferences) if getattr(old, item.name) != getattr(new, item.name)}
+
+
+class PreferencesService:
+    def __init__(self, path=None):
+        """Initialiseer de voorkeuren service; het bestand wordt pas bij het eerste gebruik gelezen."""
+        self.path = path or PREFERENCES_FILE
+        self._preferences = None
+        self.subscribers = []
+        self.watcher = None
+        self.lock = threading.RLock()
+
+    def get(self):
+        """De huidige snapshot (gedeeld; wordt nooit gewijzigd, alleen vervangen)."""
+        preferences = self._preferences
+        if preferences is None:
+            with self.lock:
+                if self._preferences is None:
+                    self._preferences = self.read()
+                preferences = self._preferences
+        return preferences
+
+    def load(self, use_backup=False):
+        """Lees het voorkeuren bestand; fouten worden doorgegeven."""
+        data = load_json(self.path, use_backup=use_backup)
+        logging.info("Voorkeuren geladen uit %s", self.path)
+        return normalize(data)
+
+    def read(self):
+        """Lees en normaliseer het voorkeuren bestand (of de vorige versie), met standaardwaarden als dat niet lukt."""
+        try:
+            return self.load(use_backup=True)
+        except FileNotFoundError:
+            logging.warning("Voorkeuren bestand niet gevonden: %s, standaardwaarden worden gebruikt", self.path)
+        except (OSError, ValueError) as e:
+            logging.error("Fout bij laden van voorkeuren: %s, standaardwaarden worden gebruikt", e)
+        return normalize({})
+
+    def write(self, preferences):
+        if atomic_write_json(self.path, preferences.to_dict(), indent=4, backup=True):
+            logging.info("Voorkeuren opgeslagen in %s", self.path)
+
+    def reload(self):
+        """Lees het bestand opnieuw (bijvoorbeeld na een wijziging buiten de applicatie).
+
+        Is het bestand (nog) niet leesbaar, bijvoorbeeld halverwege het schrijven door een editor,
+        dan blijven de huidige voorkeuren gelden.
+        """
+        with self.lock:
+            try:
+                preferences = self.load()
+            except (OSError, ValueError) as e:
+                logging.error("Voorkeuren niet herladen, huidige voorkeuren blijven gelden: %s", e)
+                return self.get()
+            return self._swap(preferences)
+
+    def watch(self, debounce=DEBOUNCE_DELAY):
+        """Herlaad de voorkeuren automatisch als het bestand verandert (hot reload, zonder herstart)."""
+        with self.lock:
+            if self.watcher is None:
+                directory, filename = os.path.split(os.path.abspath(self.path))
+                self.get()
+                self.watcher = FileWatcher(directory, lambda names: self.reload(), filenames=[filename],
+                                           debounce=debounce).start()
+            return self.watcher
+
+    def stop_watching(self):
+        with self.lock:
+            watcher, self.watcher = self.watcher, None
+        if watcher is not None:
+            watcher.stop()
+
+    def save(self, values):
+        """Sla gewijzigde voorkeuren op; values mag een deel van de sleutels bevatten, in elk bekend schema.
+
+        Fouten bij het schrijven worden doorgegeven, zodat de GUI ze kan tonen.
+        """
+        with self.lock:
+            preferences = normalize({**self.get().to_dict(), **values})
+            self.write(preferences)
+            return self._swap(preferences)
+
+    def update(self, **changes):
+        """Sla enkele voorkeuren op, bijvoorbeeld update(monitoring_interval=600)."""
+        return self.save(changes)
+
+    def reset(self):
+        """Verwijder het voorkeuren bestand en ga terug naar de standaardwaarden."""
+        with self.lock:
+            try:
+                os.remove(self.path)
+                logging.info("Voorkeuren bestand verwijderd: %s", self.path)
+            except FileNotFoundError:
+                pass
+            return self._swap(Preferences())
+
+    def _swap(self, preferences):
+        old, self._preferences = self._preferences, preferences
+        if old is not None:
+            changed = changed_fields(old, preferences)
+            if changed:
+                self.publish(preferences, changed)
+        return preferences
+
+    def subscribe(self, callback):
+        """Roep callback(preferences, changed) aan na elke wijziging; changed zijn de gewijzigde velden."""
+        self.subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def publish(self, preferences, changed):
+        logging.info("Voorkeuren gewijzigd: %s", ', '.join(sorted(changed)))
+        for callback in list(self.subscribers):
+            try:
+                callback(preferences, changed)
+            except Exception as e:
+                logging.error("Fout bij verwerken van gewijzigde voorkeuren: %s", e)
+
+# Singleton instantie
+_preferences_service = None
+_lock = threading.Lock()
+
+def get_preferences_service():
+    """Verkrijg een singleton instantie van de PreferencesService."""
+    global _preferences_service
+    with _lock:
+        if _preferences_service is None:
+            _preferences_service = PreferencesService()
+        return _preferences_service
+
+def get_preferences():
+    """De huidige voorkeuren snapshot."""
+    return get_preferences_service().get()
+
+def save_preferences(values):
+    """Sla (een deel van de) voorkeuren op en publiceer de wijziging."""
+    return get_preferences_service().save(values)
+
+def watch_preferences():
+    """Herlaad de gedeelde voorkeuren automatisch als het voorkeuren bestand verandert."""
+    return get_preferences_service().watch()
+
+# Voor testen
+if __name__ == "__main__":
+    preferences = get_preferences()
+    for day, label in enumerate(WEEKDAY_LABELS):
+        print(f"{label}: maximaal {preferences.max_jobs_per_day[day]} opdrachten")
+    print(f"Controle-interval: {preferences.monitoring_interval} seconden")
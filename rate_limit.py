@@ -0,0 +1,84 @@
+import time
+import threading
+
+# Limieten per provider: (berichten per seconde, maximale burst)
+# Telegram staat ongeveer één bericht per seconde per chat toe; de anderen zijn ruim binnen hun API limieten gekozen
+PROVIDER_RATE_LIMITS = {
+    "telegram": (1.0, 3),
+    "pushbullet": (0.2, 2),
+    "pushover": (0.5, 5),
+    "email": (0.2, 5),
+    "safari_web_push": (1.0, 5),
+}
+DEFAULT_RATE_LIMIT = (1.0, 5)
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        """Initialiseer een token bucket die vol begint."""
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        """Seconden tot er een token beschikbaar is (0 als er nu een is)."""
+        with self.lock:
+            self._refill()
+            if self.tokens >= 1:
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        """Neem een token als dat er is. Geeft 0 terug bij succes, anders de wachttijd in seconden."""
+        with self.lock:
+            self._refill()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0
+            return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    def __init__(self, limits=None, default=DEFAULT_RATE_LIMIT, clock=time.monotonic):
+        """Initialiseer een verzameling token buckets, één per provider en bestemming (chat, API key)."""
+        self.limits = PROVIDER_RATE_LIMITS if limits is None else limits
+        self.default = default
+        self.clock = clock
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, provider, destination=""):
+        """Geef de token bucket voor een provider en bestemming."""
+        key = (provider, destination)
+        with self.lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                rate, capacity = self.limits.get(provider, self.default)
+                bucket = self.buckets[key] = TokenBucket(rate, capacity, self.clock)
+            return bucket
+
+    def wait_time(self, provider, destination=""):
+        """Seconden tot er naar deze bestemming verzonden mag worden."""
+        return self.bucket(provider, destination).wait_time()
+
+    def consume(self, provider, destination=""):
+        """Neem een token voor deze bestemming; geeft 0 terug bij succes, anders de wachttijd."""
+        return self.bucket(provider, destination).consume()
+
+# Singleton instantie
+_rate_limiter = None
+
+def get_rate_limiter():
+    """Verkrijg een singleton instantie van de RateLimiter."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        _rate_limiter = RateLimiter()
+    return _rate_limiter
@@ -0,0 +1,183 @@
+import time
+import logging
+import smtplib
+import threading
+
+# Verbindingsinstellingen
+NOOP_INTERVAL = 30  # Seconden zonder verkeer waarna we de verbinding eerst met NOOP controleren
+IDLE_TIMEOUT = 300  # Seconden waarna een ongebruikte verbinding wordt gesloten in plaats van hergebruikt
+BATCH_WINDOW = 0.1  # Seconden dat we wachten op meer berichten als er al berichten op de sessie wachten
+FOLLOWER_TIMEOUT = 30  # Seconden dat een bericht op de verzendende thread wacht; daarna verstuurt het zichzelf
+
+
+class SMTPTransport:
+    def __init__(self, server, port, username="", password="", use_tls=True, connect=None,
+                 noop_interval=NOOP_INTERVAL, idle_timeout=IDLE_TIMEOUT, batch_window=BATCH_WINDOW,
+                 follower_timeout=FOLLOWER_TIMEOUT):
+        """Initialiseer een SMTP transport dat één geauthenticeerde verbinding openhoudt.
+
+        connect is een optionele functie die een nieuwe (nog niet ingelogde) smtplib.SMTP
+        verbinding teruggeeft; standaard wordt smtplib.SMTP(server, port) gebruikt.
+        """
+        self.server = server
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.connect = connect or (lambda: smtplib.SMTP(server, port))
+        self.noop_interval = noop_interval
+        self.idle_timeout = idle_timeout
+        self.batch_window = batch_window
+        self.follower_timeout = follower_timeout
+
+        self.connection = None
+        self.last_used = 0
+        self.connections_opened = 0
+
+        # Berichten die wachten op de volgende sessie: (bericht, event, resultaat)
+        self._pending = []
+        self._pending_lock = threading.Lock()
+        self._leader_active = False
+        self._connection_lock = threading.RLock()
+
+    def _open(self):
+        """Open een nieuwe verbinding, met STARTTLS en inloggen."""
+        connection = self.connect()
+        if self.use_tls:
+            connection.starttls()
+        if self.username:
+            connection.login(self.username, self.password)
+
+        self.connection = connection
+        self.connections_opened += 1
+        self.last_used = time.monotonic()
+        logging.info("SMTP verbinding geopend met %s:%s", self.server, self.port)
+        return connection
+
+    def _ensure_connection(self):
+        """Geef een bruikbare verbinding terug; controleer een oude verbinding eerst met NOOP."""
+        if self.connection is None:
+            return self._open()
+
+        idle = time.monotonic() - self.last_used
+        if idle > self.idle_timeout:
+            self.close()
+            return self._open()
+
+        if idle >= self.noop_interval:
+            try:
+                code, _ = self.connection.noop()
+                if code == 250:
+                    return self.connection
+                logging.info("SMTP verbinding reageert niet goed op NOOP (%s), opnieuw verbinden", code)
+            except Exception as e:
+                logging.info("SMTP verbinding verbroken (%s), opnieuw verbinden", e)
+            self._discard()
+            return self._open()
+
+        return self.connection
+
+    def _discard(self):
+        """Vergeet de huidige verbinding zonder netjes af te sluiten."""
+        try:
+            if self.connection is not None:
+                self.connection.close()
+        except Exception:
+            pass
+        self.connection = None
+
+    def _send_batch(self, messages):
+        """Verstuur een reeks berichten over één verbinding. Geeft per bericht True/False terug."""
+        results = []
+        with self._connection_lock:
+            for msg in messages:
+                try:
+                    for attempt in range(2):
+                        try:
+                            self._ensure_connection().send_message(msg)
+                            break
+                        except smtplib.SMTPServerDisconnected:
+                            # De server heeft de verbinding gesloten; één keer opnieuw verbinden
+                            self._discard()
+                            if attempt:
+                                raise
+                    self.last_used = time.monotonic()
+                    results.append(True)
+                except Exception as e:
+                    logging.error("Fout bij verzenden van e-mail via %s: %s", self.server, e)
+                    results.append(False)
+        return results
+
+    def send(self, msg):
+        """Verstuur een bericht. Berichten die binnenkomen terwijl er verzonden wordt delen één sessie.
+
+        Een bericht zonder andere verzenders gaat direct weg; alleen als er al berichten wachten,
+        wacht de verzendende thread het batchvenster af op de rest van de burst.
+        """
+        entry = [msg, threading.Event(), False]
+        with self._pending_lock:
+            self._pending.append(entry)
+            leader = not self._leader_active
+            self._leader_active = True
+
+        if leader:
+            self._send_pending()
+            return entry[2]
+
+        # Een andere thread verstuurt de batch waar dit bericht in zit
+        if entry[1].wait(self.follower_timeout):
+            return entry[2]
+        with self._pending_lock:
+            claimed = not any(item is entry for item in self._pending)
+            if not claimed:
+                self._pending.remove(entry)
+        if not claimed:
+            # De verzendende thread komt er niet aan toe (of is vastgelopen): verstuur het zelf
+            logging.warning("SMTP verzending wacht al %s seconden, bericht wordt apart verzonden", self.follower_timeout)
+            return self._send_batch([msg])[0]
+        # Al opgepakt; geef het nog één keer de tijd, anders telt het als mislukt (de outbox probeert het opnieuw)
+        entry[1].wait(self.follower_timeout)
+        return entry[2]
+
+    def _send_pending(self):
+        """Verstuur als verzendende thread de wachtende berichten, tot er geen meer bijkomen."""
+        batch = []
+        try:
+            while True:
+                with self._pending_lock:
+                    batch, self._pending = self._pending, []
+                    if not batch:
+                        self._leader_active = False
+                        return
+
+                results = self._send_batch([item[0] for item in batch])
+                for item, result in zip(batch, results):
+                    item[2] = result
+                    item[1].set()
+
+                if len(batch) > 1:
+                    logging.info("%s e-mails verzonden in één SMTP sessie", len(batch))
+
+                # Kwamen er tijdens het verzenden berichten bij, geef de rest van de burst dan even de tijd
+                with self._pending_lock:
+                    waiting = bool(self._pending)
+                if waiting:
+                    time.sleep(self.batch_window)
+        except BaseException:
+            # Laat geen wachtende verzenders of een bezette verzendrol achter
+            with self._pending_lock:
+                self._leader_active = False
+            for item in batch:
+                item[1].set()
+            raise
+
+    def close(self):
+        """Sluit de verbinding netjes af."""
+        with self._connection_lock:
+            if self.connection is not None:
+                try:
+                    self.connection.quit()
+                except Exception:
+                    pass
+                self.connection = None
+                logging.info("SMTP verbinding met %s:%s gesloten", self.server, self.port)
@@ -1,13 +1,16 @@
-import requests
 import logging
-import os
-import json
+
+from async_runtime import get_async_runtime
+from notifiers import Notification, create_notifier
 
 class TelegramNotifier:
     def __init__(self, bot_token=None, chat_id=None):
         """
         Initialiseer de Telegram notifier.
         
+        Dit is een dunne laag over de Telegram notifier uit het register (notifiers), met dezelfde
+        gedeelde verbindingen en rate limit als de andere kanalen.
+        
         Args:
             bot_token (str): Telegram bot token
             chat_id (str): Telegram chat ID
@@ -15,33 +18,26 @@ class TelegramNotifier:
         self.bot_token = bot_token
         self.chat_id = chat_id
         
-        # Als geen token/chat_id is opgegeven, probeer uit config te laden
+        # Als geen token/chat_id is opgegeven, gebruik de (eenmalig geladen) notificatie configuratie
         if not bot_token or not chat_id:
             self.load_config()
         
-        # Configureer logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs', 'notification.log')),
-                logging.StreamHandler()
-            ]
-        )
+        self.notifier = create_notifier("telegram", {
+            "bot_token": self.bot_token,
+            "chat_id": self.chat_id,
+            "parse_mode": "HTML"
+        })
     
     def load_config(self):
-        """Laad Telegram configuratie uit het voorkeuren bestand."""
+        """Neem de Telegram configuratie over van het notificatiesysteem."""
         try:
-            config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'user_preferences.json')
-            if os.path.exists(config_file):
-                with open(config_file, 'r') as f:
-                    preferences = json.load(f)
-                
-                telegram_config = preferences.get('telegram', {})
-                self.bot_token = telegram_config.get('bot_token', self.bot_token)
-                self.chat_id = telegram_config.get('chat_id', self.chat_id)
+            from notification_enhanced import get_notification_system
+            
+            telegram_config = get_notification_system().config.get('telegram', {})
+            self.bot_token = self.bot_token or telegram_config.get('bot_token')
+            self.chat_id = self.chat_id or telegram_config.get('chat_id')
         except Exception as e:
-            logging.error(f"Fout bij laden Telegram configuratie: {e}")
+            logging.error("Fout bij laden Telegram configuratie: %s", e)
     
     def send_notification(self, message, job=None):
         """
@@ -54,40 +50,16 @@ class TelegramNotifier:
         Returns:
             bool: True als het bericht succesvol is verzonden, anders False
         """
-        if not self.bot_token or not self.chat_id:
-            logging.error("Telegram bot token of chat ID ontbreekt. Kan geen notificatie verzenden.")
-            return False
+        notification = Notification("", message)
         
-        try:
-            # Bereid het bericht voor
-            text = message
-            
-            # Voeg opdracht details toe als beschikbaar
-            if job:
-                text += f"\n\nOpdracht details:"
-                for key, value in job.items():
-                    text += f"\n{key}: {value}"
-            
-            # Verzend het bericht via Telegram API
-            url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
-            data = {
-                "chat_id": self.chat_id,
-                "text": text,
-                "parse_mode": "HTML"
-            }
-            
-            response = requests.post(url, data=data) 
-            
-            if response.status_code == 200:
-                logging.info(f"Telegram notificatie verzonden: {message}")
-                return True
-            else:
-                logging.error(f"Fout bij verzenden Telegram notificatie: {response.text}")
-                return False
-                
-        except Exception as e:
-            logging.error(f"Fout bij verzenden Telegram notificatie: {e}")
-            return False
+        # Voeg opdracht details toe als beschikbaar (ge-escaped via het job_details template)
+        if job:
+            details = "\n".join(f"{key}: {value}" for key, value in job.items())
+            notification = Notification("", message, template={
+                "name": "job_details", "values": {"title": "", "message": message, "details": details}
+            })
+        
+        return get_async_runtime().run(self.notifier.send([notification]))[0]
     
     def test_notification(self):
         """Stuur een test notificatie."""
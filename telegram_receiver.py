@@ -0,0 +1,274 @@
+import os
+import json
+import asyncio
+import inspect
+import logging
+import sqlite3
+import threading
+from datetime import date
+from contextlib import closing
+
+from async_http import get_http_client
+from notification_metrics import get_notification_metrics, format_metrics
+from persistence import atomic_write_json
+
+# Configuratie
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+DB_PATH = os.path.join(DATA_DIR, 'mrfix.db')
+OFFSET_FILE = os.path.join(DATA_DIR, 'telegram_offset.json')
+
+# Standaardinstellingen
+API_BASE = "https://api.telegram.org"
+POLL_TIMEOUT = 25  # Seconden per long-poll verzoek aan getUpdates
+ERROR_BACKOFF = 5  # Seconden wachten na een mislukte poll
+
+# Tekstantwoorden op een toestemmingsverzoek
+ACCEPT_WORDS = {"accept", "accepteer", "accepteren", "ja", "yes", "ok"}
+REJECT_WORDS = {"reject", "weiger", "weigeren", "nee", "no"}
+
+
+def load_offset(path):
+    """Lees de bewaarde update offset (None als er nog geen is)."""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f).get('offset')
+    except (OSError, ValueError):
+        return None
+
+def save_offset(path, offset):
+    """Bewaar de update offset, zodat een herstart geen updates dubbel verwerkt."""
+    atomic_write_json(path, {'offset': offset})
+
+def todays_schedule(db_path=None, day=None):
+    """De geaccepteerde opdrachten van vandaag als lijst van (tijd, titel, locatie)."""
+    day = day or date.today()
+    try:
+        with closing(sqlite3.connect(db_path or DB_PATH, timeout=10)) as conn:
+            rows = conn.execute('''
+                SELECT scheduled_date, title, location FROM accepted_jobs
+                WHERE DATE(scheduled_date) = DATE(?)
+                ORDER BY scheduled_date
+            ''', (day.isoformat(),)).fetchall()
+    except sqlite3.Error as e:
+        logging.error("Database fout bij ophalen van de planning: %s", e)
+        return []
+    return [(scheduled_date[11:16], title, location) for scheduled_date, title, location in rows]
+
+
+class TelegramReceiver:
+    def __init__(self, bot_token, chat_id, api_base=API_BASE, offset_file=OFFSET_FILE, db_path=None,
+                 client=None, permission_manager=None, poll_timeout=POLL_TIMEOUT):
+        """Initialiseer de ontvanger van Telegram updates.
+
+        De ontvanger long-pollt getUpdates over een bewaarde verbinding van de gedeelde AsyncHTTPClient en
+        draait als taak op de gedeelde async runtime, dus zonder eigen thread.
+        """
+        self.bot_token = bot_token
+        self.chat_id = chat_id
+        self.api_base = api_base.rstrip('/')
+        self.offset_file = offset_file
+        self.db_path = db_path or DB_PATH
+        self.client = client or get_http_client()
+        self.permission_manager = permission_manager
+        self.poll_timeout = poll_timeout
+
+        self.offset = load_offset(offset_file)
+        self.commands = {}
+        self.status_callbacks = []
+        self.future = None
+
+        self.register_command(self.command_help, "/help", "/start")
+        self.register_command(self.command_status, "/status")
+        self.register_command(self.command_today, "/vandaag", "/today", "/planning")
+        self.register_command(self.command_metrics, "/metrics", "/kanalen")
+
+    def register_command(self, handler, *names):
+        """Koppel een handler aan een of meer commando's.
+
+        De handler krijgt de argumenten na het commando en geeft de antwoordtekst terug (of None);
+        een coroutine functie mag ook.
+        """
+        for name in names:
+            self.commands[name.lower()] = handler
+
+    def get_permission_manager(self):
+        if self.permission_manager is None:
+            from permission_manager import get_permission_manager
+            self.permission_manager = get_permission_manager()
+        return self.permission_manager
+
+    async def call(self, method, params, timeout=10):
+        """Roep een Telegram Bot API methode aan en geef het resultaat terug."""
+        response = await self.client.post(f"{self.api_base}/bot{self.bot_token}/{method}",
+                                          json_body=params, timeout=timeout)
+        data = response.json() or {}
+        if not data.get('ok'):
+            raise RuntimeError(f"Telegram {method} mislukt: {data.get('description', response.status)}")
+        return data.get('result')
+
+    async def reply(self, text):
+        return await self.call("sendMessage", {"chat_id": self.chat_id, "text": text})
+
+    async def poll_once(self, timeout=None):
+        """Haal één keer updates op, verwerk ze en bewaar de nieuwe offset. Geeft het aantal updates terug."""
+        timeout = self.poll_timeout if timeout is None else timeout
+        params = {"timeout": timeout, "allowed_updates": ["message", "callback_query"]}
+        if self.offset is not None:
+            params["offset"] = self.offset
+
+        updates = await self.call("getUpdates", params, timeout=timeout + 10) or []
+        for update in updates:
+            try:
+                await self.dispatch(update)
+            except Exception as e:
+                logging.error("Fout bij verwerken van Telegram update %s: %s", update.get('update_id'), e)
+            self.offset = update['update_id'] + 1
+
+        if updates:
+            save_offset(self.offset_file, self.offset)
+        return len(updates)
+
+    async def dispatch(self, update):
+        """Stuur een update door naar de toestemmingsafhandeling of een commando handler."""
+        callback = update.get('callback_query')
+        if callback:
+            return await self.handle_callback(callback)
+
+        message = update.get('message') or {}
+        text = (message.get('text') or '').strip()
+        if not text:
+            return False
+        if str(message.get('chat', {}).get('id')) != str(self.chat_id):
+            # Alleen de eigen chat mag de monitor besturen
+            logging.warning("Telegram bericht uit onbekende chat genegeerd: %s", message.get('chat', {}).get('id'))
+            return False
+
+        if text.startswith('/'):
+            return await self.handle_command(text)
+
+        answer = text.lower()
+        if answer in ACCEPT_WORDS or answer in REJECT_WORDS:
+            reply_to = (message.get('reply_to_message') or {}).get('message_id')
+            return await self.handle_answer(answer in ACCEPT_WORDS, reply_to)
+        return False
+
+    async def handle_callback(self, callback):
+        """Verwerk een druk op de knoppen onder een toestemmingsverzoek."""
+        manager = self.get_permission_manager()
+        parsed = manager.parse_callback(callback.get('data'))
+        if parsed is None:
+            return False
+
+        request_id, approved = parsed
+        changed = manager.decide(request_id, approved)
+        for method, params in manager.callback_answers(callback, changed, approved):
+            await self.call(method, params)
+        return changed
+
+    async def handle_answer(self, approved, reply_to=None):
+        """Verwerk een tekstantwoord ("accept"/"reject") op het (laatste) openstaande toestemmingsverzoek."""
+        manager = self.get_permission_manager()
+        request_id = manager.request_for_message(reply_to)
+        if request_id is None:
+            await self.reply("Er staat geen toestemmingsverzoek open.")
+            return False
+
+        changed = manager.decide(request_id, approved)
+        await self.reply("Opdracht geaccepteerd" if approved else "Opdracht geweigerd")
+        return changed
+
+    async def handle_command(self, text):
+        """Voer een commando uit en stuur het antwoord terug."""
+        command, _, args = text.partition(' ')
+        # Commando's in groepen komen binnen als /status@naam_bot
+        command = command.split('@')[0].lower()
+        handler = self.commands.get(command)
+        if handler is None:
+            await self.reply(f"Onbekend commando: {command}. Stuur /help voor een overzicht.")
+            return False
+
+        result = handler(args.strip())
+        if inspect.isawaitable(result):
+            result = await result
+        if result:
+            await self.reply(result)
+        return True
+
+    def command_help(self, args):
+        return "Beschikbare commando's:\n" + "\n".join(sorted(self.commands))
+
+    def command_status(self, args):
+        lines = [f"Openstaande toestemmingsverzoeken: {self.get_permission_manager().pending_count()}",
+                 f"Opdrachten vandaag: {len(todays_schedule(self.db_path))}"]
+        for callback in self.status_callbacks:
+            try:
+                lines.append(callback())
+            except Exception as e:
+                logging.error("Fout bij ophalen van status: %s", e)
+        return "\n".join(lines)
+
+    def command_today(self, args):
+        schedule = todays_schedule(self.db_path)
+        if not schedule:
+            return "Geen opdrachten gepland voor vandaag."
+        return "Planning voor vandaag:\n" + "\n".join(
+            f"{time_str} {title} ({location})" for time_str, title, location in schedule)
+
+    def command_metrics(self, args):
+        return format_metrics(get_notification_metrics().snapshot())
+
+    async def run(self):
+        """Blijf updates ophalen tot de taak wordt geannuleerd."""
+        logging.info("Telegram ontvanger gestart")
+        try:
+            while True:
+                try:
+                    await self.poll_once()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logging.error("Fout bij ophalen van Telegram updates: %s", e)
+                    await asyncio.sleep(ERROR_BACKOFF)
+        finally:
+            logging.info("Telegram ontvanger gestopt")
+
+    def start(self, runtime=None):
+        """Start de ontvanger als taak op de gedeelde async runtime."""
+        if self.future is not None and not self.future.done():
+            return self.future
+        if runtime is None:
+            from async_runtime import get_async_runtime
+            runtime = get_async_runtime()
+        self.future = runtime.submit(self.run())
+        return self.future
+
+    def stop(self):
+        """Stop de ontvanger (het lopende long-poll verzoek wordt afgebroken)."""
+        if self.future is not None:
+            self.future.cancel()
+            self.future = None
+
+# Singleton instantie
+_telegram_receiver = None
+_receiver_lock = threading.Lock()
+
+def get_telegram_receiver():
+    """Verkrijg een singleton instantie van de TelegramReceiver, of None als er geen bot is geconfigureerd."""
+    global _telegram_receiver
+    with _receiver_lock:
+        if _telegram_receiver is None:
+            from notification_enhanced import get_notification_system
+
+            telegram = get_notification_system().config.get("telegram") or {}
+            if not telegram.get("bot_token") or not telegram.get("chat_id"):
+                return None
+            _telegram_receiver = TelegramReceiver(telegram["bot_token"], telegram["chat_id"])
+    return _telegram_receiver
+
+def start_telegram_receiver():
+    """Start de Telegram ontvanger als die geconfigureerd is; geeft de ontvanger (of None) terug."""
+    receiver = get_telegram_receiver()
+    if receiver is not None:
+        receiver.start()
+    return receiver
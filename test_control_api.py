@@ -0,0 +1,121 @@
+import unittest
+import os
+import sys
+import json
+import queue
+import tempfile
+import shutil
+import http.client
+from unittest.mock import patch
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    from control_api import serve_control_api, stop_control_api, EVENT_PREFERENCES
+    from control_client import ControlClient, ControlError, RemoteMonitoringService, EVENT_CONNECTION
+    from monitoring_service import MonitoringService, EVENT_JOBS
+    from preferences import Preferences, PreferencesService
+except ImportError:
+    print("Kon de control_api module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+class FakeMonitor:
+    def __init__(self, results):
+        self.results = list(results)
+
+    def monitor_website(self):
+        return self.results.pop(0) if self.results else []
+
+    def cleanup(self):
+        pass
+
+class TestControlApi(unittest.TestCase):
+    """Test cases voor de control API tussen GUI en daemon."""
+
+    def setUp(self):
+        """Setup voor elke test."""
+        self.test_dir = tempfile.mkdtemp()
+        self.preferences_service = PreferencesService(os.path.join(self.test_dir, 'preferences.json'))
+        self.patchers = [
+            patch('monitoring_service.get_preferences', return_value=Preferences(monitoring_interval=60)),
+            patch('control_api.get_preferences_service', return_value=self.preferences_service),
+            patch('control_api.get_preferences', side_effect=self.preferences_service.get),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+        # Een echte server op een vrije poort
+        self.service = MonitoringService(monitor_factory=lambda: FakeMonitor([[{"id": "1", "title": "Deur afhangen"},
+                                                                                  {"id": "2", "title": "Kast ophangen"}]]))
+        self.server = serve_control_api(self.service, port=0)
+        self.client = ControlClient(port=self.server.server_address[1])
+
+    def tearDown(self):
+        """Cleanup na elke test."""
+        self.service.stop(5)
+        stop_control_api(self.server)
+        for patcher in self.patchers:
+            patcher.stop()
+        shutil.rmtree(self.test_dir)
+
+    def test_status_pause_and_resume(self):
+        """Test de status, pauzeren en hervatten en dat direct controleren alleen kan als de monitoring aan staat."""
+        status = self.client.status()
+        self.assertFalse(status["active"])
+        self.assertEqual(status["checks"], 0)
+
+        with self.assertRaises(ControlError):
+            self.client.check()
+
+        self.assertEqual(self.client.resume(), {"active": True})
+        self.assertTrue(self.service.active)
+        self.assertEqual(self.client.pause(), {"active": False})
+        self.assertFalse(self.service.active)
+
+    def test_rejects_cross_site_requests(self):
+        """Test dat verzoeken zonder JSON of via een andere hostnaam geweigerd worden."""
+        conn = http.client.HTTPConnection("127.0.0.1", self.client.port, timeout=5)
+        conn.request("POST", "/resume", "active=1", {"Content-Type": "application/x-www-form-urlencoded"})
+        self.assertEqual(conn.getresponse().status, 415)
+        conn.close()
+
+        conn = http.client.HTTPConnection("127.0.0.1", self.client.port, timeout=5)
+        conn.request("GET", "/status", headers={"Host": "evil.example:9465"})
+        self.assertEqual(conn.getresponse().status, 403)
+        conn.close()
+        self.assertFalse(self.service.active)
+
+    def test_event_stream_and_preferences(self):
+        """Test dat de GUI via de event stream de status, nieuwe opdrachten en gewijzigde voorkeuren ontvangt."""
+        events = queue.Queue()
+        remote = RemoteMonitoringService(self.client)
+        remote.subscribe(lambda event, value: events.put((event, value)))
+        remote.connect()
+
+        def next_event(kind):
+            while True:
+                event, value = events.get(timeout=5)
+                if event == kind:
+                    return value
+
+        try:
+            self.assertFalse(next_event(EVENT_CONNECTION)["active"])
+
+            self.assertTrue(remote.start())
+            jobs = next_event(EVENT_JOBS)
+            self.assertEqual([job.title for job in jobs], ["Deur afhangen", "Kast ophangen"])
+            self.assertEqual([job.title for job in self.client.recent_jobs()], ["Deur afhangen", "Kast ophangen"])
+            self.assertEqual(self.client.status()["jobs_found"], 2)
+
+            preferences = self.client.push_preferences({"min_hourly_rate": 42})
+            self.assertEqual(preferences["min_hourly_rate"], 42)
+            self.assertEqual(next_event(EVENT_PREFERENCES), ["min_hourly_rate"])
+            with open(self.preferences_service.path, 'r') as f:
+                self.assertEqual(json.load(f)["min_hourly_rate"], 42)
+        finally:
+            remote.close()
+
+if __name__ == '__main__':
+    unittest.main()
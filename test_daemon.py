@@ -0,0 +1,149 @@
+import unittest
+import os
+import sys
+import json
+import queue
+import signal
+import logging
+import tempfile
+import shutil
+import threading
+import subprocess
+from unittest.mock import patch
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    import daemon
+    from daemon import Daemon, PidFile, AlreadyRunningError
+    from logging_setup import JsonFormatter
+    from monitoring_service import MonitoringService
+    from permission_manager import PermissionManager
+    from preferences import Preferences
+except ImportError:
+    print("Kon de daemon module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+class FakeMonitor:
+    def __init__(self, results):
+        self.results = list(results)
+
+    def monitor_website(self):
+        return self.results.pop(0) if self.results else []
+
+    def cleanup(self):
+        pass
+
+class TestDaemon(unittest.TestCase):
+    """Test cases voor de daemon zonder GUI."""
+
+    def setUp(self):
+        """Setup voor elke test."""
+        self.test_dir = tempfile.mkdtemp()
+        self.pid_path = os.path.join(self.test_dir, 'mrfix.pid')
+
+        # Geen echte Telegram ontvanger, outbox of voorkeuren watcher
+        self.patchers = [
+            patch('daemon.start_integrations', return_value=(None, None)),
+            patch('daemon.start_control_api', return_value=None),
+            patch('daemon.watch_preferences'),
+            patch('daemon.get_notification_outbox'),
+            patch('daemon.get_permission_manager'),
+            patch('daemon.stop_notification_outbox'),
+            patch('daemon.stop_async_runtime'),
+            patch('daemon.get_preferences_service'),
+            patch('monitoring_service.get_preferences', return_value=Preferences(monitoring_interval=60)),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        """Cleanup na elke test."""
+        for patcher in self.patchers:
+            patcher.stop()
+        shutil.rmtree(self.test_dir)
+
+    def test_pidfile(self):
+        """Test dat een tweede daemon geweigerd wordt en een verouderd pidfile vervangen wordt."""
+        pidfile = PidFile(self.pid_path)
+        pidfile.acquire()
+        self.assertEqual(pidfile.read_pid(), os.getpid())
+
+        with self.assertRaises(AlreadyRunningError):
+            PidFile(self.pid_path).acquire()
+
+        pidfile.release()
+        self.assertFalse(os.path.exists(self.pid_path))
+
+        # Een pidfile van een gestopt proces
+        process = subprocess.Popen([sys.executable, "-c", "pass"])
+        process.wait()
+        with open(self.pid_path, 'w') as f:
+            f.write(f"{process.pid}\n")
+        pidfile.acquire()
+        self.assertEqual(pidfile.read_pid(), os.getpid())
+        pidfile.release()
+
+    def test_sigterm_stops_gracefully(self):
+        """Test dat nieuwe opdrachten gefilterd worden en SIGTERM alles netjes stopt."""
+        processed = queue.Queue()
+        service = MonitoringService(monitor_factory=lambda: FakeMonitor([[{"id": "1", "title": "Lamp ophangen"}]]))
+        daemon_instance = Daemon(self.pid_path, service=service, job_handler=processed.put, shutdown_timeout=5)
+        previous_handler = signal.getsignal(signal.SIGTERM)
+
+        seen = {}
+
+        def stop_when_processed():
+            try:
+                seen["jobs"] = processed.get(timeout=5)
+                seen["pid"] = PidFile(self.pid_path).read_pid()
+            finally:
+                os.kill(os.getpid(), signal.SIGTERM)
+
+        checker = threading.Thread(target=stop_when_processed)
+        checker.start()
+        daemon_instance.run()
+        checker.join()
+
+        self.assertEqual([job.title for job in seen["jobs"]], ["Lamp ophangen"])
+        self.assertEqual(seen["pid"], os.getpid())
+        self.assertFalse(service.active)
+        self.assertFalse(os.path.exists(self.pid_path))
+        self.assertIs(signal.getsignal(signal.SIGTERM), previous_handler)
+        daemon.stop_notification_outbox.assert_called_once()
+
+    def test_approval_without_new_jobs_starts_a_pass(self):
+        """Test dat een goedgekeurde geparkeerde opdracht verwerkt wordt, ook als er geen nieuwe opdrachten volgen."""
+        manager = PermissionManager(db_path=os.path.join(self.test_dir, 'mrfix.db'))
+        daemon.get_permission_manager.return_value = manager
+        self.assertIsNone(manager.request("Accepteren?", {"id": "ver", "title": "Kast ophangen", "location": "Utrecht"}))
+
+        passes = queue.Queue()
+        service = MonitoringService(monitor_factory=lambda: FakeMonitor([]))
+        daemon_instance = Daemon(self.pid_path, service=service,
+                                 job_handler=lambda jobs: passes.put(manager.decided_jobs()), shutdown_timeout=5)
+        daemon_instance.start()
+        try:
+            self.assertTrue(passes.empty())
+            manager.decide(manager.request_for_message(), True)
+            parked = passes.get(timeout=5)
+        finally:
+            daemon_instance.shutdown()
+
+        self.assertEqual([job.title for job in parked], ["Kast ophangen"])
+        self.assertEqual(manager.subscribers, [])
+
+    def test_json_log_format(self):
+        """Test dat elke logregel een los leesbaar JSON object is."""
+        record = logging.LogRecord("root", logging.ERROR, __file__, 1, "Opdracht %s mislukt", ("ä",), None)
+
+        entry = json.loads(JsonFormatter().format(record))
+
+        self.assertEqual(entry["level"], "ERROR")
+        self.assertEqual(entry["message"], "Opdracht ä mislukt")
+        self.assertIn("time", entry)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    from duration_model import DurationModel, DEFAULT_DURATION, job_feature_keys, samples_from_calendar_events
+except ImportError:
+    print("Kon de duration_model module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+class TestDurationModel(unittest.TestCase):
+    """Test cases voor het duurmodel."""
+
+    def setUp(self):
+        """Setup voor elke test."""
+        # Maak een tijdelijke directory voor test data
+        self.test_dir = tempfile.mkdtemp()
+        self.model_file = os.path.join(self.test_dir, 'duration_model.json')
+
+        self.ikea_job = {'title': 'IKEA kast monteren', 'description': 'Montage van een IKEA PAX kast', 'is_ikea': True}
+        self.electrical_job = {'title': 'Lamp ophangen', 'description': 'Nieuwe lamp in de woonkamer', 'is_electrical': True}
+        self.other_job = {'title': 'Schilderij ophangen', 'description': 'Drie schilderijen', 'is_ikea': False}
+
+    def tearDown(self):
+        """Cleanup na elke test."""
+        shutil.rmtree(self.test_dir)
+
+    def test_feature_keys(self):
+        """Test dat de opzoeksleutels van specifiek naar algemeen lopen."""
+        keys = job_feature_keys(self.ikea_job)
+
+        self.assertEqual(keys[0], "kw:pax")
+        self.assertIn("kw:kast", keys)
+        self.assertIn("type:ikea", keys)
+        self.assertEqual(keys[-1], "default")
+
+    def test_untrained_model_uses_default(self):
+        """Test dat een leeg model de standaardduur gebruikt."""
+        model = DurationModel()
+
+        self.assertEqual(model.estimate(self.ikea_job), DEFAULT_DURATION)
+
+    def test_train_and_estimate(self):
+        """Test het trainen van de opzoektabel en het schatten van de duur."""
+        samples = [(self.ikea_job, 120, minutes) for minutes in (50, 55, 60, 70)]
+        samples += [(self.electrical_job, 120, minutes) for minutes in (25, 30, 35)]
+
+        model = DurationModel.train(samples)
+
+        # 80e percentiel van de IKEA opdrachten, naar boven afgerond op een kwartier
+        self.assertEqual(model.estimate(self.ikea_job), 75)
+        # Elke categorie krijgt zijn eigen duur
+        self.assertEqual(model.estimate(self.electrical_job), 45)
+        # Opdrachten zonder eigen categorie gebruiken de getrainde algemene duur
+        self.assertEqual(model.estimate(self.other_job), 60)
+
+    def test_small_groups_are_ignored(self):
+        """Test dat categorieën met te weinig afspraken niet worden opgenomen."""
+        samples = [(self.electrical_job, 120, 30), (self.electrical_job, 120, 30)]
+
+        model = DurationModel.train(samples)
+
+        self.assertEqual(model.estimate(self.electrical_job), DEFAULT_DURATION)
+
+    def test_save_and_load(self):
+        """Test het opslaan en laden van de opzoektabel."""
+        model = DurationModel({"type:ikea": 90}, default=105, samples={"type:ikea": 4})
+        model.save(self.model_file)
+
+        loaded = DurationModel.load(self.model_file)
+
+        self.assertEqual(loaded.estimate(self.ikea_job), 90)
+        self.assertEqual(loaded.estimate(self.other_job), 105)
+
+    def test_samples_from_calendar_events(self):
+        """Test het omzetten van agenda-afspraken naar trainingssamples."""
+        start = datetime(2025, 3, 25, 18, 0)
+        events = [{
+            'summary': 'MrFix: IKEA kast monteren',
+            'description': 'Montage van een PAX kast',
+            'start': start,
+            'end': start + timedelta(minutes=95),
+            'scheduled_minutes': 120
+        }]
+
+        samples = samples_from_calendar_events(events)
+
+        job, scheduled, actual = samples[0]
+        self.assertTrue(job['is_ikea'])
+        self.assertEqual(job['title'], 'IKEA kast monteren')
+        self.assertEqual(scheduled, 120)
+        self.assertEqual(actual, 95)
+
+if __name__ == '__main__':
+    unittest.main()
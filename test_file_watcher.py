@@ -0,0 +1,119 @@
+import unittest
+import os
+import sys
+import json
+import time
+import queue
+import tempfile
+import shutil
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    from file_watcher import FileWatcher, load_inotify
+    from preferences import PreferencesService
+except ImportError:
+    print("Kon de file_watcher module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+class TestFileWatcher(unittest.TestCase):
+    """Test cases voor het volgen van bestanden en het herladen van de voorkeuren."""
+
+    def setUp(self):
+        """Setup voor elke test."""
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, 'user_preferences.json')
+        self.changes = queue.Queue()
+        self.watchers = []
+
+    def tearDown(self):
+        """Cleanup na elke test."""
+        for watcher in self.watchers:
+            watcher.stop()
+        shutil.rmtree(self.test_dir)
+
+    def watch(self, **kwargs):
+        watcher = FileWatcher(self.test_dir, self.changes.put, filenames=['user_preferences.json'],
+                              debounce=0.2, poll_interval=0.05, **kwargs).start()
+        self.watchers.append(watcher)
+        return watcher
+
+    def write(self, data):
+        """Schrijf zoals een editor: eerst een tijdelijk bestand, dan hernoemen."""
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def assert_debounced(self, watcher):
+        for rate in (60, 70, 80):
+            self.write({"min_hourly_rate": rate})
+            time.sleep(0.06)
+
+        self.assertEqual(self.changes.get(timeout=5), {'user_preferences.json'})
+        time.sleep(0.4)
+        self.assertTrue(self.changes.empty())
+
+        # Andere bestanden in de directory worden genegeerd
+        with open(os.path.join(self.test_dir, 'jobs.log'), 'w') as f:
+            f.write("regel")
+        time.sleep(0.4)
+        self.assertTrue(self.changes.empty())
+
+    @unittest.skipIf(load_inotify() is None, "inotify is niet beschikbaar")
+    def test_inotify_changes_are_debounced(self):
+        """Test dat snel opeenvolgende wijzigingen één aanroep geven (inotify)."""
+        watcher = self.watch()
+        self.assertEqual(watcher.backend.name, "inotify")
+        self.assert_debounced(watcher)
+
+    def test_polling_changes_are_debounced(self):
+        """Test dat snel opeenvolgende wijzigingen één aanroep geven (zonder inotify)."""
+        watcher = self.watch(use_inotify=False)
+        self.assertEqual(watcher.backend.name, "polling")
+        self.assert_debounced(watcher)
+
+    def test_stop(self):
+        """Test dat stoppen de thread direct beëindigt en er daarna niets meer wordt gemeld."""
+        watcher = self.watch()
+        thread = watcher.thread
+
+        started = time.monotonic()
+        watcher.stop()
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertFalse(thread.is_alive())
+
+        self.write({"min_hourly_rate": 60})
+        time.sleep(0.4)
+        self.assertTrue(self.changes.empty())
+
+    def test_preferences_hot_reload(self):
+        """Test dat een wijziging in het bestand de gedeelde voorkeuren vervangt zonder herstart."""
+        self.write({"min_hourly_rate": 60})
+        service = PreferencesService(self.path)
+        service.subscribe(lambda prefs, changed: self.changes.put((prefs, changed)))
+        self.watchers.append(service.watch(debounce=0.1))
+        before = service.get()
+
+        self.write({"min_hourly_rate": 90, "max_jobs_weekday": {"monday": 1}})
+        prefs, changed = self.changes.get(timeout=5)
+
+        self.assertEqual(before.min_hourly_rate, 60)
+        self.assertEqual(prefs.min_hourly_rate, 90)
+        self.assertEqual(changed, {"min_hourly_rate", "max_jobs_per_day"})
+        self.assertIs(service.get(), prefs)
+
+        # Een half geschreven bestand laat de huidige voorkeuren staan
+        with open(self.path, 'w') as f:
+            f.write('{"min_hourly_rate": ')
+        time.sleep(0.5)
+        self.assertTrue(self.changes.empty())
+        self.assertIs(service.get(), prefs)
+
+        service.stop_watching()
+        self.assertIsNone(service.watcher)
+
+if __name__ == '__main__':
+    unittest.main()
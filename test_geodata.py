@@ -0,0 +1,108 @@
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+from unittest.mock import patch
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    from geodata import GeoResolver, haversine, normalize_location, AMSTERDAM_COORDS
+except ImportError:
+    print("Kon de geodata module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+class TestGeoResolver(unittest.TestCase):
+    """Test cases voor de lokale geodata en afstandsberekening."""
+
+    def setUp(self):
+        """Setup voor elke test."""
+        # Maak een tijdelijke directory voor de cache database
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, 'test.db')
+        self.resolver = GeoResolver(self.db_path)
+
+    def tearDown(self):
+        """Cleanup na elke test."""
+        self.resolver.cleanup()
+        shutil.rmtree(self.test_dir)
+
+    def test_haversine(self):
+        """Test de afstandsberekening tussen Amsterdam en Utrecht."""
+        distance = haversine(AMSTERDAM_COORDS, (52.0907, 5.1214))
+
+        self.assertAlmostEqual(distance, 35.1, delta=0.5)
+        self.assertEqual(haversine(AMSTERDAM_COORDS, AMSTERDAM_COORDS), 0)
+
+    def test_normalize_location(self):
+        """Test het normaliseren van locaties."""
+        self.assertEqual(normalize_location("  's-Hertogenbosch "), "s hertogenbosch")
+        self.assertEqual(normalize_location("Amsterdam-Noord"), "amsterdam noord")
+
+    def test_amsterdam(self):
+        """Test een locatie in Amsterdam."""
+        self.assertTrue(self.resolver.is_amsterdam("Amsterdam"))
+        self.assertEqual(self.resolver.distance_to_amsterdam("Amsterdam"), 0)
+
+    def test_utrecht(self):
+        """Test een locatie buiten Amsterdam."""
+        self.assertFalse(self.resolver.is_amsterdam("Utrecht"))
+        self.assertGreater(self.resolver.distance_to_amsterdam("Utrecht"), 30)
+
+    def test_postcode(self):
+        """Test het herleiden van een postcode."""
+        self.assertTrue(self.resolver.is_amsterdam("Keizersgracht 1, 1015 CJ"))
+        self.assertEqual(self.resolver.resolve("3511 AB")[0], "utrecht")
+        self.assertEqual(self.resolver.resolve("3511")[0], "utrecht")
+
+    def test_house_number_with_place(self):
+        """Test dat een huisnummer van vier cijfers niet als postcode de plaatsnaam overstemt."""
+        self.assertEqual(self.resolver.resolve("Damrak 1012, Haarlem")[0], "haarlem")
+        self.assertFalse(self.resolver.is_amsterdam("Damrak 1012, Haarlem"))
+        # Een volledige postcode is wel preciezer dan de plaatsnaam
+        self.assertTrue(self.resolver.is_amsterdam("Grote Markt 2, 1012 AB Haarlem"))
+
+    def test_address_and_alias(self):
+        """Test plaatsnamen in een adres en alternatieve schrijfwijzen."""
+        self.assertEqual(self.resolver.resolve("Damrak 1, Amsterdam")[0], "amsterdam")
+        self.assertEqual(self.resolver.resolve("Den Bosch")[0], "s hertogenbosch")
+
+    def test_fuzzy_matching(self):
+        """Test het herleiden van een locatie met een tikfout."""
+        self.assertEqual(self.resolver.resolve("Amsterdm")[0], "amsterdam")
+        self.assertEqual(self.resolver.resolve("Haarlm")[0], "haarlem")
+
+    def test_unknown_location(self):
+        """Test een locatie die niet kan worden herleid."""
+        self.assertIsNone(self.resolver.resolve("Nergenshuizen"))
+        self.assertIsNone(self.resolver.distance_to_amsterdam("Nergenshuizen"))
+        self.assertFalse(self.resolver.is_amsterdam(""))
+
+    def test_persistent_cache(self):
+        """Test dat herleide locaties bewaard blijven in de SQLite cache."""
+        self.resolver.resolve("Amsterdm")
+
+        rows = self.resolver.conn.execute('SELECT query, place FROM geocode_cache').fetchall()
+        self.assertIn(("amsterdm", "amsterdam"), rows)
+
+        # Een nieuwe resolver leest de cache in plaats van opnieuw te matchen
+        other = GeoResolver(self.db_path)
+        with patch.object(GeoResolver, '_resolve_uncached') as mock_resolve:
+            self.assertEqual(other.resolve("Amsterdm")[0], "amsterdam")
+            mock_resolve.assert_not_called()
+        other.cleanup()
+
+    def test_lru_size(self):
+        """Test dat de LRU cache begrensd is."""
+        resolver = GeoResolver(self.db_path, lru_size=2)
+        for location in ["Amsterdam", "Utrecht", "Haarlem"]:
+            resolver.resolve(location)
+
+        self.assertEqual(list(resolver._lru), ["utrecht", "haarlem"])
+        resolver.cleanup()
+
+if __name__ == '__main__':
+    unittest.main()
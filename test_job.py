@@ -0,0 +1,121 @@
+import unittest
+import os
+import sys
+import sqlite3
+import threading
+from datetime import datetime
+from unittest.mock import patch, MagicMock
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    from job import Job, PROCESSED_JOBS_COLUMNS, FLAG_IKEA, FLAG_AMSTERDAM, timeslot_to_epoch, parse_timeslot
+    from job_filter import JobFilter
+    from preferences import Preferences
+except ImportError:
+    print("Kon de job module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+class TestJob(unittest.TestCase):
+    """Test cases voor het compacte Job record."""
+
+    def setUp(self):
+        """Setup voor elke test."""
+        self.job_dict = {
+            'id': 'test-ikea-job-amsterdam',
+            'title': 'IKEA kast monteren',
+            'description': 'Montage van een IKEA PAX kast, 2 uur werk, €85 per uur',
+            'location': 'Amsterdam',
+            'date_posted': '25 maart 2025',
+            'accept_link': 'https://klussenvoormij.mrfix.nl/accept/123',
+            'is_ikea': True,
+            'is_electrical': False,
+            'is_internet': False,
+            'hourly_rate': 85,
+            'is_urgent': False,
+            'is_amsterdam': True,
+            'distance_to_amsterdam': 0,
+            'available_timeslots': ['2025-03-26 18:00', '25/03/2025 19:00', 'morgen']
+        }
+
+    def test_from_dict(self):
+        """Test het omzetten van een opdracht-dict naar een Job."""
+        job = Job.from_dict(self.job_dict)
+
+        self.assertEqual(job.flags, FLAG_IKEA | FLAG_AMSTERDAM)
+        self.assertTrue(job.is_ikea)
+        self.assertFalse(job.is_electrical)
+        # Onleesbare tijdslots vallen weg, de rest wordt chronologisch gesorteerd
+        self.assertEqual(job.available_timeslots, ['2025-03-25 19:00', '2025-03-26 18:00'])
+        self.assertEqual(job.slot_datetimes()[0], datetime(2025, 3, 25, 19, 0))
+
+    def test_dict_compatibility(self):
+        """Test dat oude code met job['sleutel'] en job.get blijft werken."""
+        job = Job.from_dict(self.job_dict)
+
+        self.assertEqual(job['title'], 'IKEA kast monteren')
+        self.assertTrue(job['is_amsterdam'])
+        self.assertEqual(job.get('onbekend', 'x'), 'x')
+        self.assertIn('location', job)
+        with self.assertRaises(KeyError):
+            job['onbekend']
+
+    def test_slots(self):
+        """Test dat een Job geen __dict__ per instantie heeft."""
+        job = Job.from_dict(self.job_dict)
+
+        self.assertFalse(hasattr(job, '__dict__'))
+        with self.assertRaises(AttributeError):
+            job.extra = True
+
+    def test_dict_round_trip(self):
+        """Test dat to_dict de oorspronkelijke velden teruggeeft."""
+        data = Job.from_dict(self.job_dict).to_dict()
+
+        for key in ('id', 'title', 'location', 'is_ikea', 'is_urgent', 'hourly_rate', 'distance_to_amsterdam'):
+            self.assertEqual(data[key], self.job_dict[key])
+
+    def test_row_round_trip(self):
+        """Test het opslaan en terugladen via de processed_jobs tabel."""
+        job = Job.from_dict(self.job_dict)
+        conn = sqlite3.connect(':memory:')
+        conn.execute(f"CREATE TABLE processed_jobs ({', '.join(PROCESSED_JOBS_COLUMNS)})")
+        conn.execute(f"INSERT INTO processed_jobs VALUES ({', '.join('?' * len(PROCESSED_JOBS_COLUMNS))})", job.to_row())
+
+        loaded = Job.from_row(conn.execute("SELECT * FROM processed_jobs").fetchone())
+        conn.close()
+
+        self.assertEqual(loaded, job)
+
+    def test_timeslot_to_epoch(self):
+        """Test het omzetten van verschillende tijdslotvormen naar epoch seconden."""
+        epoch = timeslot_to_epoch('2025-03-25 18:00')
+
+        self.assertEqual(timeslot_to_epoch(datetime(2025, 3, 25, 18, 0)), epoch)
+        self.assertEqual(timeslot_to_epoch(epoch), epoch)
+        self.assertIsNone(timeslot_to_epoch('morgen'))
+        self.assertIsNone(parse_timeslot(None))
+        self.assertEqual(Job.from_dict({'id': 'x', 'available_timeslots': [None, '2025-03-25 18:00']}).timeslots, (epoch,))
+
+    def test_bad_job_skips_only_itself(self):
+        """Test dat een opdracht die niet ingelezen kan worden alleen zichzelf overslaat."""
+        job_filter = JobFilter.__new__(JobFilter)
+        job_filter.current_pass = threading.local()
+        job_filter.save_processed_job = MagicMock()
+        job_filter.meets_basic_criteria = MagicMock(return_value=False)
+
+        def classify(job):
+            if job['id'] == 'bad':
+                raise TypeError("onverwachte titel")
+
+        with patch('job_filter.apply_classification', side_effect=classify), \
+             patch('job_filter.decided_jobs', return_value=[]), \
+             patch('job_filter.get_preferences', return_value=Preferences()):
+            job_filter.filter_and_process_jobs([{'id': 'bad', 'title': 'x'}, {'id': 'good', 'title': 'Lamp ophangen'}])
+
+        self.assertEqual([call.args[0].id for call in job_filter.save_processed_job.call_args_list], ['good'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import unittest
+import os
+import sys
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    from job_classifier import JobClassifier, load_keywords, naive_classify
+except ImportError:
+    print("Kon de job_classifier module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+class TestJobClassifier(unittest.TestCase):
+    """Test cases voor de trefwoordclassificatie van opdrachten."""
+
+    def setUp(self):
+        """Setup voor elke test."""
+        self.keywords = {
+            "ikea": ["ikea", "pax", "flatpack"],
+            "electrical": ["elektra", "stopcontact", "electrical"],
+            "internet": ["wifi", "router", "access point"],
+            "urgent": ["spoed", "vandaag nog"]
+        }
+        self.classifier = JobClassifier(self.keywords)
+
+    def test_keyword_types(self):
+        """Test dat Nederlandse en Engelse synoniemen de juiste vlaggen zetten."""
+        result = self.classifier.classify("IKEA kast monteren", "Electrical work, spoed")
+
+        self.assertTrue(result['is_ikea'])
+        self.assertTrue(result['is_electrical'])
+        self.assertFalse(result['is_internet'])
+        self.assertTrue(result['is_urgent'])
+
+    def test_whole_words_only(self):
+        """Test dat trefwoorden alleen als heel woord tellen."""
+        result = self.classifier.classify("Paxton slot vervangen", "Nieuwe spoedeisende deurbel")
+
+        self.assertFalse(result['is_ikea'])
+        self.assertFalse(result['is_urgent'])
+
+    def test_phrases(self):
+        """Test dat woordreeksen als geheel herkend worden."""
+        self.assertTrue(self.classifier.classify("Access point ophangen", "")['is_internet'])
+        self.assertTrue(self.classifier.classify("Lamp", "Moet vandaag nog klaar")['is_urgent'])
+        self.assertFalse(self.classifier.classify("Point of sale", "Geen access")['is_internet'])
+
+    def test_hourly_rate(self):
+        """Test het uitlezen van het uurloon."""
+        self.assertEqual(self.classifier.classify("Klus", "Voorrijkosten €25, daarna €85 per uur")['hourly_rate'], 85)
+        self.assertEqual(self.classifier.classify("Klus", "Tarief 62,50 euro/uur")['hourly_rate'], 62.5)
+        self.assertEqual(self.classifier.classify("Klus", "Vaste prijs € 120,-")['hourly_rate'], 120)
+        self.assertEqual(self.classifier.classify("Klus", "Prijs in overleg")['hourly_rate'], 0)
+
+    def test_apply_keeps_existing_values(self):
+        """Test dat bestaande vlaggen niet overschreven worden."""
+        job = {'title': 'Router instellen', 'description': '€70 per uur', 'is_internet': False}
+
+        self.classifier.apply(job)
+
+        self.assertFalse(job['is_internet'])
+        self.assertEqual(job['hourly_rate'], 70)
+        self.assertFalse(job['is_ikea'])
+
+    def test_agrees_with_naive_classification(self):
+        """Test dat de classifier overeenkomt met losse substring-controles voor gewone teksten."""
+        keywords = load_keywords()
+        classifier = JobClassifier(keywords)
+        samples = [
+            ("IKEA kast monteren", "Montage van een IKEA PAX kast, €85 per uur"),
+            ("Elektra aanleggen", "Elektra werkzaamheden voor nieuwe keuken, €90 per uur"),
+            ("Wifi probleem", "Router instellen, spoed, €65 per uur"),
+            ("Schilderij ophangen", "Drie schilderijen ophangen"),
+        ]
+
+        for title, description in samples:
+            self.assertEqual(classifier.classify(title, description), naive_classify(keywords, title, description))
+
+if __name__ == '__main__':
+    unittest.main()
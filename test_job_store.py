@@ -0,0 +1,101 @@
+import unittest
+import os
+import sys
+import sqlite3
+import tempfile
+import shutil
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    from job import PROCESSED_JOBS_COLUMNS
+    from job_store import JobStore, SORTS, STATUS_ACCEPTED, STATUS_PROCESSED
+except ImportError:
+    print("Kon de job_store module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+class TestJobStore(unittest.TestCase):
+    """Test cases voor het bladeren door opgeslagen opdrachten."""
+
+    def setUp(self):
+        """Setup voor elke test."""
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, 'mrfix.db')
+
+        # Een database zoals die van voor de score kolom, met veel gelijke sorteerwaarden
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(f"CREATE TABLE processed_jobs ({', '.join(PROCESSED_JOBS_COLUMNS)})")
+        conn.execute("CREATE TABLE accepted_jobs (id TEXT PRIMARY KEY, title TEXT, description TEXT, location TEXT, "
+                     "date_posted TEXT, scheduled_date TEXT, accepted_at TEXT)")
+        rows = []
+        for i in range(1000):
+            row = dict.fromkeys(PROCESSED_JOBS_COLUMNS)
+            row.update(id=f"job-{i:04d}", title=f"Klus {i}", location="Utrecht" if i % 3 else "Amsterdam",
+                       distance_to_amsterdam=None if i % 10 == 0 else float(i % 7), processed_at=f"2025-03-{i % 28 + 1:02d}")
+            rows.append(tuple(row.values()))
+        conn.executemany(f"INSERT INTO processed_jobs VALUES ({', '.join('?' * len(PROCESSED_JOBS_COLUMNS))})", rows)
+        conn.execute("INSERT INTO processed_jobs (id, title, location, processed_at) VALUES ('korting', '50% korting_actie', 'Amsterdam', '2025-01-01')")
+        conn.executemany("INSERT INTO accepted_jobs (id, title) VALUES (?, ?)", [("job-0003", "Klus 3"), ("job-0500", "Klus 500")])
+        conn.commit()
+        conn.close()
+
+        self.store = JobStore(self.db_path)
+
+    def tearDown(self):
+        """Cleanup na elke test."""
+        self.store.close()
+        shutil.rmtree(self.test_dir)
+
+    def all_pages(self, **query):
+        rows, cursor = self.store.page(limit=37, **query)
+        while cursor is not None:
+            page, cursor = self.store.page(after=cursor, limit=37, **query)
+            rows += page
+        return rows
+
+    def test_keyset_pages_cover_every_job_in_order(self):
+        """Test dat de pagina's samen elke opdracht precies één keer bevatten, in de gekozen volgorde."""
+        for sort in SORTS:
+            rows = self.all_pages(sort=sort)
+            self.assertEqual(len(rows), 1001, sort)
+            self.assertEqual(len({row[0] for row in rows}), 1001, sort)
+
+        distances = [row[5] for row in self.all_pages(sort="distance")]
+        self.assertEqual(distances, sorted(distances))
+
+        # Elke volgende pagina zoekt direct in de index, in plaats van alles ervoor opnieuw te lezen
+        column, direction, _ = SORTS["score"]
+        plan = self.store.conn.execute(f"EXPLAIN QUERY PLAN SELECT p.id FROM processed_jobs p "
+                                       f"WHERE (p.{column}, p.id) < (?, ?) ORDER BY p.{column} DESC, p.id DESC LIMIT 10",
+                                       (0, "job-0500")).fetchall()
+        self.assertIn("SEARCH", plan[0][3])
+
+    def test_search_and_accepted(self):
+        """Test zoeken (ook op % en _) en het filter op geaccepteerde opdrachten."""
+        self.assertEqual(self.store.count("Amsterdam"), 335)
+        rows, cursor = self.store.page(search="50% korting_")
+        self.assertEqual([row[0] for row in rows], ["korting"])
+        self.assertIsNone(cursor)
+
+        rows = self.all_pages(accepted_only=True)
+        self.assertEqual(sorted(row[0] for row in rows), ["job-0003", "job-0500"])
+        self.assertEqual({row[6] for row in rows}, {STATUS_ACCEPTED})
+        self.assertEqual(self.store.page(search="Klus 4")[0][0][6], STATUS_PROCESSED)
+
+    def test_changed(self):
+        """Test dat opslaan via een andere verbinding opgemerkt wordt."""
+        self.store.changed()
+        self.assertFalse(self.store.changed())
+
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("INSERT INTO processed_jobs (id, title, processed_at, score) VALUES ('nieuw', 'Nieuw', '2025-04-01', 5)")
+        conn.commit()
+        conn.close()
+
+        self.assertTrue(self.store.changed())
+        self.assertEqual(self.store.page()[0][0][0], "nieuw")
+
+if __name__ == '__main__':
+    unittest.main()
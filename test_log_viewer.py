@@ -0,0 +1,100 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+import shutil
+from datetime import datetime, timezone
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    from log_viewer import LogViewer, LogFollower, LogFilter, tail
+except ImportError:
+    print("Kon de log_viewer module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+def text_line(second, level, message):
+    return f"2025-03-25 18:00:{second:02d} - {level} - {message}\n"
+
+def json_line(second, level, message, job_id=None):
+    created = datetime(2025, 3, 25, 18, 0, second).astimezone(timezone.utc)
+    entry = {"time": created.isoformat(timespec='milliseconds'), "level": level, "message": message}
+    if job_id:
+        entry["job_id"] = job_id
+    return json.dumps(entry) + "\n"
+
+class TestLogViewer(unittest.TestCase):
+    """Test cases voor het lezen en volgen van de logbestanden."""
+
+    def setUp(self):
+        """Setup voor elke test."""
+        self.test_dir = tempfile.mkdtemp()
+        self.filter_log = os.path.join(self.test_dir, 'filter.log')
+        self.daemon_log = os.path.join(self.test_dir, 'daemon.log')
+
+    def tearDown(self):
+        """Cleanup na elke test."""
+        shutil.rmtree(self.test_dir)
+
+    def write(self, path, text, mode='a'):
+        with open(path, mode, encoding='utf-8') as f:
+            f.write(text)
+
+    def test_tail_reads_from_the_end(self):
+        """Test de laatste berichten van een groot bestand, met een traceback als vervolgregels."""
+        self.write(self.filter_log, "".join(text_line(i % 60, "INFO", f"Regel {i}") for i in range(200000)))
+        self.write(self.filter_log, text_line(1, "ERROR", "Fout bij accepteren") + "Traceback (most recent call last):\n  ValueError\n")
+        self.write(self.filter_log, text_line(2, "INFO", "Laatste"))
+
+        entries, end = tail(self.filter_log, 3)
+
+        self.assertEqual([entry.message.split("\n")[0] for entry in entries], ["Regel 199999", "Fout bij accepteren", "Laatste"])
+        self.assertEqual(entries[1].text.count("\n"), 2)
+        self.assertEqual(end, os.path.getsize(self.filter_log))
+
+        # Met een filter wordt niet verder dan max_bytes terug gezocht
+        entries, end = tail(self.filter_log, 10, LogFilter(job_id="Regel 5"), max_bytes=64 * 1024)
+        self.assertEqual(entries, [])
+
+    def test_follow_partial_lines_and_rotation(self):
+        """Test dat alleen nieuwe, complete regels gelezen worden, ook na het roteren van het bestand."""
+        self.write(self.filter_log, text_line(0, "INFO", "Oud"))
+        follower = LogFollower(self.filter_log, os.path.getsize(self.filter_log))
+
+        self.write(self.filter_log, text_line(1, "INFO", "Nieuw") + "2025-03-25 18:00:02 - INFO - Halv")
+        self.assertEqual([entry.message for entry in follower.read()], ["Nieuw"])
+        self.write(self.filter_log, "e regel\n")
+        self.assertEqual([entry.message for entry in follower.read()], ["Halve regel"])
+        self.assertEqual(follower.read(), [])
+
+        os.rename(self.filter_log, self.filter_log + ".1")
+        self.write(self.filter_log, text_line(3, "INFO", "Na rotatie"))
+        self.assertEqual([entry.message for entry in follower.read()], ["Na rotatie"])
+
+    def test_merge_and_filter(self):
+        """Test het samenvoegen van tekst- en JSON logs op tijd en filteren op niveau en job id."""
+        self.write(self.filter_log, text_line(1, "INFO", "Opdracht job-1 gefilterd") + text_line(4, "WARNING", "Agenda traag"))
+        self.write(self.daemon_log, json_line(2, "INFO", "Opdracht geaccepteerd", "job-1") + json_line(3, "ERROR", "Bezorging mislukt", "job-2"))
+        viewer = LogViewer([self.filter_log, self.daemon_log])
+
+        entries = viewer.tail(10)
+        self.assertEqual([(entry.source, entry.message) for entry in entries], [
+            ("filter", "Opdracht job-1 gefilterd"),
+            ("daemon", "Opdracht geaccepteerd"),
+            ("daemon", "Bezorging mislukt"),
+            ("filter", "Agenda traag"),
+        ])
+        self.assertEqual([entry.message for entry in viewer.tail(10, LogFilter(level="WARNING"))],
+                         ["Bezorging mislukt", "Agenda traag"])
+        self.assertEqual([entry.message for entry in viewer.tail(10, LogFilter(job_id="job-1"))],
+                         ["Opdracht job-1 gefilterd", "Opdracht geaccepteerd"])
+
+        self.write(self.daemon_log, json_line(6, "INFO", "Nieuw", "job-3"))
+        self.write(self.filter_log, text_line(5, "INFO", "Ook nieuw"))
+        self.assertEqual([entry.message for entry in viewer.poll()], ["Ook nieuw", "Nieuw"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import os
+import sys
+import json
+import logging
+import tempfile
+import shutil
+import threading
+from unittest.mock import patch
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    import logging_setup
+    from logging_setup import setup_logging, stop_logging, job_context
+except ImportError:
+    print("Kon de logging_setup module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+class FormattedIn(str):
+    """Een tekst die onthoudt in welke thread hij in een logbericht is gezet."""
+
+    threads = []
+
+    def __str__(self):
+        FormattedIn.threads.append(threading.current_thread().name)
+        return str.__str__(self)
+
+class TestLoggingSetup(unittest.TestCase):
+    """Test cases voor de logging via een achtergrondthread."""
+
+    def setUp(self):
+        """Setup voor elke test."""
+        self.test_dir = tempfile.mkdtemp()
+        self.log_path = os.path.join(self.test_dir, 'app.log')
+        self.root = logging.getLogger('')
+        self.saved = (self.root.handlers[:], self.root.level)
+        self.root.handlers = []
+        self.patchers = [
+            patch.object(logging_setup, '_configured', False),
+            patch.object(logging_setup, 'LOG_MAX_BYTES', 2000),
+            patch('logging_setup.atexit.register'),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+        FormattedIn.threads = []
+
+    def tearDown(self):
+        """Cleanup na elke test."""
+        stop_logging()
+        for handler in self.root.handlers:
+            handler.close()
+        self.root.handlers, level = self.saved
+        self.root.setLevel(level)
+        for patcher in self.patchers:
+            patcher.stop()
+        shutil.rmtree(self.test_dir)
+
+    def read_entries(self):
+        with open(self.log_path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+
+    def test_json_lines_with_job_id_written_in_background(self):
+        """Test dat berichten als JSON regels met job id geschreven worden, geformatteerd in de schrijfthread."""
+        setup_logging(self.log_path, console=False)
+
+        with job_context("job-42"):
+            logging.info("Opdracht %s geaccepteerd", FormattedIn("Lamp ophangen"))
+        logging.debug("Niet zichtbaar: %s", FormattedIn("debug"))
+        try:
+            raise ValueError("kapot")
+        except ValueError:
+            logging.exception("Fout bij accepteren")
+        stop_logging()
+
+        entries = self.read_entries()
+        self.assertEqual(entries[0]["message"], "Opdracht Lamp ophangen geaccepteerd")
+        self.assertEqual(entries[0]["job_id"], "job-42")
+        self.assertNotIn("job_id", entries[1])
+        self.assertIn("ValueError: kapot", entries[1]["exception"])
+        self.assertNotIn(threading.current_thread().name, FormattedIn.threads)
+        self.assertTrue(FormattedIn.threads)
+
+    def test_rotation(self):
+        """Test dat het logbestand geroteerd wordt bij de maximale grootte."""
+        setup_logging(self.log_path, console=False)
+
+        for i in range(100):
+            logging.info("Regel %d met wat tekst om het bestand te vullen", i)
+        stop_logging()
+
+        self.assertTrue(os.path.exists(self.log_path + ".1"))
+        self.assertLessEqual(os.path.getsize(self.log_path), 2000)
+        self.assertEqual(self.read_entries()[-1]["message"], "Regel 99 met wat tekst om het bestand te vullen")
+
+if __name__ == '__main__':
+    unittest.main()
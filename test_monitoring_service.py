@@ -0,0 +1,86 @@
+import unittest
+import os
+import sys
+import time
+import queue
+from unittest.mock import patch, MagicMock
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    from monitoring_service import MonitoringService, EVENT_STATE, EVENT_CHECK, EVENT_JOBS, EVENT_FAILED
+    from preferences import Preferences
+except ImportError:
+    print("Kon de monitoring_service module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+class FakeMonitor:
+    def __init__(self, results):
+        self.results = list(results)
+        self.cleaned_up = False
+
+    def monitor_website(self):
+        return self.results.pop(0) if self.results else []
+
+    def cleanup(self):
+        self.cleaned_up = True
+
+class TestMonitoringService(unittest.TestCase):
+    """Test cases voor de monitoring loop zonder GUI."""
+
+    def setUp(self):
+        """Setup voor elke test."""
+        self.patcher = patch('monitoring_service.get_preferences', return_value=Preferences(monitoring_interval=60))
+        self.patcher.start()
+        self.events = queue.Queue()
+
+    def tearDown(self):
+        """Cleanup na elke test."""
+        self.patcher.stop()
+
+    def next_event(self, kind):
+        while True:
+            event, value = self.events.get(timeout=5)
+            if event == kind:
+                return value
+
+    def test_jobs_check_now_and_stop(self):
+        """Test dat nieuwe opdrachten gemeld worden, direct controleren werkt en stoppen snel gaat."""
+        monitor = FakeMonitor([[{"id": "1", "title": "Kast ophangen"}], []])
+        service = MonitoringService(monitor_factory=lambda: monitor)
+        service.subscribe(lambda event, value: self.events.put((event, value)))
+
+        self.assertFalse(service.request_check())
+        self.assertTrue(service.start())
+        self.assertFalse(service.start())
+        self.assertTrue(self.next_event(EVENT_STATE))
+
+        jobs = self.next_event(EVENT_JOBS)
+        self.assertEqual([job.title for job in jobs], ["Kast ophangen"])
+
+        # Zonder request_check zou de volgende controle pas na 60 seconden komen
+        self.assertTrue(service.request_check())
+        self.next_event(EVENT_CHECK)
+        self.assertIn("actief", service.status())
+
+        started = time.monotonic()
+        self.assertTrue(service.stop(timeout=5))
+        self.assertLess(time.monotonic() - started, 2)
+        self.assertFalse(self.next_event(EVENT_STATE))
+        self.assertTrue(monitor.cleaned_up)
+
+    def test_failing_monitor_stops(self):
+        """Test dat een monitor die niet kan starten de monitoring stopt en de fout meldt."""
+        service = MonitoringService(monitor_factory=MagicMock(side_effect=RuntimeError("geen browser")))
+        service.subscribe(lambda event, value: self.events.put((event, value)))
+
+        service.start()
+
+        self.assertEqual(str(self.next_event(EVENT_FAILED)), "geen browser")
+        self.assertFalse(self.next_event(EVENT_STATE))
+        self.assertFalse(service.active)
+
+if __name__ == '__main__':
+    unittest.main()
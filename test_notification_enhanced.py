@@ -3,6 +3,7 @@ import os
 import sys
 import json
 import tempfile
+import time
 import shutil
 from unittest.mock import patch, MagicMock
 
@@ -12,10 +13,26 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 # Import de modules die we willen testen
 try:
     from notification_enhanced import NotificationSystem, send_notification
+    from notification_metrics import NotificationMetrics, FAILURE_THRESHOLD
+    from rate_limit import RateLimiter
+    from async_http import HTTPResponse
 except ImportError:
     print("Kon de notification_enhanced module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
     sys.exit(1)
 
+class FakeHTTPClient:
+    """Neppe HTTP client die de verzoeken bijhoudt en 200 OK antwoordt (401 voor URL's met een falende host)."""
+    
+    def __init__(self):
+        self.calls = []
+        self.failing_hosts = set()
+    
+    async def post(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        if any(host in url for host in self.failing_hosts):
+            return HTTPResponse(401, "Unauthorized", {}, b'{"ok":false,"description":"Unauthorized"}')
+        return HTTPResponse(200, "OK", {}, b"{}")
+
 class TestNotificationEnhanced(unittest.TestCase):
     """Test cases voor het verbeterde notificatiesysteem."""
     
@@ -31,25 +48,24 @@ class TestNotificationEnhanced(unittest.TestCase):
         # Patch de constanten
         self.patcher1 = patch('notification_enhanced.DATA_DIR', self.data_dir)
         self.patcher2 = patch('notification_enhanced.LOG_DIR', self.log_dir)
-        self.patcher3 = patch('notification_enhanced.PREFERENCES_FILE', os.path.join(self.data_dir, 'test_prefs.json'))
         self.patcher4 = patch('notification_enhanced.NOTIFICATION_CONFIG_FILE', os.path.join(self.data_dir, 'test_notification.json'))
         
         self.patcher1.start()
         self.patcher2.start()
-        self.patcher3.start()
         self.patcher4.start()
         
-        # Mock requests
-        self.patcher5 = patch('notification_enhanced.requests')
-        self.mock_requests = self.patcher5.start()
+        # Vervang de gedeelde HTTP client door een nep-client
+        self.http_client = FakeHTTPClient()
+        self.patcher5 = patch('async_http.get_http_client', return_value=self.http_client)
+        self.patcher5.start()
         
-        # Mock response
-        self.mock_response = MagicMock()
-        self.mock_response.status_code = 200
-        self.mock_requests.post.return_value = self.mock_response
+        # Eigen statistieken en circuit breakers per test
+        self.metrics = NotificationMetrics()
+        self.patcher7 = patch('notification_enhanced.get_notification_metrics', return_value=self.metrics)
+        self.patcher7.start()
         
         # Mock smtplib
-        self.patcher6 = patch('notification_enhanced.smtplib')
+        self.patcher6 = patch('notifiers.mail.smtplib')
         self.mock_smtplib = self.patcher6.start()
         
         # Mock SMTP server
@@ -92,10 +108,10 @@ class TestNotificationEnhanced(unittest.TestCase):
         """Cleanup na elke test."""
         self.patcher1.stop()
         self.patcher2.stop()
-        self.patcher3.stop()
         self.patcher4.stop()
         self.patcher5.stop()
         self.patcher6.stop()
+        self.patcher7.stop()
         
         # Verwijder de tijdelijke directory
         shutil.rmtree(self.test_dir)
@@ -118,14 +134,14 @@ class TestNotificationEnhanced(unittest.TestCase):
         result = notification.send_telegram_notification("Test Titel", "Test Bericht")
         
         # Controleer of de juiste methode is aangeroepen
-        self.mock_requests.post.assert_called_once()
+        self.assertEqual(len(self.http_client.calls), 1)
         
         # Controleer de argumenten
-        args, kwargs = self.mock_requests.post.call_args
-        self.assertEqual(args[0], f"https://api.telegram.org/bot{self.config['telegram']['bot_token']}/sendMessage")
-        self.assertEqual(kwargs['data']['chat_id'], self.config['telegram']['chat_id'])
-        self.assertIn("Test Titel", kwargs['data']['text'])
-        self.assertIn("Test Bericht", kwargs['data']['text'])
+        url, kwargs = self.http_client.calls[0]
+        self.assertEqual(url, f"https://api.telegram.org/bot{self.config['telegram']['bot_token']}/sendMessage")
+        self.assertEqual(kwargs['json_body']['chat_id'], self.config['telegram']['chat_id'])
+        self.assertIn("Test Titel", kwargs['json_body']['text'])
+        self.assertIn("Test Bericht", kwargs['json_body']['text'])
         
         # Controleer het resultaat
         self.assertTrue(result)
@@ -138,14 +154,14 @@ class TestNotificationEnhanced(unittest.TestCase):
         result = notification.send_pushbullet_notification("Test Titel", "Test Bericht")
         
         # Controleer of de juiste methode is aangeroepen
-        self.mock_requests.post.assert_called_once()
+        self.assertEqual(len(self.http_client.calls), 1)
         
         # Controleer de argumenten
-        args, kwargs = self.mock_requests.post.call_args
-        self.assertEqual(args[0], "https://api.pushbullet.com/v2/pushes")
+        url, kwargs = self.http_client.calls[0]
+        self.assertEqual(url, "https://api.pushbullet.com/v2/pushes")
         self.assertEqual(kwargs['headers']['Access-Token'], self.config['pushbullet']['api_key'])
-        self.assertEqual(kwargs['json']['title'], "Test Titel")
-        self.assertEqual(kwargs['json']['body'], "Test Bericht")
+        self.assertEqual(kwargs['json_body']['title'], "Test Titel")
+        self.assertEqual(kwargs['json_body']['body'], "Test Bericht")
         
         # Controleer het resultaat
         self.assertTrue(result)
@@ -168,7 +184,14 @@ class TestNotificationEnhanced(unittest.TestCase):
             self.config['email']['password']
         )
         self.mock_smtp.send_message.assert_called_once()
-        self.mock_smtp.quit.assert_called_once()
+        # De verbinding blijft open voor volgende berichten
+        self.mock_smtp.quit.assert_not_called()
+        
+        # Een tweede e-mail hergebruikt de ingelogde verbinding
+        notification.send_email_notification("Tweede Titel", "Tweede Bericht")
+        self.mock_smtplib.SMTP.assert_called_once()
+        self.mock_smtp.login.assert_called_once()
+        self.assertEqual(self.mock_smtp.send_message.call_count, 2)
         
         # Controleer het resultaat
         self.assertTrue(result)
@@ -181,11 +204,11 @@ class TestNotificationEnhanced(unittest.TestCase):
         result = notification.send_pushover_notification("Test Titel", "Test Bericht")
         
         # Controleer of de juiste methode is aangeroepen
-        self.mock_requests.post.assert_called_once()
+        self.assertEqual(len(self.http_client.calls), 1)
         
         # Controleer de argumenten
-        args, kwargs = self.mock_requests.post.call_args
-        self.assertEqual(args[0], "https://api.pushover.net/1/messages.json")
+        url, kwargs = self.http_client.calls[0]
+        self.assertEqual(url, "https://api.pushover.net/1/messages.json")
         self.assertEqual(kwargs['data']['token'], self.config['pushover']['api_token'])
         self.assertEqual(kwargs['data']['user'], self.config['pushover']['user_key'])
         self.assertEqual(kwargs['data']['title'], "Test Titel")
@@ -201,9 +224,10 @@ class TestNotificationEnhanced(unittest.TestCase):
         
         result = notification.send_safari_web_push_notification("Test Titel", "Test Bericht")
         
-        # Safari Web Push is een vereenvoudigde implementatie die alleen logt
-        # Controleer het resultaat
-        self.assertTrue(result)
+        # Zonder abonnement van een browser wordt er niets verstuurd
+        # (het versturen zelf wordt getest in test_web_push.py tegen een lokale push service)
+        self.assertFalse(result)
+        self.assertEqual(self.http_client.calls, [])
     
     def test_send_notification(self):
         """Test de algemene send_notification functie."""
@@ -225,6 +249,67 @@ class TestNotificationEnhanced(unittest.TestCase):
                 # Controleer het resultaat
                 self.assertTrue(result)
     
+    def test_send_notification_multiple_channels(self):
+        """Test het gelijktijdig versturen via meerdere kanalen."""
+        notification = NotificationSystem()
+        notification.config["notification_methods"] = {"telegram": True, "email": True, "pushover": False}
+
+        def slow_success(title, body):
+            time.sleep(0.2)
+            return True
+
+        notification.send_telegram_notification = MagicMock(side_effect=slow_success)
+        notification.send_email_notification = MagicMock(side_effect=slow_success)
+
+        start = time.perf_counter()
+        report = notification.send_to_channels("Test Titel", "Test Bericht", notification.enabled_channels(), "all_success")
+        elapsed = time.perf_counter() - start
+
+        # De kanalen worden gelijktijdig bediend, niet na elkaar
+        self.assertLess(elapsed, 0.35)
+        self.assertTrue(report["success"])
+        self.assertEqual(set(report["channels"]), {"telegram", "email"})
+        self.assertGreaterEqual(report["channels"]["email"]["latency"], 0.2)
+
+    def test_delivery_policies(self):
+        """Test het first_success en all_success bezorgbeleid."""
+        notification = NotificationSystem()
+        notification.config["notification_methods"] = {"telegram": True, "email": True}
+        notification.send_telegram_notification = MagicMock(return_value=True)
+        notification.send_email_notification = MagicMock(side_effect=Exception("SMTP niet bereikbaar"))
+
+        # Standaard is één geslaagd kanaal genoeg
+        self.assertTrue(notification.send_notification("Test Titel", "Test Bericht"))
+
+        # Een geaccepteerde opdracht moet via alle kanalen aankomen
+        self.assertFalse(notification.send_notification("Test Titel", "Test Bericht", message_type="job_accepted"))
+        self.assertEqual(notification.last_report["channels"]["email"]["error"], "SMTP niet bereikbaar")
+
+    def test_circuit_breaker_switches_channel(self):
+        """Test dat een kanaal dat blijft falen wordt overgeslagen ten gunste van het volgende kanaal."""
+        notification = NotificationSystem()
+        notification.rate_limiter = RateLimiter(limits={}, default=(100.0, 100))
+        self.http_client.failing_hosts.add("api.telegram.org")
+        
+        for _ in range(FAILURE_THRESHOLD - 1):
+            self.assertFalse(notification.send_notification("Test Titel", "Test Bericht"))
+        
+        # Bij de laatste mislukte poging gaat de breaker open en wordt direct Pushbullet gebruikt
+        self.assertTrue(notification.send_notification("Test Titel", "Test Bericht"))
+        self.assertIn("pushbullet", self.http_client.calls[-1][0])
+        
+        # Daarna wordt Telegram niet meer aangeroepen
+        self.http_client.calls.clear()
+        self.assertTrue(notification.send_notification("Test Titel", "Test Bericht"))
+        self.assertEqual(len(self.http_client.calls), 1)
+        self.assertIn("pushbullet", self.http_client.calls[0][0])
+        
+        metrics = self.metrics.snapshot()
+        self.assertEqual(metrics["telegram"]["state"], "open")
+        self.assertEqual(metrics["telegram"]["failed"], FAILURE_THRESHOLD)
+        self.assertTrue(metrics["telegram"]["last_error"].startswith("HTTP 401"))
+        self.assertEqual(metrics["pushbullet"]["success_rate"], 1.0)
+    
     def test_request_permission(self):
         """Test het vragen van toestemming aan de gebruiker."""
         notification = NotificationSystem()
@@ -248,5 +333,14 @@ class TestNotificationEnhanced(unittest.TestCase):
         # Controleer het resultaat (in de huidige implementatie altijd True)
         self.assertTrue(result)
 
+    def test_legacy_notification_module(self):
+        """Test dat de oude notification module nog te importeren is met dezelfde namen."""
+        import notification
+        import preferences
+
+        self.assertIs(notification.NotificationSystem, NotificationSystem)
+        self.assertIs(notification.send_notification, send_notification)
+        self.assertEqual(notification.PREFERENCES_FILE, preferences.PREFERENCES_FILE)
+
 if __name__ == '__main__':
     unittest.main()
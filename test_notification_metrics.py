@@ -0,0 +1,107 @@
+import unittest
+import os
+import sys
+import json
+import urllib.request
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    from notification_metrics import (NotificationMetrics, CircuitBreaker, serve_metrics, prometheus_text, format_metrics,
+                                      STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN)
+except ImportError:
+    print("Kon de notification_metrics module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class TestNotificationMetrics(unittest.TestCase):
+    """Test cases voor de bezorgstatistieken en circuit breakers."""
+
+    def setUp(self):
+        """Setup voor elke test."""
+        self.clock = FakeClock()
+        self.metrics = NotificationMetrics(failure_threshold=3, reset_timeout=60, clock=self.clock)
+
+    def test_breaker_opens_and_probes(self):
+        """Test dat de breaker na herhaalde fouten opengaat en na de wachttijd één proefbericht toelaat."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60, clock=self.clock)
+
+        self.assertFalse(breaker.record(False))
+        self.assertTrue(breaker.record(False))
+        self.assertEqual(breaker.state, STATE_OPEN)
+        self.assertFalse(breaker.allow())
+
+        self.clock.now += 60
+        self.assertEqual(breaker.state, STATE_HALF_OPEN)
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())  # Maar één proefbericht tegelijk
+
+        # Een mislukte proef opent de breaker opnieuw, een geslaagde sluit hem
+        breaker.record(False)
+        self.assertEqual(breaker.state, STATE_OPEN)
+        self.clock.now += 60
+        self.assertTrue(breaker.allow())
+        breaker.record(True)
+        self.assertEqual(breaker.state, STATE_CLOSED)
+        self.assertEqual(breaker.failures, 0)
+
+    def test_success_resets_failures(self):
+        """Test dat alleen fouten op rij de breaker openen."""
+        for success in (False, False, True, False, False):
+            self.metrics.record("telegram", success, 0.1, None if success else "HTTP 502")
+
+        self.assertTrue(self.metrics.available("telegram"))
+        self.metrics.record("telegram", False, 0.1, "HTTP 502")
+        self.assertFalse(self.metrics.available("telegram"))
+        self.assertFalse(self.metrics.allow("telegram"))
+        self.assertEqual(self.metrics.snapshot()["telegram"]["rejected"], 1)
+
+    def test_snapshot(self):
+        """Test de histogram, het succespercentage en de laatste fout."""
+        for latency in (0.05, 0.2, 0.3, 0.7, 40):
+            self.metrics.record("pushover", True, latency)
+        self.metrics.record("pushover", False, 2.0, "HTTP 429: Too Many Requests")
+
+        snapshot = self.metrics.snapshot()["pushover"]
+        self.assertEqual(snapshot["latency_buckets"]["0.1"], 1)
+        self.assertEqual(snapshot["latency_buckets"]["0.25"], 1)
+        self.assertEqual(snapshot["latency_buckets"]["0.5"], 1)
+        self.assertEqual(snapshot["latency_buckets"]["+Inf"], 1)
+        self.assertEqual(snapshot["latency_p50"], 0.5)
+        self.assertEqual(snapshot["latency_p95"], float('inf'))
+        self.assertAlmostEqual(snapshot["success_rate"], 5 / 6)
+        self.assertEqual(snapshot["last_error"], "HTTP 429: Too Many Requests")
+        self.assertIn("laatste fout: HTTP 429", format_metrics(self.metrics.snapshot()))
+
+    def test_endpoint(self):
+        """Test het metrics endpoint in Prometheus en JSON formaat."""
+        self.metrics.record("email", True, 0.3)
+        self.metrics.record("email", False, 1.5, "SMTP verzending mislukt")
+
+        server = serve_metrics(self.metrics, port=0)
+        try:
+            base = f"http://127.0.0.1:{server.server_address[1]}"
+            with urllib.request.urlopen(f"{base}/metrics") as response:
+                text = response.read().decode()
+            with urllib.request.urlopen(f"{base}/metrics.json") as response:
+                data = json.load(response)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(text, prometheus_text(self.metrics.snapshot()))
+        self.assertIn('mrfix_notification_latency_seconds_bucket{provider="email",le="0.5"} 1', text)
+        self.assertIn('mrfix_notification_latency_seconds_bucket{provider="email",le="+Inf"} 2', text)
+        self.assertIn('mrfix_notifications_total{provider="email",result="failed"} 1', text)
+        self.assertEqual(data["email"]["state"], STATE_CLOSED)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,244 @@
+import unittest
+import os
+import sys
+import time
+import tempfile
+import shutil
+import threading
+from unittest.mock import patch
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    import notification_outbox
+    from notification_outbox import (NotificationOutbox, STATUS_SENT, STATUS_FAILED, STATUS_PENDING, STATUS_SUPERSEDED,
+                                     retry_delay, compose_digest, enqueue_notification)
+    from rate_limit import RateLimiter
+except ImportError:
+    print("Kon de notification_outbox module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+class FakeChannel:
+    """Neppe provider die bezorgde berichten bijhoudt en op commando kan falen."""
+
+    def __init__(self, failures=0, delay=0):
+        self.failures = failures
+        self.delay = delay
+        self.delivered = []
+        self.bodies = []
+        self.templates = []
+        self.lock = threading.Lock()
+
+    def __call__(self, channel, title, body, template=None):
+        time.sleep(self.delay)
+        with self.lock:
+            if self.failures > 0:
+                self.failures -= 1
+                return False
+            self.delivered.append((channel, title))
+            self.bodies.append(body)
+            self.templates.append(template)
+        return True
+
+class TestNotificationOutbox(unittest.TestCase):
+    """Test cases voor de notificatie outbox."""
+
+    def setUp(self):
+        """Setup voor elke test."""
+        # Maak een tijdelijke directory voor de outbox database
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, 'outbox.db')
+        self.outboxes = []
+
+    def tearDown(self):
+        """Cleanup na elke test."""
+        for outbox in self.outboxes:
+            outbox.stop()
+        shutil.rmtree(self.test_dir)
+
+    def make_outbox(self, deliver, **kwargs):
+        # Standaard geen rate limit, zodat de tests alleen de volgorde en herhaalpogingen testen
+        kwargs.setdefault("rate_limiter", RateLimiter(limits={}, default=(1000, 1000)))
+        kwargs.setdefault("destination", lambda channel: "")
+        outbox = NotificationOutbox(self.db_path, deliver=deliver, **kwargs)
+        self.outboxes.append(outbox)
+        return outbox
+
+    def test_retry_delay(self):
+        """Test de exponentiële wachttijd tussen pogingen."""
+        self.assertEqual(retry_delay(1, 5, 900), 5)
+        self.assertEqual(retry_delay(3, 5, 900), 20)
+        self.assertEqual(retry_delay(20, 5, 900), 900)
+
+    def test_enqueue_and_deliver(self):
+        """Test dat berichten op de achtergrond worden bezorgd."""
+        channel = FakeChannel()
+        outbox = self.make_outbox(channel)
+        outbox.start()
+
+        message_id = outbox.enqueue("Titel", "Inhoud", channel="telegram", urgent=True)
+
+        self.assertTrue(outbox.flush())
+        self.assertEqual(channel.delivered, [("telegram", "Titel")])
+        self.assertEqual(outbox.get_message(message_id)['status'], STATUS_SENT)
+
+    def test_ordering_per_channel(self):
+        """Test dat berichten per kanaal in volgorde worden bezorgd, ook met meerdere workers."""
+        channel = FakeChannel(delay=0.005)
+        outbox = self.make_outbox(channel, workers=4)
+
+        for i in range(10):
+            outbox.enqueue(f"telegram {i}", "", channel="telegram", urgent=True)
+            outbox.enqueue(f"email {i}", "", channel="email", urgent=True)
+        outbox.start()
+
+        self.assertTrue(outbox.flush())
+        for name in ("telegram", "email"):
+            titles = [title for channel_name, title in channel.delivered if channel_name == name]
+            self.assertEqual(titles, [f"{name} {i}" for i in range(10)])
+
+    def test_retry_keeps_order(self):
+        """Test dat een mislukt bericht opnieuw wordt geprobeerd voordat het volgende bericht gaat."""
+        channel = FakeChannel(failures=2)
+        outbox = self.make_outbox(channel, base_delay=0.01, max_delay=0.05)
+
+        first = outbox.enqueue("eerste", "", channel="telegram", urgent=True)
+        outbox.enqueue("tweede", "", channel="telegram", urgent=True)
+        outbox.start()
+
+        deadline = time.time() + 5
+        while outbox.pending_count() and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(channel.delivered, [("telegram", "eerste"), ("telegram", "tweede")])
+        self.assertEqual(outbox.get_message(first)['attempts'], 3)
+
+    def test_max_attempts(self):
+        """Test dat een bericht na het maximum aantal pogingen als mislukt wordt gemarkeerd."""
+        channel = FakeChannel(failures=100)
+        outbox = self.make_outbox(channel, max_attempts=3, base_delay=0)
+
+        message_id = outbox.enqueue("Titel", "Inhoud", channel="telegram", urgent=True)
+        while outbox.process_next():
+            pass
+
+        message = outbox.get_message(message_id)
+        self.assertEqual(message['status'], STATUS_FAILED)
+        self.assertEqual(message['attempts'], 3)
+        self.assertEqual(message['last_error'], "Bezorging mislukt")
+
+    def test_survives_restart(self):
+        """Test dat onbezorgde berichten na een herstart alsnog worden bezorgd."""
+        first = self.make_outbox(FakeChannel(failures=1), base_delay=0)
+        message_id = first.enqueue("Titel", "Inhoud", channel="telegram", urgent=True)
+        first.process_next()
+        self.assertEqual(first.get_message(message_id)['status'], STATUS_PENDING)
+
+        channel = FakeChannel()
+        second = self.make_outbox(channel)
+        second.start()
+
+        self.assertTrue(second.flush())
+        self.assertEqual(channel.delivered, [("telegram", "Titel")])
+
+    def test_digest(self):
+        """Test dat informatieve berichten binnen het venster tot één samenvatting worden samengevoegd."""
+        channel = FakeChannel()
+        outbox = self.make_outbox(channel, digest_window=0.2)
+        outbox.start()
+
+        for i in range(3):
+            outbox.enqueue(f"Website Verandering {i}", "", channel="telegram")
+        # Nog binnen het venster: er is niets verzonden
+        self.assertEqual(channel.delivered, [])
+
+        deadline = time.time() + 5
+        while outbox.pending_count() and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(channel.delivered, [("telegram", "3 nieuwe meldingen")])
+        self.assertIn("Website Verandering 2", channel.bodies[0])
+
+    def test_urgent_skips_digest_window(self):
+        """Test dat een urgent bericht niet wacht op informatieve berichten die voor hem staan."""
+        channel = FakeChannel()
+        outbox = self.make_outbox(channel, digest_window=60)
+        outbox.start()
+
+        outbox.enqueue("Website Verandering", "", channel="telegram")
+        outbox.enqueue("Opdracht geaccepteerd", "", channel="telegram", urgent=True)
+
+        self.assertTrue(outbox.flush())
+        self.assertEqual(channel.delivered, [("telegram", "Opdracht geaccepteerd")])
+        self.assertEqual(outbox.pending_count(), 1)
+
+    def test_rate_limit(self):
+        """Test dat de token bucket per kanaal het aantal berichten per seconde begrenst."""
+        channel = FakeChannel()
+        outbox = self.make_outbox(channel, rate_limiter=RateLimiter(limits={"telegram": (10, 2)}))
+
+        for i in range(4):
+            outbox.enqueue(f"Bericht {i}", "", channel="telegram", urgent=True)
+
+        # De burst van 2 gaat direct, daarna moet er gewacht worden op een nieuw token
+        while outbox.process_next():
+            pass
+        self.assertEqual(len(channel.delivered), 2)
+
+        time.sleep(0.25)
+        while outbox.process_next():
+            pass
+        self.assertEqual(len(channel.delivered), 4)
+
+    def test_template_survives_outbox(self):
+        """Test dat een template verwijzing bewaard blijft, maar een samenvatting platte tekst is."""
+        channel = FakeChannel()
+        outbox = self.make_outbox(channel, digest_window=0)
+        template = {"name": "website_change", "values": {"url": "https://example.com"}}
+
+        outbox.enqueue("Website Verandering", "", channel="telegram", urgent=True, template=template)
+        outbox.process_next()
+        outbox.enqueue("Eerste", "", channel="telegram", template=template)
+        outbox.enqueue("Tweede", "", channel="telegram", template=template)
+        outbox.process_next()
+
+        self.assertEqual(channel.templates, [template, None])
+        self.assertEqual(channel.delivered[1], ("telegram", "2 nieuwe meldingen"))
+
+    def test_first_success_group(self):
+        """Test dat de andere kanalen van een first_success bericht vervallen zodra één kanaal het bezorgd heeft."""
+        channel = FakeChannel()
+        outbox = self.make_outbox(lambda name, title, body, template=None: name != "email" and channel(name, title, body, template))
+
+        with patch.object(notification_outbox, 'get_notification_outbox', return_value=outbox), \
+             patch.object(notification_outbox, 'default_channels', return_value=["email", "telegram"]), \
+             patch.object(notification_outbox, 'delivery_policy', side_effect=lambda message_type: {
+                 "job_accepted": "all_success"}.get(message_type, "first_success")) as policy:
+            enqueue_notification("Website Verandering", "", urgent=True, template={"name": "website_change", "values": {}})
+            enqueue_notification("Opdracht Geaccepteerd", "", urgent=True, template={"name": "job_accepted", "values": {}})
+        self.assertEqual([call.args[0] for call in policy.call_args_list], ["website_change", "job_accepted"])
+
+        for _ in range(4):
+            outbox.process_next()
+
+        self.assertEqual(channel.delivered, [("telegram", "Website Verandering"), ("telegram", "Opdracht Geaccepteerd")])
+        statuses = [(message["title"], message["channel"], message["status"]) for message in map(outbox.get_message, range(1, 5))]
+        self.assertEqual(statuses, [
+            ("Website Verandering", "email", STATUS_SUPERSEDED),
+            ("Website Verandering", "telegram", STATUS_SENT),
+            ("Opdracht Geaccepteerd", "email", STATUS_PENDING),  # all_success: blijft het proberen
+            ("Opdracht Geaccepteerd", "telegram", STATUS_SENT),
+        ])
+
+    def test_compose_digest(self):
+        """Test het samenvoegen van berichten."""
+        self.assertEqual(compose_digest([("Titel", "Inhoud")]), ("Titel", "Inhoud"))
+
+        title, body = compose_digest([("Eerste", "Inhoud"), ("Tweede", "")])
+        self.assertEqual(title, "2 nieuwe meldingen")
+        self.assertEqual(body, "• Eerste\nInhoud\n\n• Tweede")
+
+if __name__ == '__main__':
+    unittest.main()
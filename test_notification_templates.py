@@ -0,0 +1,75 @@
+import unittest
+import os
+import sys
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    from notification_templates import (Template, render, escape, compose_text, template_message,
+                                        FORMAT_PLAIN, FORMAT_MARKDOWN, FORMAT_HTML, _render_cached)
+except ImportError:
+    print("Kon de notification_templates module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+class TestNotificationTemplates(unittest.TestCase):
+    """Test cases voor de notificatie templates."""
+
+    def test_escape(self):
+        """Test het escapen van tekens met een betekenis in de opmaak."""
+        self.assertEqual(escape("a_b*c (1.5)!", FORMAT_MARKDOWN), "a\\_b\\*c \\(1\\.5\\)\\!")
+        self.assertEqual(escape("<b>Kast & lamp</b>", FORMAT_HTML), "&lt;b&gt;Kast &amp; lamp&lt;/b&gt;")
+        self.assertEqual(escape("a_b <c>", FORMAT_PLAIN), "a_b <c>")
+
+    def test_bold_per_format(self):
+        """Test dat *vet* in het template per opmaak wordt omgezet en velden worden ge-escaped."""
+        source = "Ingepland op *{slot}* - {location}."
+        values = {"slot": "2025-03-26 18:00", "location": "Amsterdam_Noord"}
+
+        self.assertEqual(Template(source, FORMAT_PLAIN).render(values), "Ingepland op 2025-03-26 18:00 - Amsterdam_Noord.")
+        self.assertEqual(Template(source, FORMAT_MARKDOWN).render(values),
+                         "Ingepland op *2025\\-03\\-26 18:00* \\- Amsterdam\\_Noord\\.")
+        self.assertEqual(Template(source, FORMAT_HTML).render(values),
+                         "Ingepland op <b>2025-03-26 18:00</b> - Amsterdam_Noord.")
+
+        with self.assertRaises(ValueError):
+            Template("*niet afgesloten", FORMAT_HTML)
+
+    def test_render_permission(self):
+        """Test het toestemmingsbericht, inclusief opmaak van getallen."""
+        title, body = render("permission", message="Accepteren?", title="Kast <groot>", location="Utrecht",
+                             distance=35, timeout=10, default="goedgekeurd")
+
+        self.assertEqual(title, "Toestemming gevraagd")
+        self.assertIn("- Titel: Kast <groot>", body)
+        self.assertIn("na 10 minuten automatisch goedgekeurd", body)
+
+        html_body = render("permission", FORMAT_HTML, message="Accepteren?", title="Kast <groot>").body
+        self.assertIn("<b>Details:</b>", html_body)
+        self.assertIn("Kast &lt;groot&gt;", html_body)
+
+    def test_render_cache(self):
+        """Test dat hetzelfde bericht maar één keer gerenderd wordt."""
+        _render_cached.cache_clear()
+        first = render("job_accepted", FORMAT_MARKDOWN, title="Kast", slot="18:00", location="Utrecht")
+        second = render("job_accepted", FORMAT_MARKDOWN, location="Utrecht", slot="18:00", title="Kast")
+
+        self.assertIs(first, second)
+        self.assertEqual(_render_cached.cache_info().hits, 1)
+
+    def test_compose_text_and_template_message(self):
+        """Test de Telegram tekst en de argumenten voor de outbox."""
+        rendered = render("message", FORMAT_MARKDOWN, title="Nieuw!", body="Zie website.")
+        self.assertEqual(compose_text(rendered, FORMAT_MARKDOWN), "*Nieuw\\!*\n\nZie website\\.")
+
+        message = template_message("website_change", url="https://example.com")
+        self.assertEqual(message["title"], "Website Verandering")
+        self.assertEqual(message["body"], "Er is een verandering gedetecteerd op https://example.com")
+        self.assertEqual(message["template"], {"name": "website_change", "values": {"url": "https://example.com"}})
+
+        with self.assertRaises(ValueError):
+            render("bestaat_niet")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+import os
+import sys
+import asyncio
+import subprocess
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    from notifiers import Notification, Notifier, create_notifier, register_provider, load_provider
+    from async_http import HTTPResponse
+    from rate_limit import RateLimiter
+except ImportError:
+    print("Kon de notifiers module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+class FakeHTTPClient:
+    """Neppe HTTP client die de verzoeken bijhoudt; geeft de opgegeven (status, inhoud) antwoorden terug."""
+
+    def __init__(self, statuses=()):
+        self.calls = []
+        self.statuses = list(statuses)
+
+    async def post(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        status = self.statuses.pop(0) if self.statuses else 200
+        status, body = status if isinstance(status, tuple) else (status, b"{}")
+        return HTTPResponse(status, "", {}, body)
+
+class TestNotifiers(unittest.TestCase):
+    """Test cases voor het register van notificatiekanalen."""
+
+    def test_providers_are_imported_lazily(self):
+        """Test dat alleen het gebruikte kanaal (en zijn afhankelijkheden) geladen wordt."""
+        code = ("import sys, notifiers; notifiers.create_notifier('telegram', {}); "
+                "print(','.join(m for m in ('notifiers.telegram', 'notifiers.mail', 'smtplib', 'smtp_transport') if m in sys.modules))")
+        output = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_DIR, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), "notifiers.telegram")
+
+    def test_send_batch_in_order(self):
+        """Test dat een batch in volgorde over de gedeelde client gaat en per bericht een resultaat geeft."""
+        client = FakeHTTPClient(statuses=[200, 500, 200])
+        notifier = create_notifier("telegram", {"bot_token": "token", "chat_id": "42"}, client=client,
+                                   rate_limiter=RateLimiter(limits={}, default=(1000, 1000)))
+
+        batch = [Notification(f"Bericht {i}", "Inhoud") for i in range(3)]
+        results = asyncio.run(notifier.send(batch))
+
+        self.assertEqual(results, [True, False, True])
+        self.assertEqual([kwargs['json_body']['text'] for _, kwargs in client.calls],
+                         [f"*Bericht {i}*\n\nInhoud" for i in range(3)])
+
+    def test_telegram_template_and_parse_fallback(self):
+        """Test dat Telegram het template in MarkdownV2 rendert en bij een opmaakfout platte tekst stuurt."""
+        parse_error = (400, b'{"ok": false, "description": "Bad Request: can\'t parse entities"}')
+        client = FakeHTTPClient(statuses=[200, parse_error, 200])
+        notifier = create_notifier("telegram", {"bot_token": "token", "chat_id": "42"}, client=client,
+                                   rate_limiter=RateLimiter(limits={}, default=(1000, 1000)))
+        template = {"name": "job_accepted", "values": {"title": "Kast_ophangen", "slot": "18:00", "location": "Utrecht"}}
+
+        results = asyncio.run(notifier.send([Notification("", template=template), Notification("", template=template)]))
+
+        self.assertEqual(results, [True, True])
+        first, retry, plain = [kwargs['json_body'] for _, kwargs in client.calls]
+        self.assertEqual(first["parse_mode"], "MarkdownV2")
+        self.assertEqual(first["text"], "*Opdracht geaccepteerd: Kast\\_ophangen*\n\nDeze opdracht is ingepland op *18:00* in Utrecht")
+        self.assertNotIn("parse_mode", plain)
+        self.assertEqual(plain["text"], "Opdracht geaccepteerd: Kast_ophangen\n\nDeze opdracht is ingepland op 18:00 in Utrecht")
+
+    def test_missing_config(self):
+        """Test dat een kanaal zonder configuratie niets verstuurt."""
+        client = FakeHTTPClient()
+        notifier = create_notifier("pushover", {}, client=client)
+
+        self.assertEqual(asyncio.run(notifier.send([Notification("Titel")])), [False])
+        self.assertEqual(client.calls, [])
+
+    def test_rate_limit(self):
+        """Test dat de notifier op een token wacht in plaats van de limiet te overschrijden."""
+        loop = asyncio.new_event_loop()
+        client = FakeHTTPClient()
+        notifier = create_notifier("pushbullet", {"api_key": "key"}, client=client,
+                                   rate_limiter=RateLimiter(limits={"pushbullet": (20, 1)}))
+
+        start = loop.time()
+        loop.run_until_complete(notifier.send([Notification("Eerste"), Notification("Tweede")]))
+        elapsed = loop.time() - start
+        loop.close()
+
+        self.assertEqual(len(client.calls), 2)
+        self.assertGreaterEqual(elapsed, 0.04)
+
+    def test_register_provider(self):
+        """Test het registreren van een eigen kanaal."""
+        register_provider("test_kanaal", f"{__name__}:EchoNotifier")
+
+        notifier = create_notifier("test_kanaal", {}, rate_limiter=RateLimiter(limits={}))
+        self.assertIs(load_provider("test_kanaal"), EchoNotifier)
+        self.assertEqual(asyncio.run(notifier.send([Notification("Hallo")])), [True])
+        self.assertEqual(notifier.sent, ["Hallo"])
+
+        with self.assertRaises(ValueError):
+            load_provider("bestaat_niet")
+
+class EchoNotifier(Notifier):
+    """Kanaal voor de test dat berichten alleen onthoudt."""
+
+    name = "test_kanaal"
+    label = "Test"
+
+    def __init__(self, config=None, client=None, rate_limiter=None):
+        super().__init__(config, client, rate_limiter)
+        self.sent = []
+
+    async def deliver(self, notification):
+        self.sent.append(notification.title)
+        return True
+
+if __name__ == '__main__':
+    unittest.main()
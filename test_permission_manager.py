@@ -0,0 +1,245 @@
+import unittest
+import os
+import sys
+import time
+import tempfile
+import shutil
+import asyncio
+import threading
+from unittest.mock import patch, MagicMock
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    from permission_manager import PermissionManager, CALLBACK_PREFIX
+    from job_filter import JobFilter
+    from preferences import Preferences
+    from notifiers import create_notifier
+    from notification_metrics import NotificationMetrics
+    from async_http import HTTPResponse
+    from rate_limit import RateLimiter
+except ImportError:
+    print("Kon de permission_manager module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+class FakeTelegramNotifier:
+    """Neppe Telegram notifier die de Bot API aanroepen bijhoudt."""
+
+    def __init__(self):
+        self.config = {"bot_token": "token", "chat_id": "123"}
+        self.calls = []
+        self.error = None
+
+    async def api(self, method, params, rate_limit=True):
+        self.calls.append((method, params))
+        if method == "sendMessage":
+            return {"message_id": len(self.calls)}
+        return True
+
+    def methods(self):
+        return [method for method, _ in self.calls]
+
+class InlineRuntime:
+    """Async runtime die een coroutine direct uitvoert, zodat de tests het resultaat meteen zien."""
+
+    def submit(self, coro):
+        return asyncio.run(coro)
+
+class FakeHTTPClient:
+    """Neppe HTTP client met een vast Bot API antwoord die de verzoeken bijhoudt."""
+
+    def __init__(self, body=b'{"ok": true, "result": {"message_id": 9}}'):
+        self.body = body
+        self.calls = []
+
+    async def post(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        return HTTPResponse(200, "", {}, self.body)
+
+class TestPermissionManager(unittest.TestCase):
+    """Test cases voor de toestemmingsafhandeling."""
+
+    def setUp(self):
+        """Setup voor elke test."""
+        # Maak een tijdelijke directory voor de database
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, 'test.db')
+        self.api = FakeTelegramNotifier()
+
+        self.job = {
+            'id': 'test-job-utrecht',
+            'title': 'Kast ophangen',
+            'description': 'Kast ophangen in Utrecht',
+            'location': 'Utrecht',
+            'distance_to_amsterdam': 35,
+            'available_timeslots': ['2025-03-26 18:00']
+        }
+
+    def tearDown(self):
+        """Cleanup na elke test."""
+        shutil.rmtree(self.test_dir)
+
+    def make_manager(self, **kwargs):
+        kwargs.setdefault("telegram", lambda: self.api)
+        manager = PermissionManager(self.db_path, runtime=InlineRuntime(), **kwargs)
+        # De Telegram ontvanger niet starten; de tests voeren de updates zelf aan
+        manager.start_polling = lambda: None
+        return manager
+
+    def callback_update(self, request_id, answer, update_id=1):
+        return {
+            "update_id": update_id,
+            "callback_query": {
+                "id": "cb-1",
+                "data": f"{CALLBACK_PREFIX}:{request_id}:{answer}",
+                "message": {"message_id": 7, "chat": {"id": 123}}
+            }
+        }
+
+    def last_request_id(self):
+        method, params = [call for call in self.api.calls if call[0] == "sendMessage"][-1]
+        return params["reply_markup"]["inline_keyboard"][0][0]["callback_data"].split(":")[1]
+
+    def test_request_does_not_block(self):
+        """Test dat een verzoek direct terugkeert en knoppen naar Telegram stuurt."""
+        manager = self.make_manager()
+
+        start = time.perf_counter()
+        result = manager.request("Opdracht buiten Amsterdam. Accepteren?", self.job)
+
+        self.assertIsNone(result)
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual(self.api.methods(), ["sendMessage"])
+        self.assertIn("Kast ophangen", self.api.calls[0][1]["text"])
+        self.assertEqual(manager.pending_count(), 1)
+
+        # Een tweede aanvraag voor dezelfde opdracht stuurt geen nieuw bericht
+        self.assertIsNone(manager.request("Opdracht buiten Amsterdam. Accepteren?", self.job))
+        self.assertEqual(self.api.methods(), ["sendMessage"])
+
+    def test_approve_via_callback(self):
+        """Test dat een druk op de knop de geparkeerde opdracht vrijgeeft."""
+        manager = self.make_manager()
+        manager.request("Accepteren?", self.job)
+
+        self.assertTrue(manager.handle_update(self.callback_update(self.last_request_id(), "yes")))
+
+        self.assertIn("answerCallbackQuery", self.api.methods())
+        self.assertTrue(manager.request("Accepteren?", self.job))
+
+        jobs = manager.decided_jobs()
+        self.assertEqual([job.id for job in jobs], ['test-job-utrecht'])
+        self.assertEqual(jobs[0].available_timeslots, ['2025-03-26 18:00'])
+        # Tot de opdracht verwerkt is komt hij terug (ook na een mislukte filterronde), daarna niet meer
+        self.assertEqual([job.id for job in manager.decided_jobs()], ['test-job-utrecht'])
+        manager.mark_handled('test-job-utrecht')
+        self.assertEqual(manager.decided_jobs(), [])
+
+    def test_deny_via_callback(self):
+        """Test dat een geweigerde opdracht niet terugkomt."""
+        manager = self.make_manager()
+        manager.request("Accepteren?", self.job)
+
+        self.assertTrue(manager.handle_update(self.callback_update(self.last_request_id(), "no")))
+
+        self.assertFalse(manager.request("Accepteren?", self.job))
+        self.assertEqual(manager.decided_jobs(), [])
+        # Een tweede antwoord verandert de beslissing niet meer
+        self.assertFalse(manager.handle_update(self.callback_update(self.last_request_id(), "yes")))
+
+    def test_request_for_message(self):
+        """Test het terugvinden van het openstaande verzoek bij een tekstantwoord."""
+        manager = self.make_manager()
+        manager.request("Accepteren?", self.job)
+        request_id = self.last_request_id()
+
+        self.assertEqual(manager.request_for_message(), request_id)
+        self.assertEqual(manager.request_for_message(1), request_id)
+        self.assertIsNone(manager.request_for_message(999))
+
+        manager.decide(request_id, False)
+        self.assertIsNone(manager.request_for_message())
+
+    def test_approval_survives_failed_filter_pass(self):
+        """Test dat een goedgekeurde opdracht terugkomt als de filterronde mislukt, en daarna niet meer."""
+        manager = self.make_manager()
+        manager.request("Accepteren?", self.job)
+        manager.decide(self.last_request_id(), True)
+
+        job_filter = JobFilter.__new__(JobFilter)
+        job_filter.current_pass = threading.local()
+        job_filter.save_processed_job = MagicMock()
+        job_filter.meets_basic_criteria = MagicMock(return_value=False)
+        with patch('job_filter.decided_jobs', manager.decided_jobs), \
+             patch('job_filter.mark_handled', manager.mark_handled), \
+             patch('job_filter.get_preferences', return_value=Preferences()):
+            with patch.object(job_filter, 'sort_jobs_by_priority', side_effect=RuntimeError("kapot")), \
+                 self.assertRaises(RuntimeError):
+                job_filter.filter_and_process_jobs([])
+            self.assertEqual([job.id for job in manager.decided_jobs()], ['test-job-utrecht'])
+
+            job_filter.filter_and_process_jobs([])
+
+        job_filter.meets_basic_criteria.assert_called_once()
+        self.assertEqual(manager.decided_jobs(), [])
+
+    def test_timeout_auto_approves(self):
+        """Test dat een verzoek zonder antwoord na de timeout automatisch wordt goedgekeurd."""
+        manager = self.make_manager(timeout=0)
+        manager.request("Accepteren?", self.job)
+
+        jobs = manager.decided_jobs()
+
+        self.assertEqual([job.id for job in jobs], ['test-job-utrecht'])
+        self.assertEqual(manager.pending_count(), 0)
+
+    def test_request_through_telegram_notifier(self):
+        """Test dat het verzoek via de notifier gaat: eigen api_base, rate limit en metrics."""
+        client = FakeHTTPClient()
+        limiter = RateLimiter(limits={}, default=(1000, 1000))
+        metrics = NotificationMetrics()
+        config = {"bot_token": "token", "chat_id": "123", "api_base": "http://localhost:8081/"}
+        notifier = create_notifier("telegram", config, client=client, rate_limiter=limiter, metrics=metrics)
+        manager = self.make_manager(telegram=lambda: notifier)
+
+        with patch.object(limiter, 'consume', wraps=limiter.consume) as acquire:
+            manager.request("Accepteren?", self.job)
+
+        url, kwargs = client.calls[0]
+        self.assertEqual(url, "http://localhost:8081/bottoken/sendMessage")
+        self.assertEqual(kwargs["json_body"]["chat_id"], "123")
+        acquire.assert_called()
+        self.assertEqual(metrics.snapshot()["telegram"]["sent"], 1)
+        self.assertEqual(manager.request_for_message(9), manager.request_for_message())
+
+    def test_telegram_config_read_per_request(self):
+        """Test dat een later ingestelde bot direct gebruikt wordt, en een mislukte aanroep terugvalt."""
+        sent = []
+        notifiers = [None]
+        manager = self.make_manager(telegram=lambda: notifiers[-1],
+                                    fallback_notify=lambda title, body: sent.append(title) or True)
+
+        manager.request("Accepteren?", self.job)
+        self.assertEqual(sent, ["Toestemming gevraagd"])
+
+        client = FakeHTTPClient(body=b'{"ok": false, "description": "Unauthorized"}')
+        notifiers.append(create_notifier("telegram", {"bot_token": "fout", "chat_id": "123"}, client=client,
+                                         rate_limiter=RateLimiter(limits={}, default=(1000, 1000)),
+                                         metrics=NotificationMetrics()))
+        manager.request("Accepteren?", dict(self.job, id="andere-opdracht"))
+
+        self.assertEqual(len(client.calls), 1)
+        self.assertEqual(sent, ["Toestemming gevraagd", "Toestemming gevraagd"])
+
+    def test_fallback_without_telegram(self):
+        """Test dat zonder Telegram bot het verzoek als gewone notificatie gaat."""
+        sent = []
+        manager = PermissionManager(self.db_path, fallback_notify=lambda title, body: sent.append(title) or True)
+
+        self.assertIsNone(manager.request("Accepteren?", self.job))
+        self.assertEqual(sent, ["Toestemming gevraagd"])
+
+if __name__ == '__main__':
+    unittest.main()
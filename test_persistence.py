@@ -0,0 +1,81 @@
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import threading
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    from persistence import atomic_write_json, load_json, BACKUP_SUFFIX
+except ImportError:
+    print("Kon de persistence module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+class TestPersistence(unittest.TestCase):
+    """Test cases voor het veilig opslaan van JSON bestanden."""
+
+    def setUp(self):
+        """Setup voor elke test."""
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, 'data.json')
+
+    def tearDown(self):
+        """Cleanup na elke test."""
+        shutil.rmtree(self.test_dir)
+
+    def test_write_and_skip_unchanged(self):
+        """Test dat gelijke inhoud niet opnieuw wordt geschreven."""
+        self.assertTrue(atomic_write_json(self.path, {"offset": 1}))
+        inode = os.stat(self.path).st_ino
+
+        self.assertFalse(atomic_write_json(self.path, {"offset": 1}))
+        self.assertEqual(os.stat(self.path).st_ino, inode)
+
+        self.assertTrue(atomic_write_json(self.path, {"offset": 2}))
+        self.assertEqual(load_json(self.path), {"offset": 2})
+        self.assertEqual(os.listdir(self.test_dir), ['data.json'])
+
+    def test_backup_generation(self):
+        """Test dat de vorige versie bewaard blijft en gebruikt wordt als het bestand beschadigd is."""
+        atomic_write_json(self.path, {"versie": 1}, backup=True)
+        self.assertFalse(os.path.exists(self.path + BACKUP_SUFFIX))
+        atomic_write_json(self.path, {"versie": 2}, backup=True)
+        self.assertEqual(load_json(self.path + BACKUP_SUFFIX), {"versie": 1})
+
+        with open(self.path, 'w') as f:
+            f.write('{"versie": ')
+        self.assertEqual(load_json(self.path, use_backup=True), {"versie": 1})
+        with self.assertRaises(ValueError):
+            load_json(self.path)
+
+    def test_failed_write_keeps_file(self):
+        """Test dat een mislukte schrijfactie het bestaande bestand intact laat."""
+        atomic_write_json(self.path, {"versie": 1})
+
+        with self.assertRaises(TypeError):
+            atomic_write_json(self.path, {"versie": object()})
+
+        self.assertEqual(load_json(self.path), {"versie": 1})
+        self.assertEqual(os.listdir(self.test_dir), ['data.json'])
+
+    def test_concurrent_writers(self):
+        """Test dat gelijktijdige schrijvers altijd een geldig bestand achterlaten."""
+        def writer(number):
+            for i in range(50):
+                atomic_write_json(self.path, {"writer": number, "i": i, "data": "x" * 1000}, backup=True)
+
+        threads = [threading.Thread(target=writer, args=(number,)) for number in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(load_json(self.path)["i"], 49)
+        self.assertEqual(sorted(os.listdir(self.test_dir)), ['data.json', 'data.json.bak'])
+
+if __name__ == '__main__':
+    unittest.main()
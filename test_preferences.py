@@ -0,0 +1,152 @@
+import unittest
+import os
+import sys
+import json
+import tempfile
+import shutil
+from datetime import date
+from unittest.mock import patch
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    import preferences
+    from preferences import PreferencesService, Preferences, normalize
+except ImportError:
+    print("Kon de preferences module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+class TestPreferences(unittest.TestCase):
+    """Test cases voor de gedeelde voorkeuren."""
+
+    def setUp(self):
+        """Setup voor elke test."""
+        self.test_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.test_dir, 'user_preferences.json')
+
+    def tearDown(self):
+        """Cleanup na elke test."""
+        shutil.rmtree(self.test_dir)
+
+    def write(self, data):
+        with open(self.path, 'w') as f:
+            json.dump(data, f)
+
+    def test_sunday_is_zero_in_old_schema(self):
+        """Test dat "0" in het oude schema zondag is, en niet maandag zoals date.weekday()."""
+        prefs = normalize({"max_jobs_weekday": {"0": 7, "1": 1, "2": 2, "3": 3, "4": 4, "5": 5, "6": 6}})
+
+        self.assertEqual(prefs.max_jobs_on(date(2025, 3, 23)), 7)  # Zondag
+        self.assertEqual(prefs.max_jobs_on(date(2025, 3, 24)), 1)  # Maandag
+        self.assertEqual(prefs.max_jobs_on(date(2025, 3, 29)), 6)  # Zaterdag
+        self.assertEqual(prefs.to_dict()["max_jobs_weekday"]["sunday"], 7)
+
+    def test_legacy_schemas(self):
+        """Test het omzetten van de schema's van de verschillende GUI's naar één snapshot."""
+        prefs = normalize({
+            "max_jobs_monday": 4, "max_jobs_sunday": "1",
+            "check_interval": 5,
+            "location": {"prefer_amsterdam": False, "max_distance": 35},
+            "schedule": {"max_jobs_per_day": {"6": 0}, "available_from": "2025-04-04"},
+            "auto_accept": {"urgent": False, "ikea": True},
+            "email": "gebruiker@example.com",
+            "phone": "0612345678",
+        })
+
+        self.assertEqual(prefs.max_jobs_per_day, (4, 2, 5, 2, 2, 0, 1))
+        self.assertEqual(prefs.monitoring_interval, 300)
+        self.assertFalse(prefs.prefer_amsterdam)
+        self.assertEqual(prefs.max_distance_without_permission, 35)
+        self.assertEqual(prefs.available_from, "2025-04-04")
+        self.assertTrue(prefs.auto_accept)
+        self.assertEqual(prefs.email["recipient"], "gebruiker@example.com")
+        self.assertEqual(prefs.email["smtp_server"], "smtp.gmail.com")
+        self.assertEqual(prefs.extra, {"phone": "0612345678"})
+
+        # Opgeslagen in het huidige schema, zonder oude sleutels, blijft de inhoud gelijk
+        data = prefs.to_dict()
+        self.assertNotIn("check_interval", data)
+        self.assertNotIn("max_jobs_monday", data)
+        self.assertEqual(normalize(data), prefs)
+
+    def test_invalid_values_fall_back_to_defaults(self):
+        """Test dat ongeldige waarden de standaardwaarde krijgen in plaats van de filter te laten crashen."""
+        prefs = normalize({"min_hourly_rate": "veel", "monitoring_interval": -5, "prefer_ikea": "nee",
+                           "telegram": "geen object", "calendar_id": None})
+        defaults = Preferences()
+
+        self.assertEqual(prefs.min_hourly_rate, defaults.min_hourly_rate)
+        self.assertEqual(prefs.monitoring_interval, defaults.monitoring_interval)
+        self.assertFalse(prefs.prefer_ikea)
+        self.assertEqual(prefs.telegram, defaults.telegram)
+        self.assertEqual(prefs.calendar_id, "primary")
+
+    def test_snapshot_is_immutable(self):
+        """Test dat een gedeelde snapshot niet per ongeluk gewijzigd kan worden."""
+        prefs = normalize({"telegram": {"bot_token": "abc", "chat_id": "1"}})
+
+        with self.assertRaises(Exception):
+            prefs.min_hourly_rate = 10
+        with self.assertRaises(TypeError):
+            prefs.telegram["bot_token"] = "xyz"
+
+        # De kopie voor de GUI mag wel worden aangepast
+        data = prefs.to_dict()
+        data["telegram"]["bot_token"] = "xyz"
+        self.assertEqual(prefs.telegram["bot_token"], "abc")
+
+    def test_read_once_and_shared(self):
+        """Test dat het bestand één keer wordt gelezen en iedereen dezelfde snapshot krijgt."""
+        self.write({"min_hourly_rate": 90})
+        service = PreferencesService(self.path)
+
+        with patch('preferences.load_json', wraps=preferences.load_json) as load:
+            first = service.get()
+            second = service.get()
+
+        self.assertEqual(load.call_count, 1)
+        self.assertIs(first, second)
+        self.assertEqual(first.min_hourly_rate, 90)
+
+    def test_save_publishes_changes(self):
+        """Test dat opslaan de snapshot vervangt, het bestand schrijft en abonnees informeert."""
+        self.write({"max_jobs_weekday": {"1": 4}})
+        service = PreferencesService(self.path)
+        before = service.get()
+        events = []
+        service.subscribe(lambda prefs, changed: events.append((prefs, changed)))
+
+        after = service.update(monitoring_interval=600, max_jobs_monday=3)
+
+        self.assertEqual(before.monitoring_interval, 300)
+        self.assertEqual(after.monitoring_interval, 600)
+        self.assertIs(service.get(), after)
+        self.assertEqual(events, [(after, {"monitoring_interval", "max_jobs_per_day"})])
+        with open(self.path, 'r') as f:
+            saved = json.load(f)
+        self.assertEqual(saved["max_jobs_weekday"]["monday"], 3)
+        self.assertEqual(saved["schema_version"], preferences.SCHEMA_VERSION)
+
+        # Opslaan zonder wijzigingen en herladen van hetzelfde bestand geven geen nieuw bericht
+        service.save({})
+        service.reload()
+        self.assertEqual(len(events), 1)
+
+    def test_missing_or_corrupt_file(self):
+        """Test dat een ontbrekend of kapot bestand de standaardwaarden geeft."""
+        self.assertEqual(PreferencesService(self.path).get(), Preferences())
+
+        with open(self.path, 'w') as f:
+            f.write("{kapot")
+        self.assertEqual(PreferencesService(self.path).get(), Preferences())
+
+        service = PreferencesService(self.path)
+        service.update(prefer_ikea=False)
+        service.reset()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertTrue(service.get().prefer_ikea)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import unittest
+import os
+import sys
+import socket
+import socketserver
+import threading
+import time
+from email.mime.text import MIMEText
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    from smtp_transport import SMTPTransport
+except ImportError:
+    print("Kon de smtp_transport module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+class FakeSMTPHandler(socketserver.StreamRequestHandler):
+    """Minimale SMTP server die genoeg protocol spreekt voor smtplib (EHLO, AUTH PLAIN, NOOP, MAIL, DATA)."""
+
+    def reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+            server.handlers.append(self)
+        self.reply("220 localhost fake smtp")
+
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode().strip().upper()
+
+            if command.startswith("EHLO"):
+                self.wfile.write(b"250-localhost\r\n250 AUTH PLAIN\r\n")
+            elif command.startswith("AUTH"):
+                with server.lock:
+                    server.logins += 1
+                self.reply("235 Authentication successful")
+            elif command.startswith("NOOP"):
+                self.reply("250 OK")
+            elif command.startswith(("MAIL", "RCPT", "RSET")):
+                self.reply("250 OK")
+            elif command.startswith("DATA"):
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data_line = self.rfile.readline()
+                    if data_line in (b".\r\n", b""):
+                        break
+                    lines.append(data_line.decode())
+                with server.lock:
+                    server.messages.append("".join(lines))
+                self.reply("250 Queued")
+            elif command.startswith("QUIT"):
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakeSMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.logins = 0
+        self.messages = []
+        self.handlers = []
+
+    def drop_connections(self):
+        """Verbreek alle open verbindingen, zoals een server die een idle sessie afsluit."""
+        with self.lock:
+            for handler in self.handlers:
+                handler.connection.shutdown(socket.SHUT_RDWR)
+            self.handlers = []
+
+class TestSMTPTransport(unittest.TestCase):
+    """Test cases voor het SMTP transport met blijvende verbinding."""
+
+    def setUp(self):
+        """Setup voor elke test."""
+        self.server = FakeSMTPServer()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.port = self.server.server_address[1]
+
+    def tearDown(self):
+        """Cleanup na elke test."""
+        self.server.shutdown()
+        self.server.server_close()
+
+    def make_transport(self, **kwargs):
+        kwargs.setdefault("batch_window", 0)
+        transport = SMTPTransport("127.0.0.1", self.port, "user@example.com", "secret", use_tls=False, **kwargs)
+        self.addCleanup(transport.close)
+        return transport
+
+    def make_message(self, subject):
+        msg = MIMEText("Inhoud")
+        msg["From"] = "user@example.com"
+        msg["To"] = "recipient@example.com"
+        msg["Subject"] = subject
+        return msg
+
+    def test_connection_is_reused(self):
+        """Test dat opeenvolgende berichten één verbinding en één login delen."""
+        transport = self.make_transport()
+
+        for i in range(5):
+            self.assertTrue(transport.send(self.make_message(f"Bericht {i}")))
+
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.server.logins, 1)
+        self.assertEqual(len(self.server.messages), 5)
+
+    def test_burst_is_batched(self):
+        """Test dat berichten binnen het batchvenster samen worden verzonden."""
+        transport = self.make_transport(batch_window=0.2)
+        results = []
+
+        threads = [threading.Thread(target=lambda i=i: results.append(transport.send(self.make_message(f"Bericht {i}"))))
+                   for i in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(results, [True] * 5)
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(len(self.server.messages), 5)
+
+    def test_single_message_does_not_wait(self):
+        """Test dat een los bericht niet op het batchvenster wacht."""
+        transport = self.make_transport(batch_window=5)
+
+        start = time.monotonic()
+        self.assertTrue(transport.send(self.make_message("Urgent")))
+        self.assertLess(time.monotonic() - start, 2)
+
+    def test_follower_sends_itself_when_leader_hangs(self):
+        """Test dat een bericht zelf verzonden wordt als de verzendende thread er niet aan toekomt."""
+        transport = self.make_transport(follower_timeout=0.1)
+        transport._leader_active = True  # Een verzendende thread die vastzit
+
+        self.assertTrue(transport.send(self.make_message("Toch verzonden")))
+        self.assertEqual(len(self.server.messages), 1)
+        self.assertEqual(transport._pending, [])
+
+    def test_reconnect_after_noop_failure(self):
+        """Test dat een verbroken verbinding met NOOP wordt opgemerkt en lui wordt hersteld."""
+        transport = self.make_transport(noop_interval=0)
+        self.assertTrue(transport.send(self.make_message("Eerste")))
+
+        self.server.drop_connections()
+
+        self.assertTrue(transport.send(self.make_message("Tweede")))
+        self.assertEqual(self.server.connections, 2)
+        self.assertEqual(self.server.logins, 2)
+        self.assertEqual(len(self.server.messages), 2)
+
+    def test_reconnect_when_server_disconnects(self):
+        """Test dat een bericht opnieuw wordt verzonden als de server tijdens het verzenden de verbinding sluit."""
+        transport = self.make_transport()
+        self.assertTrue(transport.send(self.make_message("Eerste")))
+
+        self.server.drop_connections()
+
+        self.assertTrue(transport.send(self.make_message("Tweede")))
+        self.assertEqual(self.server.connections, 2)
+        self.assertEqual(len(self.server.messages), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+import os
+import sys
+import subprocess
+
+# Voeg de project directory toe aan het pad
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(PROJECT_DIR))
+
+# Modules die traag laden en pas bij gebruik geïmporteerd mogen worden
+HEAVY_MODULES = {"tkinter", "selenium", "googleapiclient", "google_auth_oauthlib", "bs4", "requests", "cryptography"}
+
+# Modules die samen de headless monitoring vormen
+HEADLESS_MODULES = ["mrfix", "daemon", "monitoring_service", "job_filter", "calendar_integration", "notification_enhanced",
+                    "notification_outbox", "telegram_receiver", "permission_manager", "control_api", "control_client"]
+
+# Ruime bovengrens (seconden) voor het importeren van de headless modules, tegen regressies
+HEADLESS_IMPORT_BUDGET = 0.5
+
+def import_times(statement):
+    """Voer statement uit met python -X importtime; geeft {module: cumulatieve seconden} en het totaal terug."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            cwd=PROJECT_DIR, capture_output=True, text=True, timeout=60)
+    if result.returncode != 0:
+        raise AssertionError(result.stderr)
+
+    times = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative) / 1_000_000
+        if not name.startswith("  "):  # Bij het opstarten of direct door het statement geïmporteerd
+            total += times[name.strip()]
+    return times, total
+
+class TestStartup(unittest.TestCase):
+    """Test cases voor de opstarttijd (python -X importtime)."""
+
+    def assert_not_imported(self, times, modules):
+        loaded = {name.split(".")[0] for name in times} & modules
+        self.assertEqual(loaded, set(), f"Bij het opstarten geladen: {sorted(loaded)}")
+
+    def test_headless_loads_no_heavy_modules(self):
+        """Test dat de headless modus geen GUI of trage SDK's laadt."""
+        times, total = import_times(f"import {', '.join(HEADLESS_MODULES)}")
+
+        self.assert_not_imported(times, HEAVY_MODULES)
+        self.assertLess(total, HEADLESS_IMPORT_BUDGET)
+
+    def test_gui_defers_sdks(self):
+        """Test dat de GUI alleen tkinter laadt en de SDK's pas bij gebruik."""
+        times, _ = import_times("import app")
+
+        self.assertIn("tkinter", times)
+        self.assert_not_imported(times, HEAVY_MODULES - {"tkinter"})
+
+    def test_import_has_no_side_effects(self):
+        """Test dat importeren geen logging configureert."""
+        statement = (f"import logging, app, gui_enhanced, website_monitor, {', '.join(HEADLESS_MODULES)}; "
+                     "print(len(logging.getLogger().handlers))")
+        result = subprocess.run([sys.executable, "-c", statement], cwd=PROJECT_DIR, capture_output=True,
+                                text=True, timeout=60)
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "0")
+
+if __name__ == '__main__':
+    unittest.main()
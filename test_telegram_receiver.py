@@ -0,0 +1,205 @@
+import unittest
+import os
+import sys
+import json
+import time
+import sqlite3
+import tempfile
+import shutil
+import asyncio
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    from telegram_receiver import TelegramReceiver, load_offset
+    from permission_manager import PermissionManager, CALLBACK_PREFIX
+    from async_runtime import AsyncRuntime
+    from async_http import AsyncHTTPClient
+except ImportError:
+    print("Kon de telegram_receiver module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+BOT_TOKEN = "123:abc"
+CHAT_ID = "42"
+
+class FakeTelegramHandler(BaseHTTPRequestHandler):
+    """Neppe Telegram Bot API met keep-alive: getUpdates geeft de klaargezette updates terug."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        method = self.path.rsplit('/', 1)[-1]
+        params = json.loads(self.rfile.read(int(self.headers['Content-Length'])) or b'{}')
+
+        with server.lock:
+            server.calls.append((method, params))
+            server.ports.add(self.client_address[1])
+            if method == "getUpdates":
+                offset = params.get("offset") or 0
+                result = [update for update in server.updates if update["update_id"] >= offset]
+            elif method == "sendMessage":
+                server.messages.append(params["text"])
+                result = {"message_id": len(server.calls)}
+            else:
+                result = True
+
+        body = json.dumps({"ok": True, "result": result}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class TestTelegramReceiver(unittest.TestCase):
+    """Test cases voor de Telegram ontvanger tegen een lokale nep-API."""
+
+    def setUp(self):
+        """Setup voor elke test."""
+        # Maak een tijdelijke directory voor de database en de offset
+        self.test_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.test_dir, 'test.db')
+        self.offset_file = os.path.join(self.test_dir, 'offset.json')
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeTelegramHandler)
+        self.server.lock = threading.Lock()
+        self.server.calls = []
+        self.server.updates = []
+        self.server.messages = []
+        self.server.ports = set()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.api_base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+        self.manager = PermissionManager(self.db_path)
+        self.manager.start_polling = lambda: None
+
+    def tearDown(self):
+        """Cleanup na elke test."""
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.test_dir)
+
+    def make_receiver(self):
+        return TelegramReceiver(BOT_TOKEN, CHAT_ID, api_base=self.api_base, offset_file=self.offset_file, client=AsyncHTTPClient(),
+                                db_path=self.db_path, permission_manager=self.manager, poll_timeout=0)
+
+    def message(self, update_id, text, chat_id=CHAT_ID):
+        return {"update_id": update_id, "message": {"message_id": update_id, "chat": {"id": int(chat_id)}, "text": text}}
+
+    def poll(self, receiver):
+        async def poll_and_close():
+            try:
+                return await receiver.poll_once()
+            finally:
+                await receiver.client.close()
+        return asyncio.run(poll_and_close())
+
+    def methods(self):
+        return [method for method, _ in self.server.calls]
+
+    def test_today_command_and_offset(self):
+        """Test het /vandaag commando, hergebruik van de verbinding en het bewaren van de offset."""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.execute('CREATE TABLE accepted_jobs (id TEXT, title TEXT, location TEXT, scheduled_date TEXT)')
+            conn.execute('INSERT INTO accepted_jobs VALUES (?, ?, ?, ?)', (
+                "1", "Kast ophangen", "Amsterdam", datetime.now().replace(hour=14, minute=0).isoformat()))
+
+        self.server.updates = [self.message(10, "/vandaag"), self.message(11, "/status@mrfix_bot")]
+        receiver = self.make_receiver()
+
+        self.assertEqual(self.poll(receiver), 2)
+        self.assertEqual(self.server.messages[0], "Planning voor vandaag:\n14:00 Kast ophangen (Amsterdam)")
+        self.assertIn("Opdrachten vandaag: 1", self.server.messages[1])
+        # getUpdates en beide antwoorden gingen over één keep-alive verbinding
+        self.assertEqual(receiver.client.connections_opened, 1)
+        self.assertEqual(len(self.server.ports), 1)
+        self.assertEqual(load_offset(self.offset_file), 12)
+
+        # Na een herstart gaat de nieuwe ontvanger verder vanaf de bewaarde offset
+        self.server.calls.clear()
+        restarted = self.make_receiver()
+        self.assertEqual(self.poll(restarted), 0)
+        self.assertEqual(self.server.calls, [("getUpdates", {"timeout": 0, "allowed_updates": ["message", "callback_query"], "offset": 12})])
+
+    def test_custom_command(self):
+        """Test dat geregistreerde handlers (ook coroutines) het commando en de argumenten krijgen."""
+        received = []
+
+        async def force_poll(args):
+            received.append(args)
+            return "Website wordt nu gecontroleerd"
+
+        receiver = self.make_receiver()
+        receiver.register_command(force_poll, "/controleer", "/poll")
+        self.server.updates = [self.message(1, "/POLL nu"), self.message(2, "/onbekend")]
+
+        self.poll(receiver)
+
+        self.assertEqual(received, ["nu"])
+        self.assertEqual(self.server.messages[0], "Website wordt nu gecontroleerd")
+        self.assertIn("Onbekend commando: /onbekend", self.server.messages[1])
+
+    def test_callback_routes_to_permission_manager(self):
+        """Test dat een druk op de knop de toestemming vastlegt en via de API bevestigt."""
+        self.manager.request("Accepteren?", {"id": "job-1", "title": "Kast", "location": "Utrecht"})
+        request_id = self.manager.request_for_message()
+
+        self.server.updates = [{"update_id": 5, "callback_query": {
+            "id": "cb-1",
+            "data": f"{CALLBACK_PREFIX}:{request_id}:yes",
+            "message": {"message_id": 7, "chat": {"id": int(CHAT_ID)}}
+        }}]
+        self.poll(self.make_receiver())
+
+        self.assertEqual(self.methods(), ["getUpdates", "answerCallbackQuery", "editMessageReplyMarkup"])
+        self.assertEqual([job.id for job in self.manager.decided_jobs()], ["job-1"])
+
+    def test_text_reply_decides_request(self):
+        """Test dat "reject" als antwoord het openstaande verzoek weigert."""
+        self.manager.request("Accepteren?", {"id": "job-2", "title": "Lamp", "location": "Haarlem"})
+
+        self.server.updates = [self.message(1, "reject"), self.message(2, "accept")]
+        self.poll(self.make_receiver())
+
+        self.assertFalse(self.manager.request("Accepteren?", {"id": "job-2"}))
+        self.assertEqual(self.server.messages, ["Opdracht geweigerd", "Er staat geen toestemmingsverzoek open."])
+
+    def test_ignores_other_chats(self):
+        """Test dat berichten uit een andere chat de monitor niet kunnen besturen."""
+        self.server.updates = [self.message(1, "/status", chat_id="666")]
+        receiver = self.make_receiver()
+
+        self.assertEqual(self.poll(receiver), 1)
+        self.assertEqual(self.methods(), ["getUpdates"])
+        self.assertEqual(receiver.offset, 2)
+
+    def test_runs_on_async_runtime(self):
+        """Test dat de ontvanger als taak op de gedeelde event loop draait en te stoppen is."""
+        runtime = AsyncRuntime()
+        paused = threading.Event()
+        receiver = self.make_receiver()
+        receiver.register_command(lambda args: paused.set() or "Monitoring gepauzeerd", "/pauze")
+        self.server.updates = [self.message(1, "/pauze")]
+
+        future = receiver.start(runtime)
+        try:
+            self.assertTrue(paused.wait(5))
+            deadline = time.time() + 5
+            while "Monitoring gepauzeerd" not in self.server.messages and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertIn("Monitoring gepauzeerd", self.server.messages)
+        finally:
+            receiver.stop()
+            runtime.stop()
+        self.assertTrue(future.cancelled())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+import threading
+from datetime import datetime, timedelta
+from unittest.mock import patch, MagicMock
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    from geodata import GeoResolver
+    from travel_time import TravelTimeModel, build_matrix, write_matrix, estimate_travel_minutes
+    from job import Job
+    from job_filter import JobFilter
+    from preferences import Preferences
+except ImportError:
+    print("Kon de travel_time module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+class TestTravelTimeModel(unittest.TestCase):
+    """Test cases voor de voorberekende reistijdmatrix."""
+
+    def setUp(self):
+        """Setup voor elke test."""
+        # Maak een tijdelijke directory voor de matrix en de geocode cache
+        self.test_dir = tempfile.mkdtemp()
+        self.matrix_file = os.path.join(self.test_dir, 'travel_matrix.bin')
+
+        self.resolver = GeoResolver(os.path.join(self.test_dir, 'test.db'))
+        self.patcher1 = patch('travel_time.resolve_location', self.resolver.resolve)
+        self.patcher1.start()
+
+    def tearDown(self):
+        """Cleanup na elke test."""
+        self.patcher1.stop()
+        self.resolver.cleanup()
+        shutil.rmtree(self.test_dir)
+
+    def test_estimate_travel_minutes(self):
+        """Test dat korte ritten korter zijn dan de oude vaste reistijd van een uur."""
+        amsterdam = (52.3731, 4.8926)
+        utrecht = (52.0907, 5.1214)
+
+        self.assertLess(estimate_travel_minutes(amsterdam, amsterdam), 60)
+        self.assertGreater(estimate_travel_minutes(amsterdam, utrecht), estimate_travel_minutes(amsterdam, amsterdam))
+        self.assertEqual(estimate_travel_minutes(amsterdam, utrecht) % 5, 0)
+
+    def test_write_and_load_matrix(self):
+        """Test dat de gemapte matrix gelijk is aan de opgebouwde matrix."""
+        write_matrix(self.matrix_file)
+        names, matrix = build_matrix()
+
+        model = TravelTimeModel.load(self.matrix_file)
+
+        self.assertEqual(model.zones, names)
+        self.assertEqual(list(model.matrix), list(matrix))
+        self.assertIsNotNone(model._mapped)
+
+    def test_rewrite_keeps_mapped_matrix_readable(self):
+        """Test dat opnieuw schrijven de gemapte matrix van een draaiend model niet afkapt."""
+        write_matrix(self.matrix_file)
+        model = TravelTimeModel.load(self.matrix_file)
+        before = list(model.matrix)
+
+        write_matrix(self.matrix_file, zones={"Amsterdam": (52.3731, 4.8926)})
+
+        self.assertEqual(list(model.matrix), before)
+        self.assertEqual(TravelTimeModel.load(self.matrix_file).zones, ["Amsterdam"])
+        self.assertFalse([name for name in os.listdir(self.test_dir) if name.endswith('.tmp')])
+
+    def test_missing_matrix_is_built_in_memory(self):
+        """Test dat een ontbrekend matrixbestand in het geheugen wordt opgebouwd."""
+        model = TravelTimeModel.load(os.path.join(self.test_dir, 'missing.bin'))
+
+        self.assertGreater(model.size, 0)
+        self.assertIsNone(model._mapped)
+
+    def test_travel_minutes(self):
+        """Test reistijden tussen locaties in de regio."""
+        write_matrix(self.matrix_file)
+        model = TravelTimeModel.load(self.matrix_file)
+
+        within_amsterdam = model.travel_minutes("Amsterdam Noord", "Amsterdam Zuid")
+        to_utrecht = model.travel_minutes("Amsterdam", "Utrecht")
+
+        self.assertLess(within_amsterdam, to_utrecht)
+        self.assertEqual(model.travel_minutes("1012 AB", "Amsterdam Centrum"), model.travel_minutes("Amsterdam", "Amsterdam"))
+        # Locaties buiten de regio of onbekende locaties hebben geen reistijd
+        self.assertIsNone(model.travel_minutes("Amsterdam", "Groningen"))
+        self.assertIsNone(model.travel_minutes("Amsterdam", "Nergenshuizen"))
+
+class TestReservationWindow(unittest.TestCase):
+    """Test cases voor de reistijd die rond een opdracht gereserveerd wordt."""
+
+    def setUp(self):
+        """Setup voor elke test."""
+        # Een filter zonder database; de reistijd is 30 minuten naar of van huis en 10 minuten tussen opdrachten
+        self.job_filter = JobFilter.__new__(JobFilter)
+        self.job_filter.current_pass = threading.local()
+        self.job_filter.travel_time_model = MagicMock()
+        self.job_filter.travel_time_model.travel_minutes.side_effect = lambda origin, destination: (
+            30 if "Thuis" in (origin, destination) else 10)
+        self.job_filter.get_jobs_on_date = MagicMock(return_value=[])
+
+        self.patcher1 = patch('job_filter.get_preferences', return_value=Preferences(home_location="Thuis"))
+        self.patcher1.start()
+        self.job = Job.from_dict({'id': 'job', 'title': 'Lamp ophangen', 'location': 'Haarlem'})
+        self.start = datetime(2025, 3, 25, 14, 0)
+
+    def tearDown(self):
+        """Cleanup na elke test."""
+        self.patcher1.stop()
+
+    def test_first_job_of_the_day(self):
+        """Test dat voor de eerste opdracht van de dag ook de reistijd van huis gereserveerd wordt."""
+        window_start, minutes = self.job_filter.reservation_window(self.job, self.start, 60)
+
+        self.assertEqual(window_start, self.start - timedelta(minutes=30))
+        self.assertEqual(minutes, 30 + 60 + 30)
+
+    def test_between_jobs(self):
+        """Test de reistijd vanaf de vorige en naar de volgende opdracht op dezelfde dag."""
+        self.job_filter.get_jobs_on_date.return_value = [
+            (self.start - timedelta(hours=2), "Amsterdam"), (self.start + timedelta(hours=2), "Utrecht")]
+
+        window_start, minutes = self.job_filter.reservation_window(self.job, self.start, 60)
+
+        self.assertEqual(window_start, self.start - timedelta(minutes=10))
+        self.assertEqual(minutes, 10 + 60 + 10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import os
+import sys
+import threading
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    from ui_events import UIEventBus, coalesce, LATEST, EXTEND, MAX_EVENTS_PER_DRAIN
+except ImportError:
+    print("Kon de ui_events module niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+class FakeRoot:
+    """Genoeg van tk.Tk voor de bus: after() onthoudt alleen de geplande drain."""
+
+    def __init__(self):
+        self.scheduled = None
+
+    def after(self, ms, callback):
+        self.scheduled = callback
+        return "after#1"
+
+    def after_cancel(self, after_id):
+        self.scheduled = None
+
+class TestUIEvents(unittest.TestCase):
+    """Test cases voor de event bus tussen de monitoring en de GUI."""
+
+    def test_coalesce(self):
+        """Test dat status en opdrachten samengevoegd worden en fouten allemaal in volgorde blijven."""
+        events = [("state", True), ("jobs", [1]), ("error", "a"), ("jobs", [2, 3]), ("error", "b"), ("state", False)]
+
+        result = coalesce(events, {"state": LATEST, "jobs": EXTEND})
+
+        self.assertEqual(result, [("jobs", [1, 2, 3]), ("error", "a"), ("error", "b"), ("state", False)])
+
+    def test_burst_from_threads(self):
+        """Test dat een burst uit meerdere threads per frame één keer wordt afgehandeld."""
+        root = FakeRoot()
+        handled = []
+        bus = UIEventBus(root, lambda event, value: handled.append((event, value)),
+                         merge={"jobs": EXTEND, "check": LATEST}).start()
+
+        def worker(offset):
+            for i in range(600):
+                bus.post("jobs", [offset + i])
+                bus.post("check", offset + i)
+
+        threads = [threading.Thread(target=worker, args=(n * 1000,)) for n in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Eerste frame: een begrensd deel, samengevoegd tot één gebeurtenis per soort
+        root.scheduled()
+        self.assertEqual([event for event, value in handled], ["jobs", "check"])
+        jobs = handled[0][1]
+        self.assertEqual(len(jobs), MAX_EVENTS_PER_DRAIN // 2)
+
+        # De rest volgt in de volgende frames, zonder dat er iets verloren gaat
+        while not bus.events.empty():
+            root.scheduled()
+        jobs += [job for event, value in handled[2:] if event == "jobs" for job in value]
+        self.assertEqual(sorted(jobs), sorted(n * 1000 + i for n in range(5) for i in range(600)))
+
+        bus.stop()
+        self.assertIsNone(root.scheduled)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,198 @@
+import unittest
+import os
+import sys
+import json
+import asyncio
+import tempfile
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Voeg de project directory toe aan het pad
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Import de modules die we willen testen
+try:
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+    from notifiers.base import Notification
+    from notifiers.web_push import (WebPushNotifier, encrypt_payload, public_key_bytes, b64url_encode, b64url_decode,
+                                    hkdf, VAPID_TOKEN_LIFETIME, VAPID_REFRESH_MARGIN)
+    from async_http import AsyncHTTPClient
+except ImportError:
+    print("Kon de web_push module of cryptography niet importeren. Zorg ervoor dat je in de juiste directory bent.")
+    sys.exit(1)
+
+# Voorbeeld uit RFC 8291, Appendix A
+RFC_PLAINTEXT = b"When I grow up, I want to be a watermelon"
+RFC_SERVER_PRIVATE = "yfWPiYE-n46HLnH0KqZOF1fJJU3MYrct3AELtAQ-oRw"
+RFC_UA_PUBLIC = "BCVxsr7N_eNgVRqvHtD0zTZsEc6-VV-JvLexhqUzORcxaOzi6-AYWXvTBHm4bjyPjs7Vd8pZGH6SRpkNtoIAiw4"
+RFC_AUTH = "BTBZMqHH6r4Tts7J_aSIgg"
+RFC_SALT = "DGv6ra1nlYgDCS1FRnbzlw"
+RFC_RESULT = ("DGv6ra1nlYgDCS1FRnbzlwAAEABBBP4z9KsN6nGRTbVYI_c7VJSPQTBtkgcy27mlmlMoZIIgDll6e3vCYLocInmYWAmS6TlzAC8wEqKK"
+              "6PBru3jl7A_yl95bQpu6cVPTpK4Mqgkf1CXztLVBSt2Ks3oZwbuwXPXLWyouBWLVWGNWQexSgSxsj_Qulcy4a-fN")
+
+class FakePushServiceHandler(BaseHTTPRequestHandler):
+    """Neppe push service met keep-alive: /gone is een verlopen abonnement."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        with server.lock:
+            server.pushes.append((self.path, dict(self.headers), body))
+            server.ports.add(self.client_address[1])
+
+        self.send_response(410 if self.path == "/gone" else 201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def decrypt(body, ua_key, auth_secret):
+    """Ontsleutel een aes128gcm bericht zoals de browser dat doet."""
+    salt, key_length = body[:16], body[20]
+    server_public = body[21:21 + key_length]
+    ua_public = public_key_bytes(ua_key)
+
+    shared_secret = ua_key.exchange(ec.ECDH(), ec.EllipticCurvePublicKey.from_encoded_point(ec.SECP256R1(), server_public))
+    ikm = hkdf(auth_secret, shared_secret, b"WebPush: info\x00" + ua_public + server_public, 32)
+    content_key = hkdf(salt, ikm, b"Content-Encoding: aes128gcm\x00", 16)
+    nonce = hkdf(salt, ikm, b"Content-Encoding: nonce\x00", 12)
+    record = AESGCM(content_key).decrypt(nonce, body[21 + key_length:], None)
+    return record.rstrip(b'\x00')[:-1]
+
+class TestWebPush(unittest.TestCase):
+    """Test cases voor Web Push tegen een lokale push service."""
+
+    def setUp(self):
+        """Setup voor elke test."""
+        self.test_dir = tempfile.mkdtemp()
+        self.expired_file = os.path.join(self.test_dir, 'expired.json')
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakePushServiceHandler)
+        self.server.lock = threading.Lock()
+        self.server.pushes = []
+        self.server.ports = set()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.origin = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+        # Het abonnement van de "browser"
+        self.ua_key = ec.generate_private_key(ec.SECP256R1())
+        self.auth_secret = os.urandom(16)
+        self.vapid_key = ec.generate_private_key(ec.SECP256R1())
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        """Cleanup na elke test."""
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.test_dir)
+
+    def subscription(self, path):
+        return {"endpoint": f"{self.origin}{path}", "keys": {
+            "p256dh": b64url_encode(public_key_bytes(self.ua_key)),
+            "auth": b64url_encode(self.auth_secret)
+        }}
+
+    def make_notifier(self, *paths):
+        config = {
+            "vapid_private_key": b64url_encode(self.vapid_key.private_numbers().private_value.to_bytes(32, 'big')),
+            "vapid_subject": "mailto:test@example.com",
+            "subscription_info": [self.subscription(path) for path in paths],
+        }
+        return WebPushNotifier(config, client=AsyncHTTPClient(), clock=self.clock, expired_file=self.expired_file)
+
+    def send(self, notifier, *notifications):
+        async def send_and_close():
+            try:
+                return await notifier.send(list(notifications), rate_limit=False)
+            finally:
+                await notifier.client.close()
+        return asyncio.run(send_and_close())
+
+    def verify_token(self, authorization):
+        """Controleer de VAPID handtekening met de meegestuurde publieke sleutel en geef de claims terug."""
+        token, key = [part.split('=', 1)[1] for part in authorization[len("vapid "):].split(', ')]
+        header, claims, signature = token.split('.')
+        signature = b64url_decode(signature)
+        public_key = ec.EllipticCurvePublicKey.from_encoded_point(ec.SECP256R1(), b64url_decode(key))
+        public_key.verify(encode_dss_signature(int.from_bytes(signature[:32], 'big'), int.from_bytes(signature[32:], 'big')),
+                          f"{header}.{claims}".encode(), ec.ECDSA(hashes.SHA256()))
+        self.assertEqual(b64url_decode(key), public_key_bytes(self.vapid_key))
+        return token, json.loads(b64url_decode(claims))
+
+    def test_encrypt_payload_rfc_example(self):
+        """Test de versleuteling met het voorbeeld uit RFC 8291."""
+        server_key = ec.derive_private_key(int.from_bytes(b64url_decode(RFC_SERVER_PRIVATE), 'big'), ec.SECP256R1())
+        body = encrypt_payload(RFC_PLAINTEXT, RFC_UA_PUBLIC, RFC_AUTH, salt=b64url_decode(RFC_SALT), server_key=server_key)
+
+        self.assertEqual(b64url_encode(body), RFC_RESULT)
+
+    def test_push_is_encrypted_and_signed(self):
+        """Test dat de push service een versleuteld en ondertekend bericht krijgt."""
+        notifier = self.make_notifier("/push/abc")
+
+        self.assertEqual(self.send(notifier, Notification("Nieuwe opdracht", "Kast ophangen", urgent=True)), [True])
+
+        path, headers, body = self.server.pushes[0]
+        self.assertEqual(path, "/push/abc")
+        self.assertEqual(headers["Content-Encoding"], "aes128gcm")
+        self.assertEqual(headers["Urgency"], "high")
+        self.assertEqual(json.loads(decrypt(body, self.ua_key, self.auth_secret)),
+                         {"title": "Nieuwe opdracht", "body": "Kast ophangen"})
+
+        _, claims = self.verify_token(headers["Authorization"])
+        self.assertEqual(claims["aud"], self.origin)
+        self.assertEqual(claims["sub"], "mailto:test@example.com")
+        self.assertEqual(claims["exp"], self.clock.now + VAPID_TOKEN_LIFETIME)
+
+    def test_token_and_connection_reused(self):
+        """Test dat het VAPID token en de verbinding hergebruikt worden tot het token bijna verloopt."""
+        notifier = self.make_notifier("/push/abc")
+
+        self.send(notifier, Notification("Eerste"), Notification("Tweede"))
+        self.assertEqual(notifier.client.connections_opened, 1)
+        self.assertEqual(len(self.server.ports), 1)
+
+        self.clock.now += VAPID_TOKEN_LIFETIME - VAPID_REFRESH_MARGIN - 1
+        self.send(notifier, Notification("Derde"))
+        self.clock.now += 2
+        self.send(notifier, Notification("Vierde"))
+
+        tokens = [self.verify_token(headers["Authorization"])[0] for _, headers, _ in self.server.pushes]
+        self.assertEqual(tokens[0], tokens[1])
+        self.assertEqual(tokens[1], tokens[2])
+        self.assertNotEqual(tokens[2], tokens[3])
+
+    def test_expired_subscription_skipped(self):
+        """Test dat een verlopen abonnement (410) bewaard en daarna overgeslagen wordt."""
+        notifier = self.make_notifier("/gone", "/push/abc")
+
+        self.assertEqual(self.send(notifier, Notification("Eerste")), [True])
+        with open(self.expired_file, 'r') as f:
+            self.assertEqual(json.load(f), [f"{self.origin}/gone"])
+
+        # Ook na een herstart wordt alleen het actieve abonnement nog gebruikt
+        self.server.pushes.clear()
+        restarted = self.make_notifier("/gone", "/push/abc")
+        self.assertEqual(self.send(restarted, Notification("Tweede")), [True])
+        self.assertEqual([path for path, _, _ in self.server.pushes], ["/push/abc"])
+
+        # Zonder actieve abonnementen wordt er niets verstuurd
+        only_gone = self.make_notifier("/gone")
+        self.assertIsNotNone(only_gone.missing_config())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+import os
+import math
+import mmap
+import array
+import struct
+import logging
+from functools import lru_cache
+
+from geodata import PLACES, AMSTERDAM_COORDS, haversine, resolve_location
+from persistence import atomic_write_bytes
+
+# Configuratie
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+TRAVEL_MATRIX_FILE = os.path.join(DATA_DIR, 'travel_matrix.bin')
+
+# Bestandsformaat: magic, versie, aantal zones, lengte van de zonenamen,
+# gevolgd door de zonenamen (utf-8, gescheiden door newlines) en een n x n matrix van uint16 minuten
+MATRIX_MAGIC = b'MFTT'
+MATRIX_VERSION = 1
+HEADER_FORMAT = '<4sHHI'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+# Regio waarvoor de matrix wordt opgebouwd
+REGION_RADIUS_KM = 60
+
+# Reismodel (benadering voor reizen met de auto/bus inclusief parkeren en uitladen)
+DETOUR_FACTOR = 1.3  # Weg-afstand t.o.v. hemelsbreed
+CITY_SPEED_KMH = 25  # Gemiddelde snelheid binnen de stad
+REGION_SPEED_KMH = 55  # Gemiddelde snelheid voor langere ritten
+CITY_DISTANCE_KM = 10  # Onder deze weg-afstand geldt de stadssnelheid
+FIXED_OVERHEAD_MINUTES = 10  # Parkeren, uitladen, lopen
+INTRA_ZONE_KM = 3  # Gemiddelde rit binnen één zone
+ROUND_TO = 5  # Afronden naar boven op 5 minuten
+
+
+def region_zones():
+    """Bepaal de zones (plaatsen en stadsdelen) in de Amsterdamse regio."""
+    zones = {}
+    for name, coords in PLACES.items():
+        if haversine(AMSTERDAM_COORDS, coords) <= REGION_RADIUS_KM:
+            zones[name] = coords
+    return dict(sorted(zones.items()))
+
+
+def estimate_travel_minutes(coord1, coord2):
+    """Schat de reistijd in minuten tussen twee coördinaten."""
+    road_km = max(haversine(coord1, coord2), INTRA_ZONE_KM) * DETOUR_FACTOR
+    speed = CITY_SPEED_KMH if road_km < CITY_DISTANCE_KM else REGION_SPEED_KMH
+    minutes = FIXED_OVERHEAD_MINUTES + road_km / speed * 60
+    return int(math.ceil(minutes / ROUND_TO) * ROUND_TO)
+
+
+def build_matrix(zones=None):
+    """Bouw de zone-naar-zone reistijdmatrix op (als array van uint16)."""
+    zones = zones or region_zones()
+    coords = list(zones.values())
+    matrix = array.array('H')
+    for origin in coords:
+        for destination in coords:
+            matrix.append(min(estimate_travel_minutes(origin, destination), 0xFFFF))
+    return list(zones), matrix
+
+
+def write_matrix(path=None, zones=None):
+    """Bouw de matrix en schrijf deze naar het binaire matrixbestand.
+
+    Het bestand wordt in één keer vervangen (niet overschreven), zodat een draaiende daemon die de oude
+    matrix gemapt heeft die gewoon blijft lezen.
+    """
+    path = path or TRAVEL_MATRIX_FILE
+    names, matrix = build_matrix(zones)
+    names_blob = '\n'.join(names).encode('utf-8')
+    # Lijn de matrix uit op 2 bytes zodat deze direct als uint16 gelezen kan worden
+    padding = b'\0' * ((HEADER_SIZE + len(names_blob)) % 2)
+
+    header = struct.pack(HEADER_FORMAT, MATRIX_MAGIC, MATRIX_VERSION, len(names), len(names_blob))
+    atomic_write_bytes(path, header + names_blob + padding + matrix.tobytes())
+    logging.info("Reistijdmatrix met %s zones geschreven naar %s", len(names), path)
+    return path
+
+
+class TravelTimeModel:
+    def __init__(self, zones, matrix, mapped=None):
+        """Initialiseer het reistijdmodel met zonenamen en een (gemapte) matrix."""
+        self.zones = zones
+        self.zone_index = {name: i for i, name in enumerate(zones)}
+        self.zone_coords = [PLACES.get(name) for name in zones]
+        self.matrix = matrix
+        self._mapped = mapped
+        self.size = len(zones)
+
+    @classmethod
+    def load(cls, path=None):
+        """Memory-map de voorberekende matrix; bouw deze in het geheugen op als het bestand ontbreekt."""
+        path = path or TRAVEL_MATRIX_FILE
+        try:
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                magic, version, count, names_length = struct.unpack_from(HEADER_FORMAT, mapped, 0)
+                if magic != MATRIX_MAGIC or version != MATRIX_VERSION:
+                    raise ValueError(f"Onbekend matrixformaat in {path}")
+
+                names = bytes(mapped[HEADER_SIZE:HEADER_SIZE + names_length]).decode('utf-8').split('\n')
+                offset = HEADER_SIZE + names_length + (HEADER_SIZE + names_length) % 2
+                matrix = memoryview(mapped)[offset:offset + count * count * 2].cast('H')
+                logging.info("Reistijdmatrix met %s zones geladen uit %s", count, path)
+                return cls(names, matrix, mapped)
+        except Exception as e:
+            logging.error("Fout bij laden van reistijdmatrix: %s", e)
+
+        logging.warning("Geen voorberekende reistijdmatrix gevonden, matrix wordt in het geheugen opgebouwd")
+        names, matrix = build_matrix()
+        return cls(names, matrix)
+
+    def minutes_between_zones(self, origin, destination):
+        """Geef de reistijd in minuten tussen twee zone-indices."""
+        return self.matrix[origin * self.size + destination]
+
+    def zone_for_location(self, location):
+        """Bepaal de zone-index voor een locatie, of None buiten de regio."""
+        return self._zone_for_location(location)
+
+    @lru_cache(maxsize=1024)
+    def _zone_for_location(self, location):
+        result = resolve_location(location)
+        if result is None:
+            return None
+
+        name, lat, lon = result
+        if name in self.zone_index:
+            return self.zone_index[name]
+
+        # Dichtstbijzijnde zone voor postcodegebieden en plaatsen zonder eigen zone
+        best_index, best_distance = None, None
+        for index, coords in enumerate(self.zone_coords):
+            if coords is None:
+                continue
+            distance = haversine((lat, lon), coords)
+            if best_distance is None or distance < best_distance:
+                best_index, best_distance = index, distance
+
+        if best_distance is None or best_distance > REGION_RADIUS_KM / 4:
+            return None
+        return best_index
+
+    def travel_minutes(self, origin_location, destination_location):
+        """Geef de reistijd in minuten tussen twee locaties, of None als die niet bekend is."""
+        origin = self.zone_for_location(origin_location)
+        destination = self.zone_for_location(destination_location)
+        if origin is None or destination is None:
+            return None
+        return self.minutes_between_zones(origin, destination)
+
+# Singleton instantie
+_travel_time_model = None
+
+def get_travel_time_model():
+    """Verkrijg een singleton instantie van het TravelTimeModel."""
+    global _travel_time_model
+    if _travel_time_model is None:
+        _travel_time_model = TravelTimeModel.load()
+    return _travel_time_model
+
+def travel_minutes(origin_location, destination_location):
+    """Geef de reistijd in minuten tussen twee locaties."""
+    return get_travel_time_model().travel_minutes(origin_location, destination_location)
+
+# Offline opbouwen van de matrix
+if __name__ == "__main__":
+    import sys
+
+    if len(sys.argv) > 1 and sys.argv[1] == "build":
+        write_matrix()
+    else:
+        print("Gebruik: python travel_time.py build")
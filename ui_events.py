@@ -0,0 +1,79 @@
+import queue
+import logging
+
+# Standaardinstellingen
+DRAIN_INTERVAL = 50  # Milliseconden tussen het verwerken van gebeurtenissen in de GUI (ongeveer één frame)
+MAX_EVENTS_PER_DRAIN = 1000  # Meer gebeurtenissen worden in het volgende frame verwerkt, zodat de GUI blijft reageren
+
+# Hoe gebeurtenissen van hetzelfde soort binnen één frame worden samengevoegd
+LATEST = "latest"  # Alleen de laatste waarde telt (status, tijd van de laatste controle)
+EXTEND = "extend"  # Lijsten worden aan elkaar gevoegd (nieuwe opdrachten)
+
+
+def coalesce(events, merge):
+    """Voeg gebeurtenissen samen volgens merge ({gebeurtenis: LATEST of EXTEND}).
+
+    Andere gebeurtenissen (fouten, meldingen) blijven allemaal en in volgorde bewaard.
+    """
+    merged = {}
+    for event, value in events:
+        mode = merge.get(event)
+        if mode == LATEST:
+            merged.pop(event, None)  # Naar achteren, zodat de volgorde met andere gebeurtenissen klopt
+            merged[event] = value
+        elif mode == EXTEND:
+            merged.setdefault(event, []).extend(value)
+        else:
+            merged[(event, len(merged))] = value
+    return [(key[0] if isinstance(key, tuple) else key, value) for key, value in merged.items()]
+
+
+class UIEventBus:
+    def __init__(self, root, handler, merge=None, interval=DRAIN_INTERVAL):
+        """Breng gebeurtenissen uit andere threads naar de Tk thread.
+
+        Threads roepen post() aan; één periodieke drain in de Tk thread voegt alles van een frame
+        samen en roept handler(gebeurtenis, waarde) per samengevoegde gebeurtenis aan. Zo kost een
+        burst van duizend opdrachten één treeview verversing in plaats van duizend root.after aanroepen.
+        """
+        self.root = root
+        self.handler = handler
+        self.merge = merge or {}
+        self.interval = interval
+        self.events = queue.SimpleQueue()
+        self.after_id = None
+
+    def post(self, event, value=None):
+        """Plaats een gebeurtenis; kan vanuit elke thread worden aangeroepen."""
+        self.events.put((event, value))
+
+    def start(self):
+        if self.after_id is None:
+            self.after_id = self.root.after(self.interval, self.drain)
+        return self
+
+    def stop(self):
+        if self.after_id is not None:
+            self.root.after_cancel(self.after_id)
+            self.after_id = None
+
+    def take(self, limit=MAX_EVENTS_PER_DRAIN):
+        events = []
+        while len(events) < limit:
+            try:
+                events.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def drain(self):
+        """Verwerk de gebeurtenissen van dit frame in de Tk thread en plan de volgende drain."""
+        try:
+            for event, value in coalesce(self.take(), self.merge):
+                try:
+                    self.handler(event, value)
+                except Exception as e:
+                    logging.error("Fout bij verwerken van GUI gebeurtenis %s: %s", event, e)
+        finally:
+            if self.after_id is not None:  # Niet na stop()
+                self.after_id = self.root.after(self.interval, self.drain)
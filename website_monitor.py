@@ -4,10 +4,9 @@ import logging
 from bs4 import BeautifulSoup
 import json
 import os
-from notification import send_notification
-
-# Configureer logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from notification_outbox import enqueue_notification as send_notification
+from notification_templates import template_message
+from persistence import atomic_write_json
 
 class WebsiteMonitor:
     def __init__(self, url, check_interval=1):  # Interval gewijzigd naar 1 seconde
@@ -34,15 +33,14 @@ class WebsiteMonitor:
                     self.last_content = json.load(f)
                 logging.info("Eerder opgeslagen content geladen.")
         except Exception as e:
-            logging.error(f"Fout bij laden van opgeslagen content: {e}")
+            logging.error("Fout bij laden van opgeslagen content: %s", e)
     
     def save_content(self, content):
-        """Sla huidige website content op."""
+        """Sla huidige website content op (alleen als die veranderd is)."""
         try:
-            with open(self.content_file, 'w') as f:
-                json.dump(content, f)
+            atomic_write_json(self.content_file, content)
         except Exception as e:
-            logging.error(f"Fout bij opslaan van content: {e}")
+            logging.error("Fout bij opslaan van content: %s", e)
     
     def check_website(self):
         """Controleer de website op veranderingen."""
@@ -64,21 +62,20 @@ class WebsiteMonitor:
             # Vergelijk met vorige content
             if self.last_content is not None and current_content != self.last_content:
                 logging.info("Verandering gedetecteerd op de website!")
-                # Stuur notificatie
-                send_notification("Website Verandering", 
-                                 f"Er is een verandering gedetecteerd op {self.url}")
+                # Stuur notificatie (via de outbox, zodat een trage provider de controle niet ophoudt)
+                send_notification(**template_message("website_change", url=self.url))
             
             # Update laatste content
             self.last_content = current_content
             self.save_content(current_content)
             
         except Exception as e:
-            logging.error(f"Fout bij controleren van website: {e}")
+            logging.error("Fout bij controleren van website: %s", e)
     
     def start_monitoring(self):
         """Start het monitoren van de website."""
         self.running = True
-        logging.info(f"Start monitoring van {self.url} elke {self.check_interval} seconde(n).")
+        logging.info("Start monitoring van %s elke %s seconde(n).", self.url, self.check_interval)
         
         try:
             while self.running:
@@ -95,6 +92,7 @@ class WebsiteMonitor:
 
 # Voorbeeld gebruik
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
     # Vervang met de URL die je wilt monitoren
     monitor = WebsiteMonitor("https://example.com", check_interval=1) 
     monitor.start_monitoring()